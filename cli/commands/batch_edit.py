@@ -6,12 +6,11 @@
 import sys
 import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 
 # 添加 src 到路径
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.image import ImageEditor
 from cli.shared import (
     check_api_key,
     print_banner,
@@ -21,6 +20,12 @@ from cli.shared import (
     print_warning
 )
 
+if TYPE_CHECKING:
+    from src.image import ImageEditor
+
+# 执行时才导入的重量级模块，守护进程启动时预先加载
+PRELOAD_MODULES = ("src.image.image_edit",)
+
 
 def add_arguments(parser):
     """添加子命令参数"""
@@ -52,12 +57,17 @@ def add_arguments(parser):
         action="store_true",
         help="试运行模式，不实际处理图像"
     )
+    parser.add_argument(
+        "--enqueue",
+        metavar="QUEUE",
+        help="不在本地执行，将任务加入任务队列（SQLite 文件路径或队列地址），由 worker 子命令执行"
+    )
 
 
 def execute(args):
     """执行子命令"""
-    # 检查 API 密钥
-    if not check_api_key(args.api_key):
+    # 检查 API 密钥（入队模式由 worker 使用自己的密钥）
+    if not args.enqueue and not check_api_key(args.api_key):
         return 1
 
     # 加载配置
@@ -94,8 +104,13 @@ def execute(args):
             print(f"  📋 将处理：{creation['name']} -> {filename}")
         return 0
 
+    if args.enqueue:
+        return enqueue_creations(args.enqueue, creations_to_process, base_image, output_dir)
+
     # 初始化编辑器
     try:
+        from src.image import ImageEditor
+
         editor = ImageEditor(api_key=args.api_key)
     except Exception as e:
         print_error(f"初始化失败：{e}")
@@ -132,7 +147,147 @@ def load_config(config_path: str) -> Dict[str, Any]:
         sys.exit(1)
 
 
-def process_single_creation(editor: ImageEditor, creation: Dict[str, Any], default_image: str, output_dir: str) -> bool:
+def build_edit_params(creation: Dict[str, Any], default_image: str) -> Optional[Dict[str, Any]]:
+    """
+    根据创作配置构建图像编辑参数
+
+    Args:
+        creation: 单个创作配置
+        default_image: 配置文件中的默认图像
+
+    Returns:
+        Optional[Dict[str, Any]]: ImageEditor.edit_image 的参数，缺少图像时返回None
+    """
+    # 获取模型
+    model = creation.get('model', 'qwen-image-edit')
+
+    # 获取图像 URL（优先使用 creation 中的 image，其次使用 base_image）
+    image_url = creation.get('image', default_image)
+    if not image_url:
+        return None
+
+    # 构建参数
+    params = {
+        'model': model,
+        'image_url': image_url,
+        'prompt': creation['prompt'],
+        'watermark': creation.get('watermark', False)
+    }
+
+    # 添加千问模型的反向提示词
+    if model == 'qwen-image-edit' and creation.get('negative_prompt'):
+        params['negative_prompt'] = creation['negative_prompt']
+
+    # 添加万相模型的功能参数
+    if model == 'wanx2.1-imageedit' and creation.get('function'):
+        params['function'] = creation['function']
+        if creation.get('strength') is not None:
+            params['strength'] = creation['strength']
+        if creation.get('upscale_factor') is not None:
+            params['upscale_factor'] = creation['upscale_factor']
+        if creation.get('is_sketch') is not None:
+            params['is_sketch'] = creation['is_sketch']
+        if creation.get('top_scale') is not None:
+            params['top_scale'] = creation['top_scale']
+            params['bottom_scale'] = creation.get('bottom_scale', 1.0)
+            params['left_scale'] = creation.get('left_scale', 1.0)
+            params['right_scale'] = creation.get('right_scale', 1.0)
+        if creation.get('mask_image') and is_local_file(creation['mask_image']):
+            # 本地 mask 重新编码为最小的 PNG 后内联
+            from src.utils.mask_utils import compact_mask_file
+            params['mask_image_url'] = compact_mask_file(creation['mask_image']).to_data_url()
+        elif creation.get('mask_image'):
+            params['mask_image_url'] = creation['mask_image']
+        elif creation.get('mask_shapes'):
+            params['mask_image_url'] = build_shape_mask(creation, image_url)
+
+    return params
+
+
+def is_local_file(value: str) -> bool:
+    """
+    判断图像参数是否为本地文件
+
+    data URL 和 http(s) 地址不检查文件系统：较长的 data URL 作为路径会触发 OSError（文件名过长）
+
+    Args:
+        value: 图像路径、URL 或 data URL
+
+    Returns:
+        bool: 是否为存在的本地文件
+    """
+    if value.startswith(('data:', 'http://', 'https://')):
+        return False
+    try:
+        return Path(value).is_file()
+    except OSError:
+        return False
+
+
+def build_shape_mask(creation: Dict[str, Any], image_url: str) -> str:
+    """
+    根据 mask_shapes 在内存中生成 mask，返回 Base64 data URL
+
+    Args:
+        creation: 单个创作配置，mask_size 为 [宽, 高]，未指定时读取本地图像的尺寸
+        image_url: 创作使用的图像
+
+    Returns:
+        str: mask 的 data URL
+    """
+    from src.utils.mask_utils import MaskCanvas
+
+    reference = creation.get('mask_size') or image_url
+    if isinstance(reference, str) and not is_local_file(reference):
+        raise ValueError("图像不是本地文件时需通过 mask_size 指定 mask 尺寸")
+    return MaskCanvas.from_shapes(reference, creation['mask_shapes']).to_data_url()
+
+
+def enqueue_creations(queue: str, creations: List[Dict[str, Any]], default_image: str, output_dir: str) -> int:
+    """将创作加入任务队列"""
+    from src.gateway.adapters import ImageEditAdapter
+    from src.utils.file_utils import encode_file_to_base64
+    from src.workqueue import open_queue
+
+    try:
+        backend = open_queue(queue)
+    except Exception as e:
+        print_error(f"打开任务队列失败：{e}")
+        return 1
+
+    adapter = ImageEditAdapter(api_key=None)
+    queued = 0
+    try:
+        for creation in creations:
+            try:
+                # mask_shapes 等用户配置在这里解析，单个创作出错时跳过
+                params = build_edit_params(creation, default_image)
+                if params is None:
+                    print_error(f"{creation['name']} 缺少 image 字段")
+                    continue
+                # worker 可能运行在其他主机上，本地文件在入队时编码为 Base64
+                for key in ('image_url', 'mask_image_url'):
+                    if params.get(key) and is_local_file(params[key]):
+                        params[key] = encode_file_to_base64(params[key])
+                params = adapter.validate(params)
+            except Exception as e:
+                print_error(f"{creation['name']} 参数错误：{e}")
+                continue
+
+            filename = creation.get('filename', f"creation_{creation.get('id', 'unknown')}.png")
+            job_id = backend.enqueue('image-edit', params, output={'output_dir': output_dir, 'filename': filename})
+            print_success(f"{creation['name']} 已入队：{job_id}")
+            queued += 1
+    finally:
+        backend.close()
+
+    print("=" * 60)
+    print(f"✅ 已入队：{queued}/{len(creations)}，使用 'python -m cli worker {queue}' 执行")
+    print("=" * 60)
+    return 0 if queued else 1
+
+
+def process_single_creation(editor: "ImageEditor", creation: Dict[str, Any], default_image: str, output_dir: str) -> bool:
     """处理单个创作"""
     try:
         print_info(f"正在处理：{creation['name']}")
@@ -141,43 +296,11 @@ def process_single_creation(editor: ImageEditor, creation: Dict[str, Any], defau
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        # 获取模型
-        model = creation.get('model', 'qwen-image-edit')
-
-        # 获取图像 URL（优先使用 creation 中的 image，其次使用 base_image）
-        image_url = creation.get('image', default_image)
-        if not image_url:
+        params = build_edit_params(creation, default_image)
+        if params is None:
             print_error(f"{creation['name']} 缺少 image 字段")
             return False
-
-        # 构建参数
-        params = {
-            'model': model,
-            'image_url': image_url,
-            'prompt': creation['prompt'],
-            'watermark': creation.get('watermark', False)
-        }
-
-        # 添加千问模型的反向提示词
-        if model == 'qwen-image-edit' and creation.get('negative_prompt'):
-            params['negative_prompt'] = creation['negative_prompt']
-
-        # 添加万相模型的功能参数
-        if model == 'wanx2.1-imageedit' and creation.get('function'):
-            params['function'] = creation['function']
-            if creation.get('strength') is not None:
-                params['strength'] = creation['strength']
-            if creation.get('upscale_factor') is not None:
-                params['upscale_factor'] = creation['upscale_factor']
-            if creation.get('is_sketch') is not None:
-                params['is_sketch'] = creation['is_sketch']
-            if creation.get('top_scale') is not None:
-                params['top_scale'] = creation['top_scale']
-                params['bottom_scale'] = creation.get('bottom_scale', 1.0)
-                params['left_scale'] = creation.get('left_scale', 1.0)
-                params['right_scale'] = creation.get('right_scale', 1.0)
-            if creation.get('mask_image'):
-                params['mask_image_url'] = creation['mask_image']
+        model = params['model']
 
         # 执行编辑
         result = editor.edit_image(**params)
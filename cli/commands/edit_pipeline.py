@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+图像编辑流水线子命令
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# 添加 src 到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from cli.shared import (
+    check_api_key,
+    print_banner,
+    print_success,
+    print_error,
+    print_info,
+    print_warning,
+    validate_file_exists
+)
+
+# 执行时才导入的重量级模块，守护进程启动时预先加载
+PRELOAD_MODULES = ("src.image.pipeline",)
+
+
+def add_arguments(parser):
+    """添加子命令参数"""
+    parser.add_argument(
+        "spec",
+        help="流水线配置文件（JSON）"
+    )
+    parser.add_argument(
+        "-i", "--input",
+        help="输入图像路径或 URL（覆盖配置中的 input）"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default="./output/pipeline",
+        help="输出目录 (默认：./output/pipeline)"
+    )
+    parser.add_argument(
+        "-j", "--max-workers",
+        type=int,
+        default=4,
+        help="最大并发步骤数 (默认：4)"
+    )
+    parser.add_argument(
+        "--save-intermediates",
+        action="store_true",
+        help="下载所有中间步骤的结果（默认只下载末端步骤和标记 save 的步骤）"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="只检查配置并显示执行顺序，不调用接口"
+    )
+    parser.add_argument(
+        "-k", "--api-key",
+        help="阿里云百炼 API 密钥"
+    )
+
+
+def execute(args):
+    """执行子命令"""
+    from src.image.pipeline import EditPipeline
+
+    try:
+        validate_file_exists(args.spec, ['.json'])
+        pipeline = EditPipeline.from_file(args.spec, api_key=args.api_key, max_workers=args.max_workers)
+    except Exception as e:
+        print_error(f"流水线配置错误：{e}")
+        return 1
+
+    source = args.input or pipeline.source
+    if not source:
+        print_error("未指定输入图像：请在配置中设置 input 或使用 -i 参数")
+        return 1
+
+    print_banner("图像编辑流水线", f"配置：{args.spec} | 步骤：{len(pipeline.steps)} | 并发：{args.max_workers}")
+    for step_id in pipeline.order:
+        step = pipeline.steps[step_id]
+        label = step.function or step.model
+        print_info(f"{step_id} ← {step.input}（{label}）")
+
+    if args.dry_run:
+        return 0
+    if not check_api_key(args.api_key):
+        return 1
+
+    start = time.time()
+    try:
+        results = pipeline.run(
+            source=source,
+            output_dir=args.output,
+            save_intermediates=args.save_intermediates,
+            on_step=print_step
+        )
+    except Exception as e:
+        print_error(f"流水线执行失败：{e}")
+        return 1
+
+    summary_path = Path(args.output) / f"{Path(args.spec).stem}_pipeline.json"
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "spec": args.spec,
+                "input": source,
+                "elapsed": round(time.time() - start, 3),
+                "steps": [result.model_dump() for result in results.values()]
+            },
+            f, ensure_ascii=False, indent=2
+        )
+
+    succeeded = sum(1 for result in results.values() if result.status == "SUCCEEDED")
+    print("=" * 60)
+    print(f"✅ 成功：{succeeded}/{len(results)} | 总耗时：{time.time() - start:.1f}秒")
+    print(f"📄 执行记录：{summary_path}")
+    print("=" * 60)
+    return 0 if succeeded == len(results) else 1
+
+
+def print_step(result):
+    """输出步骤结果"""
+    if result.status == "SUCCEEDED":
+        detail = f"已保存 {result.file}" if result.file else "结果URL已传给下游步骤"
+        print_success(f"{result.id} 完成（{result.elapsed:.1f}秒）：{detail}")
+    elif result.status == "SKIPPED":
+        print_warning(f"{result.id} 跳过：{result.error}")
+    else:
+        print_error(f"{result.id} 失败：{result.error}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+HTTP 网关子命令
+"""
+
+import sys
+from pathlib import Path
+
+# 添加 src 到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from cli.shared import check_api_key, print_banner, print_error, print_info
+
+
+def add_arguments(parser):
+    """添加子命令参数"""
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="监听地址 (默认：127.0.0.1)"
+    )
+    parser.add_argument(
+        "-p", "--port",
+        type=int,
+        default=8080,
+        help="监听端口 (默认：8080)"
+    )
+    parser.add_argument(
+        "-k", "--api-key",
+        help="阿里云百炼 API 密钥"
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=1000,
+        help="最大排队任务数，超出时返回 429 (默认：1000)"
+    )
+    parser.add_argument(
+        "--tenant-limit",
+        type=int,
+        default=4,
+        help="单个租户最大同时进行中任务数 (默认：4)"
+    )
+    parser.add_argument(
+        "--max-inflight",
+        type=int,
+        default=64,
+        help="全局最大同时进行中任务数 (默认：64)"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=3.0,
+        help="任务状态轮询间隔（秒）(默认：3)"
+    )
+    parser.add_argument(
+        "-t", "--timeout",
+        type=float,
+        default=600.0,
+        help="单个任务超时时间（秒）(默认：600)"
+    )
+
+
+def execute(args):
+    """执行子命令"""
+    if not check_api_key(args.api_key):
+        return 1
+
+    try:
+        from src.gateway import run_gateway
+    except ImportError as e:
+        print_error(f"缺少依赖：{e}，请执行 pip install aiohttp")
+        return 1
+
+    print_banner("DashScope HTTP 网关", f"监听：http://{args.host}:{args.port}")
+    print_info("提交任务：POST /v1/jobs/{text2image|image-edit|style-repaint|sketch|video}")
+    print_info("查询状态：GET /v1/jobs/<job_id>  进度推送：GET /v1/jobs/<job_id>/events")
+
+    try:
+        run_gateway(
+            host=args.host,
+            port=args.port,
+            api_key=args.api_key,
+            max_queue=args.max_queue,
+            tenant_limit=args.tenant_limit,
+            max_inflight=args.max_inflight,
+            poll_interval=args.poll_interval,
+            job_timeout=args.timeout
+        )
+    except Exception as e:
+        print_error(f"网关运行失败：{e}")
+        return 1
+
+    return 0
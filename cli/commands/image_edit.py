@@ -5,11 +5,13 @@
 
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 # 添加 src 到路径
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.image import ImageEditor
+# 参数定义只用到常量；编辑器、分块、mask 和尺寸适配依赖 httpx/pydantic/numpy/PIL，在用到时才导入
+from src.image.constants import FIT_METHODS, MODEL_CAPABILITIES
 from cli.shared import (
     check_api_key,
     print_banner,
@@ -21,6 +23,12 @@ from cli.shared import (
     validate_file_exists
 )
 
+if TYPE_CHECKING:
+    from src.image import ImageEditor
+
+# 执行时才导入的重量级模块，守护进程启动时预先加载
+PRELOAD_MODULES = ("src.image.image_edit", "src.image.tiling", "src.image.fitting", "src.utils.mask_utils")
+
 
 def add_arguments(parser):
     """添加子命令参数"""
@@ -125,6 +133,36 @@ def add_arguments(parser):
         help="输入是否为线稿图像 (true=直接基于线稿作画，false=先提取线稿再作画)"
     )
 
+    # 大图分块处理参数
+    tile_group = parser.add_argument_group('大图分块处理（仅万相模型，超出输入尺寸限制的大图）')
+    tile_group.add_argument(
+        "--tile",
+        type=int,
+        metavar="SIZE",
+        help="按 SIZE 像素切分为带重叠的分块并发处理后拼接 (512-4096，如 1024)"
+    )
+    tile_group.add_argument(
+        "--tile-overlap",
+        type=int,
+        default=128,
+        help="相邻分块的最小重叠像素 (默认：128)"
+    )
+    tile_group.add_argument(
+        "--tile-workers",
+        type=int,
+        default=4,
+        help="最大并发分块数 (默认：4)"
+    )
+
+    wanx_group.add_argument(
+        "--mask-crop",
+        type=int,
+        nargs="?",
+        const=64,
+        metavar="PAD",
+        help="局部重绘时只提交 mask 编辑区域外扩 PAD 像素（默认 64）的裁剪区域，结果贴回原图"
+    )
+
     wanx_group.add_argument(
         "mask_path",
         nargs='?',
@@ -161,6 +199,19 @@ def add_arguments(parser):
         help="输出文件名（可选，默认自动生成）"
     )
 
+    parser.add_argument(
+        "--fit-model",
+        metavar="NAME",
+        help=f"提交前把本地图像（及 mask）裁剪或填充为该模型支持的最接近尺寸，"
+             f"可用：{', '.join(MODEL_CAPABILITIES)} 或具体模型名称"
+    )
+    parser.add_argument(
+        "--fit-method",
+        choices=FIT_METHODS,
+        default="auto",
+        help="适配方式：auto（宽高比相差不大时裁剪，否则填充）、crop（裁剪信息最多的区域）、pad（按边缘颜色填充）"
+    )
+
 
 def execute(args):
     """执行子命令"""
@@ -174,10 +225,24 @@ def execute(args):
         return 1
 
     try:
+        from src.image import ImageEditor
+
         editor = ImageEditor(api_key=args.api_key)
 
-        # 验证图像路径
-        image_url = validate_image_path(args.image_path, editor)
+        if args.fit_model and (args.tile or args.mask_crop is not None):
+            print_error("--fit-model 不能与 --tile 或 --mask-crop 同时使用")
+            return 1
+
+        if args.tile:
+            return process_tiled(args, editor)
+
+        # 验证图像路径（局部重绘时图像和 mask 一起适配，见下方）
+        with_mask = args.function == "description_edit_with_mask" and args.mask_path
+        image_url = validate_image_path(
+            args.image_path, editor,
+            fit_model=None if with_mask else args.fit_model,
+            fit_method=args.fit_method
+        )
 
         # 模型专用参数验证
         mask_image_url = None
@@ -192,7 +257,17 @@ def execute(args):
                     print_error("万相局部重绘功能需要提供 mask 图像")
                     print("使用示例：python -m cli image-edit base.jpg mask.png '添加物体' --function description_edit_with_mask")
                     return 1
-                mask_image_url = validate_image_path(args.mask_path, editor)
+                if args.mask_crop is not None:
+                    return process_mask_crop(args, editor)
+                if args.fit_model and Path(args.image_path).exists() and Path(args.mask_path).exists():
+                    from src.image.fitting import encode_image_for_model
+
+                    image_url, mask_image_url, plan = encode_image_for_model(
+                        args.image_path, args.fit_model, args.fit_method, args.mask_path
+                    )
+                    print_fit_plan(args.fit_model, plan)
+                else:
+                    mask_image_url = validate_mask_path(args.mask_path)
                 print_info(f"使用万相局部重绘：mask={args.mask_path}")
             else:
                 print_info(f"使用万相功能：{args.function}")
@@ -264,16 +339,7 @@ def execute(args):
         output_dir.mkdir(parents=True, exist_ok=True)
 
         # 生成文件名
-        if args.filename:
-            filename = args.filename
-        else:
-            model_short = get_model_short_name(args.model)
-            safe_name = "".join(c for c in args.prompt[:20] if c.isalnum() or c in (' ', '-', '_')).strip()
-            safe_name = safe_name.replace(' ', '_') or "edited"
-            if args.function:
-                filename = f"{model_short}_{args.function}_{safe_name}.png"
-            else:
-                filename = f"{model_short}_{safe_name}.png"
+        filename = build_output_filename(args)
 
         file_path = editor.download_image(edited_url, str(output_dir), filename)
 
@@ -288,8 +354,180 @@ def execute(args):
         return 1
 
 
-def validate_image_path(image_path: str, editor: ImageEditor) -> str:
-    """验证图像路径并返回 URL/Base64"""
+def build_output_filename(args) -> str:
+    """生成输出文件名"""
+    if args.filename:
+        return args.filename
+    model_short = get_model_short_name(args.model)
+    safe_name = "".join(c for c in args.prompt[:20] if c.isalnum() or c in (' ', '-', '_')).strip()
+    safe_name = safe_name.replace(' ', '_') or "edited"
+    if args.function:
+        return f"{model_short}_{args.function}_{safe_name}.png"
+    return f"{model_short}_{safe_name}.png"
+
+
+def process_tiled(args, editor: "ImageEditor") -> int:
+    """大图分块编辑"""
+    from src.image.tiling import TiledEditor
+
+    if args.model != "wanx2.1-imageedit" or not args.function:
+        print_error("分块处理需要使用万相模型并指定 --function，如：-m wanx2.1-imageedit -f super_resolution")
+        return 1
+
+    params = {}
+    if args.strength is not None:
+        params['strength'] = args.strength
+    if args.function == "super_resolution":
+        params['upscale_factor'] = args.upscale_factor
+    if args.seed is not None:
+        params['seed'] = args.seed
+
+    tiled = TiledEditor(
+        editor=editor,
+        tile_size=args.tile,
+        overlap=args.tile_overlap,
+        max_workers=args.tile_workers
+    )
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / build_output_filename(args)
+
+    print_info(f"正在分块编辑：{args.image_path}")
+    print_info(f"使用功能：{args.function} | 分块：{args.tile}px | 重叠：{args.tile_overlap}px | 并发：{args.tile_workers}")
+    result = tiled.process(
+        args.image_path,
+        str(output_path),
+        function=args.function,
+        prompt=args.prompt,
+        watermark=args.watermark,
+        **params
+    )
+
+    print_success(f"编辑完成！{result.columns}×{result.rows} 个分块，耗时 {result.elapsed:.1f}秒")
+    print_info(f"输出尺寸：{result.width}×{result.height}")
+    print_info(f"接缝误差：平均 {result.seam_error_mean:.2f}，最大 {result.seam_error_max:.2f}（0-255，{result.seam_count} 处重叠）")
+    if result.seam_error_max > 12:
+        print_warning("接缝误差较大，可尝试增大 --tile-overlap 或 --tile")
+    print_success(f"保存路径：{result.output_path}")
+    return 0
+
+
+def validate_mask_path(mask_path: str) -> str:
+    """验证 mask 路径，本地文件重新编码为最小的 PNG 后返回 Base64"""
+    if not Path(mask_path).exists():
+        if mask_path.startswith(('http://', 'https://')):
+            return mask_path
+        raise FileNotFoundError(f"mask 文件不存在：{mask_path}")
+
+    from src.utils.mask_utils import compact_mask_file
+
+    encoding = compact_mask_file(mask_path)
+    if encoding.mode != "original":
+        print_info(
+            f"mask 编码：{len(encoding.data) / 1024:.1f} KB（原文件 {encoding.baseline_bytes / 1024:.1f} KB，"
+            f"减少 {encoding.reduction:.1%}）"
+        )
+    return encoding.to_data_url()
+
+
+def process_mask_crop(args, editor: "ImageEditor") -> int:
+    """局部重绘只提交编辑区域附近的裁剪图，完成后贴回原图"""
+    import base64
+    import io
+
+    from PIL import Image
+    from src.utils.http_client import http_client
+    from src.utils.mask_utils import MaskCanvas, edit_region_box, paste_edit_result
+
+    if not Path(args.image_path).is_file() or not Path(args.mask_path).is_file():
+        print_error("--mask-crop 需要本地图像和本地 mask 文件")
+        return 1
+
+    with Image.open(args.image_path) as image:
+        image_format = image.format
+        original = image.convert("RGB")
+    mask = MaskCanvas.from_image(args.mask_path)
+    if mask.size != original.size:
+        print_error(f"mask 尺寸 {mask.size} 与原图 {original.size} 不一致")
+        return 1
+
+    box = edit_region_box(mask.array, original.size, padding=args.mask_crop)
+    if box is None:
+        print_error("mask 不包含编辑区域")
+        return 1
+
+    # 原图为 JPEG 时裁剪区域也用 JPEG 提交，避免体积膨胀
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        original.crop(box).save(buffer, format="JPEG", quality=95)
+        mime_type = "image/jpeg"
+    else:
+        original.crop(box).save(buffer, format="PNG", optimize=True)
+        mime_type = "image/png"
+    image_url = f"data:{mime_type};base64," + base64.b64encode(buffer.getvalue()).decode("utf-8")
+    mask_crop = mask.crop(box)
+    mask_encoding = mask_crop.encode(measure_baseline=False)
+
+    full_bytes = Path(args.image_path).stat().st_size + Path(args.mask_path).stat().st_size
+    crop_bytes = len(buffer.getvalue()) + len(mask_encoding.data)
+    print_info(f"裁剪区域：{box}（{box[2] - box[0]}×{box[3] - box[1]}，原图 {original.width}×{original.height}）")
+    print_info(f"提交大小：{crop_bytes / 1024:.1f} KB（整图 {full_bytes / 1024:.1f} KB，减少 {1 - crop_bytes / full_bytes:.1%}）")
+    print_info(f"编辑指令：{args.prompt}")
+
+    params = {}
+    if args.strength is not None:
+        params['strength'] = args.strength
+    result = editor.edit_image(
+        model=args.model,
+        image_url=image_url,
+        prompt=args.prompt,
+        function=args.function,
+        mask_image_url=mask_encoding.to_data_url(),
+        n=args.n,
+        seed=args.seed,
+        watermark=args.watermark,
+        **params
+    )
+    urls = [item.url for item in result.results or [] if item.url]
+    if not urls:
+        print_error("编辑失败：未获取到结果")
+        return 1
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    filename = Path(build_output_filename(args))
+    with http_client() as client:
+        for index, url in enumerate(urls, 1):
+            response = client.get(url)
+            response.raise_for_status()
+            with Image.open(io.BytesIO(response.content)) as edited:
+                merged = paste_edit_result(original, edited, box, mask_crop.array)
+            name = filename.name if len(urls) == 1 else f"{filename.stem}_{index}{filename.suffix}"
+            merged.save(output_dir / name)
+            print_success(f"保存路径：{output_dir / name}")
+
+    print_info(f"任务 ID: {result.task_id}")
+    return 0
+
+
+def print_fit_plan(fit_model: str, plan) -> None:
+    """输出尺寸适配结果"""
+    width, height = plan.size
+    action = "裁剪" if plan.method == "crop" else "填充"
+    if plan.changed:
+        print_info(f"已按 {fit_model} 适配为 {width}x{height}（{action}）")
+    else:
+        print_info(f"图像尺寸 {width}x{height} 已满足 {fit_model} 的要求")
+
+
+def validate_image_path(
+    image_path: str,
+    editor: "ImageEditor",
+    fit_model: Optional[str] = None,
+    fit_method: str = "auto"
+) -> str:
+    """验证图像路径并返回 URL/Base64，指定 fit_model 时本地图像先适配为该模型支持的尺寸"""
     path = Path(image_path)
     if not path.exists():
         # 如果是 URL，直接返回
@@ -298,5 +536,12 @@ def validate_image_path(image_path: str, editor: ImageEditor) -> str:
         else:
             raise FileNotFoundError(f"图像文件不存在：{image_path}")
 
+    if fit_model:
+        from src.image.fitting import encode_image_for_model
+
+        image_url, _, plan = encode_image_for_model(str(path), fit_model, fit_method)
+        print_fit_plan(fit_model, plan)
+        return image_url
+
     # 本地文件转换为 Base64
     return editor.encode_image_to_base64(str(path))
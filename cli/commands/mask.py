@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+批量mask生成子命令
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 添加 src 到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from cli.shared import (
+    print_banner,
+    print_success,
+    print_error,
+    print_info,
+    print_warning
+)
+
+# 执行时才导入的重量级模块，守护进程启动时预先加载
+PRELOAD_MODULES = ("src.utils.mask_batch",)
+
+
+def add_arguments(parser):
+    """添加子命令参数"""
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="mask清单（.json），或图像文件/目录/通配符（需配合 --spec）"
+    )
+    parser.add_argument(
+        "--spec",
+        help="mask规格文件（JSON，包含 color 和/或 shapes），应用于所有图像输入"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="输出目录 (默认：清单中的 output_directory 或 ./output/masks)"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        help="并发进程数 (默认：CPU 核数)"
+    )
+    parser.add_argument(
+        "--min-coverage",
+        type=float,
+        help="编辑区域占比下限（0-1），低于下限的 mask 标记为无效"
+    )
+    parser.add_argument(
+        "--max-coverage",
+        type=float,
+        help="编辑区域占比上限（0-1），高于上限的 mask 标记为无效"
+    )
+    parser.add_argument(
+        "--summary",
+        help="汇总清单路径 (默认：<输出目录>/masks_manifest.json)"
+    )
+
+
+def execute(args):
+    """执行子命令"""
+    from src.utils.mask_batch import assign_outputs, iter_mask_batch
+
+    try:
+        items, output_dir = collect_items(args)
+    except Exception as e:
+        print_error(f"读取输入失败：{e}")
+        return 1
+    if not items:
+        print_error("没有找到需要处理的图像")
+        return 1
+
+    output_dir = args.output or output_dir or "./output/masks"
+    assign_outputs(items, output_dir)
+    for item in items:
+        if args.min_coverage is not None:
+            item["min_coverage"] = args.min_coverage
+        if args.max_coverage is not None:
+            item["max_coverage"] = args.max_coverage
+
+    print_banner("批量 mask 生成", f"图像：{len(items)} | 输出：{output_dir}")
+
+    start = time.time()
+    records = []
+    counts = {"VALID": 0, "INVALID": 0, "FAILED": 0}
+    try:
+        for record in iter_mask_batch(items, workers=args.jobs):
+            records.append(record)
+            counts[record["status"]] += 1
+            name = Path(record["image"]).name
+            if record["status"] == "VALID":
+                print_success(f"{name}：占比 {record['coverage']:.2%}，区域 {record['bounding_box']}")
+            elif record["status"] == "INVALID":
+                print_warning(f"{name}：{'；'.join(record['issues'])}")
+            else:
+                print_error(f"{name}：{record['error']}")
+    except KeyboardInterrupt:
+        print_warning(f"已中断，已完成 {len(records)}/{len(items)}")
+
+    encoded = sum(record.get("bytes", 0) for record in records)
+    baseline = sum(record.get("baseline_bytes", 0) for record in records)
+
+    summary_path = Path(args.summary or Path(output_dir) / "masks_manifest.json")
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "generated_at": datetime.now().isoformat(timespec="seconds"),
+                "total": len(items),
+                "valid": counts["VALID"],
+                "invalid": counts["INVALID"],
+                "failed": counts["FAILED"],
+                "elapsed": round(time.time() - start, 3),
+                "bytes": encoded,
+                "baseline_bytes": baseline,
+                "items": records
+            },
+            f, ensure_ascii=False, indent=2
+        )
+
+    print("=" * 60)
+    print(f"✅ 有效：{counts['VALID']} | ⚠️ 无效：{counts['INVALID']} | ❌ 失败：{counts['FAILED']} | 耗时：{time.time() - start:.1f}秒")
+    if baseline:
+        print_info(f"mask 总大小：{encoded / 1024:.1f} KB（8 位灰度 PNG 为 {baseline / 1024:.1f} KB，减少 {1 - encoded / baseline:.1%}）")
+    print_info(f"汇总清单：{summary_path}")
+    print("=" * 60)
+    return 0 if counts["VALID"] == len(items) else 1
+
+
+def collect_items(args):
+    """根据命令行输入收集任务，返回 (任务列表, 清单中的输出目录)"""
+    from src.utils.mask_batch import SPEC_KEYS, expand_image_inputs, load_mask_manifest
+
+    items, output_dir = [], None
+    images = []
+    for value in args.inputs:
+        if value.lower().endswith(".json"):
+            manifest_items, manifest_output = load_mask_manifest(value)
+            items.extend(manifest_items)
+            output_dir = output_dir or manifest_output
+        else:
+            images.append(value)
+
+    if images:
+        if not args.spec:
+            raise ValueError("图像输入需要通过 --spec 指定 mask 规格")
+        with open(args.spec, "r", encoding="utf-8") as f:
+            spec = {key: value for key, value in json.load(f).items() if key in SPEC_KEYS}
+        items.extend({**spec, "image": image} for image in expand_image_inputs(images))
+    return items, output_dir
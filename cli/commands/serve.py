@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+守护进程子命令
+"""
+
+import os
+import signal
+import socket
+import sys
+from pathlib import Path
+
+# 添加 src 到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from cli.shared import print_banner, print_success, print_error, print_info
+
+
+def add_arguments(parser):
+    """添加子命令参数"""
+    parser.add_argument(
+        "--socket",
+        help="Unix socket 路径 (默认：环境变量 DASHSCOPE_CLI_SOCKET 或 ~/.dashscope-cli.sock)"
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=100,
+        help="共享连接池最大连接数 (默认：100)"
+    )
+    parser.add_argument(
+        "-t", "--timeout",
+        type=float,
+        default=30.0,
+        help="共享连接池请求超时时间（秒）(默认：30)"
+    )
+
+
+def _socket_in_use(socket_path: str) -> bool:
+    """检查 socket 是否已有守护进程在监听"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def execute(args):
+    """执行子命令"""
+    if not hasattr(socket, 'AF_UNIX'):
+        print_error("当前平台不支持 Unix socket，无法启动守护进程")
+        return 1
+
+    from cli.daemon import DaemonServer, get_default_socket_path, preload_commands
+    from src.utils.http_client import create_pooled_client, set_shared_client
+
+    socket_path = args.socket or get_default_socket_path()
+
+    if os.path.exists(socket_path):
+        if _socket_in_use(socket_path):
+            print_error(f"守护进程已在运行：{socket_path}")
+            return 1
+        # 清理上次异常退出遗留的 socket 文件
+        os.unlink(socket_path)
+
+    print_banner("DashScope CLI 守护进程", f"监听：{socket_path}")
+
+    loaded = preload_commands()
+    print_info(f"已预加载子命令：{', '.join(loaded)}")
+
+    client = create_pooled_client(timeout=args.timeout, max_connections=args.max_connections)
+    set_shared_client(client)
+
+    server = DaemonServer(socket_path)
+
+    # 后台运行时通常以 SIGTERM 停止，转为正常退出流程以清理 socket 文件
+    def _handle_sigterm(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    print_success("守护进程已启动，按 Ctrl+C 停止")
+    print_info("客户端用法：dashscope-cli --daemon text2image \"一只猫咪\"")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 守护进程已停止")
+    finally:
+        server.server_close()
+        set_shared_client(None)
+        client.close()
+
+    return 0
@@ -9,7 +9,6 @@ from pathlib import Path
 # 添加 src 到路径
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.image.sketch_to_image import SketchToImageGenerator
 from cli.shared import (
     check_api_key,
     print_banner,
@@ -19,6 +18,9 @@ from cli.shared import (
     validate_file_exists
 )
 
+# 执行时才导入的重量级模块，守护进程启动时预先加载
+PRELOAD_MODULES = ("src.image.sketch_to_image",)
+
 
 def add_arguments(parser):
     """添加子命令参数"""
@@ -91,6 +93,8 @@ def execute(args):
         return 1
 
     # 初始化生成器
+    from src.image.sketch_to_image import SketchToImageGenerator
+
     generator = SketchToImageGenerator(args.api_key)
 
     # 映射风格
@@ -3,7 +3,9 @@
 语音识别子命令
 """
 
+import json
 import sys
+import time
 from pathlib import Path
 
 # 添加 src 到路径
@@ -12,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 # 延迟导入，避免在 add_arguments 时加载依赖
 _microphone_recognizer = None
 _speaker_recognizer = None
+_file_transcriber = None
 
 def _get_microphone_recognizer():
     """延迟加载麦克风识别器"""
@@ -29,7 +32,15 @@ def _get_speaker_recognizer():
         _speaker_recognizer = SpeakerRecognizer
     return _speaker_recognizer
 
-from cli.shared import check_api_key, print_banner, print_info, print_success, print_error
+def _get_file_transcriber():
+    """延迟加载文件转写模块"""
+    global _file_transcriber
+    if _file_transcriber is None:
+        from src.audio import file_transcriber
+        _file_transcriber = file_transcriber
+    return _file_transcriber
+
+from cli.shared import check_api_key, print_banner, print_info, print_success, print_error, print_warning
 
 
 def add_arguments(parser):
@@ -55,11 +66,79 @@ def add_arguments(parser):
         type=int,
         help="指定音频设备索引"
     )
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="启用语音活动检测，静音时不发送音频（节省带宽和识别时长）"
+    )
+    parser.add_argument(
+        "--supervise",
+        action="store_true",
+        help="长时间无人值守运行：断线自动重连并重发未确认的音频，定期轮换识别会话"
+    )
     parser.add_argument(
         "--test",
         action="store_true",
         help="测试音频设置"
     )
+    parser.add_argument(
+        "--source",
+        action="append",
+        metavar="SPEC",
+        help="同时识别多个音源，可重复指定：mic、mic:<设备>、loopback、loopback:<设备>、file:<路径>，"
+             "末尾加 =<标签> 指定输出标签"
+    )
+    parser.add_argument(
+        "--max-delay",
+        type=float,
+        default=30.0,
+        help="多音源合并输出时句子的最长等待时间（秒），音源断线等原因无法确认顺序时超时输出 (默认：30)"
+    )
+    parser.add_argument(
+        "--transcript",
+        help="多音源识别结果同时写入该 JSONL 文件"
+    )
+    parser.add_argument(
+        "--file",
+        nargs="+",
+        metavar="PATH",
+        help="转写音频文件（WAV/MP3/FLAC 等），可指定多个"
+    )
+    parser.add_argument(
+        "--dir",
+        nargs="+",
+        metavar="DIR",
+        help="转写目录中的所有音频文件"
+    )
+    parser.add_argument(
+        "-r", "--recursive",
+        action="store_true",
+        help="配合 --dir 递归子目录"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default="./output/transcripts",
+        help="文件转写结果目录 (默认：./output/transcripts)"
+    )
+    parser.add_argument(
+        "--format",
+        nargs="+",
+        choices=["jsonl", "srt"],
+        default=["jsonl", "srt"],
+        help="文件转写输出格式 (默认：jsonl srt)"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=4,
+        help="同时转写的文件数 (默认：4)"
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="文件音频的发送速度（实时的倍数），0 表示不限速 (默认：0)"
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -102,24 +181,34 @@ def execute(args):
                 mic.list_microphones()
             return 0
 
+        if args.source:
+            return recognize_sources(args)
+
+        if args.file or args.dir:
+            return transcribe_files(args)
+
         # 根据模式启动识别器
         if args.mode == "mic":
             print_success("启动麦克风识别模式...")
             recognizer = _get_microphone_recognizer()(model=args.model)
             print_info("请对着麦克风说话，按 Ctrl+C 停止")
-            recognizer.start_listening(device_index=args.device)
+            recognizer.start_listening(device_index=args.device, vad=args.vad, supervise=args.supervise)
 
         elif args.mode == "speaker":
             print_success("启动扬声器识别模式...")
             recognizer = _get_speaker_recognizer()(model=args.model)
             print_info("请确保有音频正在播放，按 Ctrl+C 停止")
-            recognizer.start_listening(device_index=args.device)
+            recognizer.start_listening(device_index=args.device, vad=args.vad, supervise=args.supervise)
 
         else:
-            print_error("请指定模式：--mode mic 或 --mode speaker")
+            print_error("请指定模式：--mode mic 或 --mode speaker，或使用 --file/--dir 转写音频文件")
             print("使用 'python -m cli speech-rec --help' 查看详细用法")
             return 1
 
+        # 识别会话出错而结束时返回非零退出码
+        if recognizer.error:
+            return 1
+
     except KeyboardInterrupt:
         print("\n👋 程序已退出")
         return 0
@@ -129,3 +218,106 @@ def execute(args):
             import traceback
             traceback.print_exc()
         return 1
+
+
+def transcribe_files(args):
+    """并行转写音频文件，按文件输出 JSONL/SRT"""
+    module = _get_file_transcriber()
+    paths = module.expand_audio_inputs(args.file or [], args.dir or [], args.recursive)
+    missing = [path for path in paths if not Path(path).is_file()]
+    if missing:
+        print_error(f"音频文件不存在：{', '.join(missing)}")
+        return 1
+    if not paths:
+        print_error("没有找到需要转写的音频文件")
+        return 1
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # 不同目录中的同名文件追加序号，避免结果互相覆盖
+    stems, used = {}, set()
+    for path in paths:
+        stem, suffix = Path(path).stem, 2
+        name = stem
+        while name in used:
+            name, suffix = f"{stem}_{suffix}", suffix + 1
+        used.add(name)
+        stems[path] = name
+
+    print_info(f"转写音频文件：{len(paths)} 个，并发 {args.jobs}，输出到 {output_dir}")
+
+    transcriber = module.FileTranscriber(model=args.model, speed=args.speed)
+    start = time.time()
+    succeeded = failed = 0
+    audio_seconds = 0.0
+    try:
+        for record in transcriber.iter_transcribe(paths, workers=args.jobs):
+            name = Path(record["file"]).name
+            if record["status"] != "SUCCEEDED":
+                failed += 1
+                print_error(f"{name}：{record['error']}")
+                continue
+            succeeded += 1
+            audio_seconds += record["duration"]
+            stem = output_dir / stems[record["file"]]
+            if "jsonl" in args.format:
+                module.write_jsonl(record, f"{stem}.jsonl")
+            if "srt" in args.format:
+                module.write_srt(record["sentences"], f"{stem}.srt")
+            speed = record["duration"] / record["elapsed"] if record["elapsed"] else 0
+            print_success(
+                f"{name}：{len(record['sentences'])} 句，音频 {record['duration']:.1f}秒，"
+                f"耗时 {record['elapsed']:.1f}秒（{speed:.1f}x 实时）"
+            )
+    except KeyboardInterrupt:
+        print_warning(f"已中断，已完成 {succeeded + failed}/{len(paths)}")
+
+    elapsed = time.time() - start
+    print("=" * 60)
+    print(f"✅ 成功：{succeeded} | ❌ 失败：{failed} | 音频：{audio_seconds:.1f}秒 | 耗时：{elapsed:.1f}秒")
+    print_info(f"结果目录：{output_dir}")
+    print("=" * 60)
+    return 0 if failed == 0 and succeeded == len(paths) else 1
+
+
+def recognize_sources(args):
+    """同时识别多个音源，按时间顺序合并输出"""
+    from src.audio.multi_source import MultiSourceRecognizer, parse_source
+
+    try:
+        specs = [parse_source(spec) for spec in args.source]
+    except ValueError as e:
+        print_error(str(e))
+        return 1
+    missing = [spec.path for spec in specs if spec.kind == "file" and not Path(spec.path).is_file()]
+    if missing:
+        print_error(f"音频文件不存在：{', '.join(missing)}")
+        return 1
+
+    transcript = None
+    if args.transcript:
+        Path(args.transcript).parent.mkdir(parents=True, exist_ok=True)
+        transcript = open(args.transcript, "a", encoding="utf-8")
+
+    def on_sentence(sentence):
+        MultiSourceRecognizer._print_sentence(sentence)
+        if transcript:
+            transcript.write(json.dumps(sentence, ensure_ascii=False) + "\n")
+            transcript.flush()
+
+    print_success(f"启动多音源识别：{', '.join(spec.label for spec in specs)}")
+    print_info("按 Ctrl+C 停止")
+    recognizer = MultiSourceRecognizer(
+        specs,
+        model=args.model,
+        vad=args.vad,
+        max_delay=args.max_delay,
+        on_sentence=on_sentence
+    )
+    try:
+        recognizer.run()
+    finally:
+        if transcript:
+            transcript.close()
+    print(f"📊 {recognizer.format_stats()}")
+    return 0
@@ -6,14 +6,13 @@
 import sys
 import json
 import time
-import requests
 from pathlib import Path
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, List
 
 # 添加 src 到路径
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.image import StyleRepaintGenerator
+from src.image.constants import PRESET_STYLES
 from src.utils.file_utils import encode_file_to_base64
 from cli.shared import (
     check_api_key,
@@ -25,6 +24,12 @@ from cli.shared import (
     validate_file_exists
 )
 
+if TYPE_CHECKING:
+    from src.image import StyleRepaintGenerator
+
+# 执行时才导入的重量级模块，守护进程启动时预先加载
+PRELOAD_MODULES = ("src.image.style_repaint", "requests")
+
 
 def add_arguments(parser):
     """添加子命令参数"""
@@ -57,8 +62,33 @@ def add_arguments(parser):
     )
     parser.add_argument(
         "-s", "--styles",
-        action="store_true",
-        help="显示可用风格列表"
+        nargs="?",
+        const="list",
+        metavar="SPEC",
+        help="不带参数时显示可用风格列表；指定风格范围（如 0-40、0-9,30-40、all）时使用多个风格并发重绘同一张人像"
+    )
+    parser.add_argument(
+        "-j", "--max-workers",
+        type=int,
+        default=8,
+        help="多风格模式：最大并发任务数 (默认：8)"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=2.0,
+        help="多风格模式：每秒最多创建的任务数，0 表示不限制 (默认：2)"
+    )
+    parser.add_argument(
+        "--grid",
+        nargs="?",
+        const="auto",
+        metavar="PATH",
+        help="多风格模式：生成带风格标注的网格对比图 (默认保存到输出目录)"
+    )
+    parser.add_argument(
+        "--font",
+        help="网格对比图标注字体（支持中文的字体文件，指定后标注中显示风格名称）"
     )
     parser.add_argument(
         "-t", "--timeout",
@@ -85,7 +115,7 @@ def execute(args):
     )
 
     # 显示风格帮助
-    if hasattr(args, 'styles') and args.styles:
+    if args.styles == "list":
         print_style_help()
         return 0
 
@@ -94,8 +124,14 @@ def execute(args):
         return 1
 
     try:
+        from src.image import StyleRepaintGenerator
+
         generator = StyleRepaintGenerator(api_key=args.api_key)
 
+        # 多风格模式
+        if args.styles:
+            return process_style_matrix(generator, args)
+
         # 批量处理模式
         if hasattr(args, 'file') and args.file:
             print_info(f"正在批量处理配置文件：{args.file}")
@@ -185,37 +221,117 @@ def execute(args):
         return 1
 
 
+def parse_style_spec(spec: str) -> List[int]:
+    """
+    解析风格范围
+
+    Args:
+        spec: 如 "0-40"、"0-9,30-40"、"3,5,31"、"all"
+
+    Returns:
+        List[int]: 有效的预置风格编号（范围内不存在的编号会被跳过）
+    """
+    if spec.strip().lower() == "all":
+        return list(PRESET_STYLES)
+
+    indices = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                start, end = (int(value) for value in part.split('-', 1))
+                indices.extend(range(start, end + 1))
+            else:
+                indices.append(int(part))
+        except ValueError:
+            raise ValueError(f"风格范围格式错误：{part}")
+    return [index for index in dict.fromkeys(indices) if index in PRESET_STYLES]
+
+
+def process_style_matrix(generator: "StyleRepaintGenerator", args) -> int:
+    """多风格模式：同一张人像并发使用多个预置风格重绘"""
+    if not args.image:
+        print_error("多风格模式需要指定图像文件路径")
+        return 1
+    if args.style is not None or args.style_ref:
+        print_error("多风格模式不能同时指定 style 或 --style-ref 参数")
+        return 1
+
+    try:
+        style_indices = parse_style_spec(args.styles)
+    except ValueError as e:
+        print_error(str(e))
+        return 1
+    if not style_indices:
+        print_error(f"范围 {args.styles} 内没有可用的预置风格，使用 --styles 查看列表")
+        return 1
+
+    image_path = validate_file_exists(args.image)
+    # 输入图像只编码一次，所有风格共用
+    image_url = encode_file_to_base64(image_path)
+    output_dir = Path(args.output)
+    stem = Path(image_path).stem
+
+    print_info(f"开始处理：{image_path}，共 {len(style_indices)} 种风格（并发 {args.max_workers}，每秒最多提交 {args.rate or '不限'} 个）")
+
+    start = time.time()
+    saved: Dict[int, str] = {}
+    summary = []
+    for style_index, result, error in generator.repaint_styles(
+        image_url,
+        style_indices,
+        max_workers=args.max_workers,
+        rate_limit=args.rate,
+        timeout=args.timeout
+    ):
+        style_name = PRESET_STYLES[style_index]
+        record = {"style_index": style_index, "style_name": style_name, "elapsed": round(time.time() - start, 1)}
+        if error is None and result.results and result.results[0].url:
+            try:
+                file_path = generator.download_image(result.results[0].url, str(output_dir), f"{stem}_style_{style_index}.jpg")
+                saved[style_index] = file_path
+                record.update(task_id=result.task_id, output_url=result.results[0].url, file=file_path)
+                print_success(f"[{len(summary) + 1}/{len(style_indices)}] {style_index} {style_name}：{file_path}（{record['elapsed']}s）")
+            except Exception as e:
+                error = e
+        elif error is None:
+            error = RuntimeError("未能获取生成结果")
+
+        if error is not None:
+            record["error"] = str(error)
+            print_error(f"[{len(summary) + 1}/{len(style_indices)}] {style_index} {style_name} 失败：{error}")
+        summary.append(record)
+
+    summary.sort(key=lambda record: style_indices.index(record["style_index"]))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary_file = output_dir / f"{stem}_styles.json"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump({"input_image": args.image, "results": summary}, f, ensure_ascii=False, indent=2)
+
+    print_info(f"完成 {len(saved)}/{len(style_indices)}，总耗时 {time.time() - start:.1f}s，结果信息：{summary_file}")
+
+    if args.grid:
+        try:
+            from src.utils.contact_sheet import build_contact_sheet
+            items = [
+                (saved.get(index), f"#{index} {PRESET_STYLES[index]}" if args.font else f"style {index}")
+                for index in style_indices
+            ]
+            grid_path = output_dir / f"{stem}_styles_grid.jpg" if args.grid == "auto" else Path(args.grid)
+            print_success(f"网格对比图：{build_contact_sheet(items, str(grid_path), cell_size=256, font_path=args.font)}")
+        except Exception as e:
+            print_error(f"生成网格对比图失败：{e}")
+
+    return 0 if len(saved) == len(style_indices) else 1
+
+
 def print_style_help():
     """打印可用风格帮助信息"""
-    styles = {
-        0: "复古漫画",
-        1: "3D 童话",
-        2: "二次元",
-        3: "小清新",
-        4: "未来科技",
-        5: "国画古风",
-        6: "将军百战",
-        7: "炫彩卡通",
-        8: "清雅国风",
-        9: "喜迎新年",
-        14: "国风工笔",
-        15: "恭贺新禧",
-        30: "童话世界",
-        31: "黏土世界",
-        32: "像素世界",
-        33: "冒险世界",
-        34: "日漫世界",
-        35: "3D 世界",
-        36: "二次元世界",
-        37: "手绘世界",
-        38: "蜡笔世界",
-        39: "冰箱贴世界",
-        40: "吧唧世界"
-    }
-
     print("\n可用的预置风格编号：")
     print("-" * 50)
-    for index, name in styles.items():
+    for index, name in PRESET_STYLES.items():
         print(f"{index:>3}: {name}")
     print("-" * 50)
     print("使用自定义风格：设置 style_index=-1，并提供 style_ref_url")
@@ -233,6 +349,8 @@ def download_and_save_image(url: str, output_dir: str, args) -> str:
     Returns:
         str: 保存的文件路径
     """
+    import requests
+
     try:
         # 创建输出目录
         output_path = Path(output_dir)
@@ -262,7 +380,7 @@ def download_and_save_image(url: str, output_dir: str, args) -> str:
         return url  # 返回 URL 作为备选
 
 
-def batch_process(generator: StyleRepaintGenerator, config_file: str, output_dir: str, timeout: int, verbose: bool) -> int:
+def batch_process(generator: "StyleRepaintGenerator", config_file: str, output_dir: str, timeout: int, verbose: bool) -> int:
     """批量处理"""
     try:
         with open(config_file, 'r', encoding='utf-8') as f:
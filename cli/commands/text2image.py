@@ -4,14 +4,16 @@
 """
 
 import sys
+import json
+import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 # 添加 src 到路径
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.image import Text2ImageGenerator
-from src.utils.file_utils import PromptFileReader
+from src.utils.file_utils import PromptFileReader, JsonlResultWriter, BatchProcessor
+from src.utils.sweep import ParameterSweep
 from cli.shared import (
     check_api_key,
     print_banner,
@@ -23,6 +25,15 @@ from cli.shared import (
     validate_size_format
 )
 
+if TYPE_CHECKING:
+    from src.image import Text2ImageGenerator
+
+# 执行时才导入的重量级模块，守护进程启动时预先加载
+PRELOAD_MODULES = ("src.image.text2image",)
+
+
+MODEL_CHOICES = ["qwen-image", "wan2.2-t2i-flash", "wan2.2-t2i-plus", "wanx2.1-t2i-turbo", "wanx2.1-t2i-plus", "wanx2.0-t2i-turbo"]
+
 
 def add_arguments(parser):
     """添加子命令参数"""
@@ -35,16 +46,33 @@ def add_arguments(parser):
     )
     input_group.add_argument(
         "-f", "--file",
-        help="从文件读取提示词（支持.txt 和.json 格式）"
+        help="从文件读取提示词（支持.txt、.json 和.jsonl 格式，.jsonl 逐行流式处理）"
+    )
+    input_group.add_argument(
+        "--sweep",
+        help="参数网格扫描配置（JSON：axes + template），按需展开为请求"
     )
 
     parser.add_argument(
         "-m", "--model",
-        choices=["qwen-image", "wan2.2-t2i-flash", "wan2.2-t2i-plus", "wanx2.1-t2i-turbo", "wanx2.1-t2i-plus", "wanx2.0-t2i-turbo"],
+        choices=MODEL_CHOICES,
         default="wan2.2-t2i-flash",
         help="模型选择 (默认：wan2.2-t2i-flash)"
     )
 
+    parser.add_argument(
+        "--models",
+        help="多模型对比：逗号分隔的模型列表（如 qwen-image,wan2.2-t2i-flash,wan2.2-t2i-plus），同时提交并汇总耗时和费用"
+    )
+
+    parser.add_argument(
+        "--contact-sheet",
+        nargs="?",
+        const="auto",
+        metavar="PATH",
+        help="多模型对比：生成并排对比图 (默认保存到输出目录)"
+    )
+
     parser.add_argument(
         "-s", "--size",
         default="1024*1024",
@@ -54,9 +82,8 @@ def add_arguments(parser):
     parser.add_argument(
         "-n", "--n",
         type=int,
-        choices=[1, 2, 3, 4],
         default=1,
-        help="生成图片数量 (仅万相模型支持 1-4 张，千问模型仅支持 1 张)"
+        help="生成图片数量 (单个任务万相最多 4 张、千问 1 张，超出时自动拆分为多个并发任务)"
     )
 
     parser.add_argument(
@@ -99,19 +126,73 @@ def add_arguments(parser):
         help="输出文件名（可选，默认自动生成）"
     )
 
+    parser.add_argument(
+        "--results",
+        help="JSONL/扫描输入的结果文件，每完成一条追加一行 (默认：<输出目录>/<输入文件名>.results.jsonl)"
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="JSONL/扫描输入：从结果文件最后一条记录之后继续处理"
+    )
+
+    parser.add_argument(
+        "--start-line",
+        type=int,
+        default=1,
+        help="JSONL/扫描输入：从指定行号（扫描为组合序号）开始处理 (默认：1)"
+    )
+
+    parser.add_argument(
+        "--shard",
+        help="参数网格扫描：只处理第 i 个分片（i/N 形式，i 从 0 开始），多个进程/主机可分片并行"
+    )
+
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="JSONL/扫描输入：并发任务数，结果仍按输入顺序写入 (默认：1)"
+    )
+
+    parser.add_argument(
+        "--enqueue",
+        metavar="QUEUE",
+        help="配合 --file 使用：不在本地执行，将任务加入任务队列（SQLite 文件路径或队列地址），由 worker 子命令执行"
+    )
+
 
 def execute(args):
     """执行子命令"""
     print_banner("阿里百炼文生图工具", "阿里云百炼大模型 - 文本生成图像")
 
+    if args.enqueue:
+        if not args.file and not args.sweep:
+            print_error("--enqueue 需要配合 --file 或 --sweep 使用")
+            return 1
+        # 入队模式由 worker 使用自己的密钥
+        if args.sweep:
+            return process_sweep_input(None, args)
+        return process_file_input(None, args)
+
     # 检查 API 密钥
     if not check_api_key(args.api_key):
         return 1
 
     try:
+        from src.image import Text2ImageGenerator
+
         generator = Text2ImageGenerator(api_key=args.api_key)
 
-        if args.file:
+        if args.models:
+            if not args.prompt:
+                print_error("--models 需要配合单个提示词使用")
+                return 1
+            return process_model_comparison(generator, args)
+        elif args.sweep:
+            return process_sweep_input(generator, args)
+        elif args.file:
             return process_file_input(generator, args)
         else:
             return process_single_prompt(generator, args)
@@ -121,8 +202,74 @@ def execute(args):
         return 1
 
 
-def process_file_input(generator: Text2ImageGenerator, args) -> int:
-    """处理文件输入"""
+def build_file_output_name(index: int, config: dict, model: str) -> str:
+    """
+    确定文件输入模式下第 index 个任务的输出文件名
+
+    Args:
+        index: 任务序号（从1开始）
+        config: 原始提示词配置
+        model: 使用的模型名称
+
+    Returns:
+        str: 带序号和模型简称前缀的文件名
+    """
+    model_short = get_model_short_name(model)
+    if config.get('filename'):
+        # 为用户指定的文件名添加模型前缀
+        name_without_ext = Path(config['filename']).stem
+        ext = Path(config['filename']).suffix or '.png'
+        return f"{index}_{model_short}_{name_without_ext}{ext}"
+
+    prompt_text = config.get('prompt', '')
+    safe_name = "".join(c for c in prompt_text[:20] if c.isalnum() or c in (' ', '-', '_')).strip()
+    safe_name = safe_name.replace(' ', '_') or f"prompt_{index}"
+    return f"{index}_{model_short}_{safe_name}.png"
+
+
+def enqueue_configs(queue: str, configs, output_dir: str) -> int:
+    """
+    将提示词配置加入任务队列
+
+    Args:
+        queue: 队列地址
+        configs: (序号, 配置) 的可迭代对象，可以是生成器
+        output_dir: 输出目录
+    """
+    from src.gateway.adapters import Text2ImageAdapter
+    from src.workqueue import open_queue
+
+    try:
+        backend = open_queue(queue)
+    except Exception as e:
+        print_error(f"打开任务队列失败：{e}")
+        return 1
+
+    adapter = Text2ImageAdapter(api_key=None)
+    queued = total = 0
+    try:
+        for i, config in configs:
+            total += 1
+            try:
+                validated_config = PromptFileReader.validate_prompt_config(config)
+                validated_config.pop('filename', None)
+                params = adapter.validate(validated_config)
+            except Exception as e:
+                print_error(f"任务 {i} 参数错误：{e}")
+                continue
+
+            filename = build_file_output_name(i, config, params['model'])
+            backend.enqueue('text2image', params, output={'output_dir': output_dir, 'filename': filename})
+            queued += 1
+    finally:
+        backend.close()
+
+    print_success(f"已入队：{queued}/{total}，使用 'python -m cli worker {queue}' 执行")
+    return 0 if queued else 1
+
+
+def process_file_input(generator: Optional["Text2ImageGenerator"], args) -> int:
+    """处理文件输入，generator 为None时将任务加入 args.enqueue 指定的队列"""
     filepath = Path(args.file)
     if not filepath.exists():
         print_error(f"文件不存在：{filepath}")
@@ -130,6 +277,9 @@ def process_file_input(generator: Text2ImageGenerator, args) -> int:
 
     print_info(f"从文件读取：{filepath}")
 
+    if filepath.suffix.lower() == '.jsonl':
+        return process_jsonl_input(generator, args)
+
     try:
         prompts = PromptFileReader.read_prompt_file(str(filepath))
 
@@ -160,6 +310,9 @@ def process_file_input(generator: Text2ImageGenerator, args) -> int:
                 configs.append(config)
             print_info(f"找到 {len(configs)} 个文本提示词")
 
+        if args.enqueue:
+            return enqueue_configs(args.enqueue, enumerate(configs, 1), args.output)
+
         # 统一处理所有配置
         from pathlib import Path as PPath
         output_dir = PPath(args.output)
@@ -177,29 +330,20 @@ def process_file_input(generator: Text2ImageGenerator, args) -> int:
                 if result.task_status.value == "SUCCEEDED" and result.results:
                     image = result.results[0]
 
-                    # 获取模型简称
-                    model_short = get_model_short_name(validated_config.get('model', 'wan2.2-t2i-flash'))
-
                     # 确定文件名
-                    if config.get('filename'):
-                        filename = config['filename']
-                        # 为用户指定的文件名添加模型前缀
-                        name_without_ext = Path(filename).stem
-                        ext = Path(filename).suffix or '.png'
-                        filename = f"{i}_{model_short}_{name_without_ext}{ext}"
-                    else:
-                        safe_name = "".join(c for c in prompt_text[:20] if c.isalnum() or c in (' ', '-', '_')).strip()
-                        safe_name = safe_name.replace(' ', '_') or f"prompt_{i}"
-                        filename = f"{i}_{model_short}_{safe_name}.png"
-
-                    file_path = generator.download_image_sync(
-                        image.url,
+                    filename = build_file_output_name(i, config, validated_config.get('model', 'wan2.2-t2i-flash'))
+
+                    file_paths = generator.download_images(
+                        [r.url for r in result.results],
                         str(output_dir),
                         filename
                     )
 
-                    print_success(f"成功：{filename}")
-                    print_info(f"保存路径：{file_path}")
+                    print_success(f"成功：{filename}" + (f" 等 {len(file_paths)} 张" if len(file_paths) > 1 else ""))
+                    for file_path in file_paths:
+                        print_info(f"保存路径：{file_path}")
+                    for error in result.errors or []:
+                        print_warning(f"部分子任务失败：{error}")
                     print_info(f"使用模型：{validated_config.get('model', '未知')}")
                     print_info(f"图片尺寸：{validated_config.get('size', '未知')}")
                     if image.actual_prompt:
@@ -221,16 +365,280 @@ def process_file_input(generator: Text2ImageGenerator, args) -> int:
         return 1
 
 
-def process_single_prompt(generator: Text2ImageGenerator, args) -> int:
+def process_jsonl_input(generator: Optional["Text2ImageGenerator"], args) -> int:
+    """
+    流式处理 JSONL 输入
+
+    逐行读取请求，结果按输入顺序逐条追加到结果文件，内存占用与输入规模无关；
+    结果记录中的 line 为输入行号，中断后可通过 --resume 从最后一条记录之后继续。
+    """
+    results_path = Path(args.results) if args.results else Path(args.output) / f"{Path(args.file).stem}.results.jsonl"
+    start_line = get_start_line(args, results_path)
+    requests = PromptFileReader.iter_jsonl_file(args.file, start_line=start_line)
+    return process_request_stream(generator, args, requests, results_path, start_line > 1, "第 {} 行")
+
+
+def process_sweep_input(generator: Optional["Text2ImageGenerator"], args) -> int:
+    """
+    处理参数网格扫描
+
+    组合按需展开，不生成中间文件；结果记录中的 line 为组合序号（从1开始），
+    各分片使用独立的结果文件，可分别续跑。
+    """
+    try:
+        sweep = ParameterSweep.from_file(args.sweep)
+        shard = ParameterSweep.parse_shard(args.shard or "0/1")
+    except Exception as e:
+        print_error(f"扫描配置错误：{e}")
+        return 1
+
+    shard_index, shard_count = shard
+    print_info(f"参数网格：{' × '.join(f'{name}({len(axis)})' for name, axis in zip(sweep.names, sweep.axes))}"
+               f" = {len(sweep)} 个组合，分片 {shard_index}/{shard_count}：{sweep.shard_size(shard)} 个")
+
+    suffix = f".shard{shard_index}of{shard_count}" if shard_count > 1 else ""
+    results_path = Path(args.results) if args.results else Path(args.output) / f"{Path(args.sweep).stem}{suffix}.results.jsonl"
+    start_line = get_start_line(args, results_path)
+    requests = ((index + 1, request) for index, request in sweep.iter_requests(shard, start=start_line - 1))
+    return process_request_stream(generator, args, requests, results_path, start_line > 1, "组合 {}")
+
+
+def get_start_line(args, results_path: Path) -> int:
+    """确定起始行号，--resume 时从结果文件最后一条记录之后继续"""
+    start_line = args.start_line
+    if args.resume:
+        last = JsonlResultWriter.read_last_record(str(results_path))
+        if last and last.get('line'):
+            start_line = max(start_line, last['line'] + 1)
+            print_info(f"从 {start_line} 继续（结果文件：{results_path}）")
+    return start_line
+
+
+def process_request_stream(
+    generator: Optional["Text2ImageGenerator"],
+    args,
+    requests,
+    results_path: Path,
+    append: bool,
+    label: str
+) -> int:
+    """
+    执行请求流并逐条写入结果
+
+    Args:
+        generator: 文生图生成器，为None时将请求加入 args.enqueue 指定的队列
+        args: 命令行参数
+        requests: (序号, 请求配置) 的迭代器
+        results_path: 结果文件路径
+        append: 是否追加到已有结果文件
+        label: 输出时的序号格式
+    """
+    if generator is None:
+        return enqueue_configs(args.enqueue, requests, args.output)
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def run(item):
+        line_no, config = item
+        return generate_record(generator, line_no, config, output_dir)
+
+    total = success_count = 0
+    try:
+        with JsonlResultWriter(str(results_path), append=args.resume or append) as writer:
+            def handle(record):
+                nonlocal total, success_count
+                writer.write(record)
+                total += 1
+                position = label.format(record['line'])
+                if record['status'] == "SUCCEEDED":
+                    success_count += 1
+                    print_success(f"[{position}] {Path(record['file']).name}（{record['elapsed']}s）")
+                else:
+                    print_error(f"[{position}] 失败：{record['error']}")
+
+            # 中断时已提交给服务端的任务执行完后仍写入结果文件，--resume 不会重复生成
+            records = BatchProcessor.map_ordered(run, requests, jobs=args.jobs, drain=handle)
+            try:
+                for record in records:
+                    handle(record)
+            finally:
+                records.close()
+    except ValueError as e:
+        print_error(f"文件读取错误：{e}")
+        return 1
+    except KeyboardInterrupt:
+        print_warning(f"已中断，使用 --resume 从断点继续（结果文件：{results_path}）")
+        return 1
+
+    print(f"\n📊 处理完成：{success_count}/{total} 成功，结果：{results_path}")
+    return 0 if success_count == total else 1
+
+
+def generate_record(generator: "Text2ImageGenerator", line_no: int, config: dict, output_dir: Path) -> dict:
+    """执行单个 JSONL 请求并生成结果记录"""
+    record = {
+        'line': line_no,
+        'prompt': config.get('prompt', ''),
+        'task_id': None,
+        'status': "FAILED",
+        'file': None,
+        'url': None,
+        'error': None,
+        'started_at': time.time(),
+    }
+    try:
+        validated_config = PromptFileReader.validate_prompt_config(config)
+        result = generator.generate_image(**validated_config)
+        record['task_id'] = result.task_id
+        record['generated_at'] = time.time()
+
+        if result.task_status.value == "SUCCEEDED" and result.results:
+            urls = [r.url for r in result.results]
+            filename = build_file_output_name(line_no, config, validated_config['model'])
+            files = generator.download_images(urls, str(output_dir), filename)
+            record['file'] = files[0]
+            record['url'] = urls[0]
+            if len(files) > 1:
+                record['files'] = files
+                record['urls'] = urls
+            if result.errors:
+                record['error'] = "; ".join(result.errors)
+            record['status'] = "SUCCEEDED"
+        else:
+            record['status'] = result.task_status.value
+            record['error'] = f"任务状态：{result.task_status.value}"
+    except Exception as e:
+        record['error'] = str(e)
+
+    record['finished_at'] = time.time()
+    record['elapsed'] = round(record['finished_at'] - record['started_at'], 3)
+    return record
+
+
+def build_output_name(prompt: str, model: str, filename: Optional[str] = None) -> str:
+    """
+    确定单个提示词的输出文件名
+
+    Args:
+        prompt: 提示词
+        model: 模型名称
+        filename: 用户指定的文件名
+
+    Returns:
+        str: 带模型简称前缀的文件名
+    """
+    model_short = get_model_short_name(model)
+    if filename:
+        # 如果用户指定了文件名，添加模型前缀
+        name_without_ext = Path(filename).stem
+        ext = Path(filename).suffix or '.png'
+        return f"{model_short}_{name_without_ext}{ext}"
+
+    safe_name = "".join(c for c in prompt[:20] if c.isalnum() or c in (' ', '-', '_')).strip()
+    safe_name = safe_name.replace(' ', '_') or "generated"
+    return f"{model_short}_{safe_name}.png"
+
+
+def process_model_comparison(generator: "Text2ImageGenerator", args) -> int:
+    """多模型对比：同一提示词并发提交到多个模型"""
+    from src.image.compare import compare_models
+
+    models = [m.strip() for m in args.models.split(',') if m.strip()]
+    unknown = [m for m in models if m not in MODEL_CHOICES]
+    if unknown:
+        print_error(f"不支持的模型：{', '.join(unknown)}，可用模型：{', '.join(MODEL_CHOICES)}")
+        return 1
+    if args.n < 1:
+        print_error("生成图片数量必须大于 0")
+        return 1
+
+    print_info(f"正在对比 {len(models)} 个模型：{args.prompt}")
+    results = compare_models(
+        prompt=args.prompt,
+        models=models,
+        size=args.size,
+        n=args.n,
+        negative_prompt=args.negative or None,
+        prompt_extend=not args.no_extend,
+        watermark=args.watermark,
+        seed=args.seed,
+        generator=generator
+    )
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # 各模型的结果并发下载
+    def download(result):
+        if result.urls:
+            filename = build_output_name(args.prompt, result.model, args.filename)
+            try:
+                result.files = generator.download_images(result.urls, str(output_dir), filename)
+            except Exception as e:
+                result.error = f"下载失败：{e}"
+        return result
+
+    from src.utils.executors import ContextThreadPoolExecutor
+    with ContextThreadPoolExecutor(max_workers=len(results)) as executor:
+        results = list(executor.map(download, results))
+
+    print("\n" + "=" * 78)
+    print(f"{'模型':<20}{'尺寸':<12}{'状态':<12}{'耗时(s)':>10}{'张数':>6}{'费用(元)':>10}")
+    print("-" * 78)
+    for result in results:
+        cost = f"{result.cost:.2f}" if result.cost is not None else "-"
+        print(f"{result.model:<20}{result.size:<12}{result.status:<12}{result.latency:>10.1f}{result.image_count:>6}{cost:>10}")
+    print("=" * 78)
+    total_cost = sum(result.cost or 0 for result in results)
+    print_info(f"总耗时约 {max(result.latency for result in results):.1f}s（各模型耗时之和 "
+               f"{sum(result.latency for result in results):.1f}s），预估总费用 {total_cost:.2f} 元")
+    for result in results:
+        for file_path in result.files:
+            print_info(f"{result.model}: {file_path}")
+        if result.error:
+            print_error(f"{result.model}: {result.error}")
+
+    base_name = Path(build_output_name(args.prompt, "compare", args.filename)).stem
+    summary_path = output_dir / f"{base_name}.json"
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'prompt': args.prompt,
+            'requested_size': args.size,
+            'results': [result.model_dump() for result in results],
+        }, f, ensure_ascii=False, indent=2)
+    print_info(f"对比结果：{summary_path}")
+
+    if args.contact_sheet:
+        sheet_path = output_dir / f"{base_name}_sheet.png" if args.contact_sheet == "auto" else Path(args.contact_sheet)
+        try:
+            from src.utils.contact_sheet import build_contact_sheet
+            items = []
+            for result in results:
+                label = f"{result.model}\n{result.latency:.1f}s"
+                if result.cost is not None:
+                    label += f"  CNY {result.cost:.2f}"
+                for file_path in result.files or [None]:
+                    items.append((file_path, label))
+            print_success(f"对比图：{build_contact_sheet(items, str(sheet_path))}")
+        except Exception as e:
+            print_error(f"生成对比图失败：{e}")
+
+    return 0 if all(result.status == "SUCCEEDED" for result in results) else 1
+
+
+def process_single_prompt(generator: "Text2ImageGenerator", args) -> int:
     """处理单个提示词"""
     print_info(f"正在生成：{args.prompt}")
     if args.negative:
         print_info(f"反向提示：{args.negative}")
 
-    # 验证千问模型的特殊限制
-    if args.model == "qwen-image" and args.n != 1:
-        print_warning("千问模型仅支持生成 1 张图片，已自动调整为 1")
-        args.n = 1
+    if args.n < 1:
+        print_error("生成图片数量必须大于 0")
+        return 1
+    if args.n > generator.max_images_per_task(args.model):
+        per_task = generator.max_images_per_task(args.model)
+        print_info(f"生成 {args.n} 张，拆分为 {-(-args.n // per_task)} 个并发任务")
 
     result = generator.generate_image(
         prompt=args.prompt,
@@ -251,33 +659,25 @@ def process_single_prompt(generator: Text2ImageGenerator, args) -> int:
         output_dir = PPath(args.output)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # 获取模型简称
-        model_short = get_model_short_name(args.model)
-
         # 确定文件名
-        filename = args.filename
-        if not filename:
-            safe_name = "".join(c for c in args.prompt[:20] if c.isalnum() or c in (' ', '-', '_')).strip()
-            safe_name = safe_name.replace(' ', '_') or "generated"
-            filename = f"{model_short}_{safe_name}.png"
-        else:
-            # 如果用户指定了文件名，添加模型前缀
-            name_without_ext = Path(filename).stem
-            ext = Path(filename).suffix or '.png'
-            filename = f"{model_short}_{name_without_ext}{ext}"
+        filename = build_output_name(args.prompt, args.model, args.filename)
 
-        file_path = generator.download_image_sync(
-            image.url,
+        file_paths = generator.download_images(
+            [r.url for r in result.results],
             str(output_dir),
             filename
         )
 
         print_success("生成成功！")
-        print_info(f"保存路径：{file_path}")
+        for file_path in file_paths:
+            print_info(f"保存路径：{file_path}")
         print_info(f"使用模型：{args.model}")
         print_info(f"图片尺寸：{args.size}")
-        print_info(f"原始 URL: {image.url}")
-        print_info(f"任务 ID: {result.task_id}")
+        if len(file_paths) == 1:
+            print_info(f"原始 URL: {image.url}")
+        print_info(f"任务 ID: {', '.join(result.sub_task_ids or [result.task_id])}")
+        for error in result.errors or []:
+            print_warning(f"部分子任务失败：{error}")
         if image.actual_prompt:
             print_info(f"实际提示词：{image.actual_prompt}")
         print_info(f"原始提示词：{image.orig_prompt}")
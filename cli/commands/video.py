@@ -6,12 +6,12 @@
 
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 # 添加 src 到路径
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.video import VideoGenerator
+from src.video.constants import VIDEO_SIZES
 from cli.shared import (
     check_api_key,
     print_banner,
@@ -21,6 +21,12 @@ from cli.shared import (
     print_warning,
 )
 
+if TYPE_CHECKING:
+    from src.video import VideoGenerator
+
+# 执行时才导入的重量级模块，守护进程启动时预先加载
+PRELOAD_MODULES = ("src.video.text2video",)
+
 
 def add_arguments(parser):
     """添加子命令参数"""
@@ -57,14 +63,7 @@ def add_arguments(parser):
 
     parser.add_argument(
         "--size",
-        choices=[
-            # 480P
-            "480*480", "832*480", "480*832",
-            # 720P
-            "720*720", "720*1280", "1280*720", "1088*832", "832*1088",
-            # 1080P
-            "1440*1440", "1080*1920", "1920*1080", "1632*1248", "1248*1632"
-        ],
+        choices=[size for sizes in VIDEO_SIZES.values() for size in sizes],
         default=None,
         help="视频分辨率（文生视频使用）"
     )
@@ -216,6 +215,8 @@ def execute(args):
         args.audio = None
 
     try:
+        from src.video import VideoGenerator
+
         generator = VideoGenerator(api_key=args.api_key)
 
         if video_mode == 'text2video':
@@ -233,7 +234,7 @@ def execute(args):
         return 1
 
 
-def process_text2video(generator: VideoGenerator, args) -> int:
+def process_text2video(generator: "VideoGenerator", args) -> int:
     """处理文生视频"""
     if not args.prompt:
         print_error("text2video 模式需要提供 prompt 参数")
@@ -276,7 +277,7 @@ def process_text2video(generator: VideoGenerator, args) -> int:
         return 1
 
 
-def process_image2video(generator: VideoGenerator, args) -> int:
+def process_image2video(generator: "VideoGenerator", args) -> int:
     """处理图生视频"""
     if not args.image:
         print_error("image2video 模式需要提供 image 参数（首帧 URL）")
@@ -334,7 +335,7 @@ def process_image2video(generator: VideoGenerator, args) -> int:
         return 1
 
 
-def process_image2video_effect(generator: VideoGenerator, args) -> int:
+def process_image2video_effect(generator: "VideoGenerator", args) -> int:
     """处理图生视频 - 特效模板模式"""
     print_info(f"正在生成视频特效")
     print_info(f"输入图片：{args.image}")
@@ -367,7 +368,7 @@ def process_image2video_effect(generator: VideoGenerator, args) -> int:
         return 1
 
 
-def process_first_last_frame(generator: VideoGenerator, args) -> int:
+def process_first_last_frame(generator: "VideoGenerator", args) -> int:
     """处理首尾帧生视频 - 只需首帧图像"""
     if not args.first_frame:
         print_error("first-last-frame 模式需要提供 first_frame 参数（首帧 URL）")
@@ -385,7 +386,7 @@ def process_first_last_frame(generator: VideoGenerator, args) -> int:
         return process_first_last_frame_normal(generator, args)
 
 
-def process_first_last_frame_effect(generator: VideoGenerator, args) -> int:
+def process_first_last_frame_effect(generator: "VideoGenerator", args) -> int:
     """处理首尾帧生视频 - 特效模板模式"""
     print_info(f"正在生成视频特效")
     print_info(f"输入图片：{args.first_frame}")
@@ -418,7 +419,7 @@ def process_first_last_frame_effect(generator: VideoGenerator, args) -> int:
         return 1
 
 
-def process_first_last_frame_normal(generator: VideoGenerator, args) -> int:
+def process_first_last_frame_normal(generator: "VideoGenerator", args) -> int:
     """处理首尾帧生视频 - 普通模式（首帧 + 尾帧 + prompt）"""
     print_info(f"正在从首尾帧生成视频")
     print_info(f"首帧：{args.first_frame}")
@@ -467,7 +468,7 @@ def process_first_last_frame_normal(generator: VideoGenerator, args) -> int:
         return 1
 
 
-def handle_result(generator: VideoGenerator, result, args) -> int:
+def handle_result(generator: "VideoGenerator", result, args) -> int:
     """处理生成结果"""
     if result.task_status.value == "SUCCEEDED" and result.video_url:
         # 确保输出目录存在
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+队列 worker 子命令
+"""
+
+import sys
+from pathlib import Path
+
+# 添加 src 到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from cli.shared import (
+    check_api_key,
+    print_banner,
+    print_success,
+    print_error,
+    print_info,
+    print_warning
+)
+
+
+def add_arguments(parser):
+    """添加子命令参数"""
+    parser.add_argument(
+        "queue",
+        help="任务队列地址（SQLite 文件路径，或 scheme://location 形式）"
+    )
+    parser.add_argument(
+        "-k", "--api-key",
+        help="阿里云百炼 API 密钥"
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=4,
+        help="并发执行的任务数 (默认：4)"
+    )
+    parser.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=120.0,
+        help="任务租约有效期（秒），worker 失联超过此时间后任务由其他 worker 接管 (默认：120)"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=3.0,
+        help="任务状态轮询间隔（秒）(默认：3)"
+    )
+    parser.add_argument(
+        "-t", "--timeout",
+        type=float,
+        default=600.0,
+        help="单个任务超时时间（秒）(默认：600)"
+    )
+    parser.add_argument(
+        "--exit-when-empty",
+        action="store_true",
+        help="队列中没有可领取任务时退出（默认持续等待新任务）"
+    )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="仅显示队列状态和最近失败的任务"
+    )
+
+
+def execute(args):
+    """执行子命令"""
+    from src.workqueue import Worker, open_queue
+
+    try:
+        backend = open_queue(args.queue)
+    except Exception as e:
+        print_error(f"打开任务队列失败：{e}")
+        return 1
+
+    try:
+        if args.status:
+            return show_status(backend)
+
+        if not check_api_key(args.api_key):
+            return 1
+
+        try:
+            worker = Worker(
+                backend,
+                api_key=args.api_key,
+                concurrency=args.concurrency,
+                lease_ttl=args.lease_ttl,
+                poll_interval=args.poll_interval,
+                job_timeout=args.timeout,
+                on_event=print_event
+            )
+        except ValueError as e:
+            print_error(f"初始化失败：{e}")
+            return 1
+
+        print_banner("DashScope 队列 worker", f"队列：{args.queue} | 并发：{args.concurrency} | ID：{worker.worker_id}")
+        try:
+            counts = worker.run(exit_when_empty=args.exit_when_empty)
+        except KeyboardInterrupt:
+            print_warning("已停止，未完成的任务将在租约过期后由其他 worker 接管")
+            counts = worker.counts
+
+        print("=" * 60)
+        print(f"✅ 成功：{counts['succeeded']} | 失败：{counts['failed']} | 租约丢失：{counts['lost']}")
+        print("=" * 60)
+        return 0 if not counts['failed'] else 1
+    finally:
+        backend.close()
+
+
+def print_event(event, job, message):
+    """输出 worker 事件"""
+    label = job.output.get("filename") or job.job_id[:8]
+    if event == "succeeded":
+        print_success(f"[{job.kind}] {label} 完成：{message}")
+    elif event == "failed":
+        print_error(f"[{job.kind}] {label} 失败：{message}")
+    elif event == "lost":
+        print_warning(f"[{job.kind}] {label} 租约丢失：{message}")
+    elif event == "submitted":
+        print_info(f"[{job.kind}] {label} 已创建任务：{message}")
+    else:
+        print_info(f"[{job.kind}] {label} {message}")
+
+
+def show_status(backend) -> int:
+    """显示队列状态"""
+    stats = backend.stats()
+    print_info("队列状态：" + " | ".join(f"{state}: {count}" for state, count in stats.items()))
+
+    failed_jobs = getattr(backend, "failed_jobs", None)
+    if failed_jobs and stats.get("FAILED"):
+        print_info("最近失败的任务：")
+        for job in failed_jobs():
+            label = job.output.get("filename") or job.job_id
+            print(f"  ❌ [{job.kind}] {label}（尝试 {job.attempts} 次）：{job.error}")
+    return 0
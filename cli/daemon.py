@@ -0,0 +1,295 @@
+"""
+DashScope CLI 守护进程模式
+
+常驻进程预先加载全部子命令并持有共享连接池，客户端通过本地 Unix socket
+转发命令行参数并实时接收输出，避免每次调用都承担解释器启动、导入和 TLS 握手的开销。
+
+通信协议（每行一个 JSON 对象）:
+    客户端 -> 守护进程: {"argv": [...], "cwd": "...", "api_key": "..."}
+    守护进程 -> 客户端: {"type": "output", "stream": "stdout", "data": "..."}
+                        {"type": "exit", "code": 0}
+"""
+
+import contextvars
+import importlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+# 子命令中不适合转发给守护进程执行的命令
+LOCAL_ONLY_COMMANDS = {'serve', 'gateway', 'worker', 'speech-rec'}
+
+
+def get_default_socket_path() -> str:
+    """获取默认 socket 路径，优先使用环境变量 DASHSCOPE_CLI_SOCKET"""
+    return os.getenv("DASHSCOPE_CLI_SOCKET") or str(Path.home() / ".dashscope-cli.sock")
+
+
+class _RoutedStream(io.TextIOBase):
+    """
+    按上下文分发写入的输出流，用于将各请求的 print 输出路由到对应客户端
+
+    输出目标保存在 contextvars 中：每个请求线程有独立的上下文，
+    子命令内部的线程池（ContextThreadPoolExecutor）在提交线程上下文的副本中执行任务，
+    并发任务的输出也会发给发起请求的客户端。
+    """
+
+    def __init__(self, default, name: str):
+        self._default = default
+        self._target = contextvars.ContextVar(f"daemon_{name}_target", default=None)
+
+    def set_target(self, target) -> None:
+        self._target.set(target)
+
+    def clear_target(self) -> None:
+        self._target.set(None)
+
+    def _current(self):
+        return self._target.get() or self._default
+
+    def write(self, data):
+        return self._current().write(data)
+
+    def flush(self):
+        return self._current().flush()
+
+    def isatty(self):
+        return False
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+
+class _SocketWriter(io.TextIOBase):
+    """将文本写入转换为协议消息并发送给客户端"""
+
+    def __init__(self, wfile, stream_name: str, lock: threading.Lock):
+        self._wfile = wfile
+        self._stream_name = stream_name
+        self._lock = lock
+
+    def write(self, data):
+        if not data:
+            return 0
+        message = {"type": "output", "stream": self._stream_name, "data": data}
+        with self._lock:
+            self._wfile.write((json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8'))
+            self._wfile.flush()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+class _CwdGate:
+    """
+    工作目录闸门
+
+    工作目录是进程级状态：相同目录的请求可以并发执行，
+    不同目录的请求需等待当前目录的请求全部结束后再切换。
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._active = 0
+
+    def enter(self, cwd: str) -> None:
+        with self._condition:
+            while self._active and os.getcwd() != cwd:
+                self._condition.wait()
+            if os.getcwd() != cwd:
+                os.chdir(cwd)
+            self._active += 1
+
+    def exit(self) -> None:
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """处理单个客户端请求"""
+
+    def handle(self):
+        server: DaemonServer = self.server
+        lock = threading.Lock()
+
+        def send(message):
+            with lock:
+                self.wfile.write((json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8'))
+                self.wfile.flush()
+
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+        except (ValueError, UnicodeDecodeError) as e:
+            send({"type": "output", "stream": "stderr", "data": f"[ERROR] 无效请求：{e}\n"})
+            send({"type": "exit", "code": 2})
+            return
+
+        code = 1
+        server.stdout.set_target(_SocketWriter(self.wfile, "stdout", lock))
+        server.stderr.set_target(_SocketWriter(self.wfile, "stderr", lock))
+        server.cwd_gate.enter(request.get("cwd") or os.getcwd())
+        try:
+            code = server.run_command(request.get("argv", []), request.get("api_key"))
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端已断开
+            return
+        finally:
+            server.cwd_gate.exit()
+            server.stdout.clear_target()
+            server.stderr.clear_target()
+
+        try:
+            send({"type": "exit", "code": code})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """CLI 守护进程，每个客户端请求在独立线程中执行"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.cwd_gate = _CwdGate()
+        self.stdout = _RoutedStream(sys.stdout, "stdout")
+        self.stderr = _RoutedStream(sys.stderr, "stderr")
+        super().__init__(socket_path, _RequestHandler)
+
+    def server_bind(self):
+        # socket 中转发 API 密钥，创建时即仅允许当前用户访问，不留下按默认 umask 可访问的窗口
+        previous = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(previous)
+
+    def server_activate(self):
+        super().server_activate()
+        sys.stdout = self.stdout
+        sys.stderr = self.stderr
+
+    def server_close(self):
+        super().server_close()
+        sys.stdout = self.stdout._default
+        sys.stderr = self.stderr._default
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def run_command(self, argv: List[str], api_key: Optional[str] = None) -> int:
+        """
+        在守护进程中执行一次子命令
+
+        Args:
+            argv: 子命令参数列表（不含程序名）
+            api_key: 客户端环境中的 API 密钥
+
+        Returns:
+            int: 退出码
+        """
+        from .main import create_parser, get_command_module
+
+        try:
+            parser = create_parser(argv)
+            parsed_args = parser.parse_args(argv)
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else 2
+
+        if not parsed_args.command:
+            parser.print_help()
+            return 0
+        if parsed_args.command in LOCAL_ONLY_COMMANDS:
+            print(f"[ERROR] 子命令 {parsed_args.command} 不支持在守护进程中执行")
+            return 1
+
+        # 环境变量是进程级状态，客户端的密钥通过参数传入
+        if hasattr(parsed_args, 'api_key') and not parsed_args.api_key:
+            parsed_args.api_key = api_key
+
+        cmd_module = get_command_module(parsed_args._module)
+        try:
+            result = cmd_module.execute(parsed_args)
+        except SystemExit as e:
+            result = e.code if isinstance(e.code, int) else 1
+        return result or 0
+
+
+def run_client(argv: List[str], socket_path: Optional[str] = None) -> int:
+    """
+    将命令转发给守护进程执行，并实时输出结果
+
+    Args:
+        argv: 子命令参数列表（不含程序名）
+        socket_path: 守护进程 socket 路径
+
+    Returns:
+        int: 子命令退出码
+
+    Raises:
+        ConnectionError: 无法连接守护进程
+    """
+    socket_path = socket_path or get_default_socket_path()
+    request = {
+        "argv": list(argv),
+        "cwd": os.getcwd(),
+        "api_key": os.getenv("DASHSCOPE_API_KEY"),
+    }
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError as e:
+        sock.close()
+        raise ConnectionError(f"无法连接守护进程 {socket_path}: {e}")
+
+    with sock, sock.makefile('rwb') as stream:
+        stream.write((json.dumps(request, ensure_ascii=False) + "\n").encode('utf-8'))
+        stream.flush()
+
+        for line in stream:
+            message = json.loads(line.decode('utf-8'))
+            if message.get("type") == "exit":
+                return message.get("code", 0)
+            target = sys.stderr if message.get("stream") == "stderr" else sys.stdout
+            target.write(message.get("data", ""))
+            target.flush()
+
+    print("[ERROR] 守护进程连接意外断开")
+    return 1
+
+
+def preload_commands() -> List[str]:
+    """
+    预加载所有子命令模块及其执行时才导入的依赖（PRELOAD_MODULES）
+
+    Returns:
+        List[str]: 加载成功的子命令列表
+    """
+    from .main import SUBCOMMANDS, get_command_module
+
+    loaded = []
+    for cmd_name, cmd_config in SUBCOMMANDS.items():
+        if cmd_name in LOCAL_ONLY_COMMANDS:
+            continue
+        try:
+            module = get_command_module(cmd_config['module'])
+            for name in getattr(module, 'PRELOAD_MODULES', ()):
+                importlib.import_module(name)
+            loaded.append(cmd_name)
+        except (ImportError, ModuleNotFoundError):
+            pass
+    return loaded
@@ -11,6 +11,7 @@ DashScope CLI - 阿里百炼大模型统一命令行工具
     python -m cli batch-edit config.json
 """
 
+import os
 import sys
 import argparse
 
@@ -48,11 +49,36 @@ SUBCOMMANDS = {
         'description': '批量图像编辑工具 - 根据配置文件批量处理图像',
         'module': 'batch_edit',
     },
+    'edit-pipeline': {
+        'help': '编辑流水线 - 按依赖关系串联多个图像编辑步骤',
+        'description': '图像编辑流水线 - 上一步结果URL直接传给下一步，互不依赖的分支并发执行',
+        'module': 'edit_pipeline',
+    },
+    'mask': {
+        'help': '批量 mask - 批量生成并验证局部重绘 mask',
+        'description': '批量 mask 生成工具 - 按清单或通配符在多进程中生成 mask，统计编辑区域并输出汇总清单',
+        'module': 'mask',
+    },
     'video': {
         'help': '视频生成 - 文生视频/图生视频',
         'description': '阿里百炼视频生成工具 - 支持文生视频、图生视频、首尾帧生视频',
         'module': 'video',
     },
+    'gateway': {
+        'help': 'HTTP 网关 - 以任务接口对外提供生成能力',
+        'description': 'DashScope HTTP 网关 - 有界排队、租户并发限制、任务状态查询与 SSE 进度推送',
+        'module': 'gateway',
+    },
+    'serve': {
+        'help': '守护进程 - 常驻后台以加速后续命令',
+        'description': 'DashScope CLI 守护进程 - 预加载子命令并复用连接池，配合 --daemon 使用',
+        'module': 'serve',
+    },
+    'worker': {
+        'help': '队列 worker - 从共享任务队列领取并执行任务',
+        'description': 'DashScope 队列 worker - 多进程/多主机从共享队列领取任务，支持租约续期与故障接管',
+        'module': 'worker',
+    },
 }
 
 
@@ -85,14 +111,94 @@ def get_command_module(module_name: str):
     elif module_name == 'batch_edit':
         from .commands import batch_edit
         return batch_edit
+    elif module_name == 'edit_pipeline':
+        from .commands import edit_pipeline
+        return edit_pipeline
+    elif module_name == 'mask':
+        from .commands import mask
+        return mask
     elif module_name == 'video':
         from .commands import video
         return video
+    elif module_name == 'gateway':
+        from .commands import gateway
+        return gateway
+    elif module_name == 'serve':
+        from .commands import serve
+        return serve
+    elif module_name == 'worker':
+        from .commands import worker
+        return worker
     return None
 
 
-def create_parser() -> argparse.ArgumentParser:
-    """创建主解析器"""
+def _selected_command(args=None):
+    """
+    从命令行参数中找出将要执行的子命令
+
+    Args:
+        args: 命令行参数列表，为 None 时使用 sys.argv
+
+    Returns:
+        子命令名称，未指定时返回 None
+    """
+    argv = sys.argv[1:] if args is None else args
+    skip_value = False
+    for arg in argv:
+        if skip_value:
+            skip_value = False
+            continue
+        if arg in SUBCOMMANDS:
+            return arg
+        if arg == '--socket':
+            skip_value = True
+            continue
+        if not arg.startswith('-'):
+            break
+    return None
+
+
+def _split_daemon_options(args):
+    """
+    拆分子命令之前的守护进程选项
+
+    Args:
+        args: 命令行参数列表（不含程序名）
+
+    Returns:
+        tuple: (是否转发给守护进程, socket 路径, 剩余参数列表)
+    """
+    use_daemon = os.getenv("DASHSCOPE_CLI_DAEMON", "").lower() in ("1", "true", "yes")
+    socket_path = None
+    remaining = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in SUBCOMMANDS:
+            remaining.extend(args[i:])
+            break
+        if arg == '--daemon':
+            use_daemon = True
+        elif arg == '--no-daemon':
+            use_daemon = False
+        elif arg == '--socket' and i + 1 < len(args):
+            socket_path = args[i + 1]
+            i += 1
+        elif arg.startswith('--socket='):
+            socket_path = arg.split('=', 1)[1]
+        else:
+            remaining.append(arg)
+        i += 1
+    return use_daemon, socket_path, remaining
+
+
+def create_parser(args=None) -> argparse.ArgumentParser:
+    """
+    创建主解析器
+
+    Args:
+        args: 命令行参数列表，仅用于确定需要加载参数的子命令
+    """
     parser = argparse.ArgumentParser(
         prog='dashscope-cli',
         description='阿里百炼大模型统一命令行工具',
@@ -121,6 +227,20 @@ def create_parser() -> argparse.ArgumentParser:
   # 批量图像编辑
   python -m cli batch-edit config.json
 
+  # 图像编辑流水线（去水印 -> 超分/风格化 并行）
+  python -m cli edit-pipeline pipeline.json -i photo.jpg
+
+  # 批量生成局部重绘 mask
+  python -m cli mask "photos/*.jpg" --spec mask_spec.json -j 8
+
+  # 守护进程模式（常驻后台，后续命令通过 --daemon 转发）
+  python -m cli serve &
+  python -m cli --daemon text2image "一只可爱的猫咪"
+
+  # 任务队列（批量任务入队，由一个或多个 worker 执行）
+  python -m cli batch-edit config.json --enqueue jobs.db
+  python -m cli worker jobs.db -c 8
+
 可用子命令:
   text2image      文生图 - 根据文本描述生成图像
   image-edit      图像编辑 - 编辑现有图像
@@ -128,7 +248,12 @@ def create_parser() -> argparse.ArgumentParser:
   style-repaint   人像重绘 - 人像风格转换
   speech-rec      语音识别 - 实时语音转文字
   batch-edit      批量编辑 - 批量处理图像编辑任务
+  edit-pipeline   编辑流水线 - 按依赖关系串联多个图像编辑步骤
+  mask            批量 mask - 批量生成并验证局部重绘 mask
   video           视频生成 - 文生视频/图生视频/特效模板
+  gateway         HTTP 网关 - 以任务接口对外提供生成能力
+  serve           守护进程 - 常驻后台以加速后续命令
+  worker          队列 worker - 从共享任务队列领取并执行任务
 
 视频特效模板:
   通用特效：squish(解压捏捏), rotation(转圈圈), poke(戳戳乐), inflate(气球膨胀), dissolve(分子扩散), melt(热浪融化), icecream(冰淇淋星球)
@@ -148,6 +273,22 @@ def create_parser() -> argparse.ArgumentParser:
         version=f'%(prog)s {__version__}'
     )
 
+    daemon_group = parser.add_mutually_exclusive_group()
+    daemon_group.add_argument(
+        '--daemon',
+        action='store_true',
+        help='将子命令转发给守护进程执行（需先运行 serve 子命令，也可设置环境变量 DASHSCOPE_CLI_DAEMON=1）'
+    )
+    daemon_group.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help='忽略 DASHSCOPE_CLI_DAEMON，在当前进程中执行'
+    )
+    parser.add_argument(
+        '--socket',
+        help='守护进程 socket 路径 (默认：环境变量 DASHSCOPE_CLI_SOCKET 或 ~/.dashscope-cli.sock)'
+    )
+
     # 创建子命令解析器
     subparsers = parser.add_subparsers(
         dest='command',
@@ -156,7 +297,9 @@ def create_parser() -> argparse.ArgumentParser:
         help='子命令帮助'
     )
 
-    # 注册子命令 - 使用懒加载方式添加参数
+    # 注册子命令 - 只为实际执行的子命令加载模块并添加参数，
+    # 其余子命令只注册帮助信息，避免每次启动都导入全部依赖
+    selected = _selected_command(args)
     for cmd_name, cmd_config in SUBCOMMANDS.items():
         subparser = subparsers.add_parser(
             cmd_name,
@@ -166,6 +309,9 @@ def create_parser() -> argparse.ArgumentParser:
         # 存储模块名供后续使用
         subparser.set_defaults(_module=cmd_config['module'])
 
+        if cmd_name != selected:
+            continue
+
         # 尝试加载模块并添加参数（如果可能的话）
         try:
             cmd_module = get_command_module(cmd_config['module'])
@@ -180,8 +326,21 @@ def create_parser() -> argparse.ArgumentParser:
 
 def main(args=None):
     """主函数"""
-    parser = create_parser()
-    parsed_args = parser.parse_args(args)
+    argv = sys.argv[1:] if args is None else list(args)
+
+    # 守护进程客户端模式：不加载子命令模块，直接转发参数
+    use_daemon, socket_path, forward_args = _split_daemon_options(argv)
+    command = _selected_command(forward_args)
+    if use_daemon and command:
+        from .daemon import LOCAL_ONLY_COMMANDS, run_client
+        if command not in LOCAL_ONLY_COMMANDS:
+            try:
+                return run_client(forward_args, socket_path)
+            except ConnectionError as e:
+                print(f"[WARN] {e}，改为在当前进程中执行")
+
+    parser = create_parser(argv)
+    parsed_args = parser.parse_args(argv)
 
     if not parsed_args.command:
         parser.print_help()
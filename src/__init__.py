@@ -7,4 +7,15 @@ __version__ = "0.1.0"
 __author__ = "Alibaba Cloud"
 __description__ = "阿里云百炼大模型工具集"
 
-from .image import Text2ImageGenerator, ImageGenerationRequest, ImageGenerationResponse
\ No newline at end of file
+from ._lazy import lazy_exports
+
+# 导出名称 -> 所在子模块，首次访问时才导入（PEP 562）
+_LAZY_EXPORTS = {
+    "Text2ImageGenerator": ".image",
+    "ImageGenerationRequest": ".image",
+    "ImageGenerationResponse": ".image",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_EXPORTS)
@@ -0,0 +1,39 @@
+"""
+包级延迟导出（PEP 562）
+各子包的 __init__ 只声明导出名称所在的子模块，首次访问时才导入，
+导入包时不会加载 httpx/pydantic/numpy/PIL 等重量级依赖
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, namespace: Dict[str, Any], exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    创建包的 __getattr__ 和 __dir__
+
+    Args:
+        package: 包名，即 __init__ 中的 __name__
+        namespace: 包的 globals()，导入后的对象缓存在其中，之后的访问不再经过 __getattr__
+        exports: 导出名称 -> 所在子模块（相对包的模块名，如 ".models"）
+
+    Returns:
+        Tuple[Callable, Callable]: (__getattr__, __dir__)
+
+    Example:
+        __getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_EXPORTS)
+    """
+
+    def __getattr__(name: str) -> Any:
+        """延迟导入导出对象，只加载实际用到的子模块"""
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,29 @@
+"""
+语音识别模块
+提供麦克风和扬声器实时语音识别及音频文件转写功能
+"""
+
+from .._lazy import lazy_exports
+
+# 导出名称 -> 所在子模块，首次访问时才导入（PEP 562）
+# pyaudio/dashscope 仅在真正使用识别器时加载
+_LAZY_EXPORTS = {
+    "SpeechRecognizer": ".speech_recognition",
+    "quick_start": ".speech_recognition",
+    "MicrophoneRecognizer": ".microphone_recognizer",
+    "SpeakerRecognizer": ".speaker_recognizer",
+    "AudioStreamer": ".streaming",
+    "FrameRingBuffer": ".streaming",
+    "VADGate": ".vad",
+    "FileTranscriber": ".file_transcriber",
+    "load_audio": ".file_transcriber",
+    "StreamResampler": ".resample",
+    "SessionSupervisor": ".session",
+    "MultiSourceRecognizer": ".multi_source",
+    "TranscriptMerger": ".multi_source",
+    "parse_source": ".multi_source",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_EXPORTS)
@@ -0,0 +1,254 @@
+"""
+音频文件离线转写
+解码 WAV/MP3/FLAC 等音频文件并转换为 16kHz 单声道 PCM，以快于实时的速度发送给实时识别服务；
+多个文件在线程池中并行使用独立的识别会话，结果输出为带时间戳的 JSONL/SRT
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import dashscope
+import numpy as np
+from dashscope.audio.asr import Recognition, RecognitionCallback, RecognitionResult
+
+from .resample import resampler_for
+
+# 识别服务要求的采样率
+SAMPLE_RATE = 16000
+
+# 目录输入时收集的音频格式
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".flac", ".ogg", ".m4a", ".aac", ".opus"}
+
+# 支持的输出格式
+OUTPUT_FORMATS = ("jsonl", "srt")
+
+
+def load_audio(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    解码音频文件为单声道 16 位 PCM
+
+    优先使用 soundfile 解码（WAV/FLAC/OGG，新版 libsndfile 也支持 MP3），多声道混为单声道，
+    采样率不同时使用与实时采集相同的流式重采样器；soundfile 不支持的格式回退到 librosa。
+
+    Args:
+        path: 音频文件路径
+        sample_rate: 目标采样率
+
+    Returns:
+        np.ndarray: int16 单声道采样
+    """
+    try:
+        import soundfile as sf
+
+        audio, rate = sf.read(path, dtype="int16", always_2d=True)
+    except Exception:
+        import librosa
+
+        audio, _ = librosa.load(path, sr=sample_rate, mono=True)
+        return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+    resampler = resampler_for(rate, audio.shape[1], sample_rate)
+    if resampler is None:
+        return audio[:, 0]
+    return np.frombuffer(resampler.process(audio.tobytes()), dtype=np.int16)
+
+
+def expand_audio_inputs(files: Iterable[str] = (), dirs: Iterable[str] = (), recursive: bool = False) -> List[str]:
+    """
+    收集音频文件
+
+    Args:
+        files: 音频文件路径
+        dirs: 目录，收集其中扩展名在 AUDIO_EXTENSIONS 中的文件
+        recursive: 是否递归子目录
+
+    Returns:
+        List[str]: 去重并保持顺序的音频路径
+    """
+    paths = list(files)
+    for directory in dirs:
+        candidates = Path(directory).rglob("*") if recursive else Path(directory).iterdir()
+        paths.extend(sorted(
+            str(path) for path in candidates
+            if path.is_file() and path.suffix.lower() in AUDIO_EXTENSIONS
+        ))
+    return list(dict.fromkeys(paths))
+
+
+def format_srt_time(ms: float) -> str:
+    """毫秒转换为 SRT 时间格式 HH:MM:SS,mmm"""
+    ms = max(0, int(round(ms)))
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+
+def write_srt(sentences: List[Dict[str, Any]], path: str) -> None:
+    """
+    把识别到的句子写入 SRT 字幕文件
+
+    Args:
+        sentences: 句子列表，包含 begin_time、end_time（毫秒）和 text
+        path: 输出路径
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for index, sentence in enumerate(sentences, 1):
+            f.write(
+                f"{index}\n"
+                f"{format_srt_time(sentence['begin_time'])} --> {format_srt_time(sentence['end_time'])}\n"
+                f"{sentence['text']}\n\n"
+            )
+
+
+def write_jsonl(record: Dict[str, Any], path: str) -> None:
+    """
+    把识别到的句子写入 JSONL 文件，每行一句
+
+    Args:
+        record: transcribe 返回的结果记录
+        path: 输出路径
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for sentence in record["sentences"]:
+            f.write(json.dumps({"file": record["file"], **sentence}, ensure_ascii=False) + "\n")
+
+
+class _FileSession(RecognitionCallback):
+    """单个文件的识别会话，收集已结束的句子"""
+
+    def __init__(self):
+        self.sentences: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+    def on_event(self, result: RecognitionResult) -> None:
+        sentence = result.get_sentence()
+        if isinstance(sentence, dict) and RecognitionResult.is_sentence_end(sentence):
+            text = (sentence.get("text") or "").strip()
+            if text:
+                self.sentences.append({
+                    "begin_time": sentence.get("begin_time", 0),
+                    "end_time": sentence.get("end_time", 0),
+                    "text": text
+                })
+
+    def on_error(self, result: RecognitionResult) -> None:
+        self.error = getattr(result, "message", None) or str(result)
+        self.done.set()
+
+    def on_complete(self) -> None:
+        self.done.set()
+
+
+class FileTranscriber:
+    """音频文件离线转写"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "paraformer-realtime-v2",
+        frame_ms: int = 100,
+        speed: float = 0.0
+    ):
+        """
+        初始化转写器
+
+        Args:
+            api_key: API 密钥，默认读取 DASHSCOPE_API_KEY
+            model: 实时识别模型
+            frame_ms: 每次发送的音频时长（毫秒）
+            speed: 发送速度（实时的倍数），0 表示不限速
+        """
+        self.api_key = api_key or os.getenv('DASHSCOPE_API_KEY')
+        self.model = model
+        self.frame_ms = frame_ms
+        self.speed = speed
+
+        if not self.api_key:
+            raise ValueError("请设置DASHSCOPE_API_KEY环境变量或传入api_key参数")
+
+        dashscope.api_key = self.api_key
+
+    def transcribe(self, path: str) -> Dict[str, Any]:
+        """
+        转写单个音频文件
+
+        Args:
+            path: 音频文件路径
+
+        Returns:
+            Dict[str, Any]: 结果记录，包含 file、status（SUCCEEDED/FAILED）、duration（秒）、
+            sentences、elapsed（秒），失败时包含 error
+        """
+        start = time.time()
+        record = {"file": path, "status": "FAILED", "sentences": []}
+        try:
+            audio = load_audio(path)
+            record["duration"] = round(len(audio) / SAMPLE_RATE, 3)
+
+            session = _FileSession()
+            recognizer = Recognition(model=self.model, format="pcm", sample_rate=SAMPLE_RATE, callback=session)
+            recognizer.start()
+            stop_error = None
+            try:
+                frame = SAMPLE_RATE * self.frame_ms // 1000
+                sent_start = time.monotonic()
+                for offset in range(0, len(audio), frame):
+                    if session.error:
+                        break
+                    recognizer.send_audio_frame(audio[offset:offset + frame].tobytes())
+                    if self.speed > 0:
+                        # 按指定倍速发送：第 n 帧不早于 n * 帧长 / 倍速 发出
+                        delay = sent_start + (offset + frame) / SAMPLE_RATE / self.speed - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+            finally:
+                # 无论成功、出错还是发送中断都要结束会话，释放服务端连接；stop 会等待服务端返回全部结果。
+                # 会话已出错时 stop 也可能失败，此时以原始错误为准
+                try:
+                    recognizer.stop()
+                except Exception as e:
+                    stop_error = e
+
+            if session.error:
+                raise RuntimeError(session.error)
+            if stop_error is not None:
+                raise stop_error
+            record["sentences"] = sorted(session.sentences, key=lambda sentence: sentence["begin_time"])
+            record["status"] = "SUCCEEDED"
+        except Exception as e:
+            record["error"] = str(e)
+        record["elapsed"] = round(time.time() - start, 3)
+        return record
+
+    def iter_transcribe(self, paths: List[str], workers: int = 4) -> Iterator[Dict[str, Any]]:
+        """
+        并行转写多个音频文件，每个文件使用独立的识别会话
+
+        Args:
+            paths: 音频文件路径
+            workers: 同时进行的识别会话数
+
+        Yields:
+            Dict[str, Any]: 结果记录，按完成顺序返回
+        """
+        if workers <= 1 or len(paths) <= 1:
+            for path in paths:
+                yield self.transcribe(path)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.transcribe, path) for path in paths]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            except (KeyboardInterrupt, GeneratorExit):
+                # Ctrl+C 或调用方停止迭代时取消尚未开始的文件，只等待正在转写的文件结束
+                executor.shutdown(cancel_futures=True)
+                raise
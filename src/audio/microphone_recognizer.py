@@ -3,6 +3,13 @@ import dashscope
 from dashscope.audio.asr import RecognitionCallback, Recognition, RecognitionResult
 import os
 import sys
+import threading
+import time
+
+from .resample import resampler_for
+from .session import SessionSupervisor
+from .streaming import AudioStreamer, native_input_format
+from .vad import VADGate
 
 class MicrophoneRecognizer(RecognitionCallback):
     """麦克风实时语音识别器"""
@@ -13,6 +20,10 @@ class MicrophoneRecognizer(RecognitionCallback):
         self.mic = None
         self.stream = None
         self.recognizer = None
+        self.streamer = None
+        self.supervisor = None
+        self.error = None
+        self._failed = threading.Event()
         
         if not self.api_key:
             raise ValueError("请设置DASHSCOPE_API_KEY环境变量或传入api_key参数")
@@ -20,30 +31,19 @@ class MicrophoneRecognizer(RecognitionCallback):
         dashscope.api_key = self.api_key
     
     def on_open(self) -> None:
-        """开始识别时的回调"""
-        try:
-            self.mic = pyaudio.PyAudio()
-            self.stream = self.mic.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=16000,
-                input=True,
-                frames_per_buffer=3200,
-                input_device_index=None  # 使用默认麦克风
-            )
-            print("🎤 麦克风已打开，开始监听...")
-            print("💡 按 Ctrl+C 停止识别")
-        except Exception as e:
-            print(f"❌ 打开麦克风失败: {e}")
-            raise
+        """开始识别时的回调（麦克风在 start_listening 中按设备原生格式打开）"""
+        print("🎤 识别会话已建立，开始监听...")
+        print("💡 按 Ctrl+C 停止识别")
     
     def on_close(self) -> None:
         """停止识别时的回调"""
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
+            self.stream = None
         if self.mic:
             self.mic.terminate()
+            self.mic = None
         print("\n🔇 麦克风已关闭")
     
     def on_event(self, result: RecognitionResult) -> None:
@@ -86,6 +86,22 @@ class MicrophoneRecognizer(RecognitionCallback):
             import logging
             logging.debug(f"识别错误: {e}, 原始数据: {result}")
     
+    def on_error(self, result: RecognitionResult) -> None:
+        """识别服务出错的回调（连接断开、鉴权失败等）"""
+        self._fail(getattr(result, "message", None) or str(result))
+    
+    def _on_send_error(self, error: Exception) -> None:
+        """发送线程发送音频失败的回调"""
+        self._fail(f"发送音频失败: {error}")
+    
+    def _fail(self, message: str) -> None:
+        """记录第一个错误并通知监听循环结束，停止采集和关闭会话由 start_listening 所在线程完成"""
+        if self._failed.is_set():
+            return
+        self.error = message
+        self._failed.set()
+        print(f"\n❌ 识别服务错误: {message}")
+    
     def list_microphones(self):
         """列出可用的麦克风设备"""
         p = pyaudio.PyAudio()
@@ -96,36 +112,61 @@ class MicrophoneRecognizer(RecognitionCallback):
                 print(f"  {i}: {dev['name']}")
         p.terminate()
     
-    def start_listening(self, device_index=None):
-        """开始实时监听麦克风"""
+    def start_listening(self, device_index=None, vad=False, supervise=False):
+        """
+        开始实时监听麦克风
+        
+        Args:
+            device_index: 麦克风设备索引，None 表示默认设备
+            vad: 只发送检测到语音的片段
+            supervise: 会话断开时自动重连并重发未确认的音频，长时间运行时定期轮换会话
+        """
         try:
-            self.recognizer = Recognition(
-                model=self.model,
-                format="pcm",
-                sample_rate=16000,
-                callback=self
-            )
-            
-            self.recognizer.start()
-            
-            # 打开指定设备或默认设备
+            # 按设备原生采样率和声道数打开指定设备或默认设备，避免系统层面的重采样或打开失败
             self.mic = pyaudio.PyAudio()
+            rate, channels = native_input_format(self.mic, device_index)
+            
+            # 采集回调只写入环形缓冲区，由发送线程混音、重采样为 16kHz 单声道后发送给识别服务
+            self.error = None
+            self._failed.clear()
+            gate = VADGate() if vad else None
+            if supervise:
+                self.supervisor = SessionSupervisor(
+                    self.model,
+                    time_map=gate.to_stream_time if gate else None
+                ).start()
+                send, on_error = self.supervisor.send, self.supervisor.on_error
+            else:
+                self.recognizer = Recognition(
+                    model=self.model,
+                    format="pcm",
+                    sample_rate=16000,
+                    callback=self
+                )
+                self.recognizer.start()
+                send, on_error = self.recognizer.send_audio_frame, self._on_send_error
+            self.streamer = AudioStreamer(
+                send,
+                on_error=on_error,
+                gate=gate,
+                resampler=resampler_for(rate, channels)
+            ).start()
             self.stream = self.mic.open(
                 format=pyaudio.paInt16,
-                channels=1,
-                rate=16000,
+                channels=channels,
+                rate=rate,
                 input=True,
                 input_device_index=device_index,
-                frames_per_buffer=3200
+                frames_per_buffer=rate // 10,
+                stream_callback=self.streamer.capture_callback
             )
+            print(f"🎚️  采集格式: {rate}Hz × {channels} 声道")
             
             print("🎤 开始实时语音识别...")
             
             try:
-                while True:
-                    if self.stream and self.recognizer:
-                        data = self.stream.read(3200, exception_on_overflow=False)
-                        self.recognizer.send_audio_frame(data)
+                while self.stream and self.stream.is_active() and not self._failed.is_set():
+                    time.sleep(0.1)
             except KeyboardInterrupt:
                 print("\n⏹️  用户中断识别")
             finally:
@@ -137,11 +178,25 @@ class MicrophoneRecognizer(RecognitionCallback):
     
     def stop(self):
         """停止识别"""
+        # 先停止采集，再发送完缓冲区中剩余的音频
+        if self.stream and self.stream.is_active():
+            self.stream.stop_stream()
+        if self.streamer:
+            # 会话已出错时丢弃缓冲区中剩余的音频
+            self.streamer.stop(drain=not self._failed.is_set())
+            print(f"📊 {self.streamer.format_stats()}")
+            self.streamer = None
+        if self.supervisor:
+            self.supervisor.stop()
+            print(f"📊 {self.supervisor.format_stats()}")
+            self.supervisor = None
         if self.recognizer:
+            # 无论会话是否出错都结束会话，释放 websocket 连接；正常结束时会等待剩余识别结果
             try:
-                self.recognizer.close()
-            except:
+                self.recognizer.stop()
+            except Exception:
                 pass
+            self.recognizer = None
         self.on_close()
 
 def main():
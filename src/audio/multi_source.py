@@ -0,0 +1,378 @@
+"""
+多音源同时识别
+在一个进程中同时采集多个麦克风、扬声器回环设备和音频文件，每个音源使用独立的发送线程和识别会话，
+共享一个 PyAudio 实例和重采样滤波器；各音源的识别结果换算到统一的时间轴，按时间排序后合并输出
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import dashscope
+
+from .resample import resampler_for
+from .session import SessionSupervisor
+from .streaming import AudioStreamer, native_input_format
+from .vad import VADGate
+
+# 音源类型
+SOURCE_KINDS = ("mic", "loopback", "file")
+
+# 文件音源每次写入的音频时长（毫秒）
+_FILE_FRAME_MS = 100
+
+# 识别服务对新发送的音频返回中间结果的延迟（毫秒），用于推进音源水位
+_RESULT_LATENCY_MS = 1500
+
+
+class SourceSpec(NamedTuple):
+    """音源配置"""
+    kind: str  # mic/loopback/file
+    device: Optional[int]  # 设备索引，None 表示默认设备或自动查找
+    path: Optional[str]  # 音频文件路径
+    label: str  # 输出中的音源标签
+
+
+def parse_source(spec: str) -> SourceSpec:
+    """
+    解析音源配置
+
+    格式：mic、mic:<设备索引>、loopback、loopback:<设备索引>、file:<路径>，
+    末尾可用 =<标签> 指定输出标签，如 mic:1=客服、loopback=客户。
+
+    Args:
+        spec: 音源配置字符串
+
+    Returns:
+        SourceSpec: 音源配置
+
+    Raises:
+        ValueError: 格式无效
+    """
+    body, _, label = spec.partition("=")
+    kind, _, value = body.partition(":")
+    kind = kind.strip().lower()
+    if kind not in SOURCE_KINDS:
+        raise ValueError(f"音源类型无效：{spec}，可用：{', '.join(SOURCE_KINDS)}")
+    if kind == "file":
+        if not value:
+            raise ValueError(f"文件音源需要指定路径：{spec}")
+        return SourceSpec(kind, None, value, label or os.path.basename(value))
+    if value and not value.isdigit():
+        raise ValueError(f"设备索引必须是整数：{spec}")
+    return SourceSpec(kind, int(value) if value else None, None, label or body)
+
+
+class TranscriptMerger:
+    """
+    多音源识别结果按时间排序合并
+
+    句子在结束后才会返回，到达顺序取决于句子长度和识别延迟，因此不能按固定的等待时间排序。
+    每个音源提供一个水位函数，返回该音源之后输出的句子的开始时间下限（见 SessionSupervisor.watermark）；
+    堆顶句子的开始时间不晚于所有音源的水位时才输出，此时任何音源都不会再输出更早开始的句子。
+    音源长时间无法推进水位（如断线重连）时，句子最多等待 max_delay_ms 后输出，早于已输出内容的计入 late。
+    """
+
+    def __init__(self, emit: Callable[[Dict[str, Any]], None], clock: Callable[[], float], max_delay_ms: float = 30000):
+        """
+        初始化合并器
+
+        Args:
+            emit: 输出句子的回调
+            clock: 返回统一时间轴上当前时间（毫秒）的函数
+            max_delay_ms: 句子到达后的最长等待时间（毫秒）
+        """
+        self.emit = emit
+        self.clock = clock
+        self.max_delay_ms = max_delay_ms
+        self.late = 0
+        self._heap: List = []
+        self._watermarks: Dict[Any, Callable[[], float]] = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._last_begin = float("-inf")
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, key: Any, watermark: Callable[[], float]) -> None:
+        """登记音源的水位函数"""
+        with self._condition:
+            self._watermarks[key] = watermark
+            self._condition.notify()
+
+    def unwatch(self, key: Any) -> None:
+        """音源结束（剩余句子都已加入）后取消登记，不再限制其他音源的输出"""
+        with self._condition:
+            self._watermarks.pop(key, None)
+            self._condition.notify()
+
+    def add(self, sentence: Dict[str, Any]) -> None:
+        """加入一个句子（识别回调线程调用）"""
+        with self._condition:
+            heapq.heappush(self._heap, (sentence["begin_time"], next(self._sequence), self.clock(), sentence))
+            self._condition.notify()
+
+    def _pop_due(self, force: bool = False) -> List[Dict[str, Any]]:
+        """取出可以输出的句子"""
+        due = []
+        now = self.clock()
+        low = min((watermark() for watermark in self._watermarks.values()), default=float("inf"))
+        while self._heap:
+            begin, _, arrived, sentence = self._heap[0]
+            if not (force or begin <= low or arrived + self.max_delay_ms <= now):
+                break
+            heapq.heappop(self._heap)
+            if begin < self._last_begin:
+                self.late += 1
+            self._last_begin = max(self._last_begin, begin)
+            due.append(sentence)
+        return due
+
+    def poll(self) -> int:
+        """输出当前可以输出的句子，返回输出的数量"""
+        with self._condition:
+            due = self._pop_due()
+        for sentence in due:
+            self.emit(sentence)
+        return len(due)
+
+    def _run(self) -> None:
+        # 水位随音频发送推进，没有新句子时也需要定期检查
+        while True:
+            self.poll()
+            with self._condition:
+                if not self._running:
+                    return
+                self._condition.wait(0.1)
+
+    def start(self) -> "TranscriptMerger":
+        """启动输出线程"""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="transcript-merger", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止输出线程，并按顺序输出剩余的句子"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        with self._condition:
+            due = self._pop_due(force=True)
+        for sentence in due:
+            self.emit(sentence)
+
+
+class _Source:
+    """一个音源的采集、发送和识别会话"""
+
+    def __init__(self, spec: SourceSpec, supervisor: SessionSupervisor, streamer: AudioStreamer, gate: Optional[VADGate]):
+        self.spec = spec
+        self.supervisor = supervisor
+        self.streamer = streamer
+        self.gate = gate
+        self.origin_ms = 0.0  # 第一帧音频在统一时间轴上的时间
+        self.stream = None
+        self.feeder: Optional[threading.Thread] = None
+        self.finished = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        if self.stream is not None:
+            return self.stream.is_active()
+        return not self.finished.is_set()
+
+
+class MultiSourceRecognizer:
+    """多音源同时识别"""
+
+    def __init__(
+        self,
+        sources: List[SourceSpec],
+        api_key: Optional[str] = None,
+        model: str = "paraformer-realtime-v2",
+        vad: bool = False,
+        max_delay: float = 30.0,
+        on_sentence: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        初始化多音源识别
+
+        Args:
+            sources: 音源配置列表，见 parse_source
+            api_key: API 密钥，默认读取 DASHSCOPE_API_KEY
+            model: 实时识别模型
+            vad: 各音源只发送检测到语音的片段
+            max_delay: 合并输出时句子的最长等待时间（秒），见 TranscriptMerger
+            on_sentence: 输出句子的回调，参数包含 begin_time、end_time（统一时间轴上的毫秒）、text、source，默认打印
+        """
+        self.api_key = api_key or os.getenv('DASHSCOPE_API_KEY')
+        self.specs = sources
+        self.model = model
+        self.vad = vad
+        self.on_sentence = on_sentence or self._print_sentence
+        self.audio = None
+        self.sources: List[_Source] = []
+        self._start = time.monotonic()
+        self.merger = TranscriptMerger(self.on_sentence, self._now_ms, max_delay * 1000)
+
+        if not self.api_key:
+            raise ValueError("请设置DASHSCOPE_API_KEY环境变量或传入api_key参数")
+        if not sources:
+            raise ValueError("至少需要一个音源")
+
+        dashscope.api_key = self.api_key
+
+    def _now_ms(self) -> float:
+        """统一时间轴上的当前时间（毫秒），从创建识别器开始计时"""
+        return (time.monotonic() - self._start) * 1000
+
+    @staticmethod
+    def _print_sentence(sentence: Dict[str, Any]) -> None:
+        seconds = sentence["begin_time"] / 1000
+        print(f"🎯 [{int(seconds // 3600):02d}:{int(seconds % 3600 // 60):02d}:{seconds % 60:04.1f}] [{sentence['source']}] {sentence['text']}")
+
+    def _add_source(self, spec: SourceSpec, rate: int = 16000, channels: int = 1) -> _Source:
+        """创建音源的识别会话和发送线程"""
+        gate = VADGate() if self.vad else None
+        supervisor = SessionSupervisor(self.model, time_map=gate.to_stream_time if gate else None)
+        streamer = AudioStreamer(supervisor.send, on_error=supervisor.on_error, gate=gate, resampler=resampler_for(rate, channels))
+        source = _Source(spec, supervisor, streamer, gate)
+
+        def forward(sentence: Dict[str, Any]) -> None:
+            self.merger.add({
+                **sentence,
+                "begin_time": round(source.origin_ms + sentence["begin_time"]),
+                "end_time": round(source.origin_ms + sentence["end_time"]),
+                "source": spec.label
+            })
+
+        def watermark() -> float:
+            bound = supervisor.watermark(_RESULT_LATENCY_MS)
+            if gate and not gate.active and not supervisor.has_pending:
+                # 门控关闭期间的音频不发送，不会产生句子
+                bound = max(bound, gate.stream_ms - _RESULT_LATENCY_MS)
+            return source.origin_ms + bound
+
+        supervisor.on_sentence = forward
+        self.merger.watch(source, watermark)
+        self.sources.append(source)
+        return source
+
+    def _open_device(self, spec: SourceSpec) -> None:
+        """按设备原生格式打开麦克风或回环设备"""
+        import pyaudio
+
+        if self.audio is None:
+            # 所有设备共享一个 PyAudio 实例
+            self.audio = pyaudio.PyAudio()
+        device = spec.device
+        if spec.kind == "loopback" and device is None:
+            from .speaker_recognizer import SpeakerRecognizer
+
+            device = SpeakerRecognizer(self.api_key, self.model).find_speaker_device()
+            if device is None:
+                raise RuntimeError("未找到扬声器回环设备，请使用 loopback:<设备索引> 指定")
+        rate, channels = native_input_format(self.audio, device)
+        source = self._add_source(spec, rate, channels)
+        source.supervisor.start()
+        source.streamer.start()
+        source.origin_ms = self._now_ms()
+        source.stream = self.audio.open(
+            format=pyaudio.paInt16,
+            channels=channels,
+            rate=rate,
+            input=True,
+            input_device_index=device,
+            frames_per_buffer=rate // 10,
+            stream_callback=source.streamer.capture_callback
+        )
+        print(f"🎚️  [{spec.label}] 设备 {device if device is not None else '默认'}: {rate}Hz × {channels} 声道")
+
+    def _open_file(self, spec: SourceSpec) -> None:
+        """按实时速度播放音频文件，与设备音源保持同一时间轴"""
+        from .file_transcriber import load_audio
+
+        audio = load_audio(spec.path)
+        source = self._add_source(spec)
+        source.supervisor.start()
+        source.streamer.start()
+        frame = 16000 * _FILE_FRAME_MS // 1000
+
+        def feed():
+            source.origin_ms = self._now_ms()
+            started = time.monotonic()
+            for index, offset in enumerate(range(0, len(audio), frame)):
+                if source.finished.is_set():
+                    break
+                source.streamer.push(audio[offset:offset + frame].tobytes())
+                delay = started + (index + 1) * _FILE_FRAME_MS / 1000 - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            # 文件播放完后结束会话，剩余句子加入合并器后不再限制其他音源的输出
+            source.streamer.stop()
+            source.supervisor.stop()
+            self.merger.unwatch(source)
+            source.finished.set()
+
+        source.feeder = threading.Thread(target=feed, name=f"file-{spec.label}", daemon=True)
+        source.feeder.start()
+        print(f"🎚️  [{spec.label}] 文件 {spec.path}: {len(audio) / 16000:.1f}秒")
+
+    def start(self) -> "MultiSourceRecognizer":
+        """打开全部音源并开始识别"""
+        self.merger.start()
+        try:
+            for spec in self.specs:
+                if spec.kind == "file":
+                    self._open_file(spec)
+                else:
+                    self._open_device(spec)
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    def run(self) -> None:
+        """开始识别并阻塞，直到所有音源结束或按 Ctrl+C"""
+        self.start()
+        try:
+            while any(source.active for source in self.sources):
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            print("\n⏹️  用户中断识别")
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """停止全部音源，等待剩余识别结果并按顺序输出"""
+        for source in self.sources:
+            if source.stream is not None:
+                if source.stream.is_active():
+                    source.stream.stop_stream()
+                source.stream.close()
+                source.stream = None
+            source.finished.set()
+            if source.feeder:
+                source.feeder.join()
+        for source in self.sources:
+            source.streamer.stop()
+        for source in self.sources:
+            source.supervisor.stop()
+        self.merger.stop()
+        if self.audio is not None:
+            self.audio.terminate()
+            self.audio = None
+
+    def format_stats(self) -> str:
+        """每个音源一行的统计摘要"""
+        return "\n".join(
+            f"[{source.spec.label}] {source.streamer.format_stats()}；{source.supervisor.format_stats()}"
+            for source in self.sources
+        ) + (f"\n合并输出时有 {self.merger.late} 句超过最长等待时间后乱序输出" if self.merger.late else "")
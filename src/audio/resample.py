@@ -0,0 +1,189 @@
+"""
+流式重采样与混音
+把采集设备原生格式（如 44.1/48kHz 立体声）的 16 位 PCM 逐块混为单声道并重采样到 16kHz：
+Kaiser 窗 sinc 低通滤波器按多相结构分解，每块音频一次性向量化计算所有输出样本，
+块与块之间只保留滤波器长度的历史样本，不引入额外的缓冲延迟
+"""
+
+import functools
+import math
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# 识别服务要求的采样率
+TARGET_RATE = 16000
+
+
+def downmix(samples: np.ndarray, channels: int) -> np.ndarray:
+    """
+    交织的多声道采样取平均混为单声道
+
+    Args:
+        samples: 交织排列的采样
+        channels: 声道数
+
+    Returns:
+        np.ndarray: float32 单声道采样
+    """
+    if channels == 1:
+        return samples.astype(np.float32)
+    frames = len(samples) // channels
+    return samples[:frames * channels].reshape(frames, channels).mean(axis=1, dtype=np.float32)
+
+
+@functools.lru_cache(maxsize=16)
+def design_filter_bank(up: int, down: int, zero_crossings: int = 8, beta: float = 8.0, rolloff: float = 0.94) -> np.ndarray:
+    """
+    设计多相分解的 Kaiser 窗 sinc 低通滤波器
+
+    原型滤波器工作在上采样 up 倍后的采样率上，截止频率为输入、输出奈奎斯特频率中较低者的 rolloff 倍；
+    第 p 行为相位 p 的子滤波器，系数按输入样本从新到旧排列；相同参数的系数会被缓存，多个音源共享同一份（只读）。
+
+    Args:
+        up: 上采样倍数
+        down: 下采样倍数
+        zero_crossings: 较低采样率下 sinc 单侧的过零点数，决定滤波器长度和过渡带宽度
+        beta: Kaiser 窗参数，越大阻带衰减越大、过渡带越宽
+        rolloff: 截止频率相对奈奎斯特频率的比例
+
+    Returns:
+        np.ndarray: (up, 每相抽头数) 的 float32 系数
+    """
+    taps = 2 * zero_crossings * math.ceil(max(1.0, down / up))
+    length = taps * up
+    cutoff = rolloff * 0.5 / max(up, down)
+    n = np.arange(length) - (length - 1) / 2
+    prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta) * up
+    # prototype[p + j * up] 作用于相位 p 的第 j 个输入样本
+    return prototype.reshape(taps, up).T.astype(np.float32)
+
+
+class StreamResampler:
+    """
+    流式多相重采样器（16 位 PCM）
+
+    输出样本 k 对应上采样后的位置 k * down，使用相位 (k * down) % up 的子滤波器，
+    与截至输入样本 (k * down) // up 的最近若干个输入样本做内积；每块音频的所有输出样本通过一次
+    索引收集和矩阵乘法计算，状态只有上一块末尾的历史样本和输出计数。
+    """
+
+    def __init__(self, in_rate: int, out_rate: int = TARGET_RATE, channels: int = 1, zero_crossings: int = 8):
+        """
+        初始化重采样器
+
+        Args:
+            in_rate: 输入采样率
+            out_rate: 输出采样率
+            channels: 输入声道数，多声道先取平均混为单声道
+            zero_crossings: 滤波器质量，见 design_filter_bank
+        """
+        if in_rate <= 0 or out_rate <= 0 or channels < 1:
+            raise ValueError(f"无效的音频格式：{in_rate}Hz × {channels} 声道 -> {out_rate}Hz")
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.channels = channels
+        divisor = math.gcd(in_rate, out_rate)
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        self.passthrough = self.up == self.down
+        if not self.passthrough:
+            self.bank = design_filter_bank(self.up, self.down, zero_crossings)
+            self.taps = self.bank.shape[1]
+            self._offsets = np.arange(self.taps)
+            self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0
+        self._produced = 0
+
+        # 开销统计
+        self.input_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    def process(self, data: bytes) -> bytes:
+        """
+        处理一块音频
+
+        Args:
+            data: 输入格式的交织 16 位 PCM
+
+        Returns:
+            bytes: 输出采样率的单声道 16 位 PCM
+        """
+        start = time.perf_counter()
+        samples = np.frombuffer(data, dtype=np.int16)
+        self.input_seconds += len(samples) / self.channels / self.in_rate
+        if self.passthrough and self.channels == 1:
+            self.cpu_seconds += time.perf_counter() - start
+            return data
+
+        mono = downmix(samples, self.channels)
+        if self.passthrough:
+            output = mono
+        else:
+            # 按不超过 1 秒的子块滤波，索引收集矩阵的大小与输入长度无关（整个文件一次传入时也是如此）
+            block = self.in_rate
+            output = np.concatenate(
+                [self._filter(mono[offset:offset + block]) for offset in range(0, len(mono), block)]
+                or [np.zeros(0, dtype=np.float32)]
+            )
+        result = np.clip(np.rint(output), -32768, 32767).astype(np.int16).tobytes()
+        self.cpu_seconds += time.perf_counter() - start
+        return result
+
+    def _filter(self, mono: np.ndarray) -> np.ndarray:
+        """多相滤波，返回本块可以计算的全部输出样本"""
+        buffer = np.concatenate((self._history, mono))
+        # buffer[0] 对应的输入样本序号（开头为零填充时为负数）
+        origin = self._consumed - (self.taps - 1)
+        self._consumed += len(mono)
+        self._history = buffer[len(buffer) - (self.taps - 1):]
+
+        # 输出样本 k 需要的最新输入样本为 (k * down) // up，必须已经收到
+        end = -(-self._consumed * self.up // self.down)
+        outputs = np.arange(self._produced, end, dtype=np.int64)
+        self._produced = end
+        if not len(outputs):
+            return np.zeros(0, dtype=np.float32)
+
+        position = outputs * self.down
+        newest = position // self.up - origin
+        phases = position % self.up
+        window = buffer[newest[:, None] - self._offsets[None, :]]
+        return np.einsum("ij,ij->i", window, self.bank[phases])
+
+    @property
+    def cost_ms_per_second(self) -> float:
+        """每秒音频的处理耗时（毫秒）"""
+        return self.cpu_seconds / self.input_seconds * 1000 if self.input_seconds else 0.0
+
+    def describe(self) -> str:
+        """格式转换说明"""
+        return f"{self.in_rate}Hz×{self.channels} -> {self.out_rate}Hz×1"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """统计数据"""
+        return {
+            "input_rate": self.in_rate,
+            "input_channels": self.channels,
+            "output_rate": self.out_rate,
+            "input_seconds": round(self.input_seconds, 2),
+            "cost_ms_per_second": round(self.cost_ms_per_second, 3),
+        }
+
+
+def resampler_for(in_rate: int, channels: int, out_rate: int = TARGET_RATE) -> Optional[StreamResampler]:
+    """
+    为采集格式创建重采样器
+
+    Args:
+        in_rate: 采集采样率
+        channels: 采集声道数
+        out_rate: 输出采样率
+
+    Returns:
+        Optional[StreamResampler]: 采集格式已是单声道目标采样率时返回 None
+    """
+    if in_rate == out_rate and channels == 1:
+        return None
+    return StreamResampler(in_rate, out_rate, channels)
@@ -0,0 +1,352 @@
+"""
+可自动恢复的识别会话
+连接断开或出错时按退避间隔重新建立识别会话，并重发上一个已确认句子结束之后的音频；
+会话接近服务端最长时长前在句子间隙切换到新会话，新旧会话重叠部分的识别结果去重后输出
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from dashscope.audio.asr import Recognition, RecognitionCallback, RecognitionResult
+
+logger = logging.getLogger(__name__)
+
+# 识别服务要求的音频格式
+SAMPLE_RATE = 16000
+_BYTES_PER_MS = SAMPLE_RATE * 2 / 1000
+
+# 判定重复句子时允许的结束时间误差（毫秒）
+_DEDUP_TOLERANCE_MS = 200
+
+
+class _Session(RecognitionCallback):
+    """一次识别会话，识别结果中的时间加上 origin 即为输入音频中的时间"""
+
+    def __init__(self, supervisor: "SessionSupervisor", number: int, origin: float):
+        self.supervisor = supervisor
+        self.number = number
+        self.origin = origin
+        self.sent_ms = 0.0
+        self.failed = False
+        self.retiring = False
+        self.recognition: Optional[Recognition] = None
+
+    def on_event(self, result: RecognitionResult) -> None:
+        sentence = result.get_sentence()
+        if not isinstance(sentence, dict):
+            return
+        if RecognitionResult.is_sentence_end(sentence):
+            self.supervisor._on_sentence(self, sentence)
+        else:
+            self.supervisor._on_partial(self, sentence)
+
+    def on_error(self, result: RecognitionResult) -> None:
+        message = getattr(result, "message", None) or str(result)
+        self.supervisor._on_session_failed(self, message)
+
+    def on_complete(self) -> None:
+        # 未主动结束的会话被服务端关闭（如达到最长时长）时同样需要重连
+        if not self.retiring:
+            self.supervisor._on_session_failed(self, "会话被服务端结束")
+
+
+class SessionSupervisor:
+    """
+    自动重连和轮换的识别会话
+
+    作为 AudioStreamer 的 send/on_error 使用：send 由发送线程调用，发送的每帧音频同时保存在重发缓冲区中，
+    收到句子结束的识别结果后才从缓冲区移除；会话失败后，下一次 send 按退避间隔重新建立会话，
+    并先重发缓冲区中的音频，保证断线期间的音频不丢失。
+    """
+
+    def __init__(
+        self,
+        model: str = "paraformer-realtime-v2",
+        on_sentence: Optional[Callable[[Dict[str, Any]], None]] = None,
+        time_map: Optional[Callable[[float], float]] = None,
+        max_session_seconds: float = 3600.0,
+        rotate_seconds: Optional[float] = None,
+        max_replay_seconds: float = 60.0,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0
+    ):
+        """
+        初始化会话管理
+
+        Args:
+            model: 实时识别模型
+            on_sentence: 输出句子的回调，参数包含 begin_time、end_time（毫秒）、text 和 session（会话编号）
+            time_map: 把输入音频中的时间换算为原始音频流中的时间（如 VADGate.to_stream_time）
+            max_session_seconds: 单个会话的最长音频时长（秒），到达前强制切换会话
+            rotate_seconds: 会话音频达到该时长后在下一个句子间隙切换会话，默认为最长时长前 60 秒
+            max_replay_seconds: 重发缓冲区最多保存的音频时长（秒），超出时丢弃最早的音频
+            backoff_initial: 首次重连前的等待时间（秒）
+            backoff_max: 重连等待时间上限（秒）
+        """
+        self.model = model
+        self.on_sentence = on_sentence or self._print_sentence
+        self.time_map = time_map
+        self.max_session_ms = max_session_seconds * 1000
+        self.rotate_ms = (rotate_seconds if rotate_seconds is not None else max(max_session_seconds - 60, max_session_seconds / 2)) * 1000
+        self.max_replay_ms = max_replay_seconds * 1000
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        self._lock = threading.Lock()
+        self._session: Optional[_Session] = None
+        self._retiring: List[threading.Thread] = []
+        self._replay: deque = deque()  # (开始时间, 音频帧)
+        self._replay_ms = 0.0
+        self._input_ms = 0.0
+        self._confirmed_ms = 0.0
+        self._emitted_until = float("-inf")
+        self._pending: Dict[int, float] = {}  # 会话编号 -> 未结束句子的开始时间
+        self._backoff = backoff_initial
+        self._next_attempt = 0.0
+        self._next_rotation = 0.0
+        self._sessions = 0
+
+        # 统计
+        self.reconnects = 0
+        self.rotations = 0
+        self.replayed_ms = 0.0
+        self.dropped_ms = 0.0
+        self.duplicates = 0
+        self.sentences = 0
+
+    @staticmethod
+    def _print_sentence(sentence: Dict[str, Any]) -> None:
+        print(f"🎯 [{sentence['begin_time'] / 1000:.1f}s] {sentence['text']}")
+
+    def _connect(self) -> _Session:
+        """建立新会话并重发缓冲区中的音频"""
+        with self._lock:
+            frames = list(self._replay)
+        origin = frames[0][0] if frames else self._input_ms
+        self._sessions += 1
+        session = _Session(self, self._sessions, origin)
+        session.recognition = Recognition(model=self.model, format="pcm", sample_rate=SAMPLE_RATE, callback=session)
+        session.recognition.start()
+        for _, frame in frames:
+            session.recognition.send_audio_frame(frame)
+            session.sent_ms += len(frame) / _BYTES_PER_MS
+        return session
+
+    def _retire(self, session: _Session) -> None:
+        """在后台结束旧会话，等待其返回剩余的识别结果"""
+        session.retiring = True
+
+        def stop():
+            try:
+                session.recognition.stop()
+            except Exception as e:
+                logger.debug(f"结束会话 {session.number} 失败: {e}")
+            with self._lock:
+                self._pending.pop(session.number, None)
+
+        thread = threading.Thread(target=stop, name=f"asr-retire-{session.number}", daemon=True)
+        thread.start()
+        self._retiring = [t for t in self._retiring if t.is_alive()] + [thread]
+
+    def start(self) -> "SessionSupervisor":
+        """建立第一个会话（失败时在首次 send 时重试）"""
+        try:
+            self._session = self._connect()
+        except Exception as e:
+            self._on_session_failed(None, str(e))
+        return self
+
+    def send(self, frame: bytes) -> None:
+        """
+        发送一帧音频（发送线程调用）
+
+        Args:
+            frame: 16kHz 单声道 16 位 PCM
+        """
+        duration = len(frame) / _BYTES_PER_MS
+        with self._lock:
+            self._replay.append((self._input_ms, frame))
+            self._replay_ms += duration
+            self._input_ms += duration
+            while self._replay_ms > self.max_replay_ms and len(self._replay) > 1:
+                _, dropped = self._replay.popleft()
+                self._replay_ms -= len(dropped) / _BYTES_PER_MS
+                self.dropped_ms += len(dropped) / _BYTES_PER_MS
+
+        session = self._session
+        if session is None or session.failed:
+            self._reconnect(session)
+            return
+
+        # 会话时长接近上限时，在句子间隙（未确认的音频不超过 1 秒）或到达强制切换点时轮换；
+        # 新会话通过重发缓冲区收到本帧，切换失败时本帧仍发给当前会话
+        if (session.sent_ms >= self.rotate_ms
+                and (self._replay_ms <= 1000 or session.sent_ms >= self.max_session_ms - 5000)
+                and time.monotonic() >= self._next_rotation
+                and self._rotate(session)):
+            return
+
+        session.recognition.send_audio_frame(frame)
+        session.sent_ms += duration
+
+    def on_error(self, error: Exception) -> None:
+        """AudioStreamer 发送失败回调：标记当前会话失败，下一帧时重连"""
+        self._on_session_failed(self._session, str(error))
+
+    def _reconnect(self, failed: Optional[_Session]) -> None:
+        """按退避间隔重新建立会话"""
+        now = time.monotonic()
+        if now < self._next_attempt:
+            return
+        if failed is not None:
+            self._retire(failed)
+            self._session = None
+        try:
+            session = self._connect()
+        except Exception as e:
+            delay = self._backoff * (1 + random.random() * 0.2)
+            self._next_attempt = now + delay
+            self._backoff = min(self._backoff * 2, self.backoff_max)
+            logger.warning(f"建立识别会话失败: {e}，{delay:.1f} 秒后重试")
+            return
+        self._session = session
+        self._backoff = self.backoff_initial
+        self.reconnects += 1
+        self.replayed_ms += session.sent_ms
+        logger.info(f"识别会话 {session.number} 已重新建立，重发 {session.sent_ms / 1000:.1f} 秒音频")
+
+    def _rotate(self, current: _Session) -> bool:
+        """
+        建立新会话接替当前会话
+
+        新会话建立失败时继续使用当前会话，按退避间隔稍后再尝试切换；
+        当前会话到达服务端最长时长被关闭时按会话失败处理重连。
+
+        Returns:
+            bool: 是否已切换到新会话
+        """
+        try:
+            session = self._connect()
+        except Exception as e:
+            delay = self._backoff * (1 + random.random() * 0.2)
+            self._next_rotation = time.monotonic() + delay
+            self._backoff = min(self._backoff * 2, self.backoff_max)
+            logger.warning(f"切换识别会话失败: {e}，继续使用当前会话，{delay:.1f} 秒后重试")
+            return False
+        self._session = session
+        self._backoff = self.backoff_initial
+        self._retire(current)
+        self.rotations += 1
+        self.replayed_ms += session.sent_ms
+        return True
+
+    def _on_session_failed(self, session: Optional[_Session], message: str) -> None:
+        if session is not None:
+            if session.failed or session.retiring:
+                return
+            session.failed = True
+            with self._lock:
+                self._pending.pop(session.number, None)
+        logger.warning(f"识别会话{f' {session.number}' if session else ''}出错: {message}")
+
+    def _on_partial(self, session: _Session, sentence: Dict[str, Any]) -> None:
+        """记录会话中尚未结束的句子的开始时间"""
+        with self._lock:
+            if not session.failed:
+                self._pending[session.number] = session.origin + sentence.get("begin_time", 0)
+
+    def _on_sentence(self, session: _Session, sentence: Dict[str, Any]) -> None:
+        """处理句子结束的识别结果：确认音频、去除重叠会话的重复句子后输出"""
+        text = (sentence.get("text") or "").strip()
+        begin = session.origin + sentence.get("begin_time", 0)
+        end = session.origin + sentence.get("end_time", 0)
+        with self._lock:
+            self._pending.pop(session.number, None)
+            if end > self._confirmed_ms:
+                self._confirmed_ms = end
+                while self._replay:
+                    start, frame = self._replay[0]
+                    if start + len(frame) / _BYTES_PER_MS > end:
+                        break
+                    self._replay.popleft()
+                    self._replay_ms -= len(frame) / _BYTES_PER_MS
+            # 新旧会话会识别同一段音频，结束时间不晚于已输出内容的句子视为重复
+            if not text or end <= self._emitted_until + _DEDUP_TOLERANCE_MS:
+                self.duplicates += bool(text)
+                return
+            self._emitted_until = end
+            self.sentences += 1
+            if self.time_map:
+                begin, end = self.time_map(begin), self.time_map(end)
+            self.on_sentence({"begin_time": round(begin), "end_time": round(end), "text": text, "session": session.number})
+
+    @property
+    def has_pending(self) -> bool:
+        """是否有已开始但尚未结束的句子"""
+        return bool(self._pending)
+
+    def watermark(self, latency_ms: float) -> float:
+        """
+        之后输出的句子的开始时间下限
+
+        有尚未结束的句子时为其开始时间；否则为已发送音频的末尾减去识别延迟
+        （最近发送的音频可能还没有返回中间结果）；会话失败时为最后确认的时间，未确认的音频会重发。
+
+        Args:
+            latency_ms: 识别服务返回中间结果的延迟（毫秒）
+
+        Returns:
+            float: 时间下限（毫秒，经过 time_map 换算）
+        """
+        with self._lock:
+            session = self._session
+            if session is None or session.failed:
+                bound = self._confirmed_ms
+            else:
+                bound = max(self._confirmed_ms, self._input_ms - latency_ms)
+            if self._pending:
+                bound = min(bound, min(self._pending.values()))
+        return self.time_map(bound) if self.time_map else bound
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        结束当前会话并等待剩余识别结果
+
+        Args:
+            timeout: 等待每个会话结束的最长时间（秒）
+        """
+        if self._session is not None:
+            if self._session.failed:
+                self._reconnect(self._session)
+            if self._session is not None and not self._session.failed:
+                self._retire(self._session)
+            self._session = None
+        for thread in self._retiring:
+            thread.join(timeout)
+        self._retiring = []
+
+    def snapshot(self) -> Dict[str, Any]:
+        """统计数据"""
+        return {
+            "sessions": self._sessions,
+            "reconnects": self.reconnects,
+            "rotations": self.rotations,
+            "sentences": self.sentences,
+            "duplicates": self.duplicates,
+            "replayed_seconds": round(self.replayed_ms / 1000, 2),
+            "dropped_seconds": round(self.dropped_ms / 1000, 2),
+            "pending_seconds": round(self._replay_ms / 1000, 2),
+        }
+
+    def format_stats(self) -> str:
+        """单行统计摘要"""
+        stats = self.snapshot()
+        return (
+            f"会话 {stats['sessions']} 个（重连 {stats['reconnects']} 次，轮换 {stats['rotations']} 次），"
+            f"输出 {stats['sentences']} 句，去重 {stats['duplicates']} 句，"
+            f"重发 {stats['replayed_seconds']}秒，丢弃 {stats['dropped_seconds']}秒音频"
+        )
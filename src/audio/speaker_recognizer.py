@@ -3,6 +3,13 @@ import dashscope
 from dashscope.audio.asr import RecognitionCallback, Recognition, RecognitionResult
 import os
 import sys
+import threading
+import time
+
+from .resample import resampler_for
+from .session import SessionSupervisor
+from .streaming import AudioStreamer, native_input_format
+from .vad import VADGate
 
 class SpeakerRecognizer(RecognitionCallback):
     """扬声器输出实时语音识别器"""
@@ -13,6 +20,10 @@ class SpeakerRecognizer(RecognitionCallback):
         self.audio = None
         self.stream = None
         self.recognizer = None
+        self.streamer = None
+        self.supervisor = None
+        self.error = None
+        self._failed = threading.Event()
         
         if not self.api_key:
             raise ValueError("请设置DASHSCOPE_API_KEY环境变量或传入api_key参数")
@@ -72,8 +83,10 @@ class SpeakerRecognizer(RecognitionCallback):
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
+            self.stream = None
         if self.audio:
             self.audio.terminate()
+            self.audio = None
         print("\n🔇 扬声器监听已关闭")
     
     def on_event(self, result: RecognitionResult) -> None:
@@ -111,6 +124,22 @@ class SpeakerRecognizer(RecognitionCallback):
             # 静默处理错误，不影响用户体验
             pass
     
+    def on_error(self, result: RecognitionResult) -> None:
+        """识别服务出错的回调（连接断开、鉴权失败等）"""
+        self._fail(getattr(result, "message", None) or str(result))
+    
+    def _on_send_error(self, error: Exception) -> None:
+        """发送线程发送音频失败的回调"""
+        self._fail(f"发送音频失败: {error}")
+    
+    def _fail(self, message: str) -> None:
+        """记录第一个错误并通知监听循环结束，停止采集和关闭会话由 start_listening 所在线程完成"""
+        if self._failed.is_set():
+            return
+        self.error = message
+        self._failed.set()
+        print(f"\n❌ 识别服务错误: {message}")
+    
     def list_all_devices(self):
         """列出所有音频设备"""
         p = pyaudio.PyAudio()
@@ -150,8 +179,15 @@ Linux:
 2. 运行 pavucontrol → 录制 → 选择"Monitor of [你的输出设备]"
 """)
     
-    def start_listening(self, device_index=None):
-        """开始实时监听扬声器输出"""
+    def start_listening(self, device_index=None, vad=False, supervise=False):
+        """
+        开始实时监听扬声器输出
+        
+        Args:
+            device_index: 回环设备索引，None 表示自动查找
+            vad: 只发送检测到语音的片段
+            supervise: 会话断开时自动重连并重发未确认的音频，长时间运行时定期轮换会话
+        """
         try:
             # 查找设备
             if device_index is None:
@@ -164,16 +200,6 @@ Linux:
             
             print(f"🎯 使用设备索引: {device_index}")
             
-            # 初始化识别器
-            self.recognizer = Recognition(
-                model=self.model,
-                format="pcm",
-                sample_rate=16000,
-                callback=self
-            )
-            
-            self.recognizer.start()
-            
             # 打开音频流
             self.audio = pyaudio.PyAudio()
             
@@ -186,24 +212,50 @@ Linux:
                 self.list_all_devices()
                 return
             
+            # 回环设备通常只支持 44.1/48kHz 立体声，按原生格式打开，
+            # 由发送线程混音、重采样为 16kHz 单声道后发送给识别服务
+            rate, channels = native_input_format(self.audio, device_index)
+            self.error = None
+            self._failed.clear()
+            gate = VADGate() if vad else None
+            if supervise:
+                self.supervisor = SessionSupervisor(
+                    self.model,
+                    time_map=gate.to_stream_time if gate else None
+                ).start()
+                send, on_error = self.supervisor.send, self.supervisor.on_error
+            else:
+                self.recognizer = Recognition(
+                    model=self.model,
+                    format="pcm",
+                    sample_rate=16000,
+                    callback=self
+                )
+                self.recognizer.start()
+                send, on_error = self.recognizer.send_audio_frame, self._on_send_error
+            self.streamer = AudioStreamer(
+                send,
+                on_error=on_error,
+                gate=gate,
+                resampler=resampler_for(rate, channels)
+            ).start()
             self.stream = self.audio.open(
                 format=pyaudio.paInt16,
-                channels=1,
-                rate=16000,
+                channels=channels,
+                rate=rate,
                 input=True,
                 input_device_index=device_index,
-                frames_per_buffer=3200,
-                stream_callback=None
+                frames_per_buffer=rate // 10,
+                stream_callback=self.streamer.capture_callback
             )
+            print(f"🎚️  采集格式: {rate}Hz × {channels} 声道")
             
             print("🔊 开始实时识别扬声器输出的声音...")
             print("💡 请确保有音频正在播放")
             
             try:
-                while True:
-                    if self.stream and self.recognizer:
-                        data = self.stream.read(3200, exception_on_overflow=False)
-                        self.recognizer.send_audio_frame(data)
+                while self.stream and self.stream.is_active() and not self._failed.is_set():
+                    time.sleep(0.1)
             except KeyboardInterrupt:
                 print("\n⏹️  用户中断识别")
             except Exception as e:
@@ -217,11 +269,25 @@ Linux:
     
     def stop(self):
         """停止识别"""
+        # 先停止采集，再发送完缓冲区中剩余的音频
+        if self.stream and self.stream.is_active():
+            self.stream.stop_stream()
+        if self.streamer:
+            # 会话已出错时丢弃缓冲区中剩余的音频
+            self.streamer.stop(drain=not self._failed.is_set())
+            print(f"📊 {self.streamer.format_stats()}")
+            self.streamer = None
+        if self.supervisor:
+            self.supervisor.stop()
+            print(f"📊 {self.supervisor.format_stats()}")
+            self.supervisor = None
         if self.recognizer:
+            # 无论会话是否出错都结束会话，释放 websocket 连接；正常结束时会等待剩余识别结果
             try:
-                self.recognizer.close()
-            except:
+                self.recognizer.stop()
+            except Exception:
                 pass
+            self.recognizer = None
         self.on_close()
     
     def test_audio_setup(self):
@@ -236,18 +302,19 @@ Linux:
             # 测试音频流
             try:
                 self.audio = pyaudio.PyAudio()
+                rate, channels = native_input_format(self.audio, device_index)
                 self.stream = self.audio.open(
                     format=pyaudio.paInt16,
-                    channels=1,
-                    rate=16000,
+                    channels=channels,
+                    rate=rate,
                     input=True,
                     input_device_index=device_index,
-                    frames_per_buffer=3200
+                    frames_per_buffer=rate // 10
                 )
                 
-                print("🔊 正在测试音频流...")
+                print(f"🔊 正在测试音频流（{rate}Hz × {channels} 声道）...")
                 for i in range(50):  # 录制5秒测试
-                    data = self.stream.read(3200, exception_on_overflow=False)
+                    data = self.stream.read(rate // 10, exception_on_overflow=False)
                     if i % 10 == 0:
                         print(f"📊 收到音频数据: {len(data)} 字节")
                 
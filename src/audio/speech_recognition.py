@@ -6,7 +6,7 @@
 import os
 import pyaudio
 from dashscope.audio.asr import RecognitionCallback, Recognition, RecognitionResult
-from typing import Optional
+from typing import List, Optional
 
 class SpeechRecognizer(RecognitionCallback):
     """统一语音识别接口"""
@@ -43,6 +43,11 @@ class SpeechRecognizer(RecognitionCallback):
     def start_speaker_recognition(self, device_index: Optional[int] = None):
         """开始扬声器语音识别"""
         return SpeakerRecognition(self.model, device_index)
+    
+    def start_multi_source_recognition(self, sources: List[str], vad: bool = False):
+        """同时识别多个音源（mic/loopback/file，见 parse_source），调用 run() 开始"""
+        from .multi_source import MultiSourceRecognizer, parse_source
+        return MultiSourceRecognizer([parse_source(spec) for spec in sources], self.api_key, self.model, vad=vad)
 
 class MicrophoneRecognition:
     """麦克风识别会话"""
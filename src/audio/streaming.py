@@ -0,0 +1,311 @@
+"""
+音频采集与发送解耦
+采集线程（PyAudio 回调）只把音频帧写入有界环形缓冲区，
+独立的发送线程从缓冲区取出音频帧发送给识别服务，网络阻塞不会导致采集溢出
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .resample import StreamResampler
+from .vad import VADGate
+
+# 默认缓冲 30 秒音频（100ms 一帧）
+DEFAULT_CAPACITY = 300
+
+# 发送耗时统计保留的最近样本数
+_LATENCY_WINDOW = 512
+
+
+def native_input_format(audio, device_index: Optional[int] = None) -> Tuple[int, int]:
+    """
+    查询输入设备的原生采样率和声道数
+
+    Args:
+        audio: pyaudio.PyAudio 实例
+        device_index: 设备索引，None 表示默认输入设备
+
+    Returns:
+        Tuple[int, int]: (采样率, 声道数)，声道数最多为 2
+    """
+    if device_index is None:
+        info = audio.get_default_input_device_info()
+    else:
+        info = audio.get_device_info_by_index(device_index)
+    return int(info["defaultSampleRate"]), max(1, min(2, int(info["maxInputChannels"])))
+
+
+class FrameRingBuffer:
+    """
+    单生产者单消费者的有界音频帧环形缓冲区
+
+    写入方只修改写入计数、读取方只修改读取计数，两端都不需要加锁；
+    缓冲区写满时丢弃新到的帧并计入溢出次数，已缓冲的音频不会被覆盖。
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        初始化缓冲区
+
+        Args:
+            capacity: 最多缓冲的帧数
+        """
+        if capacity < 1:
+            raise ValueError("缓冲区容量至少为1帧")
+        self.capacity = capacity
+        self._slots: list = [None] * capacity
+        self._written = 0
+        self._read = 0
+        self._ready = threading.Event()
+        self.overflows = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        """当前缓冲的帧数"""
+        return self._written - self._read
+
+    def put(self, frame: bytes, timestamp: Optional[float] = None) -> bool:
+        """
+        写入一帧（采集线程调用）
+
+        Args:
+            frame: 音频数据
+            timestamp: 采集时间（time.monotonic），默认为当前时间
+
+        Returns:
+            bool: 是否写入成功，缓冲区已满时返回 False
+        """
+        depth = self._written - self._read
+        if depth >= self.capacity:
+            self.overflows += 1
+            return False
+        self._slots[self._written % self.capacity] = (frame, timestamp if timestamp is not None else time.monotonic())
+        self._written += 1
+        if depth + 1 > self.max_depth:
+            self.max_depth = depth + 1
+        self._ready.set()
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[bytes, float]]:
+        """
+        读取一帧（发送线程调用）
+
+        Args:
+            timeout: 缓冲区为空时的最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            Optional[Tuple[bytes, float]]: (音频数据, 采集时间)，超时返回 None
+        """
+        if self._read == self._written:
+            self._ready.clear()
+            # 清除标志后再检查一次，避免错过清除前刚写入的帧
+            if self._read == self._written and not self._ready.wait(timeout):
+                return None
+            if self._read == self._written:
+                return None
+        index = self._read % self.capacity
+        item = self._slots[index]
+        self._slots[index] = None
+        self._read += 1
+        return item
+
+    def wake(self) -> None:
+        """唤醒等待中的读取方（停止时使用）"""
+        self._ready.set()
+
+
+class StreamStats:
+    """音频流统计"""
+
+    def __init__(self):
+        self.frames_captured = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.device_overflows = 0
+        self.send_errors = 0
+        self._send_latency: deque = deque(maxlen=_LATENCY_WINDOW)
+        self._queue_latency: deque = deque(maxlen=_LATENCY_WINDOW)
+        self.max_send_latency = 0.0
+        self.max_queue_latency = 0.0
+
+    def record_send(self, send_latency: float, queue_latency: float, size: int) -> None:
+        """记录一次发送"""
+        self.frames_sent += 1
+        self.bytes_sent += size
+        self._send_latency.append(send_latency)
+        self._queue_latency.append(queue_latency)
+        self.max_send_latency = max(self.max_send_latency, send_latency)
+        self.max_queue_latency = max(self.max_queue_latency, queue_latency)
+
+    @staticmethod
+    def _percentile(values: deque, ratio: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+    def snapshot(self, buffer: Optional[FrameRingBuffer] = None) -> Dict[str, Any]:
+        """
+        当前统计
+
+        Args:
+            buffer: 同时输出该缓冲区的深度和溢出次数
+
+        Returns:
+            Dict[str, Any]: 统计数据，耗时单位为毫秒
+        """
+        stats = {
+            "frames_captured": self.frames_captured,
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "device_overflows": self.device_overflows,
+            "send_errors": self.send_errors,
+            "send_latency_ms": {
+                "mean": round(sum(self._send_latency) / len(self._send_latency) * 1000, 2) if self._send_latency else 0.0,
+                "p95": round(self._percentile(self._send_latency, 0.95) * 1000, 2),
+                "max": round(self.max_send_latency * 1000, 2),
+            },
+            "queue_latency_ms": {
+                "p95": round(self._percentile(self._queue_latency, 0.95) * 1000, 2),
+                "max": round(self.max_queue_latency * 1000, 2),
+            },
+        }
+        if buffer is not None:
+            stats.update(buffer_depth=buffer.depth, buffer_max_depth=buffer.max_depth, buffer_overflows=buffer.overflows)
+        return stats
+
+
+class AudioStreamer:
+    """
+    采集与发送解耦的音频流
+
+    采集端调用 push（或把 capture_callback 作为 PyAudio 的 stream_callback），
+    发送线程从环形缓冲区取出音频帧后调用 send 发送。
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], None],
+        capacity: int = DEFAULT_CAPACITY,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        gate: Optional[VADGate] = None,
+        resampler: Optional[StreamResampler] = None
+    ):
+        """
+        初始化音频流
+
+        Args:
+            send: 发送一帧音频的函数（如 Recognition.send_audio_frame）
+            capacity: 环形缓冲区容量（帧）
+            on_error: 发送失败时的回调，默认只计数
+            gate: 语音活动检测门控，在发送线程中过滤静音，None 表示发送全部音频
+            resampler: 把设备原生格式转换为 16kHz 单声道，在发送线程中处理，None 表示采集的已是目标格式
+        """
+        self.send = send
+        self.on_error = on_error
+        self.gate = gate
+        self.resampler = resampler
+        self.buffer = FrameRingBuffer(capacity)
+        self.stats = StreamStats()
+        self._running = False
+        self._drain = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """发送线程是否在运行"""
+        return self._running
+
+    def start(self) -> "AudioStreamer":
+        """启动发送线程"""
+        if self._running:
+            return self
+        self._running = True
+        self._drain = True
+        self._thread = threading.Thread(target=self._send_loop, name="audio-sender", daemon=True)
+        self._thread.start()
+        return self
+
+    def push(self, frame: bytes, timestamp: Optional[float] = None) -> bool:
+        """
+        写入采集到的音频帧（不阻塞）
+
+        Args:
+            frame: 音频数据
+            timestamp: 采集时间（time.monotonic）
+
+        Returns:
+            bool: 是否写入成功，缓冲区已满时返回 False
+        """
+        self.stats.frames_captured += 1
+        return self.buffer.put(frame, timestamp)
+
+    def capture_callback(self, in_data, frame_count, time_info, status_flags):
+        """PyAudio stream_callback：写入缓冲区后立即返回，并记录设备层面的输入溢出"""
+        import pyaudio
+
+        if status_flags & pyaudio.paInputOverflow:
+            self.stats.device_overflows += 1
+        self.push(in_data)
+        return None, pyaudio.paContinue
+
+    def _send_loop(self) -> None:
+        while self._running or (self._drain and self.buffer.depth):
+            item = self.buffer.get(timeout=0.2)
+            if item is None or not (self._running or self._drain):
+                continue
+            frame, captured = item
+            if self.resampler:
+                frame = self.resampler.process(frame)
+            for data in (self.gate.process(frame) if self.gate else (frame,)):
+                start = time.monotonic()
+                try:
+                    self.send(data)
+                except Exception as e:
+                    self.stats.send_errors += 1
+                    if self.on_error:
+                        self.on_error(e)
+                    continue
+                end = time.monotonic()
+                self.stats.record_send(end - start, end - captured, len(data))
+
+    def stop(self, drain: bool = True, timeout: float = 5.0) -> None:
+        """
+        停止发送线程
+
+        Args:
+            drain: 是否先发送完缓冲区中剩余的音频
+            timeout: 等待发送线程结束的最长时间（秒）
+        """
+        # 缓冲区只由发送线程读取，不发送剩余音频时由发送线程丢弃
+        self._drain = drain
+        self._running = False
+        self.buffer.wake()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """统计数据，见 StreamStats.snapshot；启用 VAD 和重采样时包含对应统计"""
+        stats = self.stats.snapshot(self.buffer)
+        if self.resampler:
+            stats["resample"] = self.resampler.snapshot()
+        if self.gate:
+            stats["vad"] = self.gate.snapshot()
+        return stats
+
+    def format_stats(self) -> str:
+        """单行统计摘要"""
+        stats = self.snapshot()
+        return (
+            f"已发送 {stats['frames_sent']}/{stats['frames_captured']} 帧，"
+            f"缓冲溢出 {stats['buffer_overflows']} 次，设备溢出 {stats['device_overflows']} 次，"
+            f"最大缓冲 {stats['buffer_max_depth']} 帧，"
+            f"发送耗时 p95 {stats['send_latency_ms']['p95']}ms / 最大 {stats['send_latency_ms']['max']}ms"
+        ) + (
+            f"，重采样 {self.resampler.describe()} 耗时 {stats['resample']['cost_ms_per_second']:.2f}ms/秒音频"
+            if self.resampler else ""
+        ) + (f"，VAD 过滤 {stats['vad']['suppression_ratio']:.1%} 的音频" if self.gate else "")
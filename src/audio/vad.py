@@ -0,0 +1,200 @@
+"""
+语音活动检测（VAD）门控
+按短时能量和过零率逐帧判断是否有语音，只把语音片段（含前置缓冲和拖尾）发送给识别服务，
+长时间静音时不再发送音频，减少带宽和计费时长
+"""
+
+import bisect
+from collections import deque
+from typing import Any, Dict, List
+
+import numpy as np
+
+# int16 满幅能量，用于换算 dBFS
+_FULL_SCALE = 32768.0 ** 2
+
+
+class VADGate:
+    """
+    基于能量和过零率的语音门控
+
+    每帧切分为若干分析窗口，一次性计算所有窗口的能量（dBFS）和过零率：
+    能量高于噪声基底 + margin_db 的窗口判为浊音，能量略低但仍明显高于噪声基底且过零率高的窗口判为清音（如擦音）。
+    噪声基底按最小值统计估计：取最近 floor_window_ms 内所有窗口能量的低分位数，与是否判为语音无关，
+    因此能跟随持续的背景噪声上升或下降。
+    语音开始时先发送前置缓冲中的音频，语音结束后继续发送 hangover_ms 的拖尾，避免截断字头字尾。
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        window_ms: int = 20,
+        margin_db: float = 12.0,
+        min_level_db: float = -55.0,
+        fricative_zcr: float = 0.3,
+        hangover_ms: int = 600,
+        pre_roll_ms: int = 300,
+        keepalive_ms: int = 15000,
+        floor_window_ms: int = 5000,
+        floor_percentile: float = 5.0
+    ):
+        """
+        初始化门控
+
+        Args:
+            sample_rate: 采样率（16 位单声道 PCM）
+            window_ms: 分析窗口长度（毫秒）
+            margin_db: 判为语音所需高出噪声基底的分贝数
+            min_level_db: 判为语音的最低电平（dBFS），避免安静环境下把底噪判为语音
+            fricative_zcr: 判为清音的过零率下限
+            hangover_ms: 语音结束后继续发送的时长（毫秒）
+            pre_roll_ms: 语音开始前补发的音频时长（毫秒）
+            keepalive_ms: 持续静音时每隔多久发送一帧静音，保持识别会话不因超时断开；0 表示不发送
+            floor_window_ms: 估计噪声基底的时间范围（毫秒），应长于连续不间断发音的时长
+            floor_percentile: 估计噪声基底使用的窗口能量分位数
+        """
+        self.sample_rate = sample_rate
+        self.window = max(1, sample_rate * window_ms // 1000)
+        self.margin_db = margin_db
+        self.min_level_db = min_level_db
+        self.fricative_zcr = fricative_zcr
+        self.hangover_ms = hangover_ms
+        self.pre_roll_ms = pre_roll_ms
+        self.keepalive_ms = keepalive_ms
+        self.floor_percentile = floor_percentile
+
+        self.noise_db = min_level_db - margin_db
+        self._energy_history: deque = deque(maxlen=max(1, floor_window_ms // window_ms))
+        self.active = False
+        self._hangover_left = 0.0
+        self._pre_roll: deque = deque()
+        self._pre_roll_duration = 0.0
+        self._silence_since_send = 0.0
+
+        # 时间轴：stream 为原始音频流的时间，sent 为实际发送的音频的时间（毫秒）
+        self.stream_ms = 0.0
+        self.sent_ms = 0.0
+        self.speech_ms = 0.0
+        self._segment_sent: List[float] = []
+        self._segment_stream: List[float] = []
+
+    def _duration_ms(self, frame: bytes) -> float:
+        return len(frame) / 2 / self.sample_rate * 1000
+
+    def is_speech(self, frame: bytes) -> bool:
+        """
+        判断一帧是否包含语音，并更新噪声基底
+
+        Args:
+            frame: 16 位单声道 PCM
+
+        Returns:
+            bool: 是否包含语音
+        """
+        samples = np.frombuffer(frame, dtype=np.int16)
+        count = len(samples) // self.window
+        if count == 0:
+            return False
+        windows = samples[:count * self.window].reshape(count, self.window).astype(np.float32)
+        energy_db = 10 * np.log10(np.mean(windows * windows, axis=1) / _FULL_SCALE + 1e-10)
+        signs = np.signbit(windows)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.window - 1)
+
+        # 噪声基底：最近一段时间窗口能量的低分位数（最小值统计），不依赖语音判断结果
+        self._energy_history.extend(energy_db.tolist())
+        self.noise_db = float(np.percentile(np.fromiter(self._energy_history, dtype=np.float32), self.floor_percentile))
+
+        threshold = max(self.noise_db + self.margin_db, self.min_level_db)
+        voiced = energy_db > threshold
+        # 清音能量低于浊音，但同样需要明显高于噪声基底，避免高过零率的白噪声被判为语音
+        unvoiced = (
+            (zcr > self.fricative_zcr)
+            & (energy_db > self.noise_db + self.margin_db / 2)
+            & (energy_db > self.min_level_db - 6)
+        )
+        speech = np.count_nonzero(voiced | unvoiced) >= max(1, count // 5)
+        return bool(speech)
+
+    def _forward(self, frames: List[bytes], stream_start: float) -> List[bytes]:
+        """记录发送片段在原始音频流中的位置"""
+        contiguous = self._segment_sent and \
+            abs(self._segment_stream[-1] + self.sent_ms - self._segment_sent[-1] - stream_start) < 0.5
+        if not contiguous:
+            self._segment_sent.append(self.sent_ms)
+            self._segment_stream.append(stream_start)
+        self.sent_ms += sum(self._duration_ms(frame) for frame in frames)
+        self._silence_since_send = 0.0
+        return frames
+
+    def process(self, frame: bytes) -> List[bytes]:
+        """
+        处理一帧音频
+
+        Args:
+            frame: 16 位单声道 PCM
+
+        Returns:
+            List[bytes]: 需要发送的音频帧（静音时为空）
+        """
+        duration = self._duration_ms(frame)
+        frame_start = self.stream_ms
+        self.stream_ms += duration
+
+        if self.is_speech(frame):
+            self.speech_ms += duration
+            self._hangover_left = self.hangover_ms
+            if not self.active:
+                self.active = True
+                frames = list(self._pre_roll) + [frame]
+                start = frame_start - self._pre_roll_duration
+                self._pre_roll.clear()
+                self._pre_roll_duration = 0.0
+                return self._forward(frames, start)
+            return self._forward([frame], frame_start)
+
+        if self.active and self._hangover_left > 0:
+            self._hangover_left -= duration
+            if self._hangover_left <= 0:
+                self.active = False
+            return self._forward([frame], frame_start)
+
+        self.active = False
+        self._pre_roll.append(frame)
+        self._pre_roll_duration += duration
+        while self._pre_roll and self._pre_roll_duration - self._duration_ms(self._pre_roll[0]) >= self.pre_roll_ms:
+            self._pre_roll_duration -= self._duration_ms(self._pre_roll.popleft())
+
+        self._silence_since_send += duration
+        if self.keepalive_ms and self._silence_since_send >= self.keepalive_ms:
+            return self._forward([bytes(len(frame))], frame_start)
+        return []
+
+    def to_stream_time(self, sent_ms: float) -> float:
+        """
+        把识别结果中的时间（相对已发送的音频）换算为原始音频流中的时间
+
+        Args:
+            sent_ms: 识别结果中的时间（毫秒）
+
+        Returns:
+            float: 原始音频流中的时间（毫秒）
+        """
+        index = bisect.bisect_right(self._segment_sent, sent_ms) - 1
+        if index < 0:
+            return sent_ms
+        return self._segment_stream[index] + sent_ms - self._segment_sent[index]
+
+    @property
+    def suppression_ratio(self) -> float:
+        """未发送的音频占比"""
+        return 1 - self.sent_ms / self.stream_ms if self.stream_ms else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """统计数据"""
+        return {
+            "stream_seconds": round(self.stream_ms / 1000, 2),
+            "sent_seconds": round(self.sent_ms / 1000, 2),
+            "speech_seconds": round(self.speech_ms / 1000, 2),
+            "suppression_ratio": round(self.suppression_ratio, 4),
+            "noise_floor_db": round(self.noise_db, 1),
+        }
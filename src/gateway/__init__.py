@@ -0,0 +1,24 @@
+"""
+网关服务模块
+以 HTTP 任务接口对外提供文生图、图像编辑、风格重绘、涂鸦作画和视频生成功能
+"""
+
+from .._lazy import lazy_exports
+
+# 导出名称 -> 所在子模块，首次访问时才导入（PEP 562）
+# aiohttp 仅在创建网关应用时加载
+_LAZY_EXPORTS = {
+    "JobManager": ".jobs",
+    "Job": ".jobs",
+    "JobState": ".jobs",
+    "QueueFullError": ".jobs",
+    "JobNotFoundError": ".jobs",
+    "JobAdapter": ".adapters",
+    "create_adapters": ".adapters",
+    "create_app": ".server",
+    "run_gateway": ".server",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_EXPORTS)
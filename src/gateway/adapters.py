@@ -0,0 +1,264 @@
+"""
+网关任务适配器
+将各生成器统一为"校验 -> 创建任务 -> 查询状态"三步，供网关的统一轮询器驱动
+"""
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class TaskPoll(BaseModel):
+    """单次状态查询结果"""
+    status: str = Field(..., description="DashScope任务状态：PENDING/RUNNING/SUCCEEDED/FAILED/CANCELED/UNKNOWN")
+    urls: List[str] = Field(default_factory=list, description="结果URL列表（成功时）")
+    error: Optional[str] = Field(None, description="错误信息（失败时）")
+
+
+class TaskSubmission(BaseModel):
+    """任务创建结果"""
+    task_id: Optional[str] = Field(None, description="DashScope任务ID，同步接口为None")
+    result: Optional[TaskPoll] = Field(None, description="同步接口直接返回的结果")
+
+
+class JobAdapter:
+    """任务适配器基类"""
+
+    #: 任务类型名称，对应网关路由 /v1/jobs/{kind}
+    kind: str = ""
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._generator = None
+
+    @property
+    def generator(self):
+        """按需创建并复用生成器实例"""
+        if self._generator is None:
+            self._generator = self.create_generator()
+        return self._generator
+
+    def create_generator(self):
+        raise NotImplementedError
+
+    def validate(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        校验请求参数（在入队前同步执行）
+
+        Args:
+            params: 请求参数
+
+        Returns:
+            Dict[str, Any]: 规范化后的参数
+
+        Raises:
+            ValueError: 参数错误
+        """
+        return dict(params)
+
+    def submit(self, params: Dict[str, Any]) -> TaskSubmission:
+        """创建任务（阻塞调用，在线程池中执行）"""
+        raise NotImplementedError
+
+    def poll(self, task_id: str) -> TaskPoll:
+        """查询任务状态（阻塞调用，在线程池中执行）"""
+        raise NotImplementedError
+
+
+def _check(validation: Dict[str, Any]) -> None:
+    """将模型的validate_*结果转换为ValueError"""
+    if not validation["valid"]:
+        raise ValueError("; ".join(validation["errors"]))
+
+
+def _status_value(status) -> str:
+    return status.value if hasattr(status, "value") else str(status)
+
+
+class Text2ImageAdapter(JobAdapter):
+    """文生图"""
+
+    kind = "text2image"
+
+    def create_generator(self):
+        from ..image.text2image import Text2ImageGenerator
+        return Text2ImageGenerator(api_key=self.api_key)
+
+    def validate(self, params):
+        from ..image.models import ImageGenerationRequest
+        request = ImageGenerationRequest(**params)
+        _check(request.validate_for_model())
+        return request.model_dump()
+
+    def submit(self, params):
+        from ..image.models import ImageGenerationRequest
+        task = self.generator.create_task(ImageGenerationRequest(**params))
+        return TaskSubmission(task_id=task.task_id)
+
+    def poll(self, task_id):
+        result = self.generator.get_task_result(task_id)
+        return TaskPoll(
+            status=_status_value(result.task_status),
+            urls=[r.url for r in result.results or [] if r.url]
+        )
+
+
+class ImageEditAdapter(JobAdapter):
+    """图像编辑（千问同步接口 / 万相异步接口）"""
+
+    kind = "image-edit"
+
+    _WANX_OPTIONS = (
+        "strength", "top_scale", "bottom_scale", "left_scale", "right_scale",
+        "upscale_factor", "is_sketch"
+    )
+
+    def create_generator(self):
+        from ..image.image_edit import ImageEditor
+        return ImageEditor(api_key=self.api_key)
+
+    def validate(self, params):
+        from ..image.models import ImageEditRequest
+        params = dict(params)
+        params.setdefault("model", "qwen-image-edit")
+        known = {k: v for k, v in params.items() if k in ImageEditRequest.model_fields}
+        _check(ImageEditRequest(**known).validate_for_model())
+        return params
+
+    def submit(self, params):
+        from ..image.models import ModelType
+        editor = self.generator
+        if params["model"] == ModelType.QWEN_EDIT:
+            response = editor.edit_image_qwen(
+                image_url=params["image_url"],
+                prompt=params["prompt"],
+                negative_prompt=params.get("negative_prompt"),
+                watermark=params.get("watermark", False)
+            )
+            return TaskSubmission(result=TaskPoll(status="SUCCEEDED", urls=[response.url]))
+
+        if params["model"] != ModelType.WANX_EDIT:
+            raise ValueError(f"不支持的编辑模型: {params['model']}")
+
+        options = {k: params[k] for k in self._WANX_OPTIONS if params.get(k) is not None}
+        task = editor.create_edit_task_wanx(
+            function=params["function"],
+            prompt=params["prompt"],
+            base_image_url=params["image_url"],
+            mask_image_url=params.get("mask_image_url"),
+            n=params.get("n", 1),
+            seed=params.get("seed"),
+            watermark=params.get("watermark", False),
+            **options
+        )
+        return TaskSubmission(task_id=task.task_id)
+
+    def poll(self, task_id):
+        result = self.generator.get_task_result(task_id)
+        return TaskPoll(
+            status=_status_value(result.task_status),
+            urls=[r.url for r in result.results or [] if r.url]
+        )
+
+
+class StyleRepaintAdapter(JobAdapter):
+    """人像风格重绘"""
+
+    kind = "style-repaint"
+
+    def create_generator(self):
+        from ..image.style_repaint import StyleRepaintGenerator
+        return StyleRepaintGenerator(api_key=self.api_key)
+
+    def validate(self, params):
+        from ..image.models import StyleRepaintRequest
+        params = dict(params)
+        if params.get("style_ref_url") and params.get("style_index") is None:
+            params["style_index"] = -1
+        request = StyleRepaintRequest(**params)
+        _check(request.validate_style_params())
+        return request.model_dump()
+
+    def submit(self, params):
+        from ..image.models import StyleRepaintRequest
+        task = self.generator._create_task(StyleRepaintRequest(**params))
+        return TaskSubmission(task_id=task.task_id)
+
+    def poll(self, task_id):
+        result = self.generator.get_task_result(task_id)
+        return TaskPoll(
+            status=_status_value(result.task_status),
+            urls=[r.url for r in result.results or [] if r.url]
+        )
+
+
+class SketchAdapter(JobAdapter):
+    """涂鸦作画"""
+
+    kind = "sketch"
+
+    def create_generator(self):
+        from ..image.sketch_to_image import SketchToImageGenerator
+        return SketchToImageGenerator(api_key=self.api_key)
+
+    def validate(self, params):
+        from ..image.sketch_to_image import SketchToImageRequest
+        request = SketchToImageRequest(**params)
+        if not request.sketch_image_url and not request.sketch_image_base64:
+            raise ValueError("涂鸦作画需要提供sketch_image_url或sketch_image_base64")
+        return request.model_dump()
+
+    def submit(self, params):
+        from ..image.sketch_to_image import SketchToImageRequest
+        task = self.generator._create_task(SketchToImageRequest(**params))
+        if task.task_status == "FAILED":
+            raise RuntimeError(task.error_message or "创建涂鸦作画任务失败")
+        return TaskSubmission(task_id=task.task_id)
+
+    def poll(self, task_id):
+        result = self.generator.get_task_result(task_id)
+        return TaskPoll(
+            status=result.task_status,
+            urls=list(result.image_urls),
+            error=result.error_message if result.task_status == "FAILED" else None
+        )
+
+
+class VideoAdapter(JobAdapter):
+    """视频生成"""
+
+    kind = "video"
+
+    def create_generator(self):
+        from ..video.text2video import VideoGenerator
+        return VideoGenerator(api_key=self.api_key)
+
+    def validate(self, params):
+        from ..video.models import VideoGenerationRequest
+        request = VideoGenerationRequest(**params)
+        _check(request.validate_for_model())
+        return request.model_dump()
+
+    def submit(self, params):
+        from ..video.models import VideoGenerationRequest
+        task = self.generator.create_task(VideoGenerationRequest(**params))
+        return TaskSubmission(task_id=task.task_id)
+
+    def poll(self, task_id):
+        result = self.generator.get_task_result(task_id)
+        return TaskPoll(
+            status=_status_value(result.task_status),
+            urls=[result.video_url] if result.video_url else [],
+            error=result.error_message
+        )
+
+
+ADAPTERS = {
+    adapter.kind: adapter
+    for adapter in (Text2ImageAdapter, ImageEditAdapter, StyleRepaintAdapter, SketchAdapter, VideoAdapter)
+}
+
+
+def create_adapters(api_key: str) -> Dict[str, JobAdapter]:
+    """为每种任务类型创建适配器实例"""
+    return {kind: adapter_cls(api_key) for kind, adapter_cls in ADAPTERS.items()}
@@ -0,0 +1,339 @@
+"""
+网关任务调度
+有界排队、按租户限制并发，并由单个轮询协程统一查询所有进行中任务的状态
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Deque, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .adapters import JobAdapter, TaskPoll
+
+
+class JobState(str, Enum):
+    """网关任务状态"""
+    QUEUED = "QUEUED"  # 排队等待提交
+    SUBMITTING = "SUBMITTING"  # 正在创建DashScope任务
+    RUNNING = "RUNNING"  # DashScope任务进行中
+    SUCCEEDED = "SUCCEEDED"  # 执行成功
+    FAILED = "FAILED"  # 执行失败
+    CANCELED = "CANCELED"  # 已取消
+
+
+FINAL_STATES = {JobState.SUCCEEDED, JobState.FAILED, JobState.CANCELED}
+
+
+class QueueFullError(Exception):
+    """排队任务数已达上限"""
+
+
+class JobNotFoundError(KeyError):
+    """任务不存在"""
+
+
+class Job(BaseModel):
+    """网关任务记录"""
+    job_id: str = Field(..., description="网关任务ID")
+    kind: str = Field(..., description="任务类型")
+    tenant: str = Field(..., description="租户标识")
+    state: JobState = Field(default=JobState.QUEUED, description="任务状态")
+    task_id: Optional[str] = Field(None, description="DashScope任务ID")
+    task_status: Optional[str] = Field(None, description="最近一次查询到的DashScope任务状态")
+    urls: List[str] = Field(default_factory=list, description="结果URL列表")
+    error: Optional[str] = Field(None, description="错误信息")
+    created_at: float = Field(default_factory=time.time, description="创建时间")
+    started_at: Optional[float] = Field(None, description="开始提交时间")
+    finished_at: Optional[float] = Field(None, description="结束时间")
+    params: Dict[str, Any] = Field(default_factory=dict, exclude=True)
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINAL_STATES
+
+    def snapshot(self) -> Dict[str, Any]:
+        """对外展示的任务信息"""
+        return self.model_dump(mode="json")
+
+
+class JobManager:
+    """
+    网关任务管理器
+
+    - 所有未提交的任务计入排队上限，超出时拒绝（背压）
+    - 每个租户同时进行中的任务数受限，租户之间轮转调度
+    - 提交任务使用线程池，状态查询由单个轮询协程批量完成，不为每个任务占用线程
+    """
+
+    def __init__(
+        self,
+        adapters: Dict[str, JobAdapter],
+        max_queue: int = 1000,
+        tenant_limit: int = 4,
+        max_inflight: int = 64,
+        poll_interval: float = 3.0,
+        job_timeout: float = 600.0,
+        result_ttl: float = 3600.0,
+        max_workers: int = 16
+    ):
+        """
+        初始化任务管理器
+
+        Args:
+            adapters: 任务类型 -> 适配器
+            max_queue: 最大排队任务数（未提交到DashScope的任务）
+            tenant_limit: 单个租户最大同时进行中任务数
+            max_inflight: 全局最大同时进行中任务数
+            poll_interval: 轮询间隔（秒）
+            job_timeout: 单个任务从提交到完成的超时时间（秒）
+            result_ttl: 已结束任务的保留时间（秒）
+            max_workers: 执行阻塞HTTP调用的线程数
+        """
+        self.adapters = adapters
+        self.max_queue = max_queue
+        self.tenant_limit = tenant_limit
+        self.max_inflight = max_inflight
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.result_ttl = result_ttl
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gateway")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending: Dict[str, Deque[Job]] = OrderedDict()
+        self._pending_count = 0
+        self._active: Dict[str, int] = {}
+        self._inflight = 0
+        self._running: Dict[str, Job] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    # ---- 生命周期 ----
+
+    async def start(self) -> None:
+        """启动轮询协程"""
+        if self._poller is None:
+            self._poller = asyncio.get_running_loop().create_task(self._poll_loop())
+
+    async def stop(self) -> None:
+        """停止轮询协程并释放线程池"""
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+        self._executor.shutdown(wait=False)
+
+    # ---- 对外接口 ----
+
+    def submit(self, kind: str, params: Dict[str, Any], tenant: str = "default") -> Job:
+        """
+        提交任务
+
+        Args:
+            kind: 任务类型
+            params: 请求参数
+            tenant: 租户标识
+
+        Returns:
+            Job: 任务记录
+
+        Raises:
+            ValueError: 未知任务类型或参数错误
+            QueueFullError: 排队已满
+        """
+        adapter = self.adapters.get(kind)
+        if adapter is None:
+            raise ValueError(f"未知任务类型: {kind}，可用类型: {', '.join(self.adapters)}")
+        if self._pending_count >= self.max_queue:
+            raise QueueFullError(f"排队任务数已达上限 {self.max_queue}")
+
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            kind=kind,
+            tenant=tenant,
+            params=adapter.validate(params)
+        )
+        self._jobs[job.job_id] = job
+        self._pending.setdefault(tenant, deque()).append(job)
+        self._pending_count += 1
+        self._schedule()
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """获取任务记录"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        取消排队中的任务
+
+        已提交到DashScope的任务无法取消，原样返回。
+        """
+        job = self.get(job_id)
+        if job.state == JobState.QUEUED:
+            self._pending[job.tenant].remove(job)
+            self._pending_count -= 1
+            self._finish(job, JobState.CANCELED, error="任务已取消")
+        return job
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """订阅任务状态变化，队列中依次收到任务快照"""
+        job = self.get(job_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait(job.snapshot())
+        if not job.finished:
+            self._subscribers.setdefault(job_id, []).append(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        """取消订阅"""
+        queues = self._subscribers.get(job_id)
+        if queues and queue in queues:
+            queues.remove(queue)
+            if not queues:
+                del self._subscribers[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """调度统计信息"""
+        return {
+            "queued": self._pending_count,
+            "inflight": self._inflight,
+            "polling": len(self._running),
+            "jobs": len(self._jobs),
+            "tenants": {tenant: count for tenant, count in self._active.items() if count},
+            "max_queue": self.max_queue,
+            "tenant_limit": self.tenant_limit,
+            "max_inflight": self.max_inflight,
+        }
+
+    # ---- 调度 ----
+
+    def _schedule(self) -> None:
+        """在并发限制内按租户轮转启动排队任务"""
+        while self._inflight < self.max_inflight and self._pending_count:
+            started = False
+            for tenant in list(self._pending):
+                queue = self._pending[tenant]
+                if not queue:
+                    del self._pending[tenant]
+                    continue
+                if self._active.get(tenant, 0) >= self.tenant_limit:
+                    continue
+                job = queue.popleft()
+                self._pending_count -= 1
+                self._active[tenant] = self._active.get(tenant, 0) + 1
+                self._inflight += 1
+                # 轮转：被调度的租户移到末尾
+                self._pending.move_to_end(tenant)
+                asyncio.get_running_loop().create_task(self._start(job))
+                started = True
+                if self._inflight >= self.max_inflight:
+                    return
+            if not started:
+                return
+
+    async def _start(self, job: Job) -> None:
+        """在线程池中创建DashScope任务"""
+        adapter = self.adapters[job.kind]
+        job.state = JobState.SUBMITTING
+        job.started_at = time.time()
+        self._emit(job)
+
+        loop = asyncio.get_running_loop()
+        try:
+            submission = await loop.run_in_executor(self._executor, adapter.submit, job.params)
+        except Exception as e:
+            self._finish(job, JobState.FAILED, error=f"创建任务失败: {e}")
+            return
+
+        if submission.result is not None:
+            self._apply(job, submission.result)
+            return
+
+        job.task_id = submission.task_id
+        job.state = JobState.RUNNING
+        self._running[job.job_id] = job
+        self._emit(job)
+
+    async def _poll_loop(self) -> None:
+        """统一轮询所有进行中的任务"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            jobs = list(self._running.values())
+            if jobs:
+                results = await asyncio.gather(
+                    *(loop.run_in_executor(self._executor, self.adapters[job.kind].poll, job.task_id)
+                      for job in jobs),
+                    return_exceptions=True
+                )
+                now = time.time()
+                for job, result in zip(jobs, results):
+                    if job.finished:
+                        continue
+                    if isinstance(result, Exception):
+                        # 查询失败视为暂时性错误，超时前继续重试
+                        job.error = f"查询任务失败: {result}"
+                    else:
+                        self._apply(job, result)
+                        if job.finished:
+                            continue
+                    if now - job.started_at > self.job_timeout:
+                        self._finish(job, JobState.FAILED, error=f"任务超时，等待时间超过 {self.job_timeout} 秒")
+            self._expire()
+
+    def _apply(self, job: Job, poll: TaskPoll) -> None:
+        """根据查询结果更新任务"""
+        changed = poll.status != job.task_status
+        job.task_status = poll.status
+        if poll.status == "SUCCEEDED":
+            job.urls = poll.urls
+            self._finish(job, JobState.SUCCEEDED)
+        elif poll.status in ("FAILED", "CANCELED", "UNKNOWN"):
+            state = JobState.CANCELED if poll.status == "CANCELED" else JobState.FAILED
+            self._finish(job, state, error=poll.error or f"任务 {job.task_id} 状态: {poll.status}")
+        elif changed:
+            job.error = None
+            self._emit(job)
+
+    def _finish(self, job: Job, state: JobState, error: Optional[str] = None) -> None:
+        """结束任务并释放并发名额"""
+        was_started = job.state != JobState.QUEUED
+        job.state = state
+        job.finished_at = time.time()
+        if error:
+            job.error = error
+        elif state == JobState.SUCCEEDED:
+            job.error = None
+        self._running.pop(job.job_id, None)
+        self._emit(job)
+        self._subscribers.pop(job.job_id, None)
+
+        if was_started:
+            self._active[job.tenant] -= 1
+            self._inflight -= 1
+            self._schedule()
+
+    def _emit(self, job: Job) -> None:
+        """向订阅者推送任务快照"""
+        snapshot = job.snapshot()
+        for queue in self._subscribers.get(job.job_id, []):
+            queue.put_nowait(snapshot)
+
+    def _expire(self) -> None:
+        """清理超过保留时间的已结束任务"""
+        deadline = time.time() - self.result_ttl
+        for job_id in list(self._jobs):
+            job = self._jobs[job_id]
+            if job.finished and job.finished_at < deadline:
+                del self._jobs[job_id]
@@ -0,0 +1,175 @@
+"""
+网关 HTTP 服务
+基于 aiohttp 提供任务提交、状态查询、结果获取和 SSE 进度推送接口
+
+接口列表:
+    POST   /v1/jobs/{kind}          提交任务（kind: text2image/image-edit/style-repaint/sketch/video）
+    GET    /v1/jobs/{job_id}        查询任务状态
+    GET    /v1/jobs/{job_id}/result 获取任务结果（未完成时返回 202）
+    GET    /v1/jobs/{job_id}/events 以 server-sent events 推送任务进度
+    DELETE /v1/jobs/{job_id}        取消排队中的任务
+    GET    /v1/health               调度统计信息
+
+租户通过请求头 X-Tenant-ID 标识，未提供时为 "default"。
+"""
+
+import json
+import os
+from typing import Optional
+
+from aiohttp import web
+from pydantic import ValidationError
+
+from .adapters import create_adapters
+from .jobs import JobManager, JobNotFoundError, QueueFullError
+from ..utils.http_client import create_pooled_client, set_shared_client
+
+MANAGER_KEY = web.AppKey("manager", JobManager)
+TENANT_HEADER = "X-Tenant-ID"
+
+
+def _json_error(status: int, message: str, **headers) -> web.Response:
+    return web.json_response({"error": message}, status=status, headers=headers or None)
+
+
+def _get_job(request: web.Request):
+    manager = request.app[MANAGER_KEY]
+    try:
+        return manager.get(request.match_info["job_id"])
+    except JobNotFoundError:
+        raise web.HTTPNotFound(
+            text=json.dumps({"error": "任务不存在"}, ensure_ascii=False),
+            content_type="application/json"
+        )
+
+
+async def submit_job(request: web.Request) -> web.Response:
+    """提交任务"""
+    manager = request.app[MANAGER_KEY]
+    try:
+        params = await request.json()
+    except ValueError:
+        return _json_error(400, "请求体必须是JSON对象")
+    if not isinstance(params, dict):
+        return _json_error(400, "请求体必须是JSON对象")
+
+    tenant = request.headers.get(TENANT_HEADER, "default")
+    try:
+        job = manager.submit(request.match_info["kind"], params, tenant=tenant)
+    except QueueFullError as e:
+        return _json_error(429, str(e), **{"Retry-After": str(int(manager.poll_interval) or 1)})
+    except (ValueError, ValidationError) as e:
+        return _json_error(400, str(e))
+
+    return web.json_response(job.snapshot(), status=202)
+
+
+async def get_job(request: web.Request) -> web.Response:
+    """查询任务状态"""
+    return web.json_response(_get_job(request).snapshot())
+
+
+async def get_job_result(request: web.Request) -> web.Response:
+    """获取任务结果"""
+    job = _get_job(request)
+    if not job.finished:
+        return web.json_response(job.snapshot(), status=202)
+    return web.json_response(job.snapshot(), status=200 if job.urls else 422)
+
+
+async def cancel_job(request: web.Request) -> web.Response:
+    """取消排队中的任务"""
+    job = request.app[MANAGER_KEY].cancel(_get_job(request).job_id)
+    return web.json_response(job.snapshot())
+
+
+async def job_events(request: web.Request) -> web.StreamResponse:
+    """以 server-sent events 推送任务进度，任务结束后关闭连接"""
+    manager = request.app[MANAGER_KEY]
+    job = _get_job(request)
+    queue = manager.subscribe(job.job_id)
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await response.prepare(request)
+    try:
+        while True:
+            snapshot = await queue.get()
+            data = json.dumps(snapshot, ensure_ascii=False)
+            await response.write(f"event: {snapshot['state'].lower()}\ndata: {data}\n\n".encode("utf-8"))
+            if snapshot["state"] in ("SUCCEEDED", "FAILED", "CANCELED"):
+                break
+    finally:
+        manager.unsubscribe(job.job_id, queue)
+    await response.write_eof()
+    return response
+
+
+async def health(request: web.Request) -> web.Response:
+    """调度统计信息"""
+    return web.json_response(request.app[MANAGER_KEY].stats())
+
+
+def create_app(manager: JobManager, share_connections: bool = True) -> web.Application:
+    """
+    创建网关应用
+
+    Args:
+        manager: 任务管理器
+        share_connections: 是否为所有生成器启用共享连接池
+
+    Returns:
+        web.Application: aiohttp 应用
+    """
+    app = web.Application()
+    app[MANAGER_KEY] = manager
+    app.add_routes([
+        web.post("/v1/jobs/{kind}", submit_job),
+        web.get("/v1/jobs/{job_id}", get_job),
+        web.get("/v1/jobs/{job_id}/result", get_job_result),
+        web.get("/v1/jobs/{job_id}/events", job_events),
+        web.delete("/v1/jobs/{job_id}", cancel_job),
+        web.get("/v1/health", health),
+    ])
+
+    async def on_startup(app):
+        if share_connections:
+            app["http_client"] = create_pooled_client()
+            set_shared_client(app["http_client"])
+        await manager.start()
+
+    async def on_cleanup(app):
+        await manager.stop()
+        if share_connections:
+            set_shared_client(None)
+            app["http_client"].close()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def run_gateway(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    api_key: Optional[str] = None,
+    **manager_options
+) -> None:
+    """
+    启动网关服务（阻塞）
+
+    Args:
+        host: 监听地址
+        port: 监听端口
+        api_key: 阿里云百炼API密钥，如果为None则从环境变量DASHSCOPE_API_KEY获取
+        **manager_options: 传给 JobManager 的调度参数
+    """
+    api_key = api_key or os.getenv("DASHSCOPE_API_KEY")
+    if not api_key:
+        raise ValueError("API密钥不能为空，请设置api_key参数或环境变量DASHSCOPE_API_KEY")
+
+    manager = JobManager(create_adapters(api_key), **manager_options)
+    web.run_app(create_app(manager), host=host, port=port)
@@ -3,32 +3,38 @@
 提供阿里云百炼文生图、图生图、图像编辑等功能
 """
 
-from .text2image import Text2ImageGenerator
-from .image_edit import ImageEditor, QwenImageEditor, WanxImageEditor
-from .style_repaint import StyleRepaintGenerator, style_repaint_preset, style_repaint_custom
-from .models import (
-    ImageGenerationRequest, 
-    ImageGenerationResponse,
-    ImageEditRequest, 
-    ImageEditResponse, 
-    WanxEditFunction,
-    StyleRepaintRequest,
-    StyleRepaintResponse
-)
+from .._lazy import lazy_exports
 
-__all__ = [
-    "Text2ImageGenerator",
-    "ImageEditor", 
-    "QwenImageEditor",
-    "WanxImageEditor",
-    "StyleRepaintGenerator",
-    "style_repaint_preset",
-    "style_repaint_custom",
-    "ImageGenerationRequest", 
-    "ImageGenerationResponse",
-    "ImageEditRequest",
-    "ImageEditResponse",
-    "WanxEditFunction",
-    "StyleRepaintRequest",
-    "StyleRepaintResponse"
-]
\ No newline at end of file
+# 导出名称 -> 所在子模块，首次访问时才导入（PEP 562）
+_LAZY_EXPORTS = {
+    "Text2ImageGenerator": ".text2image",
+    "ImageEditor": ".image_edit",
+    "QwenImageEditor": ".image_edit",
+    "WanxImageEditor": ".image_edit",
+    "StyleRepaintGenerator": ".style_repaint",
+    "style_repaint_preset": ".style_repaint",
+    "style_repaint_custom": ".style_repaint",
+    "ImageGenerationRequest": ".models",
+    "ImageGenerationResponse": ".models",
+    "ImageEditRequest": ".models",
+    "ImageEditResponse": ".models",
+    "WanxEditFunction": ".models",
+    "StyleRepaintRequest": ".models",
+    "StyleRepaintResponse": ".models",
+    "adapt_size_for_model": ".models",
+    "fit_size_for_model": ".models",
+    "MODEL_CAPABILITIES": ".constants",
+    "fit_image_for_model": ".fitting",
+    "encode_image_for_model": ".fitting",
+    "compare_models": ".compare",
+    "ModelRunResult": ".compare",
+    "EditPipeline": ".pipeline",
+    "PipelineStep": ".pipeline",
+    "StepResult": ".pipeline",
+    "TiledEditor": ".tiling",
+    "TiledEditResult": ".tiling",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_EXPORTS)
@@ -0,0 +1,100 @@
+"""
+多模型对比
+同一提示词同时提交到多个文生图模型，汇总各模型的耗时、费用和结果
+"""
+
+import time
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from ..utils.executors import ContextThreadPoolExecutor
+from .models import adapt_size_for_model, estimate_cost
+from .text2image import Text2ImageGenerator
+
+
+class ModelRunResult(BaseModel):
+    """单个模型的生成结果"""
+    model: str = Field(..., description="模型名称")
+    size: str = Field(..., description="实际使用的尺寸")
+    status: str = Field(..., description="SUCCEEDED/FAILED")
+    task_ids: List[str] = Field(default_factory=list, description="任务ID列表")
+    latency: float = Field(..., description="从提交到完成的耗时（秒）")
+    image_count: int = Field(default=0, description="生成图片数量")
+    cost: Optional[float] = Field(None, description="按参考单价估算的费用（元）")
+    urls: List[str] = Field(default_factory=list, description="结果URL列表")
+    files: List[str] = Field(default_factory=list, description="已下载的文件路径")
+    error: Optional[str] = Field(None, description="错误信息")
+
+
+def compare_models(
+    prompt: str,
+    models: List[str],
+    size: str = "1024*1024",
+    n: int = 1,
+    negative_prompt: Optional[str] = None,
+    prompt_extend: bool = True,
+    watermark: bool = False,
+    seed: Optional[int] = None,
+    api_key: Optional[str] = None,
+    generator: Optional[Text2ImageGenerator] = None
+) -> List[ModelRunResult]:
+    """
+    使用多个模型并发生成同一提示词
+
+    每个模型的尺寸通过 adapt_size_for_model 调整为该模型支持的尺寸，
+    总耗时约等于最慢模型的耗时，而不是各模型耗时之和。
+
+    Args:
+        prompt: 正向提示词
+        models: 模型名称列表
+        size: 期望尺寸
+        n: 每个模型生成的图片数量
+        negative_prompt: 反向提示词
+        prompt_extend: 是否开启智能改写
+        watermark: 是否添加水印
+        seed: 随机种子（千问模型忽略）
+        api_key: 阿里云百炼API密钥，未提供 generator 时使用
+        generator: 复用的文生图生成器
+
+    Returns:
+        List[ModelRunResult]: 各模型结果，顺序与 models 一致
+    """
+    generator = generator or Text2ImageGenerator(api_key=api_key)
+
+    def run(model: str) -> ModelRunResult:
+        model_size = adapt_size_for_model(size, model)
+        start = time.time()
+        try:
+            response = generator.generate_image(
+                prompt=prompt,
+                negative_prompt=negative_prompt,
+                size=model_size,
+                model=model,
+                prompt_extend=prompt_extend,
+                watermark=watermark,
+                n=n,
+                seed=seed
+            )
+        except Exception as e:
+            return ModelRunResult(
+                model=model, size=model_size, status="FAILED",
+                latency=round(time.time() - start, 3), error=str(e)
+            )
+
+        urls = [result.url for result in response.results or []]
+        image_count = response.image_count or len(urls)
+        return ModelRunResult(
+            model=model,
+            size=model_size,
+            status="SUCCEEDED" if urls else "FAILED",
+            task_ids=response.sub_task_ids or [response.task_id],
+            latency=round(time.time() - start, 3),
+            image_count=image_count,
+            cost=estimate_cost(model, image_count),
+            urls=urls,
+            error="; ".join(response.errors) if response.errors else None
+        )
+
+    with ContextThreadPoolExecutor(max_workers=max(1, len(models))) as executor:
+        return list(executor.map(run, models))
@@ -0,0 +1,58 @@
+"""
+图像生成常量
+只依赖标准库，命令行参数定义、请求校验和输入图像适配共用，导入时不加载 pydantic、numpy、PIL 等依赖
+"""
+
+from typing import Any, Dict
+
+from ..video.constants import VIDEO_SIZES
+
+# 千问文生图支持的固定尺寸（宽*高），与 ImageSize 的取值一致
+QWEN_IMAGE_SIZES = ["1328*1328", "1664*928", "1472*1140", "1140*1472", "928*1664"]
+
+# 各模型可接受的图像尺寸，生成尺寸校验、尺寸调整和输入图像适配共用
+# sizes: 仅支持的固定尺寸（宽*高）；range: (最小边长, 最大边长, 最大像素数)
+MODEL_CAPABILITIES: Dict[str, Dict[str, Any]] = {
+    "qwen": {"description": "千问文生图", "sizes": QWEN_IMAGE_SIZES},
+    "wan": {"description": "万相文生图", "range": (512, 1440, 2000000)},
+    "wanx-edit": {"description": "万相通用图像编辑输入", "range": (512, 4096, 4096 * 4096)},
+    "sketch": {"description": "涂鸦作画", "sizes": ["768*768"]},
+    "video": {
+        "description": "视频（全部分辨率档位）",
+        "sizes": [size for sizes in VIDEO_SIZES.values() for size in sizes]
+    },
+    **{
+        f"video-{tier.lower()}": {"description": f"视频 {tier} 档位", "sizes": sizes}
+        for tier, sizes in VIDEO_SIZES.items()
+    },
+}
+
+# 人像风格重绘预置风格
+PRESET_STYLES: Dict[int, str] = {
+    0: "复古漫画",
+    1: "3D 童话",
+    2: "二次元",
+    3: "小清新",
+    4: "未来科技",
+    5: "国画古风",
+    6: "将军百战",
+    7: "炫彩卡通",
+    8: "清雅国风",
+    9: "喜迎新年",
+    14: "国风工笔",
+    15: "恭贺新禧",
+    30: "童话世界",
+    31: "黏土世界",
+    32: "像素世界",
+    33: "冒险世界",
+    34: "日漫世界",
+    35: "3D 世界",
+    36: "二次元世界",
+    37: "手绘世界",
+    38: "蜡笔世界",
+    39: "冰箱贴世界",
+    40: "吧唧世界",
+}
+
+# 输入图像适配方式：auto 在裁剪损失不超过 AUTO_CROP_LIMIT 时裁剪，否则填充
+FIT_METHODS = ("auto", "crop", "pad")
@@ -0,0 +1,236 @@
+"""
+按模型尺寸能力适配输入图像
+选择模型支持的最接近的尺寸后，裁剪到信息最多的区域或按边缘颜色填充，
+提交前就满足模型的尺寸要求，避免服务端重新缩放或直接拒绝
+"""
+
+import base64
+import io
+import mimetypes
+from typing import NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .constants import FIT_METHODS
+from .models import fit_size_for_model
+
+# auto 适配方式允许的最大裁剪比例，超过时改为填充
+AUTO_CROP_LIMIT = 0.2
+
+# 计算裁剪位置时使用的缩略图长边
+_ENERGY_SIDE = 256
+
+
+class FitPlan(NamedTuple):
+    """适配方案，mask 等需要与原图对齐的图像按同一方案处理"""
+    size: Tuple[int, int]  # 最终尺寸
+    crop_box: Tuple[int, int, int, int]  # 原图中保留的区域
+    scaled_size: Tuple[int, int]  # 保留区域缩放后的尺寸
+    offset: Tuple[int, int]  # 缩放后的图像在最终画布中的位置
+    method: str  # 实际使用的方式：crop/pad
+
+    @property
+    def changed(self) -> bool:
+        """是否需要处理（原图已是目标尺寸时为 False）"""
+        return self.crop_box != (0, 0, *self.size) or self.scaled_size != self.size
+
+
+def _energy_offset(image: Image.Image, horizontal: bool, keep: int) -> int:
+    """
+    沿裁剪方向选择梯度能量最大的窗口
+
+    Args:
+        image: 原图
+        horizontal: 是否沿宽度方向裁剪
+        keep: 保留的长度（原图像素）
+
+    Returns:
+        int: 窗口起点（原图像素）
+    """
+    length = image.width if horizontal else image.height
+    thumb = image.convert("L")
+    thumb.thumbnail((_ENERGY_SIDE, _ENERGY_SIDE))
+    gray = np.asarray(thumb, dtype=np.float32)
+    energy = np.zeros_like(gray)
+    energy[:, 1:] += np.abs(np.diff(gray, axis=1))
+    energy[1:, :] += np.abs(np.diff(gray, axis=0))
+    profile = energy.sum(axis=0 if horizontal else 1)
+
+    factor = len(profile) / length
+    window = max(1, min(len(profile), round(keep * factor)))
+    sums = np.convolve(profile, np.ones(window, dtype=np.float32), mode="valid")
+    if len(sums) <= 1 or sums.max() - sums.min() <= 0.01 * max(sums.max(), 1e-6):
+        # 能量分布均匀时居中裁剪
+        return (length - keep) // 2
+    # 能量接近时偏向居中，避免无意义的偏移
+    center = (len(sums) - 1) / 2
+    bias = 1 - 0.05 * np.abs(np.arange(len(sums)) - center) / max(center, 1)
+    start = int(np.argmax(sums * bias) / factor)
+    return min(max(0, start), length - keep)
+
+
+def plan_fit(image: Image.Image, size: Tuple[int, int], method: str = "auto") -> FitPlan:
+    """
+    计算把图像适配到目标尺寸的方案
+
+    Args:
+        image: 原图
+        size: 目标尺寸 (宽, 高)
+        method: auto/crop/pad
+
+    Returns:
+        FitPlan: 适配方案
+
+    Raises:
+        ValueError: 适配方式无效
+    """
+    if method not in FIT_METHODS:
+        raise ValueError(f"适配方式无效：{method}，可用：{', '.join(FIT_METHODS)}")
+    width, height = image.size
+    target_width, target_height = size
+    source_ratio, target_ratio = width / height, target_width / target_height
+    if method == "auto":
+        loss = 1 - min(source_ratio, target_ratio) / max(source_ratio, target_ratio)
+        method = "crop" if loss <= AUTO_CROP_LIMIT else "pad"
+
+    if method == "crop":
+        if source_ratio > target_ratio:
+            keep = max(1, round(height * target_ratio))
+            left = _energy_offset(image, True, keep) if keep < width else 0
+            crop_box = (left, 0, left + keep, height)
+        else:
+            keep = max(1, round(width / target_ratio))
+            top = _energy_offset(image, False, keep) if keep < height else 0
+            crop_box = (0, top, width, top + keep)
+        return FitPlan(size, crop_box, size, (0, 0), method)
+
+    scale = min(target_width / width, target_height / height)
+    scaled = (
+        min(target_width, max(1, round(width * scale))),
+        min(target_height, max(1, round(height * scale)))
+    )
+    offset = ((target_width - scaled[0]) // 2, (target_height - scaled[1]) // 2)
+    return FitPlan(size, (0, 0, width, height), scaled, offset, method)
+
+
+def apply_fit(
+    image: Image.Image,
+    plan: FitPlan,
+    fill: Optional[Union[int, Tuple[int, ...]]] = None,
+    resample: int = Image.Resampling.LANCZOS,
+    reducing_gap: Optional[float] = None
+) -> Image.Image:
+    """
+    按方案裁剪、缩放并填充图像
+
+    Args:
+        image: 原图
+        plan: 适配方案
+        fill: 填充颜色，默认取缩放后图像边缘像素的中位数（透明图像填充透明）
+        resample: 重采样滤镜（mask 使用 NEAREST 保持二值）
+        reducing_gap: 传给 Image.resize 的 reducing_gap
+
+    Returns:
+        Image.Image: 适配后的图像
+    """
+    if not plan.changed:
+        return image.copy()
+    region = image.crop(plan.crop_box) if plan.crop_box != (0, 0, *image.size) else image
+    scaled = region.resize(plan.scaled_size, resample, reducing_gap=reducing_gap)
+    if plan.scaled_size == plan.size:
+        return scaled
+
+    if fill is None:
+        if "A" in scaled.getbands():
+            fill = (0,) * len(scaled.getbands())
+        else:
+            pixels = np.asarray(scaled)
+            border = np.concatenate([pixels[0], pixels[-1], pixels[:, 0], pixels[:, -1]])
+            median = np.median(border, axis=0).astype(int)
+            fill = int(median) if median.ndim == 0 else tuple(int(v) for v in median)
+    canvas = Image.new(scaled.mode, plan.size, fill)
+    canvas.paste(scaled, plan.offset)
+    return canvas
+
+
+def fit_image_for_model(
+    image: Image.Image,
+    model: str,
+    method: str = "auto",
+    reducing_gap: Optional[float] = None
+) -> Tuple[Image.Image, FitPlan]:
+    """
+    把图像适配为模型支持的尺寸
+
+    Args:
+        image: 原图
+        model: MODEL_CAPABILITIES 中的名称或具体模型名称
+        method: auto/crop/pad
+        reducing_gap: 传给 Image.resize 的 reducing_gap
+
+    Returns:
+        Tuple[Image.Image, FitPlan]: (适配后的图像, 适配方案)
+    """
+    plan = plan_fit(image, fit_size_for_model(image.width, image.height, model), method)
+    return apply_fit(image, plan, reducing_gap=reducing_gap), plan
+
+
+def encode_image_for_model(
+    image_path: str,
+    model: str,
+    method: str = "auto",
+    mask_path: Optional[str] = None
+) -> Tuple[str, Optional[str], FitPlan]:
+    """
+    读取本地图像，适配为模型支持的尺寸后编码为Base64
+
+    JPEG 原图编码为JPEG（质量95），其他格式编码为PNG；
+    提供 mask 时按同一方案处理并编码为PNG，保证与图像对齐。
+
+    Args:
+        image_path: 图像文件路径
+        model: MODEL_CAPABILITIES 中的名称或具体模型名称
+        method: auto/crop/pad
+        mask_path: mask 文件路径
+
+    Returns:
+        Tuple[str, Optional[str], FitPlan]: (图像Base64, mask Base64, 适配方案)
+    """
+    from ..utils.mask_utils import MaskCanvas
+
+    with Image.open(image_path) as source:
+        target = fit_size_for_model(source.width, source.height, model)
+        # JPEG 大幅缩小时先按 DCT 缩放解码，再做高质量重采样
+        if source.format == "JPEG":
+            source.draft(source.mode, (target[0] * 2, target[1] * 2))
+        is_jpeg = source.format == "JPEG"
+        image = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+
+    plan = plan_fit(image, target, method)
+    if plan.changed:
+        fitted = apply_fit(image, plan, reducing_gap=3.0)
+        buffer = io.BytesIO()
+        if is_jpeg:
+            fitted.save(buffer, format="JPEG", quality=95)
+            mime_type = "image/jpeg"
+        else:
+            fitted.save(buffer, format="PNG", optimize=True)
+            mime_type = "image/png"
+        data = buffer.getvalue()
+    else:
+        # 已满足尺寸要求时提交原文件，避免重新编码
+        with open(image_path, "rb") as f:
+            data = f.read()
+        mime_type = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+    image_url = f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
+
+    mask_url = None
+    if mask_path:
+        with Image.open(mask_path) as mask:
+            mask = mask.convert("L")
+            if mask.size != image.size:
+                mask = mask.resize(image.size, Image.Resampling.NEAREST)
+        fitted_mask = apply_fit(mask, plan, fill=0, resample=Image.Resampling.NEAREST)
+        mask_url = MaskCanvas.from_image(fitted_mask).to_data_url()
+    return image_url, mask_url, plan
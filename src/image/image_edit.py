@@ -18,6 +18,7 @@ from .models import (
     ModelType,
     WanxEditFunction
 )
+from ..utils.http_client import http_client
 
 
 class ImageEditor:
@@ -91,7 +92,7 @@ class ImageEditor:
             }
         }
         
-        with httpx.Client(timeout=self.timeout) as client:
+        with http_client(timeout=self.timeout) as client:
             for attempt in range(self.max_retries):
                 try:
                     response = client.post(url, headers=self.headers, json=payload)
@@ -191,7 +192,7 @@ class ImageEditor:
         headers = self.headers.copy()
         headers["X-DashScope-Async"] = "enable"
         
-        with httpx.Client(timeout=self.timeout) as client:
+        with http_client(timeout=self.timeout) as client:
             for attempt in range(self.max_retries):
                 try:
                     response = client.post(url, headers=headers, json=payload)
@@ -227,7 +228,7 @@ class ImageEditor:
         """
         url = f"{self.base_url}/tasks/{task_id}"
         
-        with httpx.Client(timeout=self.timeout) as client:
+        with http_client(timeout=self.timeout) as client:
             response = client.get(url, headers={"Authorization": f"Bearer {self.api_key}"})
             response.raise_for_status()
             
@@ -361,12 +362,19 @@ class ImageEditor:
         else:
             raise ValueError(f"不支持的编辑模型: {model}")
     
-    def encode_image_to_base64(self, image_path: str) -> str:
+    def encode_image_to_base64(
+        self,
+        image_path: str,
+        fit_model: Optional[str] = None,
+        fit_method: str = "auto"
+    ) -> str:
         """
         将本地图像编码为Base64
         
         Args:
             image_path: 图像文件路径
+            fit_model: 先适配为该模型支持的尺寸（见 MODEL_CAPABILITIES），None 时原样编码
+            fit_method: 适配方式 auto/crop/pad
             
         Returns:
             str: Base64编码的图像
@@ -374,6 +382,10 @@ class ImageEditor:
         import base64
         import mimetypes
         
+        if fit_model:
+            from .fitting import encode_image_for_model
+            return encode_image_for_model(image_path, fit_model, fit_method)[0]
+        
         mime_type, _ = mimetypes.guess_type(image_path)
         if not mime_type:
             mime_type = "image/jpeg"
@@ -416,7 +428,7 @@ class ImageEditor:
         save_dir.mkdir(parents=True, exist_ok=True)
         file_path = save_dir / filename
         
-        with httpx.Client() as client:
+        with http_client() as client:
             response = client.get(url)
             response.raise_for_status()
             
@@ -2,10 +2,13 @@
 图像生成数据模型
 """
 
-from typing import Optional, List, Dict, Any
+import math
+from typing import Optional, List, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 from enum import Enum
 
+from .constants import MODEL_CAPABILITIES, PRESET_STYLES
+
 
 class ModelType(str, Enum):
     """支持的模型类型"""
@@ -70,7 +73,7 @@ class ImageGenerationRequest(BaseModel):
         # 千问模型特殊限制
         if self.model == ModelType.QWEN:
             # 检查尺寸
-            valid_qwen_sizes = ["1328*1328", "1664*928", "1472*1140", "1140*1472", "928*1664"]
+            valid_qwen_sizes = MODEL_CAPABILITIES["qwen"]["sizes"]
             if self.size not in valid_qwen_sizes:
                 errors.append(f"千问模型仅支持尺寸: {', '.join(valid_qwen_sizes)}")
             
@@ -82,16 +85,149 @@ class ImageGenerationRequest(BaseModel):
         elif self.model.startswith("wan") and self.model != ModelType.WANX_EDIT:
             try:
                 width, height = map(int, self.size.split("*"))
-                if not (512 <= width <= 1440 and 512 <= height <= 1440):
-                    errors.append("万相模型尺寸范围：512-1440像素")
-                if width * height > 2000000:
-                    errors.append("万相模型分辨率不超过200万像素")
+                min_side, max_side, max_pixels = MODEL_CAPABILITIES["wan"]["range"]
+                if not (min_side <= width <= max_side and min_side <= height <= max_side):
+                    errors.append(f"万相模型尺寸范围：{min_side}-{max_side}像素")
+                if width * height > max_pixels:
+                    errors.append(f"万相模型分辨率不超过{max_pixels // 10000}万像素")
             except ValueError:
                 errors.append("尺寸格式错误，应为 宽*高")
         
         return {"valid": len(errors) == 0, "errors": errors}
 
 
+# 文生图模型参考单价（元/张），实际费用以阿里云百炼计费为准
+MODEL_PRICES: Dict[str, float] = {
+    ModelType.QWEN: 0.25,
+    ModelType.WAN2_2_FLASH: 0.14,
+    ModelType.WAN2_2_PLUS: 0.20,
+    ModelType.WAN2_1_TURBO: 0.14,
+    ModelType.WAN2_1_PLUS: 0.20,
+    ModelType.WAN2_0_TURBO: 0.04,
+}
+
+
+def estimate_cost(model: str, image_count: int) -> Optional[float]:
+    """
+    按参考单价估算费用
+
+    Args:
+        model: 模型名称
+        image_count: 图片数量
+
+    Returns:
+        Optional[float]: 估算费用（元），未知模型返回None
+    """
+    price = MODEL_PRICES.get(model)
+    return None if price is None else round(price * image_count, 4)
+
+
+def resolve_capability(model: str) -> Optional[str]:
+    """
+    查找模型对应的尺寸能力
+
+    Args:
+        model: MODEL_CAPABILITIES 中的名称或具体模型名称
+
+    Returns:
+        Optional[str]: MODEL_CAPABILITIES 中的名称，未知模型返回None
+    """
+    if model in MODEL_CAPABILITIES:
+        return model
+    if model == ModelType.QWEN:
+        return "qwen"
+    if model == ModelType.WANX_EDIT:
+        return "wanx-edit"
+    if "sketch" in model:
+        return "sketch"
+    if any(tag in model for tag in ("-t2v", "-i2v", "-kf2v")):
+        return "video"
+    if model.startswith("wan"):
+        return "wan"
+    return None
+
+
+def fit_size_for_model(width: int, height: int, model: str) -> Tuple[int, int]:
+    """
+    为给定尺寸的图像选择模型支持的最接近的尺寸
+
+    - 固定尺寸：选择宽高比最接近的尺寸，宽高比相同时优先选择不超过原图像素数的最大尺寸
+    - 尺寸范围：宽高比超出范围时取最接近的可用宽高比，再缩放到边长和像素数限制内
+
+    Args:
+        width: 图像宽度
+        height: 图像高度
+        model: MODEL_CAPABILITIES 中的名称或具体模型名称
+
+    Returns:
+        Tuple[int, int]: (宽, 高)
+
+    Raises:
+        ValueError: 未知模型或尺寸无效
+    """
+    capability = resolve_capability(model)
+    if capability is None:
+        raise ValueError(f"未知的模型尺寸能力：{model}，可用：{', '.join(MODEL_CAPABILITIES)}")
+    if width <= 0 or height <= 0:
+        raise ValueError(f"图像尺寸无效：{width}x{height}")
+
+    spec = MODEL_CAPABILITIES[capability]
+    pixels = width * height
+    if "sizes" in spec:
+        ratio = math.log(width / height)
+
+        def rank(candidate: str) -> Tuple[float, int, int]:
+            w, h = map(int, candidate.split("*"))
+            fits = w * h <= pixels
+            return round(abs(math.log(w / h) - ratio), 6), 0 if fits else 1, -w * h if fits else w * h
+
+        w, h = map(int, min(spec["sizes"], key=rank).split("*"))
+        return w, h
+
+    min_side, max_side, max_pixels = spec["range"]
+    ratio = min(max(width / height, min_side / max_side), max_side / min_side)
+    area = min(pixels, max_pixels)
+    new_width, new_height = math.sqrt(area * ratio), math.sqrt(area / ratio)
+    scale = min(1.0, max_side / max(new_width, new_height))
+    # 缩小后短边不足时放大到最小边长（宽高比已限制在范围内，长边不会超限）
+    scale *= max(1.0, min_side / (min(new_width, new_height) * scale))
+    new_width = min(max_side, max(min_side, round(new_width * scale)))
+    new_height = min(max_side, max(min_side, round(new_height * scale)))
+    while new_width * new_height > max_pixels:
+        if new_width >= new_height:
+            new_width -= 1
+        else:
+            new_height -= 1
+    return new_width, new_height
+
+
+def adapt_size_for_model(size: str, model: str) -> str:
+    """
+    将尺寸调整为模型支持的尺寸，尽量保持宽高比
+
+    - 千问：选择宽高比最接近的固定尺寸
+    - 万相：等比缩放到单边 512-1440 像素且总像素不超过 200 万
+
+    Args:
+        size: 期望尺寸，格式为 宽*高
+        model: 模型名称
+
+    Returns:
+        str: 满足 validate_for_model 规则的尺寸
+    """
+    try:
+        width, height = map(int, size.split("*"))
+        if width <= 0 or height <= 0:
+            raise ValueError(size)
+    except ValueError:
+        return ImageSize.SQUARE_1328.value if model == ModelType.QWEN else "1024*1024"
+
+    if resolve_capability(model) is None:
+        return size
+    width, height = fit_size_for_model(width, height, model)
+    return f"{width}*{height}"
+
+
 class ImageEditRequest(BaseModel):
     """图像编辑请求模型"""
     model: str = Field(..., description="模型名称")
@@ -147,6 +283,8 @@ class ImageGenerationResponse(BaseModel):
     results: Optional[List[ImageResult]] = Field(None, description="任务结果列表")
     image_count: Optional[int] = Field(None, description="模型生成图片的数量")
     request_id: str = Field(..., description="请求唯一标识")
+    sub_task_ids: Optional[List[str]] = Field(None, description="拆分执行时各子任务的ID")
+    errors: Optional[List[str]] = Field(None, description="拆分执行时失败子任务的错误信息")
 
 
 class ImageEditResponse(BaseModel):
@@ -186,7 +324,7 @@ class StyleRepaintRequest(BaseModel):
         errors = []
         
         # 预置风格验证
-        valid_style_indices = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 14, 15, 30, 31, 32, 33, 34, 35, 36, 37, 38, 39, 40]
+        valid_style_indices = list(PRESET_STYLES)
         
         if self.style_index == -1:
             # 自定义风格模式
@@ -0,0 +1,254 @@
+"""
+图像编辑流水线
+按依赖关系（有向无环图）串联多个编辑步骤，上一步的结果URL直接作为下一步的输入，
+中间结果无需下载和重新编码；互不依赖的分支并发执行
+"""
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from ..utils.executors import ContextThreadPoolExecutor
+from .image_edit import ImageEditor
+from .models import ModelType
+
+# 流水线输入的引用名称
+PIPELINE_INPUT = "$input"
+
+# 部分功能的默认提示词
+DEFAULT_PROMPTS = {
+    "remove_watermark": "去除水印",
+    "super_resolution": "高清放大",
+}
+
+
+class PipelineStep(BaseModel):
+    """流水线步骤，未声明的字段（如 strength、upscale_factor、top_scale）原样传给编辑接口"""
+    model_config = ConfigDict(extra="allow")
+
+    id: str = Field(..., description="步骤ID")
+    model: str = Field(default=ModelType.WANX_EDIT, description="编辑模型")
+    function: Optional[str] = Field(None, description="万相编辑功能类型")
+    prompt: Optional[str] = Field(None, description="编辑提示词")
+    input: str = Field(default=PIPELINE_INPUT, description="输入：$input、其他步骤ID、URL或本地文件")
+    mask: Optional[str] = Field(None, description="mask：其他步骤ID、URL或本地文件")
+    pick: int = Field(default=0, description="input 引用的步骤生成多张图片时使用第几张")
+    mask_pick: int = Field(default=0, description="mask 引用的步骤生成多张图片时使用第几张")
+    save: bool = Field(default=False, description="是否下载该步骤的结果（末端步骤总是下载）")
+    filename: Optional[str] = Field(None, description="下载文件名")
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        """传给编辑接口的其他参数"""
+        return dict(self.model_extra or {})
+
+
+class StepResult(BaseModel):
+    """步骤执行结果"""
+    id: str = Field(..., description="步骤ID")
+    status: str = Field(..., description="SUCCEEDED/FAILED/SKIPPED")
+    task_id: Optional[str] = Field(None, description="任务ID（万相模型）")
+    urls: List[str] = Field(default_factory=list, description="结果URL列表")
+    file: Optional[str] = Field(None, description="已下载的文件路径")
+    elapsed: float = Field(default=0.0, description="耗时（秒）")
+    error: Optional[str] = Field(None, description="错误信息")
+
+
+class EditPipeline:
+    """图像编辑流水线"""
+
+    def __init__(
+        self,
+        steps: List[PipelineStep],
+        editor: Optional[ImageEditor] = None,
+        api_key: Optional[str] = None,
+        max_workers: int = 4,
+        source: Optional[str] = None
+    ):
+        """
+        初始化流水线
+
+        Args:
+            steps: 步骤列表
+            editor: 复用的图像编辑器
+            api_key: 阿里云百炼API密钥，未提供 editor 时使用
+            max_workers: 最大并发步骤数
+            source: 默认的流水线输入（URL或本地文件）
+
+        Raises:
+            ValueError: 步骤ID重复或存在循环依赖
+        """
+        self.steps = {step.id: step for step in steps}
+        if len(self.steps) != len(steps):
+            raise ValueError("步骤ID不能重复")
+        self.editor = editor
+        self.api_key = api_key
+        self.max_workers = max_workers
+        self.source = source
+        self.order = self._topological_order()
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any], **kwargs) -> "EditPipeline":
+        """
+        从配置字典创建流水线
+
+        配置格式：
+        {
+            "input": "photo.jpg",
+            "steps": [
+                {"id": "clean", "function": "remove_watermark"},
+                {"id": "hd", "input": "clean", "function": "super_resolution", "upscale_factor": 2},
+                {"id": "comic", "input": "clean", "function": "stylization_all", "prompt": "转换成法国绘本风格"}
+            ]
+        }
+
+        步骤的 input/mask 可引用其他步骤ID（使用其结果URL）、"$input"、URL或本地文件。
+
+        Args:
+            spec: 流水线配置
+            **kwargs: 传给构造函数的其他参数
+
+        Returns:
+            EditPipeline: 流水线
+        """
+        if not isinstance(spec, dict) or not isinstance(spec.get("steps"), list):
+            raise ValueError("流水线配置格式错误：需要包含'steps'数组")
+        kwargs.setdefault("source", spec.get("input"))
+        return cls([PipelineStep(**step) for step in spec["steps"]], **kwargs)
+
+    @classmethod
+    def from_file(cls, filepath: str, **kwargs) -> "EditPipeline":
+        """从JSON文件读取流水线配置"""
+        with open(filepath, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), **kwargs)
+
+    def dependencies(self, step: PipelineStep) -> List[str]:
+        """步骤依赖的其他步骤"""
+        return [ref for ref in (step.input, step.mask) if ref in self.steps]
+
+    def _topological_order(self) -> List[str]:
+        order = []
+        state: Dict[str, int] = {}
+
+        def visit(step_id: str, path: List[str]) -> None:
+            if state.get(step_id) == 2:
+                return
+            if state.get(step_id) == 1:
+                raise ValueError(f"流水线存在循环依赖：{' -> '.join(path + [step_id])}")
+            state[step_id] = 1
+            for dependency in self.dependencies(self.steps[step_id]):
+                visit(dependency, path + [step_id])
+            state[step_id] = 2
+            order.append(step_id)
+
+        for step_id in self.steps:
+            visit(step_id, [])
+        return order
+
+    def terminal_steps(self) -> List[str]:
+        """没有其他步骤依赖的末端步骤"""
+        used = {dependency for step in self.steps.values() for dependency in self.dependencies(step)}
+        return [step_id for step_id in self.order if step_id not in used]
+
+    def run(
+        self,
+        source: Optional[str] = None,
+        output_dir: str = "./output/pipeline",
+        save_intermediates: bool = False,
+        on_step: Optional[Callable[[StepResult], None]] = None
+    ) -> Dict[str, StepResult]:
+        """
+        执行流水线
+
+        Args:
+            source: 流水线输入（URL或本地文件），默认使用配置中的 input
+            output_dir: 下载目录
+            save_intermediates: 是否下载所有中间结果
+            on_step: 每个步骤结束时的回调
+
+        Returns:
+            Dict[str, StepResult]: 步骤ID -> 结果，按拓扑顺序排列
+        """
+        editor = self.editor or ImageEditor(api_key=self.api_key)
+        source = source or self.source
+        terminals = set(self.terminal_steps())
+        # 本地文件只编码一次，多个步骤共用
+        encoded: Dict[str, str] = {}
+
+        def resolve(ref: Optional[str], results: Dict[str, StepResult], pick: int) -> Optional[str]:
+            if ref is None:
+                return None
+            if ref in self.steps:
+                urls = results[ref].urls
+                return urls[min(pick, len(urls) - 1)]
+            if ref == PIPELINE_INPUT:
+                if source is None:
+                    raise ValueError("流水线未提供输入图像")
+                ref = source
+            if editor.is_url(ref) or ref.startswith("data:"):
+                return ref
+            if ref not in encoded:
+                encoded[ref] = editor.encode_image_to_base64(ref)
+            return encoded[ref]
+
+        def execute(step: PipelineStep, results: Dict[str, StepResult]) -> StepResult:
+            start = time.time()
+            try:
+                response = editor.edit_image(
+                    model=step.model,
+                    image_url=resolve(step.input, results, step.pick),
+                    prompt=step.prompt or DEFAULT_PROMPTS.get(step.function or "", ""),
+                    function=step.function,
+                    mask_image_url=resolve(step.mask, results, step.mask_pick),
+                    **step.params
+                )
+                if step.model == ModelType.QWEN_EDIT:
+                    urls = [response.url] if response.url else []
+                else:
+                    urls = [r.url for r in response.results or [] if r.url]
+                if not urls:
+                    raise RuntimeError("未获取到结果")
+
+                result = StepResult(id=step.id, status="SUCCEEDED", task_id=response.task_id, urls=urls)
+                if save_intermediates or step.save or step.id in terminals:
+                    result.file = editor.download_image(urls[0], output_dir, step.filename or f"{step.id}.png")
+            except Exception as e:
+                result = StepResult(id=step.id, status="FAILED", error=str(e))
+            result.elapsed = round(time.time() - start, 3)
+            return result
+
+        results: Dict[str, StepResult] = {}
+        remaining = list(self.order)
+        running: Dict[Future, str] = {}
+
+        with ContextThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while remaining or running:
+                for step_id in list(remaining):
+                    step = self.steps[step_id]
+                    dependencies = self.dependencies(step)
+                    if not all(dependency in results for dependency in dependencies):
+                        continue
+                    remaining.remove(step_id)
+                    failed = [d for d in dependencies if results[d].status != "SUCCEEDED"]
+                    if failed:
+                        results[step_id] = StepResult(
+                            id=step_id, status="SKIPPED", error=f"依赖步骤未成功：{', '.join(failed)}"
+                        )
+                        if on_step:
+                            on_step(results[step_id])
+                        continue
+                    running[executor.submit(execute, step, dict(results))] = step_id
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step_id = running.pop(future)
+                    results[step_id] = future.result()
+                    if on_step:
+                        on_step(results[step_id])
+
+        return {step_id: results[step_id] for step_id in self.order}
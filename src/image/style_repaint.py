@@ -3,7 +3,8 @@
 基于阿里云百炼人像风格重绘API
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Iterator, Tuple
+from concurrent.futures import as_completed
 import httpx
 import os
 import time
@@ -16,6 +17,9 @@ from .models import (
     TaskStatus,
     ImageResult
 )
+from ..utils.executors import ContextThreadPoolExecutor
+from ..utils.http_client import http_client
+from ..utils.rate_limit import RateLimiter
 
 
 class StyleRepaintGenerator:
@@ -138,7 +142,7 @@ class StyleRepaintGenerator:
             payload["input"]["style_index"] = request.style_index
             
         try:
-            with httpx.Client(timeout=self.timeout) as client:
+            with http_client(timeout=self.timeout) as client:
                 response = client.post(url, headers=self.headers, json=payload)
                 response.raise_for_status()
                 
@@ -165,7 +169,7 @@ class StyleRepaintGenerator:
         url = f"{self.base_url}/tasks/{task_id}"
         
         try:
-            with httpx.Client(timeout=self.timeout) as client:
+            with http_client(timeout=self.timeout) as client:
                 response = client.get(url, headers={"Authorization": f"Bearer {self.api_key}"})
                 response.raise_for_status()
                 
@@ -267,6 +271,78 @@ class StyleRepaintGenerator:
             
         return self.wait_for_completion(response.task_id, timeout)
 
+    
+    def repaint_styles(
+        self,
+        image_url: str,
+        style_indices: Iterable[int],
+        max_workers: int = 8,
+        rate_limit: float = 2.0,
+        timeout: int = 300
+    ) -> Iterator[Tuple[int, Optional[ImageGenerationResponse], Optional[Exception]]]:
+        """
+        同一张人像并发使用多个预置风格重绘，结果按完成顺序产出
+        
+        输入图像只需编码一次，所有风格共用同一个 image_url；
+        任务创建受 rate_limit 限制，避免瞬间提交过多请求触发限流。
+        
+        Args:
+            image_url: 输入人物图像URL或Base64字符串
+            style_indices: 预置风格编号列表
+            max_workers: 最大并发任务数
+            rate_limit: 每秒最多创建的任务数，小于等于0表示不限制
+            timeout: 单个任务的最大等待时间（秒）
+            
+        Yields:
+            Tuple[int, Optional[ImageGenerationResponse], Optional[Exception]]:
+                (风格编号, 成功时的结果, 失败时的异常)
+        """
+        style_indices = list(style_indices)
+        for style_index in style_indices:
+            # 提前校验，避免部分任务提交后才发现参数错误
+            validation = StyleRepaintRequest(image_url=image_url, style_index=style_index).validate_style_params()
+            if not validation["valid"]:
+                raise ValueError("; ".join(validation["errors"]))
+        
+        limiter = RateLimiter(rate_limit)
+        
+        def run(style_index: int) -> ImageGenerationResponse:
+            limiter.acquire()
+            task = self._create_task(StyleRepaintRequest(image_url=image_url, style_index=style_index))
+            return self.wait_for_completion(task.task_id, timeout)
+        
+        with ContextThreadPoolExecutor(max_workers=max(1, min(max_workers, len(style_indices)))) as executor:
+            futures = {executor.submit(run, style_index): style_index for style_index in style_indices}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+    
+    def download_image(self, url: str, save_path: str, filename: str) -> str:
+        """
+        下载重绘结果
+        
+        Args:
+            url: 图像URL
+            save_path: 保存目录
+            filename: 文件名
+            
+        Returns:
+            str: 保存的文件路径
+        """
+        save_dir = Path(save_path)
+        save_dir.mkdir(parents=True, exist_ok=True)
+        file_path = save_dir / filename
+        
+        with http_client(timeout=60) as client:
+            response = client.get(url)
+            response.raise_for_status()
+            with open(file_path, 'wb') as f:
+                f.write(response.content)
+        
+        return str(file_path)
+
 
 # 便捷函数
 async def style_repaint_preset(
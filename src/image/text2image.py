@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import httpx
 import os
 from urllib.parse import urlparse, unquote
@@ -11,8 +11,14 @@ from .models import (
     TaskCreationResponse,
     TaskStatus,
     ImageResult,
-    ModelType
+    ModelType,
+    adapt_size_for_model
 )
+from ..utils.executors import ContextThreadPoolExecutor
+from ..utils.http_client import http_client
+
+# 万相模型 seed 取值上限
+MAX_SEED = 2147483647
 
 
 class Text2ImageGenerator:
@@ -87,7 +93,7 @@ class Text2ImageGenerator:
         if request.negative_prompt:
             payload["input"]["negative_prompt"] = request.negative_prompt
             
-        with httpx.Client(timeout=self.timeout) as client:
+        with http_client(timeout=self.timeout) as client:
             for attempt in range(self.max_retries):
                 try:
                     response = client.post(url, headers=self.headers, json=payload)
@@ -126,7 +132,7 @@ class Text2ImageGenerator:
         """
         url = f"{self.base_url}/tasks/{task_id}"
         
-        with httpx.Client(timeout=self.timeout) as client:
+        with http_client(timeout=self.timeout) as client:
             response = client.get(url, headers={"Authorization": f"Bearer {self.api_key}"})
             response.raise_for_status()
             
@@ -195,6 +201,11 @@ class Text2ImageGenerator:
             
             time.sleep(poll_interval)
     
+    @staticmethod
+    def max_images_per_task(model: str) -> int:
+        """单个任务最多生成的图片数量：千问1张，万相4张"""
+        return 1 if model == ModelType.QWEN else 4
+    
     def generate_image(
         self, 
         prompt: str,
@@ -210,22 +221,38 @@ class Text2ImageGenerator:
         """
         生成图像（同步方法）
         
+        n 超过模型单个任务的上限时，自动拆分为多个并发子任务，见 generate_images。
+        千问模型的尺寸不在支持列表中时，调整为宽高比最接近的支持尺寸。
+        
         Args:
             prompt: 正向提示词
             negative_prompt: 反向提示词
             size: 图像尺寸
             prompt_extend: 是否开启智能改写
             watermark: 是否添加水印
+            n: 生成图片数量
+            seed: 随机种子
             **kwargs: 其他参数
             
         Returns:
             ImageGenerationResponse: 生成结果
         """
-        from .models import ImageGenerationRequest, ImageSize
+        # 千问模型只支持固定尺寸（见 MODEL_CAPABILITIES），不支持的尺寸换为宽高比最接近的固定尺寸
+        if model == ModelType.QWEN:
+            size = adapt_size_for_model(size, model)
         
-        # 处理千问模型的尺寸限制
-        if model == ModelType.QWEN and size not in ["1328*1328", "1664*928", "1472*1140", "1140*1472", "928*1664"]:
-            size = "1328*1328"  # 千问模型默认尺寸
+        if n > self.max_images_per_task(model):
+            return self.generate_images(
+                prompt=prompt,
+                n=n,
+                negative_prompt=negative_prompt,
+                size=size,
+                model=model,
+                prompt_extend=prompt_extend,
+                watermark=watermark,
+                seed=seed,
+                **kwargs
+            )
         
         request = ImageGenerationRequest(
             prompt=prompt,
@@ -245,6 +272,128 @@ class Text2ImageGenerator:
         # 等待完成
         return self.wait_for_completion(task.task_id)
     
+    def generate_images(
+        self,
+        prompt: str,
+        n: int,
+        negative_prompt: Optional[str] = None,
+        size: str = "1024*1024",
+        model: str = ModelType.WAN2_2_FLASH,
+        prompt_extend: bool = True,
+        watermark: bool = False,
+        seed: Optional[int] = None,
+        max_workers: int = 8,
+        poll_interval: float = 3.0,
+        timeout: float = 300.0,
+        **kwargs
+    ) -> ImageGenerationResponse:
+        """
+        生成任意数量的图像
+        
+        按模型上限拆分为多个子任务并发执行，结果按子任务顺序合并到一个响应中。
+        指定 seed 时，第 k 张图片（从0开始）对应的种子为 seed + k，与单个任务内的种子递增规则一致。
+        部分子任务失败时返回成功的结果，失败信息记录在 errors 中。
+        
+        Args:
+            prompt: 正向提示词
+            n: 生成图片总数
+            negative_prompt: 反向提示词
+            size: 图像尺寸
+            model: 模型名称
+            prompt_extend: 是否开启智能改写
+            watermark: 是否添加水印
+            seed: 随机种子
+            max_workers: 最大并发子任务数
+            poll_interval: 轮询间隔（秒）
+            timeout: 单个子任务的超时时间（秒）
+            **kwargs: 其他参数
+            
+        Returns:
+            ImageGenerationResponse: 合并后的生成结果
+            
+        Raises:
+            ValueError: 参数错误
+            Exception: 所有子任务均失败
+        """
+        if n < 1:
+            raise ValueError("生成图片数量必须大于0")
+        
+        per_task = self.max_images_per_task(model)
+        offsets = list(range(0, n, per_task))
+        
+        def run(offset: int) -> ImageGenerationResponse:
+            request = ImageGenerationRequest(
+                prompt=prompt,
+                negative_prompt=negative_prompt,
+                size=size,
+                model=model,
+                prompt_extend=prompt_extend,
+                watermark=watermark,
+                n=min(per_task, n - offset),
+                seed=None if seed is None else (seed + offset) % (MAX_SEED + 1),
+                **kwargs
+            )
+            task = self.create_task(request)
+            return self.wait_for_completion(task.task_id, poll_interval=poll_interval, timeout=timeout)
+        
+        with ContextThreadPoolExecutor(max_workers=max(1, min(max_workers, len(offsets)))) as executor:
+            futures = [executor.submit(run, offset) for offset in offsets]
+        
+        responses = []
+        errors = []
+        for future in futures:
+            try:
+                responses.append(future.result())
+            except Exception as e:
+                errors.append(str(e))
+        
+        if not responses:
+            raise Exception(f"所有子任务均失败: {'; '.join(errors)}")
+        
+        results = [result for response in responses for result in response.results or []]
+        return ImageGenerationResponse(
+            task_id=responses[0].task_id,
+            task_status=TaskStatus.SUCCEEDED,
+            submit_time=min((r.submit_time for r in responses if r.submit_time), default=None),
+            scheduled_time=min((r.scheduled_time for r in responses if r.scheduled_time), default=None),
+            end_time=max((r.end_time for r in responses if r.end_time), default=None),
+            results=results,
+            image_count=sum(r.image_count or len(r.results or []) for r in responses),
+            request_id=responses[0].request_id,
+            sub_task_ids=[r.task_id for r in responses],
+            errors=errors or None
+        )
+    
+    def download_images(
+        self,
+        urls: List[str],
+        save_path: str,
+        filename: Optional[str] = None,
+        max_workers: int = 8
+    ) -> List[str]:
+        """
+        并发下载多张图像
+        
+        Args:
+            urls: 图像URL列表
+            save_path: 保存目录
+            filename: 文件名，第一张使用原文件名，其余依次添加 _2、_3 后缀；为None时从URL中提取
+            max_workers: 最大并发下载数
+            
+        Returns:
+            List[str]: 保存的文件路径，顺序与 urls 一致
+        """
+        filenames = [None] * len(urls)
+        if filename:
+            stem, suffix = Path(filename).stem, Path(filename).suffix
+            filenames = [filename if i == 1 else f"{stem}_{i}{suffix}" for i in range(1, len(urls) + 1)]
+        
+        if len(urls) <= 1:
+            return [self.download_image(url, save_path, name) for url, name in zip(urls, filenames)]
+        
+        with ContextThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            return list(executor.map(lambda item: self.download_image(item[0], save_path, item[1]), zip(urls, filenames)))
+    
     def download_image(
         self,
         url: str,
@@ -269,7 +418,7 @@ class Text2ImageGenerator:
         save_dir.mkdir(parents=True, exist_ok=True)
         file_path = save_dir / filename
         
-        with httpx.Client() as client:
+        with http_client() as client:
             response = client.get(url)
             response.raise_for_status()
             
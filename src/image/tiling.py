@@ -0,0 +1,449 @@
+"""
+大图分块编辑
+将超出模型输入限制的大图切分为带重叠的分块并发处理，
+再用羽化权重拼接回整图，浮点累加缓冲区只保留一行分块的高度；
+PNG 输出在每行分块完成后逐行编码写入文件，不在内存中保留整张输出图像
+"""
+
+import base64
+import io
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+from pydantic import BaseModel, Field
+
+from ..utils.executors import ContextThreadPoolExecutor
+from ..utils.http_client import http_client
+from .image_edit import ImageEditor
+from .models import ModelType
+
+# 万相图像编辑输入图像的边长范围
+WANX_EDIT_MIN_SIDE = 512
+WANX_EDIT_MAX_SIDE = 4096
+
+# 只影响局部像素、可以逐块处理的功能（扩图、线稿生图等会改变构图，不能分块）
+TILEABLE_FUNCTIONS = {
+    "super_resolution",
+    "remove_watermark",
+    "colorization",
+    "stylization_all",
+    "stylization_local",
+    "description_edit",
+}
+
+# 部分功能的默认提示词
+DEFAULT_PROMPTS = {
+    "remove_watermark": "去除水印",
+    "super_resolution": "图片超分",
+}
+
+
+class TiledEditResult(BaseModel):
+    """分块编辑结果"""
+    output_path: str = Field(..., description="输出文件路径")
+    width: int = Field(..., description="输出宽度")
+    height: int = Field(..., description="输出高度")
+    columns: int = Field(..., description="分块列数")
+    rows: int = Field(..., description="分块行数")
+    task_ids: List[str] = Field(default_factory=list, description="各分块的任务ID")
+    seam_count: int = Field(default=0, description="重叠区域数量")
+    seam_error_mean: float = Field(default=0.0, description="重叠区域内相邻分块的平均绝对差（0-255）")
+    seam_error_max: float = Field(default=0.0, description="单个重叠区域的最大平均绝对差（0-255）")
+    elapsed: float = Field(default=0.0, description="耗时（秒）")
+
+
+def tile_spans(length: int, tile: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    计算一个方向上的分块区间
+
+    分块均匀分布并覆盖整个边长，相邻分块的实际重叠不小于 overlap。
+
+    Args:
+        length: 边长
+        tile: 分块边长
+        overlap: 最小重叠像素
+
+    Returns:
+        List[Tuple[int, int]]: (起点, 终点) 列表
+    """
+    if length <= tile:
+        return [(0, length)]
+    count = -(-(length - overlap) // (tile - overlap))
+    step = (length - tile) / (count - 1)
+    return [(round(i * step), round(i * step) + tile) for i in range(count)]
+
+
+def feather_weights(length: int, before: int, after: int) -> np.ndarray:
+    """
+    一个方向上的羽化权重
+
+    两端重叠区域内线性过渡，相邻分块在同一重叠区域内的权重之和为1。
+
+    Args:
+        length: 分块边长
+        before: 与前一个分块的重叠像素
+        after: 与后一个分块的重叠像素
+
+    Returns:
+        np.ndarray: float32 权重
+    """
+    weights = np.ones(length, dtype=np.float32)
+    if before > 0:
+        weights[:before] = (np.arange(before, dtype=np.float32) + 0.5) / before
+    if after > 0:
+        weights[length - after:] = np.minimum(
+            weights[length - after:],
+            (np.arange(after, 0, -1, dtype=np.float32) - 0.5) / after
+        )
+    return weights
+
+
+class PngStreamWriter:
+    """
+    逐行写入的 RGB PNG 编码器
+
+    每次写入若干行像素，按 Paeth 预测滤波后交给 zlib 压缩，压缩输出随时写为 IDAT 块，
+    内存占用与图像宽度有关，与图像高度无关。
+    """
+
+    # 每批滤波压缩的行数
+    BATCH_ROWS = 64
+
+    def __init__(self, path: str, width: int, height: int, compress_level: int = 6):
+        """
+        创建 PNG 文件并写入文件头
+
+        Args:
+            path: 输出路径
+            width: 图像宽度
+            height: 图像高度
+            compress_level: zlib 压缩级别
+        """
+        self.path = path
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._previous = np.zeros((1, width, 3), dtype=np.int16)
+        self._compressor = zlib.compressobj(compress_level)
+        self._file = open(path, "wb")
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        self._file.write(struct.pack(">I", len(data)) + kind + data)
+        self._file.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """
+        写入若干行像素
+
+        Args:
+            rows: (行数, 宽度, 3) 的 uint8 数组
+        """
+        # 滤波的中间数组为 int16，按固定行数分批处理，临时内存与一次写入的行数无关
+        for offset in range(0, len(rows), self.BATCH_ROWS):
+            self._write_batch(rows[offset:offset + self.BATCH_ROWS])
+
+    def _write_batch(self, rows: np.ndarray) -> None:
+        current = rows.astype(np.int16)
+        up = np.concatenate((self._previous, current[:-1]))
+        left = np.zeros_like(current)
+        left[:, 1:] = current[:, :-1]
+        upper_left = np.zeros_like(current)
+        upper_left[:, 1:] = up[:, :-1]
+        # Paeth 预测：选择 左、上、左上 中最接近 左 + 上 - 左上 的一个
+        pa = np.abs(up - upper_left)
+        pb = np.abs(left - upper_left)
+        pc = np.abs(left + up - 2 * upper_left)
+        predictor = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upper_left))
+        filtered = ((current - predictor) & 0xFF).astype(np.uint8).reshape(len(rows), -1)
+
+        lines = np.empty((len(rows), filtered.shape[1] + 1), dtype=np.uint8)
+        lines[:, 0] = 4
+        lines[:, 1:] = filtered
+        data = self._compressor.compress(lines.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+        self._previous = current[-1:]
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        """写入剩余的压缩数据和文件尾"""
+        if self.rows_written != self.height:
+            raise ValueError(f"PNG 行数不完整：已写入 {self.rows_written}/{self.height} 行")
+        self._chunk(b"IDAT", self._compressor.flush())
+        self._chunk(b"IEND", b"")
+        self._file.close()
+
+    def abort(self) -> None:
+        """放弃写入并删除不完整的文件"""
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class _CanvasWriter:
+    """非 PNG 输出：在内存中拼出整张图像后由 PIL 按扩展名编码"""
+
+    def __init__(self, path: str, width: int, height: int):
+        self.path = path
+        self.canvas = np.empty((height, width, 3), dtype=np.uint8)
+        self.rows_written = 0
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        self.canvas[self.rows_written:self.rows_written + len(rows)] = rows
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        Image.fromarray(self.canvas).save(self.path)
+
+    def abort(self) -> None:
+        pass
+
+
+class TiledEditor:
+    """大图分块编辑器"""
+
+    def __init__(
+        self,
+        editor: Optional[ImageEditor] = None,
+        api_key: Optional[str] = None,
+        tile_size: int = 1024,
+        overlap: int = 128,
+        max_workers: int = 4,
+        retries: int = 2
+    ):
+        """
+        初始化分块编辑器
+
+        Args:
+            editor: 复用的图像编辑器
+            api_key: 阿里云百炼API密钥，未提供 editor 时使用
+            tile_size: 分块边长（输入图像像素）
+            overlap: 相邻分块的最小重叠像素
+            max_workers: 最大并发分块数
+            retries: 单个分块失败后的重试次数
+
+        Raises:
+            ValueError: 参数超出范围
+        """
+        if not WANX_EDIT_MIN_SIDE <= tile_size <= WANX_EDIT_MAX_SIDE:
+            raise ValueError(f"分块边长需在 {WANX_EDIT_MIN_SIDE}-{WANX_EDIT_MAX_SIDE} 像素之间")
+        if not 0 <= overlap * 2 <= tile_size:
+            raise ValueError("重叠像素不能超过分块边长的一半")
+        self.editor = editor or ImageEditor(api_key=api_key)
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.max_workers = max_workers
+        self.retries = retries
+
+    def load_image(self, source: Union[str, Image.Image]) -> Image.Image:
+        """读取本地文件或URL中的图像"""
+        if isinstance(source, Image.Image):
+            return source.convert("RGB")
+        if self.editor.is_url(source):
+            with http_client() as client:
+                response = client.get(source)
+                response.raise_for_status()
+            return Image.open(io.BytesIO(response.content)).convert("RGB")
+        with Image.open(source) as image:
+            return image.convert("RGB")
+
+    def process(
+        self,
+        source: Union[str, Image.Image],
+        output_path: str,
+        function: str = "super_resolution",
+        prompt: Optional[str] = None,
+        **params
+    ) -> TiledEditResult:
+        """
+        分块编辑整张图像
+
+        每个分块以内存中的PNG（Base64）提交，结果直接下载到内存；
+        处理当前行时下一行分块已经提交，累加缓冲区只覆盖当前行分块的高度。
+
+        内存占用（T 为输出的分块边长，即 tile_size × 放大倍数）：
+        - 输入图像整张解码：输入宽×高×4 字节
+        - 当前行和已提交的下一行的分块结果：2 × 列数 × T² × 12 字节（float32 RGB）
+        - 拼接缓冲区：T × 输出宽度 × 16 字节（float32 像素和权重）
+        - 输出为 .png 时逐行编码写入文件，不保留整张输出图像；其他格式需要在内存中
+          保留整张输出图像（输出宽×高×3 字节，PIL 编码时另需约 4 字节/像素）
+
+        Args:
+            source: 输入图像（本地文件、URL或已打开的图像）
+            output_path: 输出文件路径
+            function: 万相编辑功能类型
+            prompt: 编辑提示词
+            **params: 其他编辑参数（如 upscale_factor、strength）
+
+        Returns:
+            TiledEditResult: 分块编辑结果
+
+        Raises:
+            ValueError: 功能不支持分块或图像过小
+            RuntimeError: 分块处理失败
+        """
+        if function not in TILEABLE_FUNCTIONS:
+            raise ValueError(f"功能 {function} 不支持分块处理，支持：{', '.join(sorted(TILEABLE_FUNCTIONS))}")
+
+        start = time.time()
+        image = self.load_image(source)
+        width, height = image.size
+        if min(width, height) < WANX_EDIT_MIN_SIDE:
+            raise ValueError(f"图像边长小于 {WANX_EDIT_MIN_SIDE} 像素，无需分块")
+
+        scale = int(params.get("upscale_factor") or 1) if function == "super_resolution" else 1
+        prompt = prompt or DEFAULT_PROMPTS.get(function, "")
+        xs = tile_spans(width, self.tile_size, self.overlap)
+        ys = tile_spans(height, self.tile_size, self.overlap)
+
+        writer_class = PngStreamWriter if str(output_path).lower().endswith(".png") else _CanvasWriter
+        writer = writer_class(str(output_path), width * scale, height * scale)
+        task_ids: List[str] = []
+        seam_errors: List[float] = []
+
+        try:
+            self._stitch(image, xs, ys, scale, function, prompt, params, writer, task_ids, seam_errors)
+            writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+
+        return TiledEditResult(
+            output_path=str(output_path),
+            width=width * scale,
+            height=height * scale,
+            columns=len(xs),
+            rows=len(ys),
+            task_ids=task_ids,
+            seam_count=len(seam_errors),
+            seam_error_mean=round(float(np.mean(seam_errors)), 3) if seam_errors else 0.0,
+            seam_error_max=round(float(np.max(seam_errors)), 3) if seam_errors else 0.0,
+            elapsed=round(time.time() - start, 3)
+        )
+
+    def _stitch(
+        self,
+        image: Image.Image,
+        xs: List[Tuple[int, int]],
+        ys: List[Tuple[int, int]],
+        scale: int,
+        function: str,
+        prompt: str,
+        params: Dict,
+        writer: Union[PngStreamWriter, _CanvasWriter],
+        task_ids: List[str],
+        seam_errors: List[float]
+    ) -> None:
+        """逐行提交分块并拼接，每行完成后把不会再被覆盖的像素行交给 writer"""
+        width = image.width
+        carry: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        with ContextThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit_row(row: int) -> List[Future]:
+                top, bottom = ys[row]
+                return [
+                    executor.submit(self._edit_tile, image.crop((left, top, right, bottom)), scale, function, prompt, params)
+                    for left, right in xs
+                ]
+
+            pending = submit_row(0)
+            for row, (top, bottom) in enumerate(ys):
+                current = pending
+                if row + 1 < len(ys):
+                    pending = submit_row(row + 1)
+
+                band = np.zeros(((bottom - top) * scale, width * scale, 3), dtype=np.float32)
+                weight = np.zeros(band.shape[:2] + (1,), dtype=np.float32)
+                if carry is not None:
+                    band[:len(carry[0])] = carry[0]
+                    weight[:len(carry[1])] = carry[1]
+
+                row_weights = feather_weights(
+                    band.shape[0],
+                    (ys[row - 1][1] - top) * scale if row > 0 else 0,
+                    (bottom - ys[row + 1][0]) * scale if row + 1 < len(ys) else 0
+                )
+                for col, future in enumerate(current):
+                    try:
+                        tile, task_id = future.result()
+                    except Exception as e:
+                        for other in pending:
+                            other.cancel()
+                        raise RuntimeError(f"分块 ({row}, {col}) 处理失败：{e}") from e
+                    task_ids.append(task_id)
+
+                    left, right = xs[col][0] * scale, xs[col][1] * scale
+                    col_weights = feather_weights(
+                        right - left,
+                        (xs[col - 1][1] - xs[col][0]) * scale if col > 0 else 0,
+                        (xs[col][1] - xs[col + 1][0]) * scale if col + 1 < len(xs) else 0
+                    )
+                    tile_weight = (row_weights[:, None] * col_weights[None, :])[..., None]
+
+                    region = band[:, left:right]
+                    region_weight = weight[:, left:right]
+                    # 与已写入的分块重叠的像素上比较两者结果，衡量接缝处的不一致程度
+                    covered = region_weight[..., 0] > 0
+                    if covered.any():
+                        blended = region[covered] / region_weight[covered]
+                        seam_errors.append(float(np.abs(tile[covered] - blended).mean()))
+
+                    tile *= tile_weight
+                    region += tile
+                    region_weight += tile_weight
+
+                # 下一行起点之前的部分不会再被覆盖，写入输出；其余部分带入下一行
+                done = (ys[row + 1][0] - top) * scale if row + 1 < len(ys) else band.shape[0]
+                for offset in range(0, done, PngStreamWriter.BATCH_ROWS):
+                    end = min(done, offset + PngStreamWriter.BATCH_ROWS)
+                    writer.write_rows(np.clip(
+                        band[offset:end] / np.maximum(weight[offset:end], 1e-6), 0, 255
+                    ).round().astype(np.uint8))
+                carry = (band[done:].copy(), weight[done:].copy())
+
+    def _edit_tile(
+        self,
+        tile: Image.Image,
+        scale: int,
+        function: str,
+        prompt: str,
+        params: Dict
+    ) -> Tuple[np.ndarray, str]:
+        """处理单个分块，返回 (float32 像素数组, 任务ID)"""
+        buffer = io.BytesIO()
+        tile.save(buffer, format="PNG")
+        image_url = "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("utf-8")
+        expected = (tile.width * scale, tile.height * scale)
+
+        last_error: Optional[Exception] = None
+        for _ in range(self.retries + 1):
+            try:
+                response = self.editor.edit_image(
+                    model=ModelType.WANX_EDIT,
+                    image_url=image_url,
+                    prompt=prompt,
+                    function=function,
+                    **params
+                )
+                if not response.results or not response.results[0].url:
+                    raise RuntimeError("未获取到结果")
+                with http_client() as client:
+                    result = client.get(response.results[0].url)
+                    result.raise_for_status()
+                edited = Image.open(io.BytesIO(result.content)).convert("RGB")
+                # 部分功能的输出尺寸与输入不完全一致，统一缩放到期望尺寸后再拼接
+                if edited.size != expected:
+                    edited = edited.resize(expected, Image.LANCZOS)
+                return np.asarray(edited, dtype=np.float32), response.task_id
+            except Exception as e:
+                last_error = e
+        raise last_error
@@ -1,3 +1,27 @@
 """
 工具函数模块
-"""
\ No newline at end of file
+"""
+
+from .._lazy import lazy_exports
+
+# 导出名称 -> 所在子模块，首次访问时才导入（PEP 562）
+# mask_utils/contact_sheet 依赖 PIL/numpy，仅在使用相应功能时加载
+_LAZY_EXPORTS = {
+    "PromptFileReader": ".file_utils",
+    "BatchProcessor": ".file_utils",
+    "JsonlResultWriter": ".file_utils",
+    "ParameterSweep": ".sweep",
+    "encode_file_to_base64": ".file_utils",
+    "MaskCreator": ".mask_utils",
+    "MaskValidator": ".mask_utils",
+    "MaskCanvas": ".mask_utils",
+    "iter_mask_batch": ".mask_batch",
+    "build_contact_sheet": ".contact_sheet",
+    "RateLimiter": ".rate_limit",
+    "set_shared_client": ".http_client",
+    "create_pooled_client": ".http_client",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_EXPORTS)
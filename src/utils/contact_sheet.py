@@ -0,0 +1,84 @@
+"""
+对比图拼接工具
+将多张图片按网格缩放拼接，并在每张图片下方标注说明
+"""
+
+import math
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+def _load_font(font_path: Optional[str], size: int):
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    try:
+        # Pillow >= 10.1 的默认字体支持指定字号
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def build_contact_sheet(
+    items: Sequence[Tuple[Optional[str], str]],
+    output_path: str,
+    columns: Optional[int] = None,
+    cell_size: int = 384,
+    label_height: int = 48,
+    padding: int = 8,
+    font_path: Optional[str] = None,
+    background: Tuple[int, int, int] = (255, 255, 255)
+) -> str:
+    """
+    生成带标注的对比图
+
+    Args:
+        items: (图片路径, 标注文字) 列表，图片路径为None时显示空白占位（如生成失败）
+        output_path: 输出文件路径
+        columns: 列数，默认为全部放在一行（超过6张时自动换行）
+        cell_size: 每张图片缩放后的最大边长
+        label_height: 标注区域高度
+        padding: 图片间距
+        font_path: 标注字体文件路径，标注包含中文时需指定支持中文的字体
+        background: 背景颜色
+
+    Returns:
+        str: 输出文件路径
+
+    Raises:
+        ValueError: 没有图片
+    """
+    if not items:
+        raise ValueError("没有可拼接的图片")
+
+    columns = columns or min(len(items), 6)
+    rows = math.ceil(len(items) / columns)
+    cell_width = cell_size + padding
+    cell_height = cell_size + label_height + padding
+
+    sheet = Image.new("RGB", (columns * cell_width + padding, rows * cell_height + padding), background)
+    draw = ImageDraw.Draw(sheet)
+    font = _load_font(font_path, max(10, label_height // 3))
+
+    for index, (image_path, label) in enumerate(items):
+        left = padding + (index % columns) * cell_width
+        top = padding + (index // columns) * cell_height
+
+        if image_path:
+            with Image.open(image_path) as image:
+                # draft 模式让 JPEG 在解码时直接缩小，避免完整解码大图
+                image.draft("RGB", (cell_size, cell_size))
+                image = image.convert("RGB")
+                image.thumbnail((cell_size, cell_size))
+                offset = ((cell_size - image.width) // 2, (cell_size - image.height) // 2)
+                sheet.paste(image, (left + offset[0], top + offset[1]))
+        else:
+            draw.rectangle([left, top, left + cell_size - 1, top + cell_size - 1], outline=(200, 200, 200))
+
+        draw.multiline_text((left + 4, top + cell_size + 4), label, fill=(0, 0, 0), font=font, spacing=2)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    sheet.save(output_path)
+    return str(output_path)
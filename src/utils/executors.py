@@ -0,0 +1,20 @@
+"""
+线程池工具
+"""
+
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    在提交线程上下文副本中执行任务的线程池
+
+    标准 ThreadPoolExecutor 的工作线程不继承提交方的 contextvars；
+    守护进程按上下文把各请求的输出路由到对应客户端，子命令内部的线程池使用本类，
+    任务中的 print 输出才能发给发起请求的客户端。map 同样经由 submit，行为一致。
+    """
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
@@ -7,8 +7,11 @@ import json
 import os
 import base64
 import mimetypes
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Iterable, Iterator, Callable, Tuple
+
+from .executors import ContextThreadPoolExecutor
 
 
 class PromptFileReader:
@@ -30,6 +33,23 @@ class PromptFileReader:
         Returns:
             List[str]: 提示词列表
             
+        Raises:
+            FileNotFoundError: 文件不存在
+            IOError: 读取文件失败
+        """
+        return list(PromptFileReader.iter_text_file(filepath))
+    
+    @staticmethod
+    def iter_text_file(filepath: str) -> Iterator[str]:
+        """
+        逐行读取文本文件中的提示词（惰性生成，不一次性载入整个文件）
+        
+        Args:
+            filepath: 文本文件路径
+            
+        Yields:
+            str: 提示词
+            
         Raises:
             FileNotFoundError: 文件不存在
             IOError: 读取文件失败
@@ -38,18 +58,56 @@ class PromptFileReader:
         if not filepath.exists():
             raise FileNotFoundError(f"文件不存在: {filepath}")
         
-        prompts = []
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 for line in f:
                     line = line.strip()
                     # 跳过空行和注释行
                     if line and not line.startswith('#'):
-                        prompts.append(line)
-        except Exception as e:
+                        yield line
+        except UnicodeDecodeError as e:
             raise IOError(f"读取文件失败: {e}")
+    
+    @staticmethod
+    def iter_jsonl_file(filepath: str, start_line: int = 1) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        逐行读取JSONL文件，每行一个请求配置（惰性生成，内存占用与文件大小无关）
+        
+        支持格式：
+        {"prompt": "一只猫", "size": "1024*1024", "filename": "cat.png"}
+        {"prompt": "一只狗", "model": "qwen-image"}
         
-        return prompts
+        空行和以#开头的行会被忽略。
+        
+        Args:
+            filepath: JSONL文件路径
+            start_line: 起始行号（从1开始），用于断点续跑
+            
+        Yields:
+            Tuple[int, Dict]: (行号, 请求配置)
+            
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 某行不是JSON对象
+        """
+        filepath = Path(filepath)
+        if not filepath.exists():
+            raise FileNotFoundError(f"文件不存在: {filepath}")
+        
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if line_no < start_line:
+                    continue
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    config = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"第 {line_no} 行JSON格式错误: {e}")
+                if not isinstance(config, dict):
+                    raise ValueError(f"第 {line_no} 行必须是JSON对象")
+                yield line_no, config
     
     @staticmethod
     def read_json_file(filepath: str) -> List[Dict[str, Any]]:
@@ -116,6 +174,8 @@ class PromptFileReader:
         
         if filepath.suffix.lower() == '.json':
             return PromptFileReader.read_json_file(str(filepath))
+        elif filepath.suffix.lower() == '.jsonl':
+            return [config for _, config in PromptFileReader.iter_jsonl_file(str(filepath))]
         elif filepath.suffix.lower() in ['.txt', '.text']:
             return PromptFileReader.read_text_file(str(filepath))
         else:
@@ -135,7 +195,7 @@ class PromptFileReader:
         """
         validated = {
             'prompt': str(config.get('prompt', '')),
-            'negative_prompt': str(config.get('negative', config.get('negative_prompt', ''))),
+            'negative_prompt': str(config.get('negative', config.get('negative_prompt')) or ''),
             'size': str(config.get('size', '1328*1328')),
             'watermark': bool(config.get('watermark', False)),
             'prompt_extend': bool(config.get('prompt_extend', config.get('extend', True))),
@@ -146,33 +206,17 @@ class PromptFileReader:
         }
         
         # 验证模型特定参数
+        # n 超过单个任务上限（千问1张、万相4张）时由生成器拆分为多个子任务
         model = validated['model']
+        if validated['n'] < 1:
+            validated['n'] = 1
         if model == 'qwen-image':
             # 千问模型限制
-            validated['n'] = 1  # 只支持1张
             validated['seed'] = None  # 不支持seed参数
-        else:
-            # 万相模型限制
-            if validated['n'] > 4:
-                validated['n'] = 4
-            elif validated['n'] < 1:
-                validated['n'] = 1
-        
-        # 验证size - 根据模型选择有效尺寸范围
-        model = validated.get('model', 'wan2.2-t2i-flash')
-        if model == 'qwen-image':
-            valid_sizes = ['1328*1328', '1664*928', '1472*1140', '1140*1472', '928*1664']
-            if validated['size'] not in valid_sizes:
-                validated['size'] = '1328*1328'
-        else:
-            # 万相模型支持512-1440范围内的任意尺寸
-            size_str = validated['size']
-            try:
-                width, height = map(int, size_str.split('*'))
-                if not (512 <= width <= 1440 and 512 <= height <= 1440 and width * height <= 2000000):
-                    validated['size'] = '1024*1024'  # 万相默认尺寸
-            except (ValueError, IndexError):
-                validated['size'] = '1024*1024'
+        
+        # 验证size - 不支持的尺寸调整为该模型支持的宽高比最接近的尺寸
+        from ..image.models import adapt_size_for_model
+        validated['size'] = adapt_size_for_model(validated['size'], validated['model'])
         
         return validated
 
@@ -207,9 +251,151 @@ def encode_file_to_base64(file_path: str) -> str:
         raise IOError(f"文件读取失败: {e}")
 
 
+class JsonlResultWriter:
+    """
+    JSONL结果写入器
+    
+    每条结果写入一行并立即落盘，进程中断时已完成的结果不会丢失；
+    结果按输入顺序写入时，最后一行的行号即可作为断点续跑的位置。
+    """
+    
+    def __init__(self, filepath: str, append: bool = True):
+        """
+        打开结果文件
+        
+        Args:
+            filepath: 结果文件路径
+            append: 是否追加写入，False时覆盖已有文件
+        """
+        self.filepath = Path(filepath)
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.filepath, 'a' if append else 'w', encoding='utf-8')
+        # 上次中断时可能留下不完整的最后一行，补齐换行避免与新记录粘连
+        if append and self._ends_with_partial_line():
+            self._file.write("\n")
+    
+    def _ends_with_partial_line(self) -> bool:
+        if self.filepath.stat().st_size == 0:
+            return False
+        with open(self.filepath, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b'\n'
+    
+    def write(self, record: Dict[str, Any]) -> None:
+        """写入一条结果"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+    
+    def close(self) -> None:
+        """关闭结果文件"""
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    @staticmethod
+    def read_last_record(filepath: str, chunk_size: int = 8192) -> Optional[Dict[str, Any]]:
+        """
+        读取结果文件的最后一条完整记录（从文件末尾反向读取，不载入整个文件）
+        
+        Args:
+            filepath: 结果文件路径
+            chunk_size: 每次反向读取的字节数
+            
+        Returns:
+            Optional[Dict]: 最后一条记录，文件不存在或为空时返回None
+        """
+        filepath = Path(filepath)
+        if not filepath.exists():
+            return None
+        
+        with open(filepath, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            tail = b''
+            while position > 0:
+                read_size = min(chunk_size, position)
+                position -= read_size
+                f.seek(position)
+                tail = f.read(read_size) + tail
+                lines = tail.rstrip(b'\n').split(b'\n')
+                # 找到换行符或读到文件开头时，最后一行已完整
+                if len(lines) > 1 or position == 0:
+                    # 中断时可能留下不完整的最后一行，向前查找可解析的记录
+                    for line in reversed(lines if position == 0 else lines[1:]):
+                        try:
+                            return json.loads(line.decode('utf-8'))
+                        except (ValueError, UnicodeDecodeError):
+                            continue
+                    if position == 0:
+                        return None
+        return None
+
+
 class BatchProcessor:
     """批量处理器"""
     
+    @staticmethod
+    def map_ordered(
+        func: Callable[[Any], Any],
+        items: Iterable[Any],
+        jobs: int = 1,
+        window: Optional[int] = None,
+        drain: Optional[Callable[[Any], None]] = None
+    ) -> Iterator[Any]:
+        """
+        并发处理并按输入顺序产出结果
+        
+        同时提交的任务数不超过 window，输入按需读取，内存占用与输入规模无关。
+        中断（Ctrl+C）或出错提前退出时，尚未开始的任务被取消，已开始的任务仍会执行完，
+        其结果按输入顺序交给 drain（如写入结果文件），遇到被取消或失败的任务为止，之后再抛出原异常。
+        
+        Args:
+            func: 处理函数
+            items: 输入（可以是生成器）
+            jobs: 并发线程数
+            window: 最多同时提交的任务数，默认为 jobs 的两倍
+            drain: 提前退出时接收已开始任务结果的回调，None 表示丢弃这些结果
+            
+        Yields:
+            func 的返回值，顺序与输入一致
+        """
+        if jobs <= 1:
+            for item in items:
+                yield func(item)
+            return
+        
+        window = max(window or jobs * 2, jobs)
+        pending = deque()
+        
+        def next_result():
+            # 取得结果后才出队，等待期间中断时该任务仍在 pending 中，由 finally 处理
+            result = pending[0].result()
+            pending.popleft()
+            return result
+        
+        with ContextThreadPoolExecutor(max_workers=jobs) as executor:
+            try:
+                for item in items:
+                    pending.append(executor.submit(func, item))
+                    if len(pending) >= window:
+                        yield next_result()
+                while pending:
+                    yield next_result()
+            finally:
+                for future in pending:
+                    future.cancel()
+                if drain is not None:
+                    # 只交出连续的结果，保证按最后一条记录续跑（--resume）时不会跳过任务
+                    for future in pending:
+                        if future.cancelled() or future.exception() is not None:
+                            break
+                        drain(future.result())
+    
     @staticmethod
     def create_batch_config(
         prompts: List[str],
@@ -0,0 +1,108 @@
+"""
+HTTP客户端工具
+提供进程内共享的httpx连接池，供常驻进程（如CLI守护进程）复用TLS连接
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import httpx
+
+
+_shared_client: Optional[httpx.Client] = None
+_shared_lock = threading.Lock()
+
+
+def set_shared_client(client: Optional[httpx.Client]) -> Optional[httpx.Client]:
+    """
+    设置进程内共享的HTTP客户端
+
+    设置后所有生成器的请求都复用该客户端的连接池，传入None恢复为每次请求新建客户端。
+
+    Args:
+        client: 共享的httpx客户端，None表示取消共享
+
+    Returns:
+        Optional[httpx.Client]: 之前设置的共享客户端
+    """
+    global _shared_client
+    with _shared_lock:
+        previous = _shared_client
+        _shared_client = client
+    return previous
+
+
+def get_shared_client() -> Optional[httpx.Client]:
+    """获取当前共享的HTTP客户端，未设置时返回None"""
+    return _shared_client
+
+
+def create_pooled_client(
+    timeout: float = 30.0,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20
+) -> httpx.Client:
+    """
+    创建带连接池的HTTP客户端
+
+    Args:
+        timeout: 默认请求超时时间（秒）
+        max_connections: 最大连接数
+        max_keepalive_connections: 最大保活连接数
+
+    Returns:
+        httpx.Client: 客户端实例
+    """
+    return httpx.Client(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+    )
+
+
+class _RequestTimeoutClient:
+    """共享客户端的包装：请求时带上调用方指定的超时，其他属性直接转发给共享客户端"""
+
+    _REQUEST_METHODS = {"request", "stream", "get", "options", "head", "post", "put", "patch", "delete"}
+
+    def __init__(self, client: httpx.Client, timeout):
+        self._client = client
+        self._timeout = timeout
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in self._REQUEST_METHODS:
+            return attr
+
+        def call(*args, **kwargs):
+            kwargs.setdefault("timeout", self._timeout)
+            return attr(*args, **kwargs)
+
+        return call
+
+
+@contextmanager
+def http_client(**kwargs) -> Iterator[httpx.Client]:
+    """
+    获取HTTP客户端
+
+    已设置共享客户端时直接复用（不会关闭），传入的 timeout 应用到每个请求上，
+    其他参数属于连接池级别的配置，以共享客户端的设置为准；
+    未设置共享客户端时按参数新建客户端并在退出时关闭。
+
+    Args:
+        **kwargs: 新建httpx.Client时使用的参数
+
+    Yields:
+        httpx.Client: 客户端实例
+    """
+    client = _shared_client
+    if client is not None:
+        yield _RequestTimeoutClient(client, kwargs["timeout"]) if "timeout" in kwargs else client
+        return
+
+    with httpx.Client(**kwargs) as client:
+        yield client
@@ -0,0 +1,209 @@
+"""
+批量mask生成与验证
+按清单或通配符展开图像，在进程池中并发生成mask并统计编辑区域
+"""
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .mask_utils import MaskCanvas, mask_stats
+
+# 目录输入时收集的图像格式
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+
+# 生成mask时使用的规格字段
+SPEC_KEYS = ("shapes", "color", "min_coverage", "max_coverage")
+
+
+def load_mask_manifest(filepath: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    读取mask清单
+
+    清单格式：
+    {
+        "output_directory": "./output/masks",
+        "defaults": {"color": {"target": [0, 255, 0], "tolerance": 20, "metric": "lab"}},
+        "items": [
+            {"image": "a.jpg"},
+            {"image": "b.jpg", "output": "b_sky.png", "shapes": [{"type": "rectangle", "x": 0, "y": 0, "width": 800, "height": 200}]}
+        ]
+    }
+
+    相对路径按清单所在目录解析，items 中的字段覆盖 defaults。
+
+    Args:
+        filepath: 清单文件路径
+
+    Returns:
+        Tuple[List[Dict], Optional[str]]: (任务列表, 清单指定的输出目录)
+    """
+    filepath = Path(filepath)
+    with open(filepath, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("items"), list):
+        raise ValueError("mask清单格式错误：需要包含'items'数组")
+
+    defaults = {key: value for key, value in manifest.get("defaults", {}).items() if key in SPEC_KEYS}
+    items = []
+    for entry in manifest["items"]:
+        if isinstance(entry, str):
+            entry = {"image": entry}
+        if not entry.get("image"):
+            raise ValueError(f"mask清单条目缺少 image 字段：{entry}")
+        item = {**defaults, **entry}
+        image = Path(item["image"])
+        item["image"] = str(image if image.is_absolute() else filepath.parent / image)
+        items.append(item)
+
+    output_dir = manifest.get("output_directory")
+    if output_dir and not Path(output_dir).is_absolute():
+        output_dir = str(filepath.parent / output_dir)
+    return items, output_dir
+
+
+def expand_image_inputs(patterns: Iterable[str]) -> List[str]:
+    """
+    展开图像文件、目录和通配符
+
+    Args:
+        patterns: 文件路径、目录或通配符
+
+    Returns:
+        List[str]: 去重并保持顺序的图像路径
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(
+                str(path) for path in Path(pattern).iterdir()
+                if path.suffix.lower() in IMAGE_EXTENSIONS
+            )
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+
+def assign_outputs(items: List[Dict[str, Any]], output_dir: str) -> List[Dict[str, Any]]:
+    """为未指定 output 的任务分配输出路径 <输出目录>/<图像名>_mask.png，重名时追加序号"""
+    used = set()
+    for item in items:
+        output = item.get("output")
+        if not output:
+            stem = Path(item["image"]).stem
+            output, suffix = f"{stem}_mask.png", 2
+            while output in used:
+                output, suffix = f"{stem}_mask_{suffix}.png", suffix + 1
+        used.add(output)
+        if not Path(output).is_absolute():
+            output = str(Path(output_dir) / output)
+        item["output"] = output
+    return items
+
+
+def build_mask(image: str, spec: Dict[str, Any]) -> MaskCanvas:
+    """
+    按规格生成mask
+
+    Args:
+        image: 图像路径
+        spec: color（颜色选区参数，见 MaskCanvas.from_color）和/或 shapes（形状列表，见 MaskCanvas.apply）
+
+    Returns:
+        MaskCanvas: mask画布
+    """
+    color = spec.get("color")
+    shapes = spec.get("shapes") or []
+    if not color and not shapes:
+        raise ValueError("mask规格至少需要 color 或 shapes")
+
+    if color:
+        params = dict(color)
+        target = params.pop("target", None) or params.pop("target_color", None)
+        if target is None:
+            raise ValueError("color 规格缺少 target 颜色")
+        if "fill_holes" in params:
+            params["holes"] = params.pop("fill_holes")
+        canvas = MaskCanvas.from_color(image, tuple(target), **params)
+    else:
+        # 只有形状时只需读取图像尺寸
+        canvas = MaskCanvas.like(image)
+
+    for shape in shapes:
+        canvas.apply(shape)
+    return canvas
+
+
+def generate_mask(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    生成并验证单个mask（在工作进程中执行）
+
+    Args:
+        item: 任务，包含 image、output 和mask规格
+
+    Returns:
+        Dict[str, Any]: 结果记录
+    """
+    start = time.time()
+    record = {"image": item["image"], "mask": item.get("output"), "status": "FAILED"}
+    try:
+        canvas = build_mask(item["image"], item)
+        stats = mask_stats(canvas.array)
+        width, height = canvas.size
+
+        issues = []
+        if stats["bounding_box"] is None:
+            issues.append("mask不包含编辑区域")
+        if stats["coverage"] < item.get("min_coverage", 0.0):
+            issues.append(f"编辑区域占比 {stats['coverage']:.2%} 低于下限 {item['min_coverage']:.2%}")
+        if stats["coverage"] > item.get("max_coverage", 1.0):
+            issues.append(f"编辑区域占比 {stats['coverage']:.2%} 高于上限 {item['max_coverage']:.2%}")
+
+        encoding = canvas.encode()
+        Path(item["output"]).parent.mkdir(parents=True, exist_ok=True)
+        with open(item["output"], "wb") as f:
+            f.write(encoding.data)
+        record.update(
+            status="INVALID" if issues else "VALID",
+            width=width,
+            height=height,
+            white_pixels=stats["white_pixels"],
+            coverage=round(stats["coverage"], 6),
+            bounding_box=stats["bounding_box"],
+            encoding=encoding.mode,
+            bytes=len(encoding.data),
+            baseline_bytes=encoding.baseline_bytes,
+            issues=issues
+        )
+    except Exception as e:
+        record["error"] = str(e)
+    record["elapsed"] = round(time.time() - start, 3)
+    return record
+
+
+def iter_mask_batch(items: List[Dict[str, Any]], workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    在进程池中批量生成mask
+
+    Args:
+        items: 任务列表（需已分配 output）
+        workers: 进程数，默认为CPU核数；为1时在当前进程中执行
+
+    Yields:
+        Dict[str, Any]: 结果记录，顺序与 items 一致
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(items) <= 1:
+        for item in items:
+            yield generate_mask(item)
+        return
+
+    # 分块派发，减少大批量小任务的进程间通信开销
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(generate_mask, items, chunksize=chunksize)
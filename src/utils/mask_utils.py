@@ -3,18 +3,672 @@ mask图像处理工具
 提供创建和处理mask图像的功能，用于万相局部重绘
 """
 
+import base64
+import io
 from PIL import Image, ImageDraw
 import numpy as np
-from typing import Tuple, Optional, List
+from typing import Any, Dict, NamedTuple, Tuple, Optional, List, Union
 from pathlib import Path
 
+# 形状组合方式
+MASK_OPS = ("union", "intersect", "subtract")
+
+
+def _image_size(image: Union[str, Image.Image, Tuple[int, int]]) -> Tuple[int, int]:
+    """获取图像尺寸，支持文件路径（只读取文件头）、已打开的图像或 (宽, 高)"""
+    if isinstance(image, Image.Image):
+        return image.size
+    if isinstance(image, (tuple, list)):
+        return int(image[0]), int(image[1])
+    with Image.open(image) as img:
+        return img.size
+
+
+def _max_filter(array: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    """沿一个方向的最大值滤波（倍增法，只需 log2(窗口) 次整体比较）"""
+    size = 2 * radius + 1
+    pad = [(0, 0)] * array.ndim
+    pad[axis] = (radius, radius)
+    # 把目标方向换到第0维，便于切片
+    padded = np.swapaxes(np.pad(array, pad, mode="constant"), 0, axis)
+    length = padded.shape[0] - size + 1
+    span = 1
+    while span * 2 <= size:
+        padded = np.maximum(padded[:-span], padded[span:])
+        span *= 2
+    result = np.maximum(padded[:length], padded[size - span:size - span + length])
+    return np.ascontiguousarray(np.swapaxes(result, 0, axis))
+
+
+def _box_blur(array: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    """沿一个方向的均值模糊（前缀和实现，耗时与半径无关）"""
+    size = 2 * radius + 1
+    pad = [(0, 0)] * array.ndim
+    pad[axis] = (radius + 1, radius)
+    cumsum = np.swapaxes(np.cumsum(np.pad(array, pad, mode="edge"), axis=axis, dtype=np.float32), 0, axis)
+    result = (cumsum[size:] - cumsum[:-size]) * np.float32(1.0 / size)
+    return np.ascontiguousarray(np.swapaxes(result, 0, axis))
+
+
+# sRGB -> 线性RGB 查找表，以及线性RGB -> XYZ（D65，已按白点归一化）的矩阵
+_SRGB_TO_LINEAR = np.where(
+    np.arange(256) / 255.0 <= 0.04045,
+    np.arange(256) / 255.0 / 12.92,
+    ((np.arange(256) / 255.0 + 0.055) / 1.055) ** 2.4
+).astype(np.float32)
+_RGB_TO_XYZ = (np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+]) / np.array([[0.95047], [1.0], [1.08883]])).astype(np.float32)
+
+# 颜色距离度量
+COLOR_METRICS = ("rgb", "lab")
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """
+    sRGB（uint8）转换为 CIE Lab（float32）
+
+    Args:
+        rgb: 形状为 (..., 3) 的 uint8 数组
+
+    Returns:
+        np.ndarray: 形状相同的 float32 Lab 数组
+    """
+    xyz = _SRGB_TO_LINEAR[rgb] @ _RGB_TO_XYZ.T
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), xyz * np.float32(7.787) + np.float32(16 / 116))
+    lab = np.empty_like(f)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def color_distance_mask(
+    image: Union[str, Image.Image, np.ndarray],
+    target_color: Tuple[int, int, int],
+    tolerance: float = 30,
+    metric: str = "rgb",
+    chunk_rows: int = 256
+) -> np.ndarray:
+    """
+    选出与目标颜色相近的像素
+
+    按行分块计算，临时数组只占用 chunk_rows 行的内存。
+
+    Args:
+        image: 图像文件路径、已打开的图像或 (高, 宽, 3) uint8 数组
+        target_color: 目标颜色RGB值 (r, g, b)
+        tolerance: 颜色容差；rgb 为每通道平均差值（与原有行为一致），lab 为 ΔE（CIE76，常用 10-25）
+        metric: rgb 或 lab
+        chunk_rows: 每块的行数
+
+    Returns:
+        np.ndarray: (高, 宽) 布尔数组
+    """
+    if metric not in COLOR_METRICS:
+        raise ValueError(f"不支持的颜色距离：{metric}，可选：{', '.join(COLOR_METRICS)}")
+    if isinstance(image, np.ndarray):
+        pixels = image
+    elif isinstance(image, Image.Image):
+        pixels = np.asarray(image.convert("RGB"))
+    else:
+        with Image.open(image) as img:
+            pixels = np.asarray(img.convert("RGB"))
+
+    target = np.array(target_color, dtype=np.uint8).reshape(1, 1, 3)
+    if metric == "lab":
+        target = rgb_to_lab(target)
+        threshold = np.float32(tolerance) ** 2
+    else:
+        target = target.astype(np.int16)
+        threshold = int(tolerance * 3)
+
+    mask = np.empty(pixels.shape[:2], dtype=bool)
+    for top in range(0, pixels.shape[0], chunk_rows):
+        chunk = pixels[top:top + chunk_rows]
+        if metric == "lab":
+            diff = rgb_to_lab(chunk) - target
+            distance = np.einsum("ijk,ijk->ij", diff, diff)
+        else:
+            # int16 足以容纳 3×255 的差值之和，比默认的 int64 节省 3/4 内存
+            distance = np.abs(chunk.astype(np.int16) - target).sum(axis=2, dtype=np.int16)
+        np.less_equal(distance, threshold, out=mask[top:top + chunk_rows])
+    return mask
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """逐行提取连续前景区段，返回 (行号, 起点, 终点[不含])"""
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends
+
+
+def label_regions(
+    mask: np.ndarray,
+    connectivity: int = 8
+) -> Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray], np.ndarray, np.ndarray]:
+    """
+    连通区域标记（基于行程编码，全部为向量化运算）
+
+    Args:
+        mask: (高, 宽) 布尔数组
+        connectivity: 4 或 8 连通
+
+    Returns:
+        Tuple: ((行号, 起点, 终点), 每个区段的区域编号, 每个区域的面积)
+    """
+    if connectivity not in (4, 8):
+        raise ValueError("connectivity 只能为 4 或 8")
+    rows, starts, ends = _runs(mask)
+    count = len(rows)
+    if count == 0:
+        return (rows, starts, ends), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # 相邻两行中区间重叠（8连通时允许对角相邻）的区段属于同一区域
+    stride = mask.shape[1] + 2
+    reach = 1 if connectivity == 8 else 0
+    start_keys = rows * stride + starts
+    end_keys = rows * stride + ends
+    query_row = (rows - 1) * stride
+    lower = np.searchsorted(end_keys, query_row + starts - reach, side="right")
+    upper = np.searchsorted(start_keys, query_row + ends + reach, side="left")
+    upper = np.maximum(upper, lower)
+    lengths = upper - lower
+    current = np.repeat(np.arange(count), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    previous = np.repeat(lower, lengths) + offsets
+
+    # 标签传播 + 路径压缩，直到每个区段都指向所在区域的最小编号
+    labels = np.arange(count)
+    while True:
+        merged = np.minimum(labels[current], labels[previous])
+        updated = labels.copy()
+        for nodes in (current, previous, labels[current], labels[previous]):
+            np.minimum.at(updated, nodes, merged)
+        while True:
+            compressed = updated[updated]
+            if np.array_equal(compressed, updated):
+                break
+            updated = compressed
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+
+    _, labels = np.unique(labels, return_inverse=True)
+    areas = np.bincount(labels, weights=ends - starts).astype(np.int64)
+    return (rows, starts, ends), labels, areas
+
+
+def _paint_runs(shape: Tuple[int, int], rows: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """把区段重新绘制为布尔数组"""
+    delta = np.zeros((shape[0], shape[1] + 1), dtype=np.int16)
+    np.add.at(delta, (rows, starts), 1)
+    np.add.at(delta, (rows, ends), -1)
+    return np.cumsum(delta[:, :-1], axis=1) > 0
+
+
+def remove_small_regions(mask: np.ndarray, min_area: int, connectivity: int = 8) -> np.ndarray:
+    """
+    移除面积小于 min_area 的连通区域
+
+    Args:
+        mask: (高, 宽) 布尔数组
+        min_area: 最小面积（像素）
+        connectivity: 4 或 8 连通
+
+    Returns:
+        np.ndarray: 过滤后的布尔数组
+    """
+    if min_area <= 1:
+        return mask
+    (rows, starts, ends), labels, areas = label_regions(mask, connectivity)
+    keep = areas[labels] >= min_area
+    return _paint_runs(mask.shape, rows[keep], starts[keep], ends[keep])
+
+
+def fill_holes(mask: np.ndarray, max_area: Optional[int] = None) -> np.ndarray:
+    """
+    填充被前景完全包围的空洞
+
+    Args:
+        mask: (高, 宽) 布尔数组
+        max_area: 只填充面积不超过该值的空洞，None 表示全部填充
+
+    Returns:
+        np.ndarray: 填充后的布尔数组
+    """
+    height, width = mask.shape
+    # 背景按4连通划分，接触图像边缘的背景区域不是空洞
+    (rows, starts, ends), labels, areas = label_regions(~mask, connectivity=4)
+    if len(labels) == 0:
+        return mask
+    on_border = (rows == 0) | (rows == height - 1) | (starts == 0) | (ends == width)
+    border_labels = np.zeros(len(areas), dtype=bool)
+    border_labels[labels[on_border]] = True
+    hole = ~border_labels[labels]
+    if max_area is not None:
+        hole &= areas[labels] <= max_area
+    return mask | _paint_runs(mask.shape, rows[hole], starts[hole], ends[hole])
+
+
+class MaskEncoding(NamedTuple):
+    """mask编码结果"""
+    data: bytes
+    mode: str
+    baseline_bytes: int
+
+    @property
+    def reduction(self) -> float:
+        """相对 8 位灰度PNG 的体积缩减比例"""
+        return 1 - len(self.data) / self.baseline_bytes if self.baseline_bytes else 0.0
+
+    def to_data_url(self) -> str:
+        return "data:image/png;base64," + base64.b64encode(self.data).decode("utf-8")
+
+
+def _png_bytes(image: Image.Image, **params) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", **params)
+    return buffer.getvalue()
+
+
+def encode_mask(mask: np.ndarray, allow_palette: bool = False, measure_baseline: bool = True) -> MaskEncoding:
+    """
+    以最小的PNG编码mask
+
+    只有 0/255 两种取值时使用 1 位灰度PNG，否则使用压缩优化后的 8 位灰度PNG；
+    allow_palette 时，取值不超过16种的mask（如少量羽化级别）还会尝试 4 位调色板PNG。
+
+    Args:
+        mask: (高, 宽) uint8 数组
+        allow_palette: 是否允许调色板PNG（非灰度颜色类型，需确认接口可接受）
+        measure_baseline: 是否编码一次默认的 8 位灰度PNG 作为对比基准
+
+    Returns:
+        MaskEncoding: 编码数据、模式和基准大小
+    """
+    candidates = []
+    if not np.any((mask != 0) & (mask != 255)):
+        candidates.append((_png_bytes(Image.fromarray(mask > 0), optimize=True), "1"))
+    else:
+        candidates.append((_png_bytes(Image.fromarray(mask), optimize=True), "L"))
+        if allow_palette:
+            levels = np.unique(mask)
+            if len(levels) <= 16:
+                palette_image = Image.fromarray(np.searchsorted(levels, mask).astype(np.uint8), mode="P")
+                palette_image.putpalette(np.repeat(levels, 3).tolist())
+                candidates.append((_png_bytes(palette_image, optimize=True, bits=4), "P"))
+
+    data, mode = min(candidates, key=lambda candidate: len(candidate[0]))
+    baseline = len(_png_bytes(Image.fromarray(mask))) if measure_baseline else 0
+    return MaskEncoding(data, mode, baseline)
+
+
+def compact_mask_file(mask_path: str, allow_palette: bool = False) -> MaskEncoding:
+    """
+    重新编码已有的mask文件
+
+    Args:
+        mask_path: mask图像路径
+        allow_palette: 是否允许调色板PNG
+
+    Returns:
+        MaskEncoding: 编码结果，基准大小为原文件大小；重新编码没有变小时保留原文件内容
+    """
+    with open(mask_path, "rb") as f:
+        original = f.read()
+    with Image.open(io.BytesIO(original)) as mask:
+        encoding = encode_mask(np.asarray(mask.convert("L")), allow_palette, measure_baseline=False)
+    if len(encoding.data) >= len(original) and original[:8] == b"\x89PNG\r\n\x1a\n":
+        return MaskEncoding(original, "original", len(original))
+    return MaskEncoding(encoding.data, encoding.mode, len(original))
+
+
+def edit_region_box(
+    mask: np.ndarray,
+    image_size: Tuple[int, int],
+    padding: int = 64,
+    min_side: int = 512
+) -> Optional[Tuple[int, int, int, int]]:
+    """
+    计算局部重绘的裁剪区域
+
+    接口要求 mask 与原图尺寸一致，因此裁剪时原图和 mask 一起裁剪；
+    区域为编辑区域外接矩形加上 padding，并扩大到模型要求的最小边长。
+
+    Args:
+        mask: (高, 宽) mask数组
+        image_size: 原图 (宽, 高)
+        padding: 外扩像素，为模型保留上下文
+        min_side: 最小边长
+
+    Returns:
+        Optional[Tuple]: (left, top, right, bottom)，无编辑区域时为None
+    """
+    bbox = mask_stats(mask)["bounding_box"]
+    if bbox is None:
+        return None
+    width, height = image_size
+    box = []
+    for low, high, limit in ((bbox[0], bbox[2] + 1, width), (bbox[1], bbox[3] + 1, height)):
+        low, high = max(low - padding, 0), min(high + padding, limit)
+        target = min(min_side, limit)
+        if high - low < target:
+            # 不足最小边长时向两侧扩展，碰到边界后向另一侧补足
+            low = max(low - (target - (high - low)) // 2, 0)
+            high = min(low + target, limit)
+            low = high - target
+        box.append((low, high))
+    return box[0][0], box[1][0], box[0][1], box[1][1]
+
+
+def paste_edit_result(
+    original: Image.Image,
+    edited: Image.Image,
+    box: Tuple[int, int, int, int],
+    mask: Optional[np.ndarray] = None
+) -> Image.Image:
+    """
+    将裁剪区域的编辑结果贴回原图
+
+    Args:
+        original: 原图
+        edited: 裁剪区域的编辑结果（尺寸不一致时缩放到裁剪区域大小）
+        box: 裁剪区域 (left, top, right, bottom)
+        mask: 裁剪区域对应的mask，提供时只替换编辑区域（羽化值作为透明度）
+
+    Returns:
+        Image.Image: 合成后的新图像
+    """
+    size = (box[2] - box[0], box[3] - box[1])
+    edited = edited.convert(original.mode)
+    if edited.size != size:
+        edited = edited.resize(size, Image.LANCZOS)
+    result = original.copy()
+    result.paste(edited, box[:2], Image.fromarray(mask.astype(np.uint8)) if mask is not None else None)
+    return result
+
+
+class MaskCanvas:
+    """
+    内存中的mask画布
+
+    所有形状在同一个 uint8 数组（0=保留，255=编辑）上组合，不经过磁盘：
+
+        canvas = MaskCanvas.like(image)
+        canvas.rectangle(100, 100, 400, 300)
+        canvas.circle(300, 250, 80, op="subtract")
+        canvas.dilate(4).feather(6)
+        editor.description_edit_with_mask(base_url, canvas.to_data_url(), "添加一只猫")
+    """
+
+    def __init__(self, width: int, height: int, fill: int = 0):
+        """
+        初始化画布
+
+        Args:
+            width: 宽度
+            height: 高度
+            fill: 初始填充值（0=全部保留，255=全部编辑）
+        """
+        if width <= 0 or height <= 0:
+            raise ValueError(f"mask尺寸无效：{width}x{height}")
+        self.array = np.full((height, width), fill, dtype=np.uint8)
+
+    @classmethod
+    def like(cls, image: Union[str, Image.Image, Tuple[int, int]], fill: int = 0) -> "MaskCanvas":
+        """创建与图像尺寸相同的画布（文件路径只读取文件头）"""
+        width, height = _image_size(image)
+        return cls(width, height, fill)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "MaskCanvas":
+        """从数组创建画布，非零即视为编辑区域的布尔数组会转换为 0/255"""
+        array = np.asarray(array)
+        if array.ndim != 2:
+            raise ValueError("mask数组必须是二维的")
+        canvas = cls.__new__(cls)
+        canvas.array = array.astype(np.uint8) * np.uint8(255) if array.dtype == bool else array.astype(np.uint8)
+        return canvas
+
+    @classmethod
+    def from_image(cls, mask: Union[str, Image.Image]) -> "MaskCanvas":
+        """从已有mask图像创建画布"""
+        if isinstance(mask, Image.Image):
+            return cls.from_array(np.asarray(mask.convert("L")))
+        with Image.open(mask) as img:
+            return cls.from_array(np.asarray(img.convert("L")))
+
+    @classmethod
+    def from_shapes(
+        cls,
+        image: Union[str, Image.Image, Tuple[int, int]],
+        shapes: List[Dict[str, Any]]
+    ) -> "MaskCanvas":
+        """
+        按形状描述列表创建画布
+
+        Args:
+            image: 参考图像或 (宽, 高)
+            shapes: 形状描述，如 {"type": "rectangle", "x": 0, "y": 0, "width": 100, "height": 80, "op": "union"}，
+                    另支持 {"type": "dilate", "radius": 4}、{"type": "feather", "radius": 6}、{"type": "invert"}
+
+        Returns:
+            MaskCanvas: 画布
+        """
+        canvas = cls.like(image)
+        for shape in shapes:
+            canvas.apply(shape)
+        return canvas
+
+    @classmethod
+    def from_color(
+        cls,
+        image: Union[str, Image.Image, np.ndarray],
+        target_color: Tuple[int, int, int],
+        tolerance: float = 30,
+        metric: str = "rgb",
+        min_area: int = 0,
+        holes: bool = False,
+        max_hole_area: Optional[int] = None,
+        connectivity: int = 8,
+        chunk_rows: int = 256
+    ) -> "MaskCanvas":
+        """
+        按颜色相似度创建画布
+
+        Args:
+            image: 图像文件路径、已打开的图像或 (高, 宽, 3) uint8 数组
+            target_color: 目标颜色RGB值 (r, g, b)
+            tolerance: 颜色容差，含义见 color_distance_mask
+            metric: rgb 或 lab
+            min_area: 移除面积小于该值的连通区域
+            holes: 是否填充区域内部的空洞
+            max_hole_area: 只填充面积不超过该值的空洞
+            connectivity: 4 或 8 连通
+            chunk_rows: 颜色距离按行分块计算的行数
+
+        Returns:
+            MaskCanvas: 画布
+        """
+        mask = color_distance_mask(image, target_color, tolerance, metric, chunk_rows)
+        mask = remove_small_regions(mask, min_area, connectivity)
+        if holes:
+            mask = fill_holes(mask, max_hole_area)
+        return cls.from_array(mask)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """(宽, 高)"""
+        return self.array.shape[1], self.array.shape[0]
+
+    def apply(self, shape: Dict[str, Any]) -> "MaskCanvas":
+        """
+        应用一个形状或操作描述
+
+        Args:
+            shape: 形状描述，type 为方法名，其余字段为方法参数
+
+        Returns:
+            MaskCanvas: 画布自身
+        """
+        params = dict(shape)
+        kind = params.pop("type", None)
+        if kind not in ("rectangle", "circle", "ellipse", "polygon", "dilate", "erode", "feather", "invert"):
+            raise ValueError(f"不支持的mask形状：{kind}")
+        if kind == "polygon" and "points" in params:
+            params["points"] = [tuple(point) for point in params["points"]]
+        return getattr(self, kind)(**params)
+
+    def combine(self, shape: np.ndarray, op: str = "union") -> "MaskCanvas":
+        """
+        将形状数组组合到画布
+
+        Args:
+            shape: 与画布同尺寸的 uint8 数组
+            op: union（并集）、intersect（交集）、subtract（差集）
+
+        Returns:
+            MaskCanvas: 画布自身
+        """
+        if op == "union":
+            np.maximum(self.array, shape, out=self.array)
+        elif op == "intersect":
+            np.minimum(self.array, shape, out=self.array)
+        elif op == "subtract":
+            np.minimum(self.array, 255 - shape, out=self.array)
+        else:
+            raise ValueError(f"不支持的组合方式：{op}，可选：{', '.join(MASK_OPS)}")
+        return self
+
+    def rectangle(self, x: int, y: int, width: int, height: int, op: str = "union") -> "MaskCanvas":
+        """
+        矩形，左上角 (x, y)，覆盖 width×height 像素
+
+        与 ImageDraw.rectangle([x, y, x + width, y + height]) 不同，右边和下边不包含在内；
+        MaskCreator.create_rectangle_mask 为保持原有输出仍按包含右下边计算。
+        """
+        shape = np.zeros_like(self.array)
+        shape[max(y, 0):max(y + height, 0), max(x, 0):max(x + width, 0)] = 255
+        return self.combine(shape, op)
+
+    def ellipse(self, center_x: float, center_y: float, radius_x: float, radius_y: float, op: str = "union") -> "MaskCanvas":
+        """椭圆"""
+        if radius_x <= 0 or radius_y <= 0:
+            raise ValueError("椭圆半径必须大于0")
+        # 只在外接矩形内计算，避免为整张图生成坐标网格
+        height, width = self.array.shape
+        top, bottom = max(int(center_y - radius_y), 0), min(int(center_y + radius_y) + 1, height)
+        left, right = max(int(center_x - radius_x), 0), min(int(center_x + radius_x) + 1, width)
+        shape = np.zeros_like(self.array)
+        if top < bottom and left < right:
+            ys = ((np.arange(top, bottom, dtype=np.float32) - center_y) / radius_y) ** 2
+            xs = ((np.arange(left, right, dtype=np.float32) - center_x) / radius_x) ** 2
+            shape[top:bottom, left:right] = (ys[:, None] + xs[None, :] <= 1.0) * np.uint8(255)
+        return self.combine(shape, op)
+
+    def circle(self, center_x: float, center_y: float, radius: float, op: str = "union") -> "MaskCanvas":
+        """圆形"""
+        return self.ellipse(center_x, center_y, radius, radius, op)
+
+    def polygon(self, points: List[Tuple[int, int]], op: str = "union") -> "MaskCanvas":
+        """多边形"""
+        if len(points) < 3:
+            raise ValueError("多边形至少需要3个顶点")
+        image = Image.new("L", self.size, 0)
+        ImageDraw.Draw(image).polygon([tuple(point) for point in points], fill=255)
+        return self.combine(np.asarray(image), op)
+
+    def invert(self) -> "MaskCanvas":
+        """黑白互换"""
+        np.subtract(255, self.array, out=self.array)
+        return self
+
+    def dilate(self, radius: int) -> "MaskCanvas":
+        """
+        膨胀编辑区域（方形结构元素，行列分离计算）
+
+        Args:
+            radius: 膨胀半径（像素），负数表示腐蚀
+
+        Returns:
+            MaskCanvas: 画布自身
+        """
+        if radius < 0:
+            return self.erode(-radius)
+        if radius > 0:
+            self.array = _max_filter(_max_filter(self.array, radius, 0), radius, 1)
+        return self
+
+    def erode(self, radius: int) -> "MaskCanvas":
+        """收缩编辑区域"""
+        if radius > 0:
+            self.invert().dilate(radius).invert()
+        return self
+
+    def feather(self, radius: int) -> "MaskCanvas":
+        """
+        羽化边缘（三次均值模糊近似高斯模糊）
+
+        Args:
+            radius: 羽化半径（像素）
+
+        Returns:
+            MaskCanvas: 画布自身
+        """
+        if radius <= 0:
+            return self
+        box = max(1, radius // 3)
+        blurred = self.array.astype(np.float32)
+        for axis in (0, 1):
+            for _ in range(3):
+                blurred = _box_blur(blurred, box, axis)
+        self.array = np.clip(blurred + 0.5, 0, 255).astype(np.uint8)
+        return self
+
+    def coverage(self) -> float:
+        """编辑区域占比"""
+        return float(np.count_nonzero(self.array)) / self.array.size
+
+    def to_image(self) -> Image.Image:
+        """转换为灰度图像"""
+        return Image.fromarray(self.array)
+
+    def encode(self, allow_palette: bool = False, measure_baseline: bool = True) -> MaskEncoding:
+        """以最小的PNG编码，见 encode_mask"""
+        return encode_mask(self.array, allow_palette, measure_baseline)
+
+    def to_png_bytes(self) -> bytes:
+        """编码为PNG字节（自动选择最小的编码）"""
+        return self.encode(measure_baseline=False).data
+
+    def to_data_url(self) -> str:
+        """编码为可直接作为 mask_image_url 传给 ImageEditor 的Base64 data URL"""
+        return self.encode(measure_baseline=False).to_data_url()
+
+    def crop(self, box: Tuple[int, int, int, int]) -> "MaskCanvas":
+        """裁剪画布，box 为 (left, top, right, bottom)"""
+        return MaskCanvas.from_array(self.array[box[1]:box[3], box[0]:box[2]].copy())
+
+    def save(self, output_path: str) -> str:
+        """保存为PNG文件（自动选择最小的编码）"""
+        with open(output_path, "wb") as f:
+            f.write(self.to_png_bytes())
+        return output_path
+
 
 class MaskCreator:
     """mask图像创建器"""
     
     @staticmethod
     def create_rectangle_mask(
-        image_path: str,
+        image_path: Union[str, Image.Image, Tuple[int, int]],
         x: int,
         y: int,
         width: int,
@@ -25,37 +679,23 @@ class MaskCreator:
         创建矩形mask
         
         Args:
-            image_path: 原始图像路径
+            image_path: 原始图像路径、已打开的图像或 (宽, 高)
             x: 矩形左上角x坐标
             y: 矩形左上角y坐标
             width: 矩形宽度
             height: 矩形高度
-            output_path: 输出mask图像路径
+            output_path: 输出mask图像路径（image_path 不是文件路径时必须指定）
             
         Returns:
             str: mask图像路径
         """
-        # 打开原始图像获取尺寸
-        with Image.open(image_path) as img:
-            img_width, img_height = img.size
-        
-        # 创建黑色背景
-        mask = Image.new('L', (img_width, img_height), 0)
-        draw = ImageDraw.Draw(mask)
-        
-        # 绘制白色矩形
-        draw.rectangle([x, y, x + width, y + height], fill=255)
-        
-        # 保存mask
-        if output_path is None:
-            output_path = str(Path(image_path).with_suffix('')) + "_mask.png"
-        
-        mask.save(output_path)
-        return output_path
+        # 原实现用 ImageDraw 绘制 [x, y, x+width, y+height]，包含右下边，实际覆盖 (width+1)×(height+1) 像素
+        canvas = MaskCanvas.like(image_path).rectangle(x, y, width + 1, height + 1)
+        return canvas.save(output_path or str(Path(image_path).with_suffix('')) + "_mask.png")
     
     @staticmethod
     def create_circle_mask(
-        image_path: str,
+        image_path: Union[str, Image.Image, Tuple[int, int]],
         center_x: int,
         center_y: int,
         radius: int,
@@ -65,41 +705,21 @@ class MaskCreator:
         创建圆形mask
         
         Args:
-            image_path: 原始图像路径
+            image_path: 原始图像路径、已打开的图像或 (宽, 高)
             center_x: 圆心x坐标
             center_y: 圆心y坐标
             radius: 圆半径
-            output_path: 输出mask图像路径
+            output_path: 输出mask图像路径（image_path 不是文件路径时必须指定）
             
         Returns:
             str: mask图像路径
         """
-        # 打开原始图像获取尺寸
-        with Image.open(image_path) as img:
-            img_width, img_height = img.size
-        
-        # 创建黑色背景
-        mask = Image.new('L', (img_width, img_height), 0)
-        draw = ImageDraw.Draw(mask)
-        
-        # 绘制白色圆形
-        draw.ellipse([
-            center_x - radius,
-            center_y - radius,
-            center_x + radius,
-            center_y + radius
-        ], fill=255)
-        
-        # 保存mask
-        if output_path is None:
-            output_path = str(Path(image_path).with_suffix('')) + "_mask.png"
-        
-        mask.save(output_path)
-        return output_path
+        canvas = MaskCanvas.like(image_path).circle(center_x, center_y, radius)
+        return canvas.save(output_path or str(Path(image_path).with_suffix('')) + "_mask.png")
     
     @staticmethod
     def create_polygon_mask(
-        image_path: str,
+        image_path: Union[str, Image.Image, Tuple[int, int]],
         points: List[Tuple[int, int]],
         output_path: Optional[str] = None
     ) -> str:
@@ -107,34 +727,19 @@ class MaskCreator:
         创建多边形mask
         
         Args:
-            image_path: 原始图像路径
+            image_path: 原始图像路径、已打开的图像或 (宽, 高)
             points: 多边形顶点坐标列表 [(x1,y1), (x2,y2), ...]
-            output_path: 输出mask图像路径
+            output_path: 输出mask图像路径（image_path 不是文件路径时必须指定）
             
         Returns:
             str: mask图像路径
         """
-        # 打开原始图像获取尺寸
-        with Image.open(image_path) as img:
-            img_width, img_height = img.size
-        
-        # 创建黑色背景
-        mask = Image.new('L', (img_width, img_height), 0)
-        draw = ImageDraw.Draw(mask)
-        
-        # 绘制白色多边形
-        draw.polygon(points, fill=255)
-        
-        # 保存mask
-        if output_path is None:
-            output_path = str(Path(image_path).with_suffix('')) + "_mask.png"
-        
-        mask.save(output_path)
-        return output_path
+        canvas = MaskCanvas.like(image_path).polygon(points)
+        return canvas.save(output_path or str(Path(image_path).with_suffix('')) + "_mask.png")
     
     @staticmethod
     def create_ellipse_mask(
-        image_path: str,
+        image_path: Union[str, Image.Image, Tuple[int, int]],
         center_x: int,
         center_y: int,
         radius_x: int,
@@ -145,38 +750,18 @@ class MaskCreator:
         创建椭圆mask
         
         Args:
-            image_path: 原始图像路径
+            image_path: 原始图像路径、已打开的图像或 (宽, 高)
             center_x: 椭圆中心x坐标
             center_y: 椭圆中心y坐标
             radius_x: x轴半径
             radius_y: y轴半径
-            output_path: 输出mask图像路径
+            output_path: 输出mask图像路径（image_path 不是文件路径时必须指定）
             
         Returns:
             str: mask图像路径
         """
-        # 打开原始图像获取尺寸
-        with Image.open(image_path) as img:
-            img_width, img_height = img.size
-        
-        # 创建黑色背景
-        mask = Image.new('L', (img_width, img_height), 0)
-        draw = ImageDraw.Draw(mask)
-        
-        # 绘制白色椭圆
-        draw.ellipse([
-            center_x - radius_x,
-            center_y - radius_y,
-            center_x + radius_x,
-            center_y + radius_y
-        ], fill=255)
-        
-        # 保存mask
-        if output_path is None:
-            output_path = str(Path(image_path).with_suffix('')) + "_mask.png"
-        
-        mask.save(output_path)
-        return output_path
+        canvas = MaskCanvas.like(image_path).ellipse(center_x, center_y, radius_x, radius_y)
+        return canvas.save(output_path or str(Path(image_path).with_suffix('')) + "_mask.png")
     
     @staticmethod
     def create_inverse_mask(
@@ -195,34 +780,25 @@ class MaskCreator:
         Returns:
             str: 反转后的mask图像路径
         """
-        # 打开原始图像获取尺寸
-        with Image.open(image_path) as img:
-            img_width, img_height = img.size
-        
-        # 打开原始mask
+        size = _image_size(image_path)
         with Image.open(mask_path) as mask:
+            mask = mask.convert('L')
             # 确保尺寸匹配
-            if mask.size != (img_width, img_height):
-                mask = mask.resize((img_width, img_height))
-            
-            # 创建反转mask
-            mask_array = np.array(mask)
-            inverted_mask = 255 - mask_array
-            inverted_image = Image.fromarray(inverted_mask.astype('uint8'))
-        
-        # 保存反转mask
-        if output_path is None:
-            output_path = str(Path(mask_path).with_suffix('')) + "_inverted.png"
-        
-        inverted_image.save(output_path)
-        return output_path
+            if mask.size != size:
+                mask = mask.resize(size)
+            canvas = MaskCanvas.from_image(mask).invert()
+
+        return canvas.save(output_path or str(Path(mask_path).with_suffix('')) + "_inverted.png")
     
     @staticmethod
     def create_smart_mask(
         image_path: str,
         target_color: Tuple[int, int, int],
         tolerance: int = 30,
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        metric: str = "rgb",
+        min_area: int = 0,
+        fill_holes: bool = False
     ) -> str:
         """
         基于颜色创建智能mask
@@ -230,34 +806,55 @@ class MaskCreator:
         Args:
             image_path: 原始图像路径
             target_color: 目标颜色RGB值 (r, g, b)
-            tolerance: 颜色容差
+            tolerance: 颜色容差（rgb 为每通道平均差值，lab 为 ΔE）
             output_path: 输出mask图像路径
+            metric: 颜色距离，rgb 或 lab（感知均匀，选区更接近人眼判断）
+            min_area: 移除面积小于该值的零散区域
+            fill_holes: 是否填充选区内部的空洞
             
         Returns:
             str: mask图像路径
         """
-        # 打开原始图像
-        with Image.open(image_path) as img:
-            img_rgb = img.convert('RGB')
-            img_array = np.array(img_rgb)
-            
-            # 计算与目标颜色的差异
-            target_r, target_g, target_b = target_color
-            diff = np.abs(img_array - np.array([target_r, target_g, target_b]))
-            
-            # 计算总差异
-            total_diff = np.sum(diff, axis=2)
-            
-            # 创建mask
-            mask_array = np.where(total_diff <= tolerance * 3, 255, 0)
-            mask = Image.fromarray(mask_array.astype('uint8'))
-        
-        # 保存mask
-        if output_path is None:
-            output_path = str(Path(image_path).with_suffix('')) + "_smart_mask.png"
-        
-        mask.save(output_path)
-        return output_path
+        canvas = MaskCanvas.from_color(
+            image_path, target_color, tolerance, metric,
+            min_area=min_area, holes=fill_holes
+        )
+        return canvas.save(output_path or str(Path(image_path).with_suffix('')) + "_smart_mask.png")
+
+
+def mask_stats(mask: np.ndarray) -> Dict[str, Any]:
+    """
+    统计mask的编辑区域
+
+    外接矩形由行、列方向的 any 归约得到，不生成逐像素坐标列表。
+
+    Args:
+        mask: (高, 宽) mask数组，非零为编辑区域
+
+    Returns:
+        dict: white_pixels、coverage、bounding_box (min_x, min_y, max_x, max_y，无编辑区域时为None)
+    """
+    selected = mask if mask.dtype == bool else mask > 0
+    rows = np.flatnonzero(selected.any(axis=1))
+    white_pixels = int(np.count_nonzero(selected))
+    bbox = None
+    if len(rows):
+        cols = np.flatnonzero(selected[rows[0]:rows[-1] + 1].any(axis=0))
+        bbox = (int(cols[0]), int(rows[0]), int(cols[-1]), int(rows[-1]))
+    return {
+        "white_pixels": white_pixels,
+        "coverage": white_pixels / selected.size,
+        "bounding_box": bbox,
+    }
+
+
+def _is_gray_palette(image: Image.Image) -> bool:
+    """是否为所有颜色都是灰度的调色板图像"""
+    palette = image.getpalette("RGB") if image.mode == 'P' else None
+    if not palette:
+        return False
+    colors = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+    return bool(np.all((colors[:, 0] == colors[:, 1]) & (colors[:, 1] == colors[:, 2])))
 
 
 class MaskValidator:
@@ -282,14 +879,13 @@ class MaskValidator:
                     print(f"⚠️ 警告：mask尺寸 {mask.size} 与基础图像 {base.size} 不匹配")
                     return False
                 
-                # 检查是否为灰度图
-                if mask.mode != 'L':
-                    print(f"⚠️ 警告：mask应为灰度图（8位），当前为 {mask.mode}")
+                # 检查是否为灰度图（1 位、8 位，或 encode_mask 生成的灰度调色板图）
+                if mask.mode not in ('1', 'L') and not _is_gray_palette(mask):
+                    print(f"⚠️ 警告：mask应为灰度图（1 位或 8 位），当前为 {mask.mode}")
                     return False
                 
-                # 检查是否包含白色区域
-                mask_array = np.array(mask)
-                if not np.any(mask_array > 0):
+                # 检查是否包含白色区域（调色板图的索引不是灰度值，需先转换）
+                if mask.convert('L').getbbox() is None:
                     print("⚠️ 警告：mask不包含任何白色编辑区域")
                     return False
                 
@@ -312,21 +908,14 @@ class MaskValidator:
         """
         try:
             with Image.open(mask_path) as mask:
-                mask_array = np.array(mask)
+                # 调色板、RGB/RGBA 等模式先转换为灰度，mask_stats 只接受二维数组
+                mask_array = np.array(mask if mask.mode in ('1', 'L') else mask.convert('L'))
                 
-                # 计算白色像素比例
-                white_pixels = np.sum(mask_array > 0)
+                stats = mask_stats(mask_array)
+                white_pixels = stats["white_pixels"]
                 total_pixels = mask_array.size
-                white_ratio = white_pixels / total_pixels
-                
-                # 计算白色像素位置
-                white_coords = np.where(mask_array > 0)
-                if len(white_coords[0]) > 0:
-                    min_x, max_x = white_coords[1].min(), white_coords[1].max()
-                    min_y, max_y = white_coords[0].min(), white_coords[0].max()
-                    bbox = (min_x, min_y, max_x, max_y)
-                else:
-                    bbox = None
+                white_ratio = stats["coverage"]
+                bbox = stats["bounding_box"]
                 
                 return {
                     "size": mask.size,
@@ -354,14 +943,22 @@ def create_mask_cli():
     parser.add_argument("--coords", nargs='+', type=int, help="坐标参数")
     parser.add_argument("--output", help="输出mask路径")
     parser.add_argument("--color", nargs=3, type=int, help="智能mask目标颜色RGB")
-    parser.add_argument("--tolerance", type=int, default=30, help="颜色容差")
+    parser.add_argument("--tolerance", type=float, default=30, help="颜色容差（rgb 为每通道差值，lab 为 ΔE）")
+    parser.add_argument("--metric", choices=COLOR_METRICS, default="rgb", help="智能mask颜色距离")
+    parser.add_argument("--min-area", type=int, default=0, help="智能mask：移除面积小于该值的零散区域")
+    parser.add_argument("--fill-holes", action="store_true", help="智能mask：填充选区内部的空洞")
     
     args = parser.parse_args()
     
     creator = MaskCreator()
     
     try:
-        if args.type == "rectangle":
+        if args.color:
+            mask_path = creator.create_smart_mask(
+                args.image_path, tuple(args.color), args.tolerance, args.output,
+                metric=args.metric, min_area=args.min_area, fill_holes=args.fill_holes
+            )
+        elif args.type == "rectangle":
             if len(args.coords) != 4:
                 print("❌ 矩形mask需要4个参数: x y width height")
                 return
@@ -390,10 +987,6 @@ def create_mask_cli():
             mask_path = creator.create_polygon_mask(
                 args.image_path, points, args.output
             )
-        elif args.color:
-            mask_path = creator.create_smart_mask(
-                args.image_path, tuple(args.color), args.tolerance, args.output
-            )
         
         print(f"✅ mask创建成功: {mask_path}")
         
@@ -0,0 +1,43 @@
+"""
+请求速率限制
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    线程安全的速率限制器
+
+    按固定间隔放行请求，保证任意时间段内的请求数不超过 rate * 时长（允许 burst 个请求的突发）。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初始化速率限制器
+
+        Args:
+            rate: 每秒允许的请求数，小于等于0表示不限制
+            burst: 允许连续放行的请求数
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def acquire(self) -> None:
+        """等待直到允许发送下一个请求"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,237 @@
+"""
+参数网格扫描
+根据声明式的扫描配置（各参数轴 + 请求模板）按需展开请求，
+不预先生成全部组合，支持确定性排序和分片执行
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_PLACEHOLDER = re.compile(r"^\{(\w+)\}$")
+
+# 模板中的转义花括号和占位符（可带格式说明，如 {seed:04d}），其余花括号原样保留
+_TOKEN = re.compile(r"\{\{|\}\}|\{(\w+)(?::([^{}]*))?\}")
+
+
+class ParameterSweep:
+    """
+    参数网格
+
+    配置格式：
+    {
+        "axes": {
+            "prompt": ["一只猫", "一只狗"],
+            "style": {"file": "styles.txt"},
+            "size": ["1024*1024", "1440*810"],
+            "seed": {"range": [1, 9]}
+        },
+        "template": {
+            "prompt": "{prompt}，{style}风格",
+            "size": "{size}",
+            "seed": "{seed}",
+            "model": "wan2.2-t2i-flash",
+            "filename": "p{prompt_index}_{size}_s{seed}.png"
+        }
+    }
+
+    组合顺序固定：按 axes 中的书写顺序，越靠后的轴变化越快（与嵌套循环一致）。
+    模板中的 "{name}" 引用轴的取值，"{name_index}" 引用取值在轴中的序号（从0开始）；
+    整个字符串仅为一个占位符时保留原始类型（如 seed 保持为整数）；"{{" 和 "}}" 表示字面的花括号，
+    其他不构成占位符的花括号（如内嵌的 JSON）原样保留。
+    未提供模板时，请求直接由各轴的取值组成。
+    """
+
+    def __init__(self, axes: Dict[str, List[Any]], template: Optional[Dict[str, Any]] = None):
+        """
+        初始化参数网格
+
+        Args:
+            axes: 轴名称 -> 取值列表
+            template: 请求模板
+
+        Raises:
+            ValueError: 轴为空或模板引用了不存在的轴
+        """
+        if not axes:
+            raise ValueError("扫描配置至少需要一个参数轴")
+        for name, values in axes.items():
+            if not values:
+                raise ValueError(f"参数轴 {name} 没有取值")
+
+        self.names = list(axes)
+        self.axes = [list(axes[name]) for name in self.names]
+        self.template = template
+
+        # 混合进制：第 k 个轴的步长为其后所有轴长度之积
+        self._strides = []
+        stride = 1
+        for values in reversed(self.axes):
+            self._strides.append(stride)
+            stride *= len(values)
+        self._strides.reverse()
+        self._size = stride
+
+        if template is not None:
+            self._check_template(template)
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any], base_dir: Optional[str] = None) -> "ParameterSweep":
+        """
+        从配置字典创建参数网格
+
+        轴的取值支持三种写法：列表；{"range": [start, stop, step]}；
+        {"file": "path.txt"}（每行一个取值，忽略空行和#注释）。
+
+        Args:
+            spec: 扫描配置
+            base_dir: {"file": ...} 中相对路径的基准目录
+
+        Returns:
+            ParameterSweep: 参数网格
+        """
+        if not isinstance(spec, dict) or not isinstance(spec.get("axes"), dict):
+            raise ValueError("扫描配置格式错误：需要包含'axes'对象")
+
+        axes = {}
+        for name, values in spec["axes"].items():
+            if isinstance(values, list):
+                axes[name] = values
+            elif isinstance(values, dict) and "range" in values:
+                axes[name] = list(range(*values["range"]))
+            elif isinstance(values, dict) and "file" in values:
+                from .file_utils import PromptFileReader
+                path = Path(values["file"])
+                if base_dir and not path.is_absolute():
+                    path = Path(base_dir) / path
+                axes[name] = list(PromptFileReader.iter_text_file(str(path)))
+            else:
+                raise ValueError(f"参数轴 {name} 格式错误：需要列表、range 或 file")
+        return cls(axes, spec.get("template"))
+
+    @classmethod
+    def from_file(cls, filepath: str) -> "ParameterSweep":
+        """从JSON文件读取扫描配置，{"file": ...} 相对于配置文件所在目录"""
+        filepath = Path(filepath)
+        if not filepath.exists():
+            raise FileNotFoundError(f"文件不存在: {filepath}")
+        with open(filepath, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        return cls.from_dict(spec, base_dir=str(filepath.parent))
+
+    @staticmethod
+    def is_sweep_spec(data: Any) -> bool:
+        """判断JSON数据是否为扫描配置"""
+        return isinstance(data, dict) and "axes" in data
+
+    @staticmethod
+    def parse_shard(shard: str) -> Tuple[int, int]:
+        """
+        解析分片参数
+
+        Args:
+            shard: "i/N" 形式，i 从0开始
+
+        Returns:
+            Tuple[int, int]: (分片序号, 分片总数)
+        """
+        try:
+            index, count = (int(part) for part in shard.split("/"))
+        except ValueError:
+            raise ValueError(f"分片格式错误：{shard}，应为 i/N，如 0/4")
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"分片序号超出范围：{shard}，需满足 0 <= i < N")
+        return index, count
+
+    def __len__(self) -> int:
+        return self._size
+
+    def values_at(self, index: int) -> Dict[str, Any]:
+        """第 index 个组合中各轴的取值"""
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        values = {}
+        for name, axis, stride in zip(self.names, self.axes, self._strides):
+            position = (index // stride) % len(axis)
+            values[name] = axis[position]
+            values[f"{name}_index"] = position
+        return values
+
+    def request_at(self, index: int) -> Dict[str, Any]:
+        """第 index 个组合对应的请求"""
+        values = self.values_at(index)
+        if self.template is None:
+            return {name: values[name] for name in self.names}
+        return self._render(self.template, values)
+
+    def iter_requests(
+        self,
+        shard: Tuple[int, int] = (0, 1),
+        start: int = 0
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        按顺序惰性展开请求
+
+        分片按序号取模划分，各分片的任务数最多相差1，且不依赖其他分片即可独立计算。
+
+        Args:
+            shard: (分片序号, 分片总数)
+            start: 起始组合序号，用于断点续跑
+
+        Yields:
+            Tuple[int, Dict]: (组合序号, 请求)
+        """
+        shard_index, shard_count = shard
+        # 从 start 起第一个属于本分片的序号
+        first = start + (shard_index - start) % shard_count
+        for index in range(first, self._size, shard_count):
+            yield index, self.request_at(index)
+
+    def shard_size(self, shard: Tuple[int, int] = (0, 1)) -> int:
+        """分片中的组合数量"""
+        shard_index, shard_count = shard
+        return len(range(shard_index, self._size, shard_count))
+
+    def _check_template(self, template: Any) -> None:
+        # 占位符名称 -> 可能的取值，用于在展开前检查格式说明
+        known = dict(zip(self.names, self.axes))
+        known.update({f"{name}_index": range(len(values)) for name, values in zip(self.names, self.axes)})
+        if isinstance(template, dict):
+            for value in template.values():
+                self._check_template(value)
+        elif isinstance(template, list):
+            for value in template:
+                self._check_template(value)
+        elif isinstance(template, str):
+            for match in _TOKEN.finditer(template):
+                name = match.group(1)
+                if name is None:
+                    continue
+                if name not in known:
+                    raise ValueError(f"模板引用了不存在的参数轴：{name}")
+                if match.group(2):
+                    for value in known[name]:
+                        try:
+                            format(value, match.group(2))
+                        except (TypeError, ValueError) as e:
+                            raise ValueError(f"模板占位符 {match.group(0)} 无法格式化取值 {value!r}：{e}") from e
+
+    def _render(self, template: Any, values: Dict[str, Any]) -> Any:
+        if isinstance(template, dict):
+            return {key: self._render(value, values) for key, value in template.items()}
+        if isinstance(template, list):
+            return [self._render(value, values) for value in template]
+        if isinstance(template, str):
+            match = _PLACEHOLDER.match(template)
+            if match:
+                return values[match.group(1)]
+            return _TOKEN.sub(lambda token: self._substitute(token, values), template)
+        return template
+
+    @staticmethod
+    def _substitute(token: "re.Match", values: Dict[str, Any]) -> str:
+        text = token.group(0)
+        if text in ("{{", "}}"):
+            return text[0]
+        return format(values[token.group(1)], token.group(2) or "")
@@ -3,29 +3,24 @@
 支持文生视频、图生视频、首尾帧生视频等功能
 """
 
-from .models import (
-    ModelType,
-    TaskStatus,
-    VideoGenerationRequest,
-    VideoGenerationResponse,
-    VideoResult,
-    TaskCreationResponse,
-    VideoGenerationError,
-    Resolution,
-)
+from .._lazy import lazy_exports
 
-from .text2video import VideoGenerator
-
-__all__ = [
+# 导出名称 -> 所在子模块，首次访问时才导入（PEP 562）
+_LAZY_EXPORTS = {
     # 生成器
-    "VideoGenerator",
+    "VideoGenerator": ".text2video",
     # 数据模型
-    "ModelType",
-    "TaskStatus",
-    "VideoGenerationRequest",
-    "VideoGenerationResponse",
-    "VideoResult",
-    "TaskCreationResponse",
-    "VideoGenerationError",
-    "Resolution",
-]
+    "ModelType": ".models",
+    "TaskStatus": ".models",
+    "VideoGenerationRequest": ".models",
+    "VideoGenerationResponse": ".models",
+    "VideoResult": ".models",
+    "TaskCreationResponse": ".models",
+    "VideoGenerationError": ".models",
+    "Resolution": ".models",
+    "VIDEO_SIZES": ".constants",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_EXPORTS)
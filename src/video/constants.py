@@ -0,0 +1,13 @@
+"""
+视频生成常量
+只依赖标准库，命令行参数定义和尺寸校验共用，导入时不加载 pydantic 等依赖
+"""
+
+from typing import Dict, List
+
+# 各分辨率档位支持的视频尺寸（宽*高），键与 Resolution 的取值一致
+VIDEO_SIZES: Dict[str, List[str]] = {
+    "480P": ["480*480", "832*480", "480*832"],
+    "720P": ["720*720", "720*1280", "1280*720", "1088*832", "832*1088"],
+    "1080P": ["1440*1440", "1080*1920", "1920*1080", "1632*1248", "1248*1632"],
+}
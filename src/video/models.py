@@ -6,6 +6,8 @@ from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 from enum import Enum
 
+from .constants import VIDEO_SIZES
+
 
 class ModelType(str, Enum):
     """支持的模型类型"""
@@ -17,6 +17,7 @@ from .models import (
     TaskStatus,
     VideoResult,
 )
+from ..utils.http_client import http_client
 
 
 class VideoGenerator:
@@ -121,7 +122,7 @@ class VideoGenerator:
         if request.audio is not None and request.model == "wan2.6-i2v-flash":
             payload["parameters"]["audio"] = request.audio
 
-        with httpx.Client(timeout=self.timeout) as client:
+        with http_client(timeout=self.timeout) as client:
             for attempt in range(self.max_retries):
                 try:
                     response = client.post(url, headers=self.headers, json=payload)
@@ -160,7 +161,7 @@ class VideoGenerator:
         """
         url = f"{self.base_url}/tasks/{task_id}"
 
-        with httpx.Client(timeout=self.timeout) as client:
+        with http_client(timeout=self.timeout) as client:
             response = client.get(url, headers={"Authorization": f"Bearer {self.api_key}"})
             response.raise_for_status()
 
@@ -434,8 +435,8 @@ class VideoGenerator:
         file_path = save_dir / filename
 
         print(f"正在下载视频：{filename}")
-        with httpx.Client(timeout=300) as client:
-            response = client.get(url)
+        with http_client(timeout=300) as client:
+            response = client.get(url, timeout=300)
             response.raise_for_status()
 
             with open(file_path, 'wb') as f:
@@ -0,0 +1,21 @@
+"""
+持久化任务队列
+多个进程或主机从共享队列领取生成任务，支持租约续期、故障接管和任务ID持久化
+"""
+
+from .._lazy import lazy_exports
+
+# 导出名称 -> 所在子模块，首次访问时才导入
+_LAZY_EXPORTS = {
+    "QueueBackend": ".backends",
+    "SQLiteQueueBackend": ".backends",
+    "QueuedJob": ".backends",
+    "LeaseLostError": ".backends",
+    "open_queue": ".backends",
+    "register_backend": ".backends",
+    "Worker": ".worker",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_EXPORTS)
@@ -0,0 +1,310 @@
+"""
+持久化任务队列后端
+默认使用 SQLite 文件，同一台主机上的多个进程可同时领取任务；跨主机共享队列需通过 register_backend 注册其他后端
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel, Field
+
+
+class QueuedJob(BaseModel):
+    """队列中的任务"""
+    job_id: str = Field(..., description="任务ID")
+    kind: str = Field(..., description="任务类型，对应网关适配器类型")
+    params: Dict[str, Any] = Field(default_factory=dict, description="请求参数")
+    output: Dict[str, Any] = Field(default_factory=dict, description="结果保存设置：output_dir/filename")
+    state: str = Field(default="QUEUED", description="QUEUED/LEASED/SUCCEEDED/FAILED")
+    attempts: int = Field(default=0, description="已领取次数")
+    max_attempts: int = Field(default=3, description="最大领取次数")
+    task_id: Optional[str] = Field(None, description="已创建的DashScope任务ID")
+    lease_owner: Optional[str] = Field(None, description="当前持有租约的worker")
+    lease_expires: Optional[float] = Field(None, description="租约到期时间")
+    result: Optional[Dict[str, Any]] = Field(None, description="执行结果")
+    error: Optional[str] = Field(None, description="错误信息")
+
+
+class LeaseLostError(Exception):
+    """租约已过期或被其他worker接管"""
+
+
+class QueueBackend:
+    """
+    任务队列后端接口
+
+    实现需保证 lease 的原子性：同一任务在租约有效期内只会被一个 worker 持有，
+    租约过期后可被其他 worker 重新领取；record_task_id 写入的任务ID在重新领取时原样返回。
+    """
+
+    def enqueue(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        output: Optional[Dict[str, Any]] = None,
+        max_attempts: int = 3
+    ) -> str:
+        """添加任务，返回任务ID"""
+        raise NotImplementedError
+
+    def lease(self, owner: str, ttl: float) -> Optional[QueuedJob]:
+        """领取一个待执行或租约已过期的任务，没有可领取任务时返回None"""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id: str, owner: str, ttl: float) -> None:
+        """续租，租约已丢失时抛出 LeaseLostError"""
+        raise NotImplementedError
+
+    def record_task_id(self, job_id: str, owner: str, task_id: str) -> None:
+        """持久化已创建的DashScope任务ID，租约已丢失时抛出 LeaseLostError"""
+        raise NotImplementedError
+
+    def complete(self, job_id: str, owner: str, result: Dict[str, Any]) -> None:
+        """标记任务成功"""
+        raise NotImplementedError
+
+    def fail(self, job_id: str, owner: str, error: str, retry: bool = True) -> None:
+        """标记任务失败，retry为True且未超过最大次数时重新排队"""
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        """获取任务"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        """各状态任务数量"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """释放资源"""
+
+
+class SQLiteQueueBackend(QueueBackend):
+    """
+    基于 SQLite 的任务队列
+
+    仅支持单台主机：数据库使用 WAL 模式，WAL 依赖同一主机上的共享内存索引，
+    放在 NFS/SMB 等网络文件系统上由多台主机同时访问会损坏队列。
+    多台主机共享队列时请通过 register_backend 注册基于数据库服务等的后端。
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        params TEXT NOT NULL,
+        output TEXT NOT NULL,
+        state TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 3,
+        task_id TEXT,
+        lease_owner TEXT,
+        lease_expires REAL,
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, created_at);
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 30.0):
+        """
+        初始化 SQLite 队列
+
+        Args:
+            path: 数据库文件路径
+            busy_timeout: 数据库被锁定时的等待时间（秒）
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._connection().executescript(self._SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """每个线程使用独立连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    class _Transaction:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            # IMMEDIATE 事务在开始时即获取写锁，保证领取任务的原子性
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+            return False
+
+    def _transaction(self):
+        return self._Transaction(self._connection())
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> QueuedJob:
+        return QueuedJob(
+            job_id=row["job_id"],
+            kind=row["kind"],
+            params=json.loads(row["params"]),
+            output=json.loads(row["output"]),
+            state=row["state"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            task_id=row["task_id"],
+            lease_owner=row["lease_owner"],
+            lease_expires=row["lease_expires"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"]
+        )
+
+    def enqueue(self, kind, params, output=None, max_attempts=3):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, params, output, state, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'QUEUED', ?, ?, ?)",
+                (job_id, kind, json.dumps(params, ensure_ascii=False),
+                 json.dumps(output or {}, ensure_ascii=False), max_attempts, now, now)
+            )
+        return job_id
+
+    def lease(self, owner, ttl):
+        now = time.time()
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE state = 'QUEUED' "
+                    "OR (state = 'LEASED' AND lease_expires < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["state"] == "QUEUED" or row["attempts"] < row["max_attempts"]:
+                    break
+                # 租约过期且次数用尽的任务直接标记失败
+                conn.execute(
+                    "UPDATE jobs SET state = 'FAILED', lease_owner = NULL, error = ?, updated_at = ? "
+                    "WHERE job_id = ?",
+                    (f"worker {row['lease_owner']} 租约过期，已达最大尝试次数", now, row["job_id"])
+                )
+
+            conn.execute(
+                "UPDATE jobs SET state = 'LEASED', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                (owner, now + ttl, now, row["job_id"])
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+        return self._to_job(row)
+
+    def _update_leased(self, job_id: str, owner: str, sql: str, args: tuple) -> None:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {sql}, updated_at = ? "
+                "WHERE job_id = ? AND lease_owner = ? AND state = 'LEASED'",
+                args + (time.time(), job_id, owner)
+            )
+            if cursor.rowcount == 0:
+                raise LeaseLostError(f"任务 {job_id} 的租约已丢失")
+
+    def heartbeat(self, job_id, owner, ttl):
+        self._update_leased(job_id, owner, "lease_expires = ?", (time.time() + ttl,))
+
+    def record_task_id(self, job_id, owner, task_id):
+        self._update_leased(job_id, owner, "task_id = ?", (task_id,))
+
+    def complete(self, job_id, owner, result):
+        self._update_leased(
+            job_id, owner,
+            "state = 'SUCCEEDED', lease_owner = NULL, lease_expires = NULL, result = ?, error = NULL",
+            (json.dumps(result, ensure_ascii=False),)
+        )
+
+    def fail(self, job_id, owner, error, retry=True):
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE job_id = ? AND lease_owner = ? AND state = 'LEASED'",
+                (job_id, owner)
+            ).fetchone()
+            if row is None:
+                raise LeaseLostError(f"任务 {job_id} 的租约已丢失")
+            state = "QUEUED" if retry and row["attempts"] < row["max_attempts"] else "FAILED"
+            conn.execute(
+                "UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                (state, error, time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        row = self._connection().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def stats(self):
+        rows = self._connection().execute("SELECT state, COUNT(*) AS count FROM jobs GROUP BY state").fetchall()
+        counts = {state: 0 for state in ("QUEUED", "LEASED", "SUCCEEDED", "FAILED")}
+        counts.update({row["state"]: row["count"] for row in rows})
+        return counts
+
+    def failed_jobs(self, limit: int = 20) -> List[QueuedJob]:
+        """最近失败的任务"""
+        rows = self._connection().execute(
+            "SELECT * FROM jobs WHERE state = 'FAILED' ORDER BY updated_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# 队列地址协议 -> 后端实现，可通过 register_backend 扩展（如 Redis、数据库服务）
+BACKENDS: Dict[str, Type[QueueBackend]] = {
+    "sqlite": SQLiteQueueBackend,
+}
+
+
+def register_backend(scheme: str, backend_cls: Type[QueueBackend]) -> None:
+    """
+    注册队列后端
+
+    Args:
+        scheme: 地址协议，如 "redis"
+        backend_cls: 后端类，构造函数接收去掉 "scheme://" 前缀后的地址
+    """
+    BACKENDS[scheme] = backend_cls
+
+
+def open_queue(url: str) -> QueueBackend:
+    """
+    打开任务队列
+
+    Args:
+        url: 队列地址，"scheme://location" 形式；不带协议时视为 SQLite 文件路径
+
+    Returns:
+        QueueBackend: 队列后端实例
+    """
+    scheme, sep, location = url.partition("://")
+    if not sep:
+        return SQLiteQueueBackend(url)
+    backend_cls = BACKENDS.get(scheme)
+    if backend_cls is None:
+        raise ValueError(f"不支持的队列类型: {scheme}，可用类型: {', '.join(BACKENDS)}")
+    return backend_cls(location)
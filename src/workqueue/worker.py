@@ -0,0 +1,253 @@
+"""
+任务队列 worker
+从共享队列领取任务，创建DashScope任务并轮询结果，定期续租；
+worker 异常退出后，其任务在租约过期后由其他 worker 重新领取，
+已创建的DashScope任务ID会被重新接管而不是再次提交。
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .backends import LeaseLostError, QueueBackend, QueuedJob
+from ..gateway.adapters import JobAdapter, TaskPoll, create_adapters
+from ..utils.http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+# 下载单个结果的超时时间（秒）
+DOWNLOAD_TIMEOUT = 300.0
+
+# 领取任务失败时的最长退避时间（秒）
+MAX_LEASE_BACKOFF = 60.0
+
+
+class Worker:
+    """
+    队列 worker
+
+    每个线程独立领取并执行任务。任务创建后立即持久化任务ID，
+    因此只有在"创建任务成功"与"写入任务ID"之间进程崩溃时才可能重复提交。
+    """
+
+    def __init__(
+        self,
+        backend: QueueBackend,
+        api_key: Optional[str] = None,
+        adapters: Optional[Dict[str, JobAdapter]] = None,
+        concurrency: int = 4,
+        lease_ttl: float = 120.0,
+        poll_interval: float = 3.0,
+        job_timeout: float = 600.0,
+        idle_interval: float = 2.0,
+        on_event: Optional[Callable[[str, QueuedJob, str], None]] = None
+    ):
+        """
+        初始化 worker
+
+        Args:
+            backend: 队列后端
+            api_key: 阿里云百炼API密钥，如果为None则从环境变量DASHSCOPE_API_KEY获取
+            adapters: 任务类型 -> 适配器，默认使用网关的全部适配器
+            concurrency: 并发执行的任务数
+            lease_ttl: 租约有效期（秒），需明显大于轮询间隔
+            poll_interval: 轮询间隔（秒）
+            job_timeout: 单个任务等待结果的超时时间（秒）
+            idle_interval: 队列为空时的等待间隔（秒）
+            on_event: 事件回调 (event, job, message)，event 为 leased/submitted/succeeded/failed/lost
+        """
+        if adapters is None:
+            api_key = api_key or os.getenv("DASHSCOPE_API_KEY")
+            if not api_key:
+                raise ValueError("API密钥不能为空，请设置api_key参数或环境变量DASHSCOPE_API_KEY")
+            adapters = create_adapters(api_key)
+        if lease_ttl <= poll_interval * 2:
+            raise ValueError("lease_ttl 需大于两倍的 poll_interval")
+
+        self.backend = backend
+        self.adapters = adapters
+        self.concurrency = concurrency
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.idle_interval = idle_interval
+        self.on_event = on_event
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.counts = {"succeeded": 0, "failed": 0, "lost": 0}
+
+    def stop(self) -> None:
+        """请求停止：正在执行的任务不再续租，租约过期后由其他 worker 接管"""
+        self._stop.set()
+
+    def run(self, exit_when_empty: bool = False) -> Dict[str, int]:
+        """
+        运行 worker（阻塞）
+
+        Args:
+            exit_when_empty: 队列中没有可领取任务时退出，否则持续等待新任务
+
+        Returns:
+            Dict[str, int]: 本次运行的成功/失败/租约丢失计数
+        """
+        threads = [
+            threading.Thread(
+                target=self._run_loop,
+                args=(index, exit_when_empty),
+                name=f"worker-{index}",
+                daemon=True
+            )
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            self.stop()
+            raise
+        return dict(self.counts)
+
+    def _run_loop(self, index: int, exit_when_empty: bool) -> None:
+        owner = f"{self.worker_id}/{index}"
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                job = self.backend.lease(owner, self.lease_ttl)
+            except Exception as e:
+                # 队列暂时不可用（如 SQLite "database is locked"、队列服务连接中断）时退避重试，线程不退出
+                failures += 1
+                delay = min(self.idle_interval * 2 ** (failures - 1), MAX_LEASE_BACKOFF)
+                logger.warning(f"{owner} 领取任务失败: {e}，{delay:.1f} 秒后重试")
+                self._stop.wait(delay)
+                continue
+            failures = 0
+            if job is None:
+                if exit_when_empty:
+                    return
+                self._stop.wait(self.idle_interval)
+                continue
+            self.process(job, owner)
+
+    def _emit(self, event: str, job: QueuedJob, message: str = "") -> None:
+        if event in self.counts:
+            with self._lock:
+                self.counts[event] += 1
+        if self.on_event:
+            self.on_event(event, job, message)
+
+    def process(self, job: QueuedJob, owner: str) -> None:
+        """
+        执行一个已领取的任务
+
+        Args:
+            job: 已领取的任务
+            owner: 租约持有者标识
+        """
+        adapter = self.adapters.get(job.kind)
+        try:
+            if adapter is None:
+                self.backend.fail(job.job_id, owner, f"未知任务类型: {job.kind}", retry=False)
+                self._emit("failed", job, f"未知任务类型: {job.kind}")
+                return
+
+            self._emit("leased", job, f"第 {job.attempts} 次执行" + (f"，接管任务 {job.task_id}" if job.task_id else ""))
+            poll = self._execute(job, owner, adapter)
+            if poll is None:
+                # 收到停止请求，保留租约等待过期后由其他 worker 接管
+                return
+
+            if poll.status != "SUCCEEDED":
+                error = poll.error or f"任务 {job.task_id} 状态: {poll.status}"
+                # DashScope 明确返回失败时不再重试，避免重复计费
+                self.backend.fail(job.job_id, owner, error, retry=False)
+                self._emit("failed", job, error)
+                return
+
+            files = self._save_results(job, owner, poll.urls)
+            self.backend.complete(job.job_id, owner, {
+                "task_id": job.task_id,
+                "urls": poll.urls,
+                "files": files,
+            })
+            self._emit("succeeded", job, ", ".join(files) or ", ".join(poll.urls))
+
+        except LeaseLostError as e:
+            self._emit("lost", job, str(e))
+        except Exception as e:
+            try:
+                self.backend.fail(job.job_id, owner, str(e), retry=True)
+            except LeaseLostError:
+                pass
+            except Exception as backend_error:
+                # 无法记录失败时保留租约，过期后任务会被重新领取
+                logger.warning(f"记录任务 {job.job_id} 失败状态出错: {backend_error}")
+            self._emit("failed", job, str(e))
+
+    def _execute(self, job: QueuedJob, owner: str, adapter: JobAdapter) -> Optional[TaskPoll]:
+        """创建或接管DashScope任务并等待结果，收到停止请求时返回None"""
+        if not job.task_id:
+            submission = adapter.submit(job.params)
+            if submission.result is not None:
+                # 同步接口直接返回结果
+                return submission.result
+            job.task_id = submission.task_id
+            self.backend.record_task_id(job.job_id, owner, job.task_id)
+            self._emit("submitted", job, job.task_id)
+
+        deadline = time.time() + self.job_timeout
+        while True:
+            if self._stop.wait(self.poll_interval):
+                return None
+            self.backend.heartbeat(job.job_id, owner, self.lease_ttl)
+            try:
+                poll = adapter.poll(job.task_id)
+            except Exception as e:
+                # 查询失败视为暂时性错误，超时前继续重试
+                if time.time() > deadline:
+                    raise TimeoutError(f"任务 {job.task_id} 查询失败: {e}")
+                continue
+            if poll.status in ("SUCCEEDED", "FAILED", "CANCELED", "UNKNOWN"):
+                return poll
+            if time.time() > deadline:
+                raise TimeoutError(f"任务超时，等待时间超过 {self.job_timeout} 秒")
+
+    def _save_results(self, job: QueuedJob, owner: str, urls: List[str]) -> List[str]:
+        """
+        下载结果到任务 output 指定的位置
+
+        多个结果时第一个使用原文件名，其余依次添加 _2、_3 后缀；未指定输出目录时不下载。
+        下载时间可能超过租约有效期，每次下载前续租，有效期覆盖一次下载的超时时间。
+        """
+        output = job.output
+        output_dir = output.get("output_dir")
+        if not output_dir:
+            return []
+        save_dir = Path(output_dir)
+        save_dir.mkdir(parents=True, exist_ok=True)
+
+        base = Path(output.get("filename") or "")
+        files = []
+        with http_client(timeout=DOWNLOAD_TIMEOUT) as client:
+            for index, url in enumerate(urls, 1):
+                if base.name:
+                    name = base.name if index == 1 else f"{base.stem}_{index}{base.suffix}"
+                else:
+                    name = Path(url.split("?")[0]).name or f"result_{index}"
+                self.backend.heartbeat(job.job_id, owner, self.lease_ttl + DOWNLOAD_TIMEOUT)
+                response = client.get(url)
+                response.raise_for_status()
+                file_path = save_dir / name
+                with open(file_path, "wb") as f:
+                    f.write(response.content)
+                files.append(str(file_path))
+        return files
@@ -0,0 +1,128 @@
+"""
+音频模块测试公共配置：提供替代 dashscope 实时识别服务的 FakeRecognition
+"""
+
+import sys
+import types
+
+import pytest
+
+
+class FakeRecognitionResult:
+    """与 dashscope RecognitionResult 接口一致的识别结果"""
+
+    def __init__(self, sentence):
+        self.sentence = sentence
+
+    def get_sentence(self):
+        return self.sentence
+
+    @staticmethod
+    def is_sentence_end(sentence):
+        return bool(sentence.get("sentence_end"))
+
+
+class FakeRecognitionCallback:
+    def on_open(self):
+        pass
+
+    def on_close(self):
+        pass
+
+    def on_event(self, result):
+        pass
+
+    def on_error(self, result):
+        pass
+
+    def on_complete(self):
+        pass
+
+
+try:
+    import dashscope.audio.asr  # noqa: F401
+except ImportError:
+    # 测试环境未安装 dashscope 时，注册只包含识别接口的替身模块，被测代码的识别服务由 FakeRecognition 代替
+    asr = types.ModuleType("dashscope.audio.asr")
+    asr.Recognition = None
+    asr.RecognitionCallback = FakeRecognitionCallback
+    asr.RecognitionResult = FakeRecognitionResult
+    audio = types.ModuleType("dashscope.audio")
+    audio.asr = asr
+    dashscope = types.ModuleType("dashscope")
+    dashscope.api_key = None
+    dashscope.audio = audio
+    sys.modules.update({"dashscope": dashscope, "dashscope.audio": audio, "dashscope.audio.asr": asr})
+
+
+class FakeService:
+    """
+    模拟实时识别服务
+
+    句子按绝对时间定义为 (开始, 结束, 文本)（毫秒）；会话收到覆盖句子开始的音频后返回中间结果，
+    收到覆盖句子结束的音频后返回最终结果，时间相对会话收到的第一帧音频。
+    fail_after 中的数字表示累计发送到第几帧时断开当前会话。
+    """
+
+    def __init__(self, sentences, fail_after=(), fail_starts=0):
+        self.sentences = sentences
+        self.fail_after = list(fail_after)
+        self.fail_starts = fail_starts
+        self.frames = 0
+        self.sessions = []
+
+    def recognition(self, model, format, sample_rate, callback):
+        service = self
+
+        class Recognition:
+            def __init__(self):
+                self.callback = callback
+                self.received_ms = 0.0
+                self.reported = set()
+                self.dead = False
+
+            def start(self):
+                if service.sessions and service.fail_starts > 0:
+                    service.fail_starts -= 1
+                    raise ConnectionError("handshake failed")
+                service.sessions.append(self)
+
+            def send_audio_frame(self, frame):
+                if self.dead:
+                    raise ConnectionError("socket closed")
+                self.received_ms += len(frame) / 32
+                service.frames += 1
+                if service.fail_after and service.frames >= service.fail_after[0]:
+                    service.fail_after.pop(0)
+                    self.dead = True
+                    self.callback.on_error(types.SimpleNamespace(message="websocket dropped"))
+                    return
+                origin = self.callback.origin
+                covered = origin + self.received_ms
+                for begin, end, text in service.sentences:
+                    if begin < origin or text in self.reported:
+                        continue
+                    sentence = {"begin_time": begin - origin, "end_time": end - origin, "text": text}
+                    if covered >= end:
+                        self.reported.add(text)
+                        self.callback.on_event(FakeRecognitionResult({**sentence, "sentence_end": True}))
+                    elif covered >= begin:
+                        self.callback.on_event(FakeRecognitionResult({**sentence, "text": text[:1]}))
+
+            def stop(self):
+                self.callback.on_complete()
+
+        return Recognition()
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    """创建 FakeService 并替换 session 模块中的 Recognition"""
+    from src.audio import session
+
+    def create(sentences, **kwargs):
+        service = FakeService(sentences, **kwargs)
+        monkeypatch.setattr(session, "Recognition", service.recognition)
+        return service
+
+    return create
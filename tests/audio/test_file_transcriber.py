@@ -0,0 +1,94 @@
+"""
+音频文件离线转写测试
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from src.audio import file_transcriber
+
+
+class StubRecognition:
+    """记录调用的识别会话，send_error 时在第二帧后回调 on_error"""
+
+    instances = []
+
+    def __init__(self, model, format, sample_rate, callback, send_error=None, stop_error=None):
+        self.callback = callback
+        self.send_error = send_error
+        self.stop_error = stop_error
+        self.frames = 0
+        self.stopped = False
+        StubRecognition.instances.append(self)
+
+    def start(self):
+        pass
+
+    def send_audio_frame(self, data):
+        self.frames += 1
+        if self.send_error == "callback" and self.frames == 2:
+            self.callback.on_error(type("Result", (), {"message": "连接断开"})())
+        if self.send_error == "raise":
+            raise ConnectionError("发送失败")
+
+    def stop(self):
+        self.stopped = True
+        if self.stop_error:
+            raise RuntimeError(self.stop_error)
+        self.callback.on_complete()
+
+
+@pytest.fixture
+def transcriber(monkeypatch):
+    StubRecognition.instances.clear()
+    monkeypatch.setattr(file_transcriber, "load_audio", lambda path: np.zeros(16000, dtype=np.int16))
+    return file_transcriber.FileTranscriber(api_key="test-key")
+
+
+@pytest.mark.parametrize("send_error, stop_error, message", [
+    (None, None, None),
+    ("callback", None, "连接断开"),
+    ("callback", "识别已停止", "连接断开"),
+    ("raise", None, "发送失败"),
+    ("raise", "识别已停止", "发送失败"),
+    (None, "识别已停止", "识别已停止"),
+])
+def test_session_is_always_stopped(transcriber, monkeypatch, send_error, stop_error, message):
+    monkeypatch.setattr(
+        file_transcriber, "Recognition",
+        lambda **kwargs: StubRecognition(**kwargs, send_error=send_error, stop_error=stop_error)
+    )
+    record = transcriber.transcribe("a.wav")
+
+    assert StubRecognition.instances[0].stopped
+    assert record["status"] == ("SUCCEEDED" if message is None else "FAILED")
+    assert record.get("error") == message
+
+
+def _slow_transcriber(monkeypatch, transcriber, interrupt_at=None):
+    started = []
+
+    def transcribe(path):
+        started.append(path)
+        if path == interrupt_at:
+            raise KeyboardInterrupt
+        time.sleep(0.05)
+        return {"file": path, "status": "SUCCEEDED"}
+
+    monkeypatch.setattr(transcriber, "transcribe", transcribe)
+    return started
+
+
+@pytest.mark.parametrize("where", ["consumer", "worker"])
+def test_interrupt_cancels_queued_files(transcriber, monkeypatch, where):
+    paths = [f"{i}.wav" for i in range(40)]
+    started = _slow_transcriber(monkeypatch, transcriber, interrupt_at="1.wav" if where == "worker" else None)
+    records = []
+    with pytest.raises(KeyboardInterrupt):
+        for record in transcriber.iter_transcribe(paths, workers=2):
+            records.append(record)
+            raise KeyboardInterrupt
+    # 只有中断前已开始的文件会执行完
+    assert len(started) <= 4
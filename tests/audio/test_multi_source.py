@@ -0,0 +1,95 @@
+"""
+多音源合并输出测试
+"""
+
+import pytest
+
+from src.audio.multi_source import TranscriptMerger, parse_source
+from src.audio.session import SessionSupervisor
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _sentence(source, begin, end):
+    return {"source": source, "begin_time": begin, "end_time": end, "text": f"{source}{begin}"}
+
+
+def test_long_sentence_is_not_overtaken_by_later_short_one():
+    clock, out = Clock(), []
+    merger = TranscriptMerger(out.append, clock, max_delay_ms=30000)
+    marks = {"a": 0.0, "b": 0.0}
+    merger.watch("a", lambda: marks["a"])
+    merger.watch("b", lambda: marks["b"])
+
+    # a 的句子 A(0-12000) 还在进行中，水位停在它的开始时间
+    clock.now = 700
+    marks["b"] = 600
+    merger.add(_sentence("b", 500, 600))
+    assert merger.poll() == 0
+
+    clock.now = 12500
+    marks["a"] = 12000
+    merger.add(_sentence("a", 0, 12000))
+    assert merger.poll() == 2
+    assert [s["text"] for s in out] == ["a0", "b500"]
+    assert merger.late == 0
+
+
+def test_max_delay_releases_when_source_stalls():
+    clock, out = Clock(), []
+    merger = TranscriptMerger(out.append, clock, max_delay_ms=1000)
+    merger.watch("stalled", lambda: 0.0)
+    merger.add(_sentence("b", 500, 600))
+    clock.now = 900
+    assert merger.poll() == 0
+    clock.now = 1000
+    assert merger.poll() == 1
+
+    merger.unwatch("stalled")
+    merger.add(_sentence("c", 100, 200))
+    assert merger.poll() == 1
+    assert merger.late == 1
+
+
+def test_stop_flushes_in_order():
+    out = []
+    merger = TranscriptMerger(out.append, Clock())
+    merger.watch("a", lambda: 0.0)
+    for begin in (300, 100, 200):
+        merger.add(_sentence("a", begin, begin + 50))
+    merger.stop()
+    assert [s["begin_time"] for s in out] == [100, 200, 300]
+
+
+def test_supervisor_watermark_holds_at_partial_sentence(fake_service):
+    fake_service([(1000, 8000, "long"), (9000, 9500, "short")])
+    supervisor = SessionSupervisor(on_sentence=lambda s: None).start()
+    for _ in range(30):
+        supervisor.send(bytes(3200))
+    # 3 秒音频：long 已开始未结束
+    assert supervisor.has_pending
+    assert supervisor.watermark(1500) == 1000
+    for _ in range(55):
+        supervisor.send(bytes(3200))
+    # 8.5 秒：long 已结束，short 尚未开始，下限为已确认的结束时间
+    assert not supervisor.has_pending
+    assert supervisor.watermark(1500) == 8000
+    for _ in range(50):
+        supervisor.send(bytes(3200))
+    # 13.5 秒：short 已确认，之后没有新句子，下限为已发送音频减去识别延迟
+    assert supervisor.watermark(1500) == pytest.approx(13500 - 1500)
+
+
+def test_parse_source():
+    assert parse_source("mic") == ("mic", None, None, "mic")
+    assert parse_source("mic:2=客服") == ("mic", 2, None, "客服")
+    assert parse_source("file:/tmp/a.wav") == ("file", None, "/tmp/a.wav", "a.wav")
+    for spec in ("speaker", "mic:x", "file:"):
+        with pytest.raises(ValueError):
+            parse_source(spec)
@@ -0,0 +1,57 @@
+"""
+StreamResampler 测试
+"""
+
+import numpy as np
+import pytest
+
+from src.audio.resample import StreamResampler, downmix, resampler_for
+
+
+def _tone(freq, rate, seconds, channels=1, amplitude=10000):
+    wave = np.sin(2 * np.pi * freq * np.arange(int(rate * seconds)) / rate) * amplitude
+    return np.repeat(wave[:, None], channels, axis=1).astype(np.int16).ravel()
+
+
+def _rms(samples):
+    return float(np.sqrt(np.mean(samples.astype(np.float64) ** 2)))
+
+
+@pytest.mark.parametrize("rate,channels", [(48000, 2), (44100, 2), (22050, 1), (8000, 1)])
+@pytest.mark.parametrize("block", [7, 441, 4800, 100000])
+def test_chunk_size_invariance(rate, channels, block):
+    audio = _tone(1000, rate, 2.5, channels)
+    expected = StreamResampler(rate, channels=channels).process(audio.tobytes())
+
+    resampler = StreamResampler(rate, channels=channels)
+    step = block * channels
+    chunks = [resampler.process(audio[i:i + step].tobytes()) for i in range(0, len(audio), step)]
+    assert b"".join(chunks) == expected
+    assert len(expected) // 2 == pytest.approx(2.5 * 16000, abs=2)
+
+
+@pytest.mark.parametrize("rate", [48000, 44100])
+def test_passband_and_stopband(rate):
+    passed = np.frombuffer(StreamResampler(rate).process(_tone(1000, rate, 2).tobytes()), dtype=np.int16)
+    rejected = np.frombuffer(StreamResampler(rate).process(_tone(10000, rate, 2).tobytes()), dtype=np.int16)
+    steady = slice(4000, -4000)
+    assert _rms(passed[steady]) == pytest.approx(10000 / np.sqrt(2), rel=0.01)
+    # 10kHz 高于 16kHz 的奈奎斯特频率，应被滤除而不是混叠到低频
+    assert 20 * np.log10(_rms(rejected[steady]) / (10000 / np.sqrt(2))) < -60
+
+
+def test_long_input_in_one_call():
+    # 整个文件一次传入时按子块滤波，结果与逐块处理一致
+    audio = _tone(440, 48000, 12, 2)
+    one_shot = StreamResampler(48000, channels=2).process(audio.tobytes())
+    resampler = StreamResampler(48000, channels=2)
+    step = 4800 * 2
+    blocks = b"".join(resampler.process(audio[i:i + step].tobytes()) for i in range(0, len(audio), step))
+    assert one_shot == blocks
+
+
+def test_downmix_and_passthrough():
+    stereo = np.array([100, 300, -200, 0], dtype=np.int16)
+    assert downmix(stereo, 2).tolist() == [200.0, -100.0]
+    assert resampler_for(16000, 1) is None
+    assert StreamResampler(16000, channels=2).process(stereo.tobytes()) == np.array([200, -100], dtype=np.int16).tobytes()
@@ -0,0 +1,89 @@
+"""
+SessionSupervisor 重连、重发和去重测试
+"""
+
+import pytest
+
+from src.audio.session import SessionSupervisor
+
+# 1 秒 16kHz 16 位音频
+SECOND = bytes(32000)
+
+
+def _run(service_sentences, fake_service, frames, **kwargs):
+    service = fake_service(service_sentences, **kwargs)
+    out = []
+    supervisor = SessionSupervisor(on_sentence=out.append, backoff_initial=0.0).start()
+    for _ in range(frames):
+        supervisor.send(SECOND)
+    return service, supervisor, out
+
+
+def test_replays_unconfirmed_audio_after_drop(fake_service):
+    service, supervisor, out = _run(
+        [(500, 1000, "a"), (2200, 2800, "b"), (4100, 4700, "c")], fake_service, 6, fail_after=[3]
+    )
+    # 第 3 帧时会话断开，第 4 帧时重连并从 a 之后的第 2 帧开始重发
+    assert len(service.sessions) == 2
+    assert service.sessions[1].callback.origin == 1000
+    assert supervisor.reconnects == 1
+    assert supervisor.replayed_ms == 3000
+    assert [(s["begin_time"], s["end_time"], s["text"], s["session"]) for s in out] == [
+        (500, 1000, "a", 1), (2200, 2800, "b", 2), (4100, 4700, "c", 2)
+    ]
+
+
+def test_drops_sentence_recognized_by_both_sessions(fake_service):
+    # a 结束于第 2 帧中间，该帧仍在重发缓冲区中，新会话会再次识别 a
+    service, supervisor, out = _run(
+        [(1000, 1500, "a"), (2200, 2800, "b")], fake_service, 4, fail_after=[3]
+    )
+    assert service.sessions[1].callback.origin == 1000
+    assert [(s["text"], s["session"]) for s in out] == [("a", 1), ("b", 2)]
+    assert supervisor.duplicates == 1
+    assert supervisor.sentences == 2
+
+
+def test_retries_failed_reconnect_with_all_pending_audio(fake_service):
+    service, supervisor, out = _run(
+        [(500, 1000, "a"), (2200, 2800, "b")], fake_service, 5, fail_after=[3], fail_starts=1
+    )
+    # 第 4 帧重连失败，第 5 帧重连时重发第 2 至 5 帧
+    assert supervisor.reconnects == 1
+    assert supervisor.replayed_ms == 4000
+    assert [s["text"] for s in out] == ["a", "b"]
+    assert supervisor.watermark(0) == pytest.approx(5000)
+
+
+def test_failed_rotation_keeps_current_session(fake_service):
+    service = fake_service([(500, 1000, "a"), (2500, 3000, "b"), (4500, 5000, "c")], fail_starts=1)
+    out = []
+    # 最长 7 秒：发送 2 秒后强制切换
+    supervisor = SessionSupervisor(
+        on_sentence=out.append, max_session_seconds=7, rotate_seconds=2, backoff_initial=0.0
+    ).start()
+    for _ in range(3):
+        supervisor.send(SECOND)
+    # 第 3 帧切换失败，当前会话未被标记失败且收到了该帧
+    current = service.sessions[0].callback
+    assert len(service.sessions) == 1
+    assert not current.failed
+    assert service.sessions[0].received_ms == 3000
+    assert (supervisor.rotations, supervisor.reconnects) == (0, 0)
+
+    # 下一帧重试切换成功，之后的句子照常输出且不重复
+    supervisor.send(SECOND)
+    assert (supervisor.rotations, supervisor.reconnects) == (1, 0)
+    for _ in range(2):
+        supervisor.send(SECOND)
+    assert [s["text"] for s in out] == ["a", "b", "c"]
+
+
+def test_rotation_retry_waits_for_backoff(fake_service):
+    service = fake_service([], fail_starts=1)
+    supervisor = SessionSupervisor(max_session_seconds=7, rotate_seconds=2, backoff_initial=60.0).start()
+    for _ in range(6):
+        supervisor.send(SECOND)
+    assert len(service.sessions) == 1
+    assert service.sessions[0].received_ms == 6000
+    assert supervisor.rotations == 0
@@ -0,0 +1,77 @@
+"""
+FrameRingBuffer 测试
+"""
+
+import threading
+
+import pytest
+
+from src.audio.streaming import FrameRingBuffer
+
+
+def test_wraps_around_in_order():
+    buffer = FrameRingBuffer(capacity=3)
+    received = []
+    for i in range(10):
+        assert buffer.put(bytes([i]), timestamp=float(i))
+        if i % 2:
+            received.append(buffer.get(timeout=0))
+            received.append(buffer.get(timeout=0))
+    assert buffer.depth == 0
+    assert [frame[0] for frame, _ in received] == list(range(10))
+    assert [timestamp for _, timestamp in received] == [float(i) for i in range(10)]
+    assert buffer.max_depth == 2
+
+
+def test_overflow_drops_new_frames():
+    buffer = FrameRingBuffer(capacity=3)
+    assert all(buffer.put(bytes([i])) for i in range(3))
+    assert not buffer.put(b"\x03")
+    assert not buffer.put(b"\x04")
+    assert (buffer.overflows, buffer.depth, buffer.max_depth) == (2, 3, 3)
+    # 已缓冲的帧不会被覆盖，读出一帧后可以继续写入
+    assert buffer.get(timeout=0)[0] == b"\x00"
+    assert buffer.put(b"\x05")
+    assert [buffer.get(timeout=0)[0] for _ in range(3)] == [b"\x01", b"\x02", b"\x05"]
+    assert buffer.get(timeout=0.01) is None
+
+
+def test_wake_releases_waiting_reader():
+    buffer = FrameRingBuffer(capacity=2)
+    result = []
+    reader = threading.Thread(target=lambda: result.append(buffer.get(timeout=5)))
+    reader.start()
+    buffer.wake()
+    reader.join(timeout=5)
+    assert not reader.is_alive()
+    assert result == [None]
+
+
+def test_single_producer_single_consumer():
+    total = 20000
+    buffer = FrameRingBuffer(capacity=8)
+    received = []
+    finished = threading.Event()
+
+    def consume():
+        while not (finished.is_set() and buffer.depth == 0):
+            item = buffer.get(timeout=0.05)
+            if item is not None:
+                received.append(int.from_bytes(item[0], "little"))
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    accepted = sum(buffer.put(i.to_bytes(4, "little")) for i in range(total))
+    finished.set()
+    consumer.join(timeout=10)
+
+    assert not consumer.is_alive()
+    assert accepted + buffer.overflows == total
+    assert len(received) == accepted
+    assert received == sorted(set(received))
+    assert buffer.max_depth <= buffer.capacity
+
+
+def test_rejects_empty_capacity():
+    with pytest.raises(ValueError):
+        FrameRingBuffer(capacity=0)
@@ -0,0 +1,66 @@
+"""
+VADGate 测试
+"""
+
+import numpy as np
+import pytest
+
+from src.audio.vad import VADGate
+
+RATE = 16000
+
+
+def _noisy_bursts(noise_std, seconds=20, bursts=(5, 12), burst_seconds=2, seed=0):
+    """白噪声背景上叠加两段 300Hz 音调"""
+    rng = np.random.default_rng(seed)
+    audio = rng.normal(0, noise_std, RATE * seconds) if noise_std else np.zeros(RATE * seconds)
+    tone = np.sin(2 * np.pi * 300 * np.arange(RATE * burst_seconds) / RATE) * 8000
+    for start in bursts:
+        audio[start * RATE:(start + burst_seconds) * RATE] += tone
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def _run(gate, audio, frame=1600):
+    sent = []
+    for offset in range(0, len(audio), frame):
+        sent.extend(gate.process(audio[offset:offset + frame].tobytes()))
+    return sent
+
+
+@pytest.mark.parametrize("noise_std", [0, 10, 30, 100, 300, 1000])
+def test_gate_closes_on_steady_background_noise(noise_std):
+    gate = VADGate(keepalive_ms=0)
+    _run(gate, _noisy_bursts(noise_std))
+    stats = gate.snapshot()
+    # 两段 2 秒音调，加上前置缓冲和拖尾
+    assert stats["speech_seconds"] == pytest.approx(4.0, abs=0.3)
+    assert stats["sent_seconds"] < 6.5
+    assert stats["suppression_ratio"] > 0.65
+
+
+def test_noise_floor_follows_rising_noise():
+    gate = VADGate(keepalive_ms=0)
+    rng = np.random.default_rng(1)
+    quiet = rng.normal(0, 10, RATE * 5)
+    loud = rng.normal(0, 300, RATE * 10)
+    _run(gate, np.concatenate([quiet, loud]).astype(np.int16))
+    assert gate.noise_db > -45
+    # 噪声上升后的几秒内会被判为语音，之后门控关闭
+    assert gate.speech_ms < 6000
+
+
+def test_stream_time_mapping():
+    gate = VADGate(keepalive_ms=0, pre_roll_ms=300, hangover_ms=600)
+    _run(gate, _noisy_bursts(30))
+    # 第一段音调从 5 秒开始，发送的音频从 4.7 秒（前置缓冲）开始
+    assert gate.to_stream_time(0) == pytest.approx(4700, abs=100)
+    # 第二段发送的音频接在第一段之后
+    first_segment = 2000 + 300 + 600
+    assert gate.to_stream_time(first_segment + 50) == pytest.approx(11700 + 50, abs=150)
+
+
+def test_keepalive_during_silence():
+    gate = VADGate(keepalive_ms=1000)
+    sent = _run(gate, np.zeros(RATE * 5, dtype=np.int16))
+    assert 4 <= len(sent) <= 5
+    assert all(frame == bytes(len(frame)) for frame in sent)
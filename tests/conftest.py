@@ -0,0 +1,9 @@
+"""
+测试公共配置
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径，与 cli 的做法一致
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,155 @@
+"""
+网关任务调度测试
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.gateway.adapters import JobAdapter, TaskPoll, TaskSubmission
+from src.gateway.jobs import JobManager, JobState, QueueFullError
+
+
+class FakeAdapter(JobAdapter):
+    """release 之前 submit 一直阻塞；每个任务第一次查询为 RUNNING，之后成功"""
+
+    kind = "fake"
+
+    def __init__(self, blocked=False, sync=False):
+        super().__init__(api_key="test-key")
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+        self.sync = sync
+        self.submitted = []
+        self.polls = {}
+
+    def validate(self, params):
+        if "prompt" not in params:
+            raise ValueError("缺少 prompt")
+        return dict(params)
+
+    def submit(self, params):
+        self.submitted.append(params["prompt"])
+        self.release.wait(5)
+        if self.sync:
+            return TaskSubmission(result=TaskPoll(status="SUCCEEDED", urls=[f"https://example.com/{params['prompt']}"]))
+        return TaskSubmission(task_id=f"task-{params['prompt']}")
+
+    def poll(self, task_id):
+        count = self.polls[task_id] = self.polls.get(task_id, 0) + 1
+        if count == 1:
+            return TaskPoll(status="RUNNING")
+        return TaskPoll(status="SUCCEEDED", urls=[f"https://example.com/{task_id}"])
+
+
+def _run(coroutine_factory, adapter, **kwargs):
+    async def main():
+        manager = JobManager({"fake": adapter}, poll_interval=0.01, **kwargs)
+        await manager.start()
+        try:
+            return await coroutine_factory(manager)
+        finally:
+            adapter.release.set()
+            await manager.stop()
+
+    return asyncio.run(main())
+
+
+async def _wait_for(predicate, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "等待超时"
+        await asyncio.sleep(0.005)
+
+
+def test_job_runs_to_success_with_events():
+    async def scenario(manager):
+        job = manager.submit("fake", {"prompt": "cat"})
+        events = manager.subscribe(job.job_id)
+        await _wait_for(lambda: job.finished)
+        states = []
+        while not events.empty():
+            states.append(events.get_nowait()["state"])
+        return job, states, manager.stats()
+
+    job, states, stats = _run(scenario, FakeAdapter())
+
+    assert job.state == JobState.SUCCEEDED
+    assert job.urls == ["https://example.com/task-cat"]
+    assert states[-1] == "SUCCEEDED" and "RUNNING" in states
+    assert (stats["inflight"], stats["polling"]) == (0, 0)
+
+
+def test_queue_limit_rejects_excess_jobs():
+    adapter = FakeAdapter(blocked=True)
+
+    async def scenario(manager):
+        first = manager.submit("fake", {"prompt": "a"})
+        await _wait_for(lambda: adapter.submitted)
+        manager.submit("fake", {"prompt": "b"})
+        manager.submit("fake", {"prompt": "c"})
+        with pytest.raises(QueueFullError):
+            manager.submit("fake", {"prompt": "d"})
+        assert first.state == JobState.SUBMITTING
+        return manager.stats()
+
+    stats = _run(scenario, adapter, max_queue=2, max_inflight=1)
+    assert (stats["queued"], stats["inflight"]) == (2, 1)
+
+
+def test_cancel_frees_queue_slot():
+    adapter = FakeAdapter(blocked=True)
+
+    async def scenario(manager):
+        manager.submit("fake", {"prompt": "a"})
+        queued = manager.submit("fake", {"prompt": "b"})
+        assert manager.cancel(queued.job_id).state == JobState.CANCELED
+        manager.submit("fake", {"prompt": "c"})
+        return manager.stats()
+
+    assert _run(scenario, adapter, max_queue=1, max_inflight=1)["queued"] == 1
+
+
+def test_tenants_are_scheduled_round_robin():
+    adapter = FakeAdapter(blocked=True)
+
+    async def scenario(manager):
+        for prompt in ("a1", "a2", "a3"):
+            manager.submit("fake", {"prompt": prompt}, tenant="a")
+        manager.submit("fake", {"prompt": "b1"}, tenant="b")
+        await _wait_for(lambda: len(adapter.submitted) == 2)
+        started = sorted(adapter.submitted)
+        adapter.release.set()
+        await _wait_for(lambda: len(adapter.submitted) == 4)
+        return started
+
+    started = _run(scenario, adapter, tenant_limit=1, max_inflight=4)
+    # 租户 a 受并发上限限制，b 不必等待 a 的排队任务
+    assert started == ["a1", "b1"]
+
+
+def test_sync_result_finishes_without_polling():
+    adapter = FakeAdapter(sync=True)
+
+    async def scenario(manager):
+        job = manager.submit("fake", {"prompt": "cat"})
+        await _wait_for(lambda: job.finished)
+        return job
+
+    job = _run(scenario, adapter)
+    assert job.state == JobState.SUCCEEDED and job.task_id is None
+    assert adapter.polls == {}
+
+
+def test_invalid_requests_are_rejected_before_queueing():
+    async def scenario(manager):
+        with pytest.raises(ValueError):
+            manager.submit("unknown", {"prompt": "cat"})
+        with pytest.raises(ValueError):
+            manager.submit("fake", {})
+        return manager.stats()
+
+    assert _run(scenario, FakeAdapter())["jobs"] == 0
@@ -0,0 +1,88 @@
+"""
+多模型对比测试
+"""
+
+import threading
+
+import pytest
+from PIL import Image
+
+from src.image.compare import compare_models
+from src.image.models import ImageGenerationResponse, ImageResult, TaskStatus, adapt_size_for_model
+from src.utils.contact_sheet import build_contact_sheet
+
+
+class FakeGenerator:
+    """所有模型的请求都到达后才一起返回；fail 中的模型抛出异常"""
+
+    def __init__(self, models, fail=()):
+        self.calls = {}
+        self.fail = set(fail)
+        self._barrier = threading.Barrier(len(models), timeout=5)
+
+    def generate_image(self, prompt, size, model, n, **kwargs):
+        self.calls[model] = size
+        self._barrier.wait()
+        if model in self.fail:
+            raise RuntimeError(f"{model} 不可用")
+        return ImageGenerationResponse(
+            task_id=f"task-{model}",
+            task_status=TaskStatus.SUCCEEDED,
+            results=[ImageResult(url=f"https://example.com/{model}/{i}.png") for i in range(n)],
+            image_count=n,
+            request_id=f"req-{model}"
+        )
+
+
+MODELS = ["qwen-image", "wan2.2-t2i-flash", "wanx2.0-t2i-turbo"]
+
+
+def test_models_run_concurrently_in_order():
+    generator = FakeGenerator(MODELS)
+
+    results = compare_models("一只猫", MODELS, size="1920*1080", n=2, generator=generator)
+
+    assert [result.model for result in results] == MODELS
+    assert all(result.status == "SUCCEEDED" and result.image_count == 2 for result in results)
+    assert results[0].task_ids == ["task-qwen-image"]
+    assert results[2].cost == pytest.approx(0.08)
+
+
+def test_sizes_are_adapted_per_model():
+    generator = FakeGenerator(MODELS)
+
+    results = compare_models("一只猫", MODELS, size="1920*1080", generator=generator)
+
+    assert generator.calls["qwen-image"] == "1664*928"
+    for result in results:
+        assert result.size == generator.calls[result.model] == adapt_size_for_model("1920*1080", result.model)
+
+
+def test_failed_model_does_not_affect_others():
+    generator = FakeGenerator(MODELS, fail={"wan2.2-t2i-flash"})
+
+    results = compare_models("一只猫", MODELS, generator=generator)
+
+    assert [result.status for result in results] == ["SUCCEEDED", "FAILED", "SUCCEEDED"]
+    assert "不可用" in results[1].error and results[1].cost is None
+
+
+def test_contact_sheet_keeps_placeholder_for_missing_image(tmp_path):
+    image = tmp_path / "a.png"
+    Image.new("RGB", (200, 100), "red").save(image)
+
+    output = build_contact_sheet(
+        [(str(image), "qwen"), (None, "wan 失败")], str(tmp_path / "sheet" / "compare.png"),
+        cell_size=64, label_height=20, padding=4
+    )
+
+    with Image.open(output) as sheet:
+        assert sheet.size == (2 * (64 + 4) + 4, 64 + 20 + 4 + 4)
+        # 宽图按比例缩放后居中
+        assert sheet.getpixel((4 + 32, 4 + 32)) == (255, 0, 0)
+        assert sheet.getpixel((4 + 32, 4 + 5)) == (255, 255, 255)
+
+
+def test_contact_sheet_requires_items(tmp_path):
+    with pytest.raises(ValueError):
+        build_contact_sheet([], str(tmp_path / "empty.png"))
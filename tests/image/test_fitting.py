@@ -0,0 +1,110 @@
+"""
+模型尺寸能力和输入图像适配测试
+"""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.image.constants import MODEL_CAPABILITIES
+from src.image.fitting import apply_fit, encode_image_for_model, plan_fit
+from src.image.models import ImageGenerationRequest, adapt_size_for_model, fit_size_for_model
+from src.image.text2image import Text2ImageGenerator
+
+
+@pytest.mark.parametrize("size, model, expected", [
+    ((1920, 1080), "qwen-image", (1664, 928)),
+    ((1000, 1000), "qwen-image", (1328, 1328)),
+    ((1080, 1920), "qwen", (928, 1664)),
+    ((4000, 3000), "wan2.2-t2i-flash", (1440, 1080)),
+    ((300, 200), "wan", (768, 512)),
+    ((5000, 500), "wan", (1440, 512)),
+    ((640, 480), "wanx2.1-sketch2image", (768, 768)),
+])
+def test_fit_size_for_model(size, model, expected):
+    width, height = fit_size_for_model(*size, model)
+    assert (width, height) == expected
+    spec = MODEL_CAPABILITIES[{"qwen-image": "qwen", "wan2.2-t2i-flash": "wan", "wanx2.1-sketch2image": "sketch"}.get(model, model)]
+    if "range" in spec:
+        min_side, max_side, max_pixels = spec["range"]
+        assert min_side <= width <= max_side and min_side <= height <= max_side
+        assert width * height <= max_pixels
+    else:
+        assert f"{width}*{height}" in spec["sizes"]
+
+
+def test_unknown_model_is_rejected():
+    with pytest.raises(ValueError):
+        fit_size_for_model(100, 100, "unknown-model")
+    assert adapt_size_for_model("1000*700", "unknown-model") == "1000*700"
+
+
+@pytest.mark.parametrize("size", ["1024*1024", "1920*1080", "800*1200", "oops"])
+def test_adapted_sizes_pass_validation(size):
+    for model in ("qwen-image", "wan2.2-t2i-flash"):
+        request = ImageGenerationRequest(prompt="猫", model=model, size=adapt_size_for_model(size, model))
+        assert request.validate_for_model()["valid"]
+
+
+def test_generate_image_uses_capability_table_for_qwen(monkeypatch):
+    generator = Text2ImageGenerator(api_key="test-key")
+    sizes = []
+    monkeypatch.setattr(generator, "create_task", lambda request: sizes.append(request.size) or type("Task", (), {"task_id": "t"})())
+    monkeypatch.setattr(generator, "wait_for_completion", lambda task_id: None)
+    for size in ("1920*1080", "1472*1140", "1024*1024"):
+        generator.generate_image("猫", model="qwen-image", size=size)
+    assert sizes == ["1664*928", "1472*1140", "1328*1328"]
+
+
+def _striped(width, height):
+    """左侧平坦、右侧有细节的图像"""
+    array = np.full((height, width, 3), 120, dtype=np.uint8)
+    array[:, width // 2:, :] = (np.arange(width - width // 2) // 16 % 2 * 255)[None, :, None]
+    return Image.fromarray(array)
+
+
+def test_auto_crops_small_aspect_change_towards_detail():
+    plan = plan_fit(_striped(1100, 1000), (1000, 1000))
+    assert plan.method == "crop"
+    # 居中裁剪的起点为 50，能量窗口偏向右侧细节（缩略图精度内）
+    left, top, right, bottom = plan.crop_box
+    assert (right - left, top, bottom) == (1000, 0, 1000)
+    assert left >= 90
+
+
+def test_auto_pads_large_aspect_change():
+    image = Image.new("RGB", (2000, 500), (10, 20, 30))
+    plan = plan_fit(image, (1000, 1000))
+    assert plan.method == "pad"
+    assert (plan.scaled_size, plan.offset) == ((1000, 250), (0, 375))
+    fitted = apply_fit(image, plan)
+    assert fitted.size == (1000, 1000)
+    assert fitted.getpixel((0, 0)) == (10, 20, 30)
+
+
+def test_plan_fit_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        plan_fit(Image.new("RGB", (10, 10)), (5, 5), "stretch")
+
+
+def test_encode_keeps_mask_aligned(tmp_path):
+    Image.new("RGB", (3000, 1000), (200, 200, 200)).save(tmp_path / "a.jpg")
+    mask = Image.new("L", (3000, 1000), 0)
+    mask.paste(255, (0, 0, 1500, 1000))
+    mask.save(tmp_path / "m.png")
+
+    image_url, mask_url, plan = encode_image_for_model(str(tmp_path / "a.jpg"), "wan", "pad", str(tmp_path / "m.png"))
+
+    assert image_url.startswith("data:image/jpeg;base64,")
+    decoded = Image.open(io.BytesIO(base64.b64decode(image_url.split(",", 1)[1])))
+    fitted_mask = np.asarray(Image.open(io.BytesIO(base64.b64decode(mask_url.split(",", 1)[1]))).convert("L"))
+    assert decoded.size == plan.size == fitted_mask.shape[::-1]
+    left, top = plan.offset
+    width, height = plan.scaled_size
+    # 填充区域不编辑，原 mask 的左半部分对应缩放后图像的左半部分
+    assert fitted_mask[:top].max() == 0
+    assert fitted_mask[top + 1:top + height - 1, left:left + width // 2 - 1].min() == 255
+    assert fitted_mask[top:top + height, left + width // 2 + 1:].max() == 0
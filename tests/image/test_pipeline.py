@@ -0,0 +1,106 @@
+"""
+图像编辑流水线测试
+"""
+
+import threading
+
+import pytest
+
+from src.image.models import ImageEditResponse, ImageResult
+from src.image.pipeline import EditPipeline
+
+
+class FakeEditor:
+    """每个步骤返回 n 个以步骤提示词命名的结果URL，记录调用参数和下载"""
+
+    def __init__(self, fail=()):
+        self.calls = {}
+        self.downloads = []
+        self.fail = set(fail)
+        self._lock = threading.Lock()
+
+    def edit_image(self, model, image_url, prompt, function=None, mask_image_url=None, n=1, **params):
+        with self._lock:
+            self.calls[prompt] = {"image_url": image_url, "mask_image_url": mask_image_url, **params}
+        if prompt in self.fail:
+            raise RuntimeError(f"{prompt} 失败")
+        return ImageEditResponse(
+            task_id=f"task-{prompt}",
+            results=[ImageResult(url=f"https://example.com/{prompt}/{i}.png") for i in range(n)],
+            request_id="req"
+        )
+
+    def is_url(self, path):
+        return path.startswith(("http://", "https://"))
+
+    def encode_image_to_base64(self, path):
+        return f"data:image/png;base64,{path}"
+
+    def download_image(self, url, output_dir, filename):
+        with self._lock:
+            self.downloads.append(url)
+        return f"{output_dir}/{filename}"
+
+
+def _step(step_id, **kwargs):
+    return {"id": step_id, "function": "description_edit", "prompt": step_id, **kwargs}
+
+
+def test_result_urls_are_chained_and_terminals_downloaded(tmp_path):
+    editor = FakeEditor()
+    pipeline = EditPipeline.from_dict({
+        "input": "photo.jpg",
+        "steps": [_step("clean"), _step("hd", input="clean", upscale_factor=2), _step("comic", input="clean")]
+    }, editor=editor)
+
+    results = pipeline.run(output_dir=str(tmp_path))
+
+    assert list(results) == ["clean", "hd", "comic"]
+    assert all(result.status == "SUCCEEDED" for result in results.values())
+    assert editor.calls["clean"]["image_url"] == "data:image/png;base64,photo.jpg"
+    assert editor.calls["hd"]["image_url"] == "https://example.com/clean/0.png"
+    assert editor.calls["hd"]["upscale_factor"] == 2
+    assert sorted(editor.downloads) == ["https://example.com/comic/0.png", "https://example.com/hd/0.png"]
+
+
+def test_mask_pick_is_independent_of_input_pick(tmp_path):
+    editor = FakeEditor()
+    pipeline = EditPipeline.from_dict({
+        "input": "https://example.com/photo.png",
+        "steps": [
+            _step("variants", n=4),
+            _step("masks", n=2),
+            _step("inpaint", input="variants", pick=3, mask="masks", mask_pick=1),
+            _step("default", input="variants", pick=2, mask="masks"),
+        ]
+    }, editor=editor)
+
+    pipeline.run(output_dir=str(tmp_path))
+
+    assert editor.calls["inpaint"]["image_url"] == "https://example.com/variants/3.png"
+    assert editor.calls["inpaint"]["mask_image_url"] == "https://example.com/masks/1.png"
+    assert editor.calls["default"]["mask_image_url"] == "https://example.com/masks/0.png"
+
+
+def test_failed_step_skips_dependents(tmp_path):
+    editor = FakeEditor(fail={"clean"})
+    pipeline = EditPipeline.from_dict({
+        "input": "https://example.com/photo.png",
+        "steps": [_step("clean"), _step("hd", input="clean"), _step("other")]
+    }, editor=editor)
+
+    results = pipeline.run(output_dir=str(tmp_path))
+
+    assert results["clean"].status == "FAILED"
+    assert results["hd"].status == "SKIPPED"
+    assert results["other"].status == "SUCCEEDED"
+    assert "hd" not in editor.calls
+
+
+@pytest.mark.parametrize("steps", [
+    [_step("a", input="b"), _step("b", input="a")],
+    [_step("a"), _step("a")],
+])
+def test_invalid_graphs_are_rejected(steps):
+    with pytest.raises(ValueError):
+        EditPipeline.from_dict({"steps": steps}, editor=FakeEditor())
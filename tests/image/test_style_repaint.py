@@ -0,0 +1,97 @@
+"""
+风格矩阵并发重绘测试
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.image.models import ImageGenerationResponse, ImageResult, StyleRepaintResponse, TaskStatus
+from src.image.style_repaint import StyleRepaintGenerator
+from src.utils.rate_limit import RateLimiter
+
+
+class FakeService:
+    """记录提交的风格；fail 中的风格在等待结果时失败"""
+
+    def __init__(self, fail=()):
+        self.created = []
+        self.images = set()
+        self.fail = set(fail)
+        self._lock = threading.Lock()
+
+    def create_task(self, request):
+        with self._lock:
+            self.created.append(request.style_index)
+            self.images.add(request.image_url)
+        return StyleRepaintResponse(
+            task_id=f"task-{request.style_index}", task_status=TaskStatus.PENDING, request_id="req"
+        )
+
+    def wait_for_completion(self, task_id, timeout=300):
+        style_index = int(task_id.split("-")[1])
+        if style_index in self.fail:
+            raise RuntimeError(f"风格 {style_index} 失败")
+        return ImageGenerationResponse(
+            task_id=task_id,
+            task_status=TaskStatus.SUCCEEDED,
+            results=[ImageResult(url=f"https://example.com/{style_index}.png")],
+            request_id="req"
+        )
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    generator = StyleRepaintGenerator(api_key="test-key")
+
+    def install(service):
+        monkeypatch.setattr(generator, "_create_task", service.create_task)
+        monkeypatch.setattr(generator, "wait_for_completion", service.wait_for_completion)
+        return service
+
+    generator.install = install
+    return generator
+
+
+def test_all_styles_share_one_image(generator):
+    service = generator.install(FakeService(fail={5}))
+
+    results = {
+        style: (response, error)
+        for style, response, error in generator.repaint_styles("data:image/png;base64,AAAA", [0, 2, 5, 30], rate_limit=0)
+    }
+
+    assert sorted(results) == sorted(service.created) == [0, 2, 5, 30]
+    assert service.images == {"data:image/png;base64,AAAA"}
+    assert results[30][0].results[0].url == "https://example.com/30.png"
+    assert results[5][0] is None and "失败" in str(results[5][1])
+
+
+def test_invalid_style_rejected_before_submission(generator):
+    service = generator.install(FakeService())
+
+    with pytest.raises(ValueError):
+        list(generator.repaint_styles("https://example.com/a.png", [0, 12]))
+    assert service.created == []
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+
+    # 首个请求立即放行，其余 5 个按 1/50 秒间隔放行
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
+
+def test_rate_limiter_burst_and_unlimited():
+    start = time.monotonic()
+    for _ in range(3):
+        RateLimiter(rate=0).acquire()
+    limiter = RateLimiter(rate=1, burst=3)
+    for _ in range(3):
+        limiter.acquire()
+
+    assert time.monotonic() - start < 0.5
@@ -0,0 +1,98 @@
+"""
+文生图拆分执行测试
+"""
+
+import threading
+
+import httpx
+import pytest
+
+from src.image.models import ImageGenerationResponse, ImageResult, TaskCreationResponse, TaskStatus
+from src.image.text2image import MAX_SEED, Text2ImageGenerator
+from src.utils.http_client import set_shared_client
+
+
+class FakeService:
+    """记录创建的子任务，fail 中的子任务序号返回失败"""
+
+    def __init__(self, fail=()):
+        self.requests = {}
+        self.fail = set(fail)
+        self._lock = threading.Lock()
+
+    def create_task(self, request):
+        with self._lock:
+            task_id = f"task-{len(self.requests)}"
+            self.requests[task_id] = request
+        return TaskCreationResponse(task_id=task_id, task_status=TaskStatus.PENDING, request_id=f"req-{task_id}")
+
+    def wait_for_completion(self, task_id, poll_interval=3.0, timeout=300.0):
+        request = self.requests[task_id]
+        if request.seed in self.fail:
+            raise RuntimeError(f"{task_id} 失败")
+        return ImageGenerationResponse(
+            task_id=task_id,
+            task_status=TaskStatus.SUCCEEDED,
+            results=[ImageResult(url=f"https://example.com/{request.seed + i}.png") for i in range(request.n)],
+            image_count=request.n,
+            request_id=f"req-{task_id}"
+        )
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    generator = Text2ImageGenerator(api_key="test-key")
+
+    def install(service):
+        monkeypatch.setattr(generator, "create_task", service.create_task)
+        monkeypatch.setattr(generator, "wait_for_completion", service.wait_for_completion)
+        return service
+
+    generator.install = install
+    return generator
+
+
+def test_large_count_is_split_with_consecutive_seeds(generator):
+    service = generator.install(FakeService())
+    response = generator.generate_image("一只猫", n=10, seed=100)
+
+    assert sorted(request.n for request in service.requests.values()) == [2, 4, 4]
+    assert [result.url for result in response.results] == [f"https://example.com/{100 + i}.png" for i in range(10)]
+    assert response.image_count == 10
+    assert len(response.sub_task_ids) == 3
+    assert response.errors is None
+
+
+def test_qwen_is_split_into_single_image_tasks(generator):
+    service = generator.install(FakeService())
+    response = generator.generate_image("一只猫", model="qwen-image", n=3, seed=MAX_SEED)
+    assert [request.n for request in service.requests.values()] == [1, 1, 1]
+    # 种子超过上限后回绕
+    assert sorted(request.seed for request in service.requests.values()) == [0, 1, MAX_SEED]
+    assert len(response.results) == 3
+
+
+def test_partial_failures_are_reported(generator):
+    generator.install(FakeService(fail={4}))
+    response = generator.generate_image("一只猫", n=8, seed=0)
+    assert len(response.results) == 4
+    assert response.errors and "失败" in response.errors[0]
+
+
+def test_all_failures_raise(generator):
+    generator.install(FakeService(fail={0, 4}))
+    with pytest.raises(Exception, match="所有子任务均失败"):
+        generator.generate_images("一只猫", n=8, seed=0)
+
+
+def test_download_images_names_in_order(tmp_path):
+    client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=request.url.path.encode())))
+    previous = set_shared_client(client)
+    try:
+        urls = [f"https://example.com/{i}.png" for i in range(3)]
+        paths = Text2ImageGenerator(api_key="test-key").download_images(urls, str(tmp_path), "cat.png")
+    finally:
+        set_shared_client(previous)
+        client.close()
+    assert [p.rsplit("/", 1)[-1] for p in paths] == ["cat.png", "cat_2.png", "cat_3.png"]
+    assert [open(p, "rb").read() for p in paths] == [b"/0.png", b"/1.png", b"/2.png"]
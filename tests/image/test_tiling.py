@@ -0,0 +1,64 @@
+"""
+大图分块编辑测试
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.image.tiling import PngStreamWriter, TiledEditor, tile_spans
+
+
+def _photo(height, width, seed=0):
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    base = (np.sin(x / 40) + np.cos(y / 55)) * 60 + 128
+    image = np.stack([base, np.roll(base, 17, axis=1), base[::-1]], axis=-1) + rng.normal(0, 6, (height, width, 3))
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("chunks", [[300], [1, 2, 97, 200], [150, 150]])
+def test_png_stream_writer_is_lossless(tmp_path, chunks):
+    image = _photo(300, 257)
+    writer = PngStreamWriter(str(tmp_path / "out.png"), 257, 300)
+    offset = 0
+    for size in chunks:
+        writer.write_rows(image[offset:offset + size])
+        offset += size
+    writer.close()
+    with Image.open(tmp_path / "out.png") as decoded:
+        assert decoded.mode == "RGB"
+        assert np.array_equal(np.asarray(decoded), image)
+
+
+def test_png_stream_writer_rejects_incomplete_image(tmp_path):
+    writer = PngStreamWriter(str(tmp_path / "out.png"), 10, 10)
+    writer.write_rows(np.zeros((5, 10, 3), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        writer.close()
+    writer.abort()
+    assert not (tmp_path / "out.png").exists()
+
+
+def test_tile_spans_cover_length():
+    spans = tile_spans(3000, 1024, 128)
+    assert spans[0][0] == 0 and spans[-1][1] == 3000
+    assert all(a[1] - b[0] >= 128 for a, b in zip(spans, spans[1:]))
+
+
+@pytest.mark.parametrize("suffix", [".png", ".bmp"])
+def test_identity_tiles_reconstruct_image(tmp_path, monkeypatch, suffix):
+    def upscale(self, tile, scale, function, prompt, params):
+        return np.asarray(tile.resize((tile.width * scale, tile.height * scale), Image.NEAREST), dtype=np.float32), "task"
+
+    monkeypatch.setattr(TiledEditor, "_edit_tile", upscale)
+    source = _photo(1400, 1100)
+    editor = TiledEditor(editor=object(), tile_size=512, overlap=64, max_workers=2)
+    output = tmp_path / f"out{suffix}"
+    result = editor.process(Image.fromarray(source), str(output), function="super_resolution", upscale_factor=2)
+
+    assert (result.width, result.height, result.columns, result.rows) == (2200, 2800, 3, 3)
+    assert result.seam_error_max == 0.0
+    with Image.open(output) as decoded:
+        expected = source.repeat(2, axis=0).repeat(2, axis=1)
+        assert np.array_equal(np.asarray(decoded), expected)
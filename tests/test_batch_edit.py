@@ -0,0 +1,61 @@
+"""
+批量图像编辑入队测试
+"""
+
+import numpy as np
+from PIL import Image
+
+from cli.commands.batch_edit import enqueue_creations, is_local_file
+from src.workqueue import SQLiteQueueBackend
+
+
+def test_is_local_file(tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(b"png")
+    assert is_local_file(str(path))
+    assert not is_local_file(str(tmp_path / "missing.png"))
+    assert not is_local_file("https://example.com/a.png")
+    # 长 data URL 作为路径会触发“文件名过长”
+    assert not is_local_file("data:image/png;base64," + "A" * 100000)
+
+
+def test_enqueue_inlines_large_local_mask(tmp_path):
+    Image.new("RGB", (320, 240), (90, 120, 150)).save(tmp_path / "base.png")
+    noise = np.random.default_rng(0).integers(0, 256, (240, 320), dtype=np.uint8)
+    Image.fromarray(noise).save(tmp_path / "mask.png")
+    queue = str(tmp_path / "queue.db")
+    creation = {
+        "id": 1,
+        "name": "局部重绘",
+        "model": "wanx2.1-imageedit",
+        "function": "description_edit_with_mask",
+        "prompt": "添加一只猫",
+        "mask_image": str(tmp_path / "mask.png"),
+    }
+
+    assert enqueue_creations(queue, [creation], str(tmp_path / "base.png"), str(tmp_path / "out")) == 0
+
+    backend = SQLiteQueueBackend(queue)
+    try:
+        job = backend.lease("test", 30.0)
+    finally:
+        backend.close()
+    assert job.params["image_url"].startswith("data:image/png;base64,")
+    assert job.params["mask_image_url"].startswith("data:image/png;base64,")
+    assert len(job.params["mask_image_url"]) > 50000
+
+
+def test_enqueue_skips_creation_with_bad_mask_shapes(tmp_path, capsys):
+    Image.new("RGB", (320, 240)).save(tmp_path / "base.png")
+    queue = str(tmp_path / "queue.db")
+    base = {"model": "wanx2.1-imageedit", "function": "description_edit_with_mask", "prompt": "添加一只猫"}
+    creations = [
+        {**base, "id": 1, "name": "错误形状", "mask_shapes": [{"type": "rectangle", "left": 0, "top": 0}]},
+        {**base, "id": 2, "name": "正确形状", "mask_shapes": [{"type": "rectangle", "x": 10, "y": 10, "width": 50, "height": 40}]},
+    ]
+
+    assert enqueue_creations(queue, creations, str(tmp_path / "base.png"), str(tmp_path / "out")) == 0
+
+    output = capsys.readouterr().out
+    assert "错误形状 参数错误" in output
+    assert "已入队：1/2" in output
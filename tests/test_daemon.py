@@ -0,0 +1,76 @@
+"""
+CLI 守护进程测试
+"""
+
+import io
+import os
+import stat
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cli.daemon import DaemonServer
+from src.utils.executors import ContextThreadPoolExecutor
+
+
+def _request(server, name, jobs):
+    """模拟一个请求线程：设置输出目标后在线程池中输出"""
+    target = io.StringIO()
+
+    def run():
+        server.stdout.set_target(target)
+        try:
+            with ContextThreadPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(lambda i: print(f"{name}-{i}"), range(jobs * 3)))
+            print(f"{name}-done")
+        finally:
+            server.stdout.clear_target()
+
+    thread = threading.Thread(target=run)
+    return thread, target
+
+
+def test_pool_output_follows_request(tmp_path):
+    # 在测试函数中创建，pytest 在各阶段之间会替换 sys.stdout
+    server = DaemonServer(str(tmp_path / "cli.sock"))
+    try:
+        requests = [_request(server, name, 3) for name in ("a", "b")]
+        for thread, _ in requests:
+            thread.start()
+        for thread, _ in requests:
+            thread.join()
+    finally:
+        server.server_close()
+
+    for name, (_, target) in zip(("a", "b"), requests):
+        lines = target.getvalue().split()
+        assert sorted(lines) == sorted([f"{name}-{i}" for i in range(9)] + [f"{name}-done"])
+
+
+def test_server_close_restores_streams(tmp_path):
+    stdout, submit = sys.stdout, ThreadPoolExecutor.submit
+    server = DaemonServer(str(tmp_path / "cli.sock"))
+    assert sys.stdout is server.stdout
+    # 守护进程不修改标准库线程池
+    assert ThreadPoolExecutor.submit is submit
+    server.server_close()
+    assert sys.stdout is stdout
+
+
+def test_socket_is_private_from_creation(tmp_path, monkeypatch):
+    modes = []
+    listen = DaemonServer.server_activate
+
+    def record_mode(self):
+        modes.append(stat.S_IMODE(os.stat(self.socket_path).st_mode))
+        listen(self)
+
+    monkeypatch.setattr(DaemonServer, "server_activate", record_mode)
+    previous = os.umask(0o022)
+    try:
+        server = DaemonServer(str(tmp_path / "cli.sock"))
+        server.server_close()
+        assert os.umask(0o022) == 0o022
+    finally:
+        os.umask(previous)
+    assert modes == [0o600]
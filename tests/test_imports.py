@@ -0,0 +1,63 @@
+"""
+导入开销测试：导入包和查看子命令帮助时不加载重量级依赖
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from cli.main import SUBCOMMANDS
+
+ROOT = Path(__file__).parent.parent
+
+HEAVY_MODULES = ("httpx", "pydantic", "PIL", "numpy")
+
+# 在子进程中执行 code 后输出已加载的重量级依赖
+_PROBE = """
+import runpy, sys
+sys.argv = {argv!r}
+try:
+    {code}
+except SystemExit:
+    pass
+sys.stdout = sys.__stdout__
+print(",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def _loaded_heavy_modules(code, argv=("probe",)):
+    script = _PROBE.format(code=code, argv=list(argv), heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    last = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    return [name for name in last.split(",") if name]
+
+
+@pytest.mark.parametrize("package", [
+    "src", "src.image", "src.video", "src.audio", "src.utils", "src.workqueue", "src.gateway"
+])
+def test_import_package_is_light(package):
+    assert _loaded_heavy_modules(f"import {package}; dir({package})") == []
+
+
+@pytest.mark.parametrize("command", sorted(SUBCOMMANDS))
+def test_subcommand_help_is_light(command):
+    loaded = _loaded_heavy_modules(
+        "import io; sys.stdout = io.StringIO(); runpy.run_module('cli', run_name='__main__')",
+        argv=["cli", command, "--help"],
+    )
+    assert loaded == []
+
+
+def test_subcommand_help_lists_arguments():
+    """子命令模块导入失败时帮助信息只剩 -h，这里确认参数已注册"""
+    for command in SUBCOMMANDS:
+        result = subprocess.run(
+            [sys.executable, "-m", "cli", command, "--help"], cwd=ROOT, capture_output=True, text=True, timeout=60
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.count("--") > 1, command
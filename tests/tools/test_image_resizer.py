@@ -0,0 +1,120 @@
+"""
+批量缩放工具测试
+"""
+
+import json
+
+from PIL import Image
+
+from tools.image_resizer import batch_resize, resample_image, resize_image
+
+
+def _make_images(directory, names):
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        Image.new("RGB", (64, 48), "red").save(directory / name)
+
+
+def test_incremental_skips_and_prunes(tmp_path):
+    source, output = tmp_path / "src", tmp_path / "out"
+    _make_images(source, ["a.png", "b.png"])
+    assert batch_resize(source, output, incremental=True, width=32)["processed"] == 2
+
+    (source / "b.png").unlink()
+    stats = batch_resize(source, output, incremental=True, width=32)
+    assert (stats["skipped"], stats["pruned"]) == (1, 1)
+    assert not (output / "b.png").exists()
+
+
+def test_manifest_from_other_input_dir_is_not_pruned(tmp_path):
+    output = tmp_path / "out"
+    _make_images(tmp_path / "first", ["a.png"])
+    _make_images(tmp_path / "second", ["b.png"])
+    batch_resize(tmp_path / "first", output, incremental=True, width=32)
+
+    stats = batch_resize(tmp_path / "second", output, incremental=True, width=32)
+    assert stats["pruned"] == 0
+    assert (output / "a.png").exists() and (output / "b.png").exists()
+
+
+def test_parallel_jobs_match_serial_output(tmp_path):
+    source = tmp_path / "src"
+    names = [f"{i:02d}.png" for i in range(6)]
+    _make_images(source, names)
+
+    serial = batch_resize(source, tmp_path / "serial", width=32)
+    parallel = batch_resize(source, tmp_path / "parallel", jobs=2, width=32)
+
+    assert (parallel["jobs"], parallel["succeeded"]) == (2, 6)
+    # 结果按文件顺序汇总，与串行处理一致
+    assert [f["input"] for f in parallel["files"]] == [f["input"] for f in serial["files"]]
+    for name in names:
+        with Image.open(tmp_path / "serial" / name) as a, Image.open(tmp_path / "parallel" / name) as b:
+            assert a.size == b.size == (32, 24)
+            assert a.tobytes() == b.tobytes()
+
+
+def test_parallel_report_counts_failures(tmp_path):
+    source, report = tmp_path / "src", tmp_path / "report.json"
+    _make_images(source, ["a.png", "b.png", "c.png"])
+    (source / "broken.png").write_bytes(b"not an image")
+
+    stats = batch_resize(source, tmp_path / "out", jobs=4, report=report, width=32)
+
+    assert (stats["total"], stats["succeeded"], stats["failed"], stats["cancelled"]) == (4, 3, 1, 0)
+    saved = json.loads(report.read_text(encoding="utf-8"))
+    assert {f["input"].rsplit("/", 1)[-1]: f["success"] for f in saved["files"]} == {
+        "a.png": True, "b.png": True, "broken.png": False, "c.png": True
+    }
+
+
+def _make_jpeg(path, size=(800, 600)):
+    # 平滑渐变，便于比较不同模式的画质差异
+    gradient = Image.linear_gradient("L").resize(size)
+    Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.ROTATE_90).resize(size), gradient)).save(path, quality=95)
+
+
+def _mean_abs_diff(a, b):
+    diff = [abs(x - y) for x, y in zip(a.convert("RGB").tobytes(), b.convert("RGB").tobytes())]
+    return sum(diff) / len(diff)
+
+
+def test_jpeg_draft_decodes_at_reduced_scale(tmp_path):
+    path = tmp_path / "photo.jpg"
+    _make_jpeg(path)
+
+    decoded = {}
+    results = {}
+    for mode in ("quality", "balanced", "fast"):
+        with Image.open(path) as img:
+            results[mode] = resample_image(img, (100, 75), mode)
+            decoded[mode] = img.size
+
+    assert decoded["quality"] == (800, 600)
+    # balanced 保留至少 2 倍目标尺寸，fast 只保留到目标尺寸
+    assert decoded["balanced"] == (200, 150)
+    assert decoded["fast"] == (100, 75)
+    assert all(result.size == (100, 75) for result in results.values())
+    assert _mean_abs_diff(results["balanced"], results["quality"]) < 2
+    assert _mean_abs_diff(results["fast"], results["quality"]) < 4
+
+
+def test_draft_is_skipped_for_non_jpeg(tmp_path):
+    path = tmp_path / "image.png"
+    Image.new("RGB", (400, 300), "blue").save(path)
+
+    with Image.open(path) as img:
+        resized = resample_image(img, (100, 75), "fast")
+        assert img.size == (400, 300)
+    assert resized.size == (100, 75)
+
+
+def test_resize_image_modes_keep_target_size(tmp_path):
+    source = tmp_path / "photo.jpg"
+    _make_jpeg(source)
+
+    for mode in ("quality", "balanced", "fast"):
+        output = tmp_path / f"{mode}.jpg"
+        assert resize_image(source, output, width=120, mode=mode)
+        with Image.open(output) as img:
+            assert img.size == (120, 90)
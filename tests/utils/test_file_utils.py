@@ -0,0 +1,82 @@
+"""
+文件与批量处理工具测试
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from src.utils.file_utils import BatchProcessor, JsonlResultWriter
+
+
+def test_map_ordered_keeps_input_order():
+    def func(x):
+        time.sleep(0.001 * (10 - x % 10))
+        return x
+
+    assert list(BatchProcessor.map_ordered(func, range(50), jobs=4)) == list(range(50))
+
+
+def test_map_ordered_drains_started_tasks_on_interrupt():
+    started, lock = [], threading.Lock()
+
+    def func(x):
+        with lock:
+            started.append(x)
+        time.sleep(0.05)
+        return x
+
+    consumed, drained = [], []
+    records = BatchProcessor.map_ordered(func, range(40), jobs=4, window=8, drain=drained.append)
+    with pytest.raises(KeyboardInterrupt):
+        try:
+            for x in records:
+                consumed.append(x)
+                if len(consumed) == 2:
+                    raise KeyboardInterrupt
+        finally:
+            records.close()
+
+    # 已开始的任务全部交出且连续，未开始的任务被取消
+    assert drained == list(range(2, 2 + len(drained)))
+    assert sorted(started) == consumed + drained
+    assert len(started) < 40
+
+
+def test_map_ordered_stops_drain_at_failed_task():
+    def func(x):
+        if x == 3:
+            raise ValueError("bad item")
+        time.sleep(0.01)
+        return x
+
+    consumed, drained = [], []
+    with pytest.raises(ValueError):
+        for x in BatchProcessor.map_ordered(func, range(20), jobs=4, drain=drained.append):
+            consumed.append(x)
+    assert consumed == [0, 1, 2]
+    assert drained == []
+
+
+def test_drained_records_support_resume(tmp_path):
+    path = tmp_path / "results.jsonl"
+
+    def func(line):
+        time.sleep(0.02)
+        return {"line": line}
+
+    with JsonlResultWriter(str(path), append=False) as writer:
+        records = BatchProcessor.map_ordered(func, range(1, 30), jobs=3, drain=writer.write)
+        try:
+            for record in records:
+                writer.write(record)
+                if record["line"] == 5:
+                    break
+        finally:
+            records.close()
+
+    lines = [record["line"] for record in map(json.loads, path.read_text().splitlines())]
+    assert lines == list(range(1, len(lines) + 1))
+    assert JsonlResultWriter.read_last_record(str(path))["line"] == lines[-1] > 5
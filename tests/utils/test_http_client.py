@@ -0,0 +1,50 @@
+"""
+共享HTTP客户端测试
+"""
+
+import httpx
+import pytest
+
+from src.utils.http_client import http_client, set_shared_client
+
+
+@pytest.fixture
+def shared_timeouts():
+    """设置使用 MockTransport 的共享客户端，返回每个请求的读超时"""
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={"ok": True})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler), timeout=30.0)
+    previous = set_shared_client(client)
+    yield timeouts
+    set_shared_client(previous)
+    client.close()
+
+
+def test_shared_client_uses_caller_timeout(shared_timeouts):
+    with http_client(timeout=300) as client:
+        client.get("https://example.com/a")
+        client.post("https://example.com/b", json={})
+        with client.stream("GET", "https://example.com/c") as response:
+            response.read()
+        # 单个请求显式指定的超时优先
+        client.get("https://example.com/d", timeout=5)
+    assert shared_timeouts == [300, 300, 300, 5]
+
+
+def test_shared_client_default_timeout(shared_timeouts):
+    with http_client() as client:
+        client.get("https://example.com/a")
+    assert shared_timeouts == [30.0]
+
+
+def test_shared_client_is_not_closed(shared_timeouts):
+    with http_client(timeout=10) as client:
+        client.get("https://example.com/a")
+    with http_client(timeout=10) as client:
+        assert not client.is_closed
+        client.get("https://example.com/b")
+    assert shared_timeouts == [10, 10]
@@ -0,0 +1,81 @@
+"""
+批量mask生成与验证测试
+"""
+
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.utils.mask_batch import assign_outputs, expand_image_inputs, iter_mask_batch, load_mask_manifest
+
+
+@pytest.fixture
+def images(tmp_path):
+    """绿色方块位于不同位置的图像"""
+    paths = []
+    for i in range(4):
+        array = np.full((60, 80, 3), 200, dtype=np.uint8)
+        array[10:30, 10 + i * 10:30 + i * 10] = (0, 255, 0)
+        path = tmp_path / "images" / f"img{i}.png"
+        path.parent.mkdir(exist_ok=True)
+        Image.fromarray(array).save(path)
+        paths.append(str(path))
+    (tmp_path / "images" / "notes.txt").write_text("ignored")
+    return paths
+
+
+def test_manifest_applies_defaults_and_relative_paths(tmp_path, images):
+    manifest = {
+        "output_directory": "masks",
+        "defaults": {"color": {"target": [0, 255, 0], "tolerance": 20}, "unknown": 1},
+        "items": ["images/img0.png", {"image": "images/img1.png", "max_coverage": 0.01}],
+    }
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    items, output_dir = load_mask_manifest(str(tmp_path / "manifest.json"))
+
+    assert output_dir == str(tmp_path / "masks")
+    assert [item["image"] for item in items] == images[:2]
+    assert all(item["color"]["target"] == [0, 255, 0] and "unknown" not in item for item in items)
+    assert items[1]["max_coverage"] == 0.01
+
+
+def test_expand_and_assign_outputs(tmp_path, images):
+    paths = expand_image_inputs([str(tmp_path / "images"), str(tmp_path / "images" / "img*.png")])
+    assert paths == images
+    items = assign_outputs([{"image": images[0]}, {"image": images[0]}, {"image": images[1], "output": "x.png"}], str(tmp_path / "out"))
+    assert [item["output"] for item in items] == [
+        str(tmp_path / "out" / "img0_mask.png"), str(tmp_path / "out" / "img0_mask_2.png"), str(tmp_path / "out" / "x.png")
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_generates_and_validates_in_order(tmp_path, images, workers):
+    spec = {"color": {"target": [0, 255, 0], "tolerance": 20}, "max_coverage": 0.5}
+    items = assign_outputs([{"image": path, **spec} for path in images], str(tmp_path / "out"))
+    items.append({"image": str(tmp_path / "missing.png"), "output": str(tmp_path / "out" / "missing.png"), **spec})
+    items.append({"image": images[0], "output": str(tmp_path / "out" / "tiny.png"), **spec, "min_coverage": 0.5})
+
+    records = list(iter_mask_batch(items, workers=workers))
+
+    assert [record["image"] for record in records] == [item["image"] for item in items]
+    assert [record["status"] for record in records] == ["VALID"] * 4 + ["FAILED", "INVALID"]
+    assert [record["bounding_box"] for record in records[:4]] == [(10 + i * 10, 10, 29 + i * 10, 29) for i in range(4)]
+    assert records[0]["white_pixels"] == 400
+    with Image.open(records[0]["mask"]) as mask:
+        assert mask.size == (80, 60)
+        assert np.count_nonzero(np.asarray(mask.convert("L"))) == 400
+
+
+def test_shapes_only_spec(tmp_path, images):
+    items = assign_outputs([{"image": images[0], "shapes": [{"type": "rectangle", "x": 0, "y": 0, "width": 8, "height": 5}]}], str(tmp_path))
+    record = next(iter_mask_batch(items, workers=1))
+    assert (record["status"], record["white_pixels"], record["encoding"]) == ("VALID", 40, "1")
+
+
+def test_spec_without_color_or_shapes_fails(tmp_path, images):
+    record = next(iter_mask_batch(assign_outputs([{"image": images[0]}], str(tmp_path)), workers=1))
+    assert record["status"] == "FAILED"
+    assert "color" in record["error"]
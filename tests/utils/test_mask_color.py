@@ -0,0 +1,105 @@
+"""
+颜色 mask 与连通区域过滤测试
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.utils.mask_utils import (
+    MaskCanvas,
+    color_distance_mask,
+    fill_holes,
+    label_regions,
+    remove_small_regions,
+    rgb_to_lab,
+)
+
+
+def _random_pixels(shape=(37, 53), seed=0):
+    return np.random.default_rng(seed).integers(0, 256, size=(*shape, 3), dtype=np.uint8)
+
+
+def test_rgb_distance_matches_per_channel_average():
+    pixels = _random_pixels()
+    target = (120, 80, 200)
+    expected = np.abs(pixels.astype(np.int64) - np.array(target)).sum(axis=2) <= 40 * 3
+
+    assert np.array_equal(color_distance_mask(pixels, target, tolerance=40), expected)
+
+
+def test_chunked_distance_is_independent_of_chunk_size():
+    pixels = _random_pixels()
+    for metric in ("rgb", "lab"):
+        full = color_distance_mask(pixels, (10, 200, 30), 20, metric, chunk_rows=1000)
+        assert np.array_equal(color_distance_mask(pixels, (10, 200, 30), 20, metric, chunk_rows=5), full)
+
+
+def test_rgb_to_lab_reference_colors():
+    lab = rgb_to_lab(np.array([[[255, 255, 255], [0, 0, 0], [255, 0, 0]]], dtype=np.uint8))[0]
+
+    assert lab[0] == pytest.approx([100, 0, 0], abs=0.1)
+    assert lab[1] == pytest.approx([0, 0, 0], abs=0.1)
+    assert lab[2] == pytest.approx([53.24, 80.09, 67.20], abs=0.1)
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError):
+        color_distance_mask(_random_pixels(), (0, 0, 0), metric="hsv")
+
+
+def test_label_regions_connectivity():
+    mask = np.zeros((4, 4), dtype=bool)
+    mask[0, 0] = mask[1, 1] = True
+    mask[3, 1:4] = True
+
+    assert sorted(label_regions(mask, connectivity=8)[2].tolist()) == [2, 3]
+    assert sorted(label_regions(mask, connectivity=4)[2].tolist()) == [1, 1, 3]
+
+
+def test_label_regions_merges_u_shape():
+    # 两条竖边在底部相连，逐行扫描时先出现为两个区段
+    mask = np.zeros((5, 5), dtype=bool)
+    mask[:, 0] = mask[:, 4] = True
+    mask[4, :] = True
+
+    _, labels, areas = label_regions(mask)
+    assert len(areas) == 1 and areas[0] == mask.sum()
+
+
+def test_remove_small_regions_keeps_large_areas():
+    mask = np.zeros((20, 20), dtype=bool)
+    mask[2:10, 2:10] = True
+    mask[15, 15] = mask[15, 16] = True
+
+    filtered = remove_small_regions(mask, min_area=5)
+    expected = np.zeros_like(mask)
+    expected[2:10, 2:10] = True
+    assert np.array_equal(filtered, expected)
+
+
+def test_fill_holes_ignores_background_touching_border():
+    mask = np.zeros((12, 12), dtype=bool)
+    mask[1:8, 1:8] = True
+    mask[3:5, 3:5] = False      # 面积 4 的空洞
+    mask[1:8, 10:12] = True
+    mask[0:12, 10] = True       # 与右边缘之间不构成空洞
+
+    filled = fill_holes(mask)
+    assert filled[3:5, 3:5].all()
+    assert not filled[0, 11] and not filled[9, 5]
+    assert np.array_equal(fill_holes(mask, max_area=3), mask)
+
+
+def test_from_color_filters_specks_and_fills_holes():
+    image = Image.new("RGB", (40, 30), (255, 255, 255))
+    pixels = np.asarray(image).copy()
+    pixels[5:25, 5:25] = (200, 30, 30)
+    pixels[12:15, 12:15] = (255, 255, 255)
+    pixels[28, 35] = (200, 30, 30)
+
+    canvas = MaskCanvas.from_color(Image.fromarray(pixels), (205, 25, 35), tolerance=10, min_area=4, holes=True)
+
+    assert canvas.size == (40, 30)
+    assert np.count_nonzero(canvas.array) == 20 * 20
+    assert canvas.array[13, 13] == 255 and canvas.array[28, 35] == 0
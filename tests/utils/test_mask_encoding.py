@@ -0,0 +1,85 @@
+"""
+mask 紧凑编码和局部裁剪测试
+"""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.utils.mask_utils import compact_mask_file, edit_region_box, encode_mask, paste_edit_result
+
+
+def _decode(data):
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert("L"))
+
+
+def _binary_mask():
+    mask = np.zeros((600, 800), dtype=np.uint8)
+    mask[100:300, 200:500] = 255
+    return mask
+
+
+def test_binary_mask_uses_one_bit_png():
+    mask = _binary_mask()
+    encoding = encode_mask(mask)
+    assert encoding.mode == "1"
+    assert np.array_equal(_decode(encoding.data), mask)
+    assert len(encoding.data) < encoding.baseline_bytes
+    assert 0 < encoding.reduction < 1
+    assert base64.b64decode(encoding.to_data_url().split(",", 1)[1]) == encoding.data
+
+
+@pytest.mark.parametrize("allow_palette", [False, True])
+def test_feathered_mask_is_lossless(allow_palette):
+    mask = _binary_mask()
+    mask[300:310, 200:500] = np.linspace(255, 0, 10, dtype=np.uint8)[:, None]
+    encoding = encode_mask(mask, allow_palette=allow_palette)
+    assert encoding.mode in (("L", "P") if allow_palette else ("L",))
+    assert np.array_equal(_decode(encoding.data), mask)
+
+
+def test_compact_mask_file_keeps_smaller_original(tmp_path):
+    Image.fromarray(_binary_mask()).save(tmp_path / "mask.png")
+    compacted = compact_mask_file(str(tmp_path / "mask.png"))
+    assert compacted.mode == "1"
+    assert compacted.baseline_bytes == (tmp_path / "mask.png").stat().st_size
+    assert np.array_equal(_decode(compacted.data), _binary_mask())
+
+    (tmp_path / "small.png").write_bytes(compacted.data)
+    again = compact_mask_file(str(tmp_path / "small.png"))
+    assert again.mode in ("original", "1")
+    assert len(again.data) <= len(compacted.data)
+
+
+@pytest.mark.parametrize("bbox, size, expected", [
+    # 外扩 64 像素后不足 512，向两侧扩展
+    ((300, 200, 400, 250), (800, 600), (95, 0, 607, 512)),
+    # 靠近右下边界时向另一侧补足
+    ((780, 580, 799, 599), (800, 600), (288, 88, 800, 600)),
+    # 图像小于最小边长时取整张图
+    ((10, 10, 20, 20), (300, 200), (0, 0, 300, 200)),
+])
+def test_edit_region_box(bbox, size, expected):
+    mask = np.zeros(size[::-1], dtype=np.uint8)
+    mask[bbox[1]:bbox[3] + 1, bbox[0]:bbox[2] + 1] = 255
+    assert edit_region_box(mask, size) == expected
+
+
+def test_edit_region_box_empty_mask():
+    assert edit_region_box(np.zeros((100, 100), dtype=np.uint8), (100, 100)) is None
+
+
+def test_paste_edit_result_only_replaces_masked_pixels():
+    original = Image.new("RGB", (100, 80), (0, 0, 0))
+    box = (20, 10, 60, 50)
+    mask = np.zeros((40, 40), dtype=np.uint8)
+    mask[:, :20] = 255
+    # 编辑结果尺寸不同时缩放到裁剪区域
+    result = np.asarray(paste_edit_result(original, Image.new("RGB", (80, 80), (255, 0, 0)), box, mask))
+    assert (result[10:50, 20:40] == (255, 0, 0)).all()
+    assert (result[10:50, 40:60] == 0).all()
+    assert (result[:10] == 0).all()
@@ -0,0 +1,54 @@
+"""
+mask 工具测试
+"""
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src.utils.mask_utils import MaskCanvas, MaskCreator, MaskValidator
+
+
+def test_create_rectangle_mask_matches_previous_output(tmp_path):
+    output = MaskCreator.create_rectangle_mask((200, 150), 10, 20, 50, 40, str(tmp_path / "mask.png"))
+    expected = Image.new("L", (200, 150), 0)
+    ImageDraw.Draw(expected).rectangle([10, 20, 60, 60], fill=255)
+    with Image.open(output) as mask:
+        assert np.array_equal(np.asarray(mask.convert("L")), np.asarray(expected))
+
+
+def test_canvas_rectangle_covers_width_by_height():
+    canvas = MaskCanvas(100, 80).rectangle(10, 20, 30, 15)
+    assert np.count_nonzero(canvas.array) == 30 * 15
+
+
+def test_validator_accepts_gray_palette_mask(tmp_path):
+    array = np.zeros((150, 200), dtype=np.uint8)
+    array[20:100, 20:120] = 128
+    array[40:80, 40:100] = 255
+    levels = np.unique(array)
+    palette = Image.fromarray(np.searchsorted(levels, array).astype(np.uint8), mode="P")
+    palette.putpalette(np.repeat(levels, 3).tolist())
+    palette.save(tmp_path / "mask.png", optimize=True, bits=4)
+    Image.new("RGB", (200, 150)).save(tmp_path / "base.png")
+
+    assert MaskValidator.validate_mask(str(tmp_path / "mask.png"), str(tmp_path / "base.png"))
+    assert MaskValidator.get_mask_info(str(tmp_path / "mask.png"))["white_pixels"] == 80 * 100
+
+
+def test_validator_rejects_color_palette_mask(tmp_path):
+    Image.new("RGB", (200, 150), (255, 0, 0)).convert("P").save(tmp_path / "mask.png")
+    Image.new("RGB", (200, 150)).save(tmp_path / "base.png")
+    assert not MaskValidator.validate_mask(str(tmp_path / "mask.png"), str(tmp_path / "base.png"))
+
+
+def test_mask_info_for_rgb_mask(tmp_path):
+    mask = Image.new("RGB", (80, 50), (0, 0, 0))
+    ImageDraw.Draw(mask).rectangle([30, 10, 39, 19], fill=(255, 255, 255))
+    mask.save(tmp_path / "mask.png")
+
+    info = MaskValidator.get_mask_info(str(tmp_path / "mask.png"))
+    assert "error" not in info
+    assert info["mode"] == "RGB"
+    assert info["bounding_box"] == (30, 10, 39, 19)
+    assert info["white_pixels"] == 100
+    assert info["is_valid"]
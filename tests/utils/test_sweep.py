@@ -0,0 +1,66 @@
+"""
+参数网格扫描测试
+"""
+
+import itertools
+
+import pytest
+
+from src.utils.sweep import ParameterSweep
+
+
+def _sweep(template=None):
+    return ParameterSweep({"p": ["猫", "狗"], "size": ["1024*1024", "1440*810"], "seed": [1, 2, 3]}, template)
+
+
+def test_order_matches_nested_loops():
+    sweep = _sweep()
+    expected = [
+        {"p": p, "size": size, "seed": seed}
+        for p, size, seed in itertools.product(["猫", "狗"], ["1024*1024", "1440*810"], [1, 2, 3])
+    ]
+    assert len(sweep) == 12
+    assert [request for _, request in sweep.iter_requests()] == expected
+
+
+def test_shards_partition_combinations():
+    sweep = _sweep()
+    shards = [[index for index, _ in sweep.iter_requests(shard=(i, 5))] for i in range(5)]
+    assert sorted(itertools.chain(*shards)) == list(range(12))
+    assert [len(shard) for shard in shards] == [sweep.shard_size((i, 5)) for i in range(5)]
+    # 断点续跑时只跳过 start 之前的组合
+    assert [index for index, _ in sweep.iter_requests(shard=(1, 5), start=4)] == [6, 11]
+
+
+def test_template_keeps_single_placeholder_type():
+    request = _sweep({"prompt": "{p}", "seed": "{seed}", "filename": "p{p_index}_s{seed:03d}.png"}).request_at(11)
+    assert request == {"prompt": "狗", "seed": 3, "filename": "p1_s003.png"}
+
+
+def test_template_literal_braces():
+    sweep = _sweep({"prompt": "{p}，{{纯白}}背景", "extra": '{p} {"a": 1}', "nested": "{{{seed}}}"})
+    assert sweep.request_at(0) == {"prompt": "猫，{纯白}背景", "extra": '猫 {"a": 1}', "nested": "{1}"}
+
+
+@pytest.mark.parametrize("template", [{"prompt": "{style}"}, {"prompt": "{p:d}"}])
+def test_template_errors_are_reported_before_expansion(template):
+    with pytest.raises(ValueError):
+        _sweep(template)
+
+
+def test_from_dict_axis_forms(tmp_path):
+    (tmp_path / "styles.txt").write_text("# 风格\n水彩\n\n油画\n", encoding="utf-8")
+    sweep = ParameterSweep.from_dict(
+        {"axes": {"style": {"file": "styles.txt"}, "seed": {"range": [1, 7, 3]}}},
+        base_dir=str(tmp_path)
+    )
+    assert [request for _, request in sweep.iter_requests()] == [
+        {"style": "水彩", "seed": 1}, {"style": "水彩", "seed": 4},
+        {"style": "油画", "seed": 1}, {"style": "油画", "seed": 4},
+    ]
+
+
+@pytest.mark.parametrize("shard", ["2/2", "1", "a/b"])
+def test_parse_shard_rejects_invalid(shard):
+    with pytest.raises(ValueError):
+        ParameterSweep.parse_shard(shard)
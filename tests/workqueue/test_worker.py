@@ -0,0 +1,110 @@
+"""
+队列 worker 测试
+"""
+
+import sqlite3
+import time
+
+import httpx
+import pytest
+
+from src.gateway.adapters import JobAdapter, TaskPoll, TaskSubmission
+from src.utils.http_client import set_shared_client
+from src.workqueue import SQLiteQueueBackend, Worker
+
+
+class FakeAdapter(JobAdapter):
+    kind = "fake"
+
+    def submit(self, params):
+        return TaskSubmission(task_id="task-1")
+
+    def poll(self, task_id):
+        return TaskPoll(status="SUCCEEDED", urls=["https://example.com/a.png", "https://example.com/b.png"])
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteQueueBackend(str(tmp_path / "queue.db"))
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def slow_downloads(backend):
+    """共享客户端每次下载耗时 0.4 秒，最后一次下载结束时另一个 worker 尝试接管任务"""
+    takeovers = []
+
+    def handler(request):
+        time.sleep(0.4)
+        if request.url.path.endswith("b.png"):
+            takeovers.append(backend.lease("other-worker", 30.0))
+        return httpx.Response(200, content=b"png")
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    previous = set_shared_client(client)
+    yield takeovers
+    set_shared_client(previous)
+    client.close()
+
+
+def _worker(backend, events, **kwargs):
+    options = dict(concurrency=1, lease_ttl=0.5, poll_interval=0.1, idle_interval=0.01)
+    options.update(kwargs)
+    return Worker(
+        backend,
+        adapters={"fake": FakeAdapter("key")},
+        on_event=lambda event, job, message: events.append(event),
+        **options
+    )
+
+
+def test_lease_errors_back_off_and_recover(backend, tmp_path, monkeypatch):
+    backend.enqueue("fake", {}, {"output_dir": str(tmp_path / "out")})
+    lease, failures = backend.lease, [sqlite3.OperationalError("database is locked")] * 2
+
+    def flaky_lease(owner, ttl):
+        if failures:
+            raise failures.pop()
+        return lease(owner, ttl)
+
+    monkeypatch.setattr(backend, "lease", flaky_lease)
+    events = []
+    worker = _worker(backend, events, lease_ttl=30.0)
+    monkeypatch.setattr(worker, "_save_results", lambda job, owner, urls: [])
+    counts = worker.run(exit_when_empty=True)
+    assert counts["succeeded"] == 1
+    assert not failures
+
+
+def test_lease_is_extended_while_downloading(backend, tmp_path, slow_downloads):
+    job_id = backend.enqueue("fake", {}, {"output_dir": str(tmp_path / "out"), "filename": "r.png"})
+    events = []
+    # 两次下载共 0.8 秒，超过 0.5 秒的租约有效期
+    counts = _worker(backend, events).run(exit_when_empty=True)
+    assert slow_downloads == [None]
+    assert counts == {"succeeded": 1, "failed": 0, "lost": 0}
+    assert backend.get(job_id).state == "SUCCEEDED"
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["r.png", "r_2.png"]
+
+
+def test_expired_lease_reattaches_recorded_task(backend, tmp_path, monkeypatch):
+    job_id = backend.enqueue("fake", {}, {"output_dir": str(tmp_path / "out")})
+    # 第一个 worker 提交任务并记录任务ID后失联
+    dead = backend.lease("dead-worker", 0.05)
+    backend.record_task_id(dead.job_id, "dead-worker", "task-recorded")
+    time.sleep(0.1)
+
+    submitted, polled = [], []
+    monkeypatch.setattr(FakeAdapter, "submit", lambda self, params: submitted.append(params))
+    monkeypatch.setattr(FakeAdapter, "poll", lambda self, task_id: polled.append(task_id) or TaskPoll(status="SUCCEEDED", urls=[]))
+    events = []
+    worker = _worker(backend, events, lease_ttl=30.0)
+    monkeypatch.setattr(worker, "_save_results", lambda job, owner, urls: [])
+
+    assert worker.run(exit_when_empty=True)["succeeded"] == 1
+    assert submitted == []
+    assert polled == ["task-recorded"]
+    assert "submitted" not in events
+    job = backend.get(job_id)
+    assert (job.state, job.attempts, job.task_id) == ("SUCCEEDED", 2, "task-recorded")
@@ -1,14 +1,103 @@
 import os
 import sys
+import json
+import time
+import hashlib
+import signal
 from PIL import Image
 import argparse
 from pathlib import Path
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def resize_image(input_path, output_path, width=None, height=None, scale=None, keep_ratio=True, quality=95):
+# 缩放模式: (JPEG draft 解码尺寸相对目标尺寸的最小倍数, reducing_gap)
+# quality: 完整解码后 LANCZOS 缩放
+# balanced: JPEG 在 DCT 阶段按 1/2、1/4、1/8 缩小解码，保留至少 2 倍目标尺寸，再用 reduce() + LANCZOS 完成缩放，画质与 quality 几乎一致
+# fast: 解码尺寸只保留到目标尺寸，reduce() 承担更多缩放，速度最快
+RESIZE_MODES = {
+    'quality': (None, None),
+    'balanced': (2, 3.0),
+    'fast': (1, 1.5),
+}
+
+
+def compute_target_size(size, width=None, height=None, scale=None, keep_ratio=True):
+    """
+    根据缩放参数计算目标尺寸
+
+    参数:
+    size: 原始尺寸 (宽, 高)
+    width/height/scale/keep_ratio: 与 resize_image 相同
+
+    返回:
+    tuple: (新宽度, 新高度)
+    """
+    original_width, original_height = size
+    if scale:
+        # 使用缩放比例
+        new_width = int(original_width * scale)
+        new_height = int(original_height * scale)
+    else:
+        # 使用指定的宽度和高度
+        new_width = width if width else original_width
+        new_height = height if height else original_height
+        
+        # 如果需要保持比例
+        if keep_ratio:
+            if width and height:
+                # 同时指定了宽度和高度，保持比例填充
+                width_ratio = width / original_width
+                height_ratio = height / original_height
+                if width_ratio < height_ratio:
+                    new_width = int(original_width * width_ratio)
+                    new_height = int(original_height * width_ratio)
+                else:
+                    new_width = int(original_width * height_ratio)
+                    new_height = int(original_height * height_ratio)
+            elif width and not height:
+                # 只指定了宽度，计算高度
+                ratio = width / original_width
+                new_height = int(original_height * ratio)
+            elif height and not width:
+                # 只指定了高度，计算宽度
+                ratio = height / original_height
+                new_width = int(original_width * ratio)
+    
+    return new_width, new_height
+
+
+def resample_image(img, size, mode='balanced'):
+    """
+    按模式缩放已打开（尚未解码）的图片
+
+    参数:
+    img: Image.open 返回的图片对象，需在读取像素之前调用
+    size: 目标尺寸 (宽, 高)
+    mode: 缩放模式，见 RESIZE_MODES
+
+    返回:
+    Image: 缩放后的图片
+    """
+    draft_factor, reducing_gap = RESIZE_MODES[mode]
+    if draft_factor and img.format == 'JPEG':
+        img.draft(img.mode, (size[0] * draft_factor, size[1] * draft_factor))
+    return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=reducing_gap)
+
+
+def _load_fitting():
+    """导入项目中的模型尺寸能力表和适配函数（仅 --fit-model 时需要）"""
+    root = str(Path(__file__).resolve().parent.parent)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    from src.image import fitting, models
+    return fitting, models
+
+
+def resize_image(input_path, output_path, width=None, height=None, scale=None, keep_ratio=True, quality=95, mode='balanced',
+                 fit_model=None, fit_method='auto'):
     """
     调整图片尺寸
     
@@ -20,6 +109,9 @@ def resize_image(input_path, output_path, width=None, height=None, scale=None, k
     scale: 缩放比例
     keep_ratio: 是否保持宽高比
     quality: 输出图片质量（JPEG格式有效，1-100）
+    mode: 缩放模式，quality/balanced/fast，见 RESIZE_MODES
+    fit_model: 适配为该模型支持的最接近尺寸（如 qwen、wan、sketch、video-720p），指定时忽略宽高和缩放比例
+    fit_method: 适配方式，auto/crop/pad
     """
     try:
         # 验证输入文件
@@ -48,44 +140,27 @@ def resize_image(input_path, output_path, width=None, height=None, scale=None, k
                 logging.error(f"图片尺寸过大: {original_width}x{original_height}")
                 return False
             
-            # 计算新尺寸
-            if scale:
-                # 使用缩放比例
-                new_width = int(original_width * scale)
-                new_height = int(original_height * scale)
+            if fit_model:
+                # 按模型尺寸能力选择最接近的尺寸，再裁剪或填充到该尺寸
+                fitting, models = _load_fitting()
+                new_width, new_height = models.fit_size_for_model(original_width, original_height, fit_model)
+                draft_factor, reducing_gap = RESIZE_MODES[mode]
+                if draft_factor and img.format == 'JPEG':
+                    img.draft(img.mode, (new_width * draft_factor, new_height * draft_factor))
+                source = img if img.mode in ('RGB', 'RGBA', 'L') else img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+                plan = fitting.plan_fit(source, (new_width, new_height), fit_method)
+                resized_img = fitting.apply_fit(source, plan, reducing_gap=reducing_gap)
             else:
-                # 使用指定的宽度和高度
-                new_width = width if width else original_width
-                new_height = height if height else original_height
-                
-                # 如果需要保持比例
-                if keep_ratio:
-                    if width and height:
-                        # 同时指定了宽度和高度，保持比例填充
-                        width_ratio = width / original_width
-                        height_ratio = height / original_height
-                        if width_ratio < height_ratio:
-                            new_width = int(original_width * width_ratio)
-                            new_height = int(original_height * width_ratio)
-                        else:
-                            new_width = int(original_width * height_ratio)
-                            new_height = int(original_height * height_ratio)
-                    elif width and not height:
-                        # 只指定了宽度，计算高度
-                        ratio = width / original_width
-                        new_height = int(original_height * ratio)
-                    elif height and not width:
-                        # 只指定了高度，计算宽度
-                        ratio = height / original_height
-                        new_width = int(original_width * ratio)
-            
-            # 检查新尺寸
-            if new_width <= 0 or new_height <= 0:
-                logging.error(f"计算出的尺寸无效: {new_width}x{new_height}")
-                return False
+                # 计算新尺寸
+                new_width, new_height = compute_target_size(img.size, width, height, scale, keep_ratio)
                 
-            # 调整尺寸
-            resized_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                # 检查新尺寸
+                if new_width <= 0 or new_height <= 0:
+                    logging.error(f"计算出的尺寸无效: {new_width}x{new_height}")
+                    return False
+                    
+                # 调整尺寸
+                resized_img = resample_image(img, (new_width, new_height), mode)
             
             # 创建输出目录（如果不存在）
             output_dir = output_path.parent
@@ -107,8 +182,208 @@ def resize_image(input_path, output_path, width=None, height=None, scale=None, k
         logging.error(f"处理 {input_path} 时出错: {str(e)}")
         return False
 
-def batch_resize(input_dir, output_dir, **kwargs):
-    """批量处理目录中的图片"""
+class _BufferHandler(logging.Handler):
+    """工作进程中缓存日志，由主进程按文件顺序输出"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+_worker_buffer = None
+
+
+def _init_worker(log_level):
+    """工作进程初始化：日志写入缓冲区，忽略 Ctrl+C（由主进程统一取消）"""
+    global _worker_buffer
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_buffer = _BufferHandler()
+    root = logging.getLogger()
+    root.handlers = [_worker_buffer]
+    root.setLevel(log_level)
+
+
+def _resize_chunk(chunk):
+    """在工作进程中处理一组文件，返回每个文件的 (是否成功, 耗时, 日志记录)"""
+    results = []
+    for input_path, output_path, kwargs in chunk:
+        _worker_buffer.records = []
+        start = time.perf_counter()
+        success = resize_image(input_path, output_path, **kwargs)
+        results.append((success, time.perf_counter() - start, _worker_buffer.records))
+    return results
+
+
+# 增量模式的默认清单文件名（位于输出目录）
+MANIFEST_NAME = '.resize_manifest.json'
+
+
+def file_signature(path, checksum=False):
+    """
+    计算源文件签名
+
+    参数:
+    path: 文件路径
+    checksum: 是否计算内容哈希(SHA-256)
+
+    返回:
+    dict: {"size", "mtime_ns"}，checksum 为 True 时包含 "sha256"
+    """
+    stat = os.stat(path)
+    signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if checksum:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        signature["sha256"] = digest.hexdigest()
+    return signature
+
+
+def load_manifest(manifest_path, input_dir=None):
+    """
+    读取增量处理清单
+
+    清单中的路径相对于记录的输入目录，输入目录不一致时（如两个目录输出到同一位置）
+    这些记录不能用来判断跳过或清理，按新清单重新开始，不会删除其他输入目录的输出。
+
+    参数:
+    manifest_path: 清单路径
+    input_dir: 本次的输入目录，None 表示不检查
+
+    返回:
+    dict: 源文件相对路径 -> 记录，清单不存在、损坏或输入目录不一致时为空
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        files = manifest.get("files", {})
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, AttributeError) as e:
+        logging.warning(f"清单无法读取，将重新处理全部文件: {manifest_path} ({e})")
+        return {}
+
+    recorded = manifest.get("input_dir")
+    if input_dir is not None and recorded and recorded != str(Path(input_dir).resolve()):
+        logging.warning(
+            f"清单记录的输入目录 {recorded} 与本次的 {Path(input_dir).resolve()} 不一致，"
+            f"将重新处理全部文件且不清理任何输出: {manifest_path}"
+        )
+        return {}
+    return files
+
+
+def save_manifest(manifest_path, entries, input_dir):
+    """
+    写入增量处理清单（先写临时文件再替换，中断时不会留下不完整的清单）
+
+    参数:
+    manifest_path: 清单路径
+    entries: 源文件相对路径 -> 记录
+    input_dir: 输入目录
+    """
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(
+            {"version": 1, "input_dir": str(Path(input_dir).resolve()), "files": dict(sorted(entries.items()))},
+            f, ensure_ascii=False, indent=2
+        )
+    os.replace(temp_path, manifest_path)
+
+
+def is_unchanged(entry, input_path, output_path, params, checksum=False):
+    """
+    判断源文件自上次处理后是否未变化
+
+    大小和修改时间一致即视为未变化；启用 checksum 时，修改时间变化但内容哈希一致
+    （如同步工具重写了文件）也视为未变化，并更新记录中的修改时间。
+
+    参数:
+    entry: 清单中的记录
+    input_path: 源文件路径
+    output_path: 本次的输出路径
+    params: 本次的缩放参数
+    checksum: 是否比较内容哈希
+
+    返回:
+    bool: 是否可以跳过
+    """
+    if not entry or entry.get("params") != params or entry.get("output") != str(output_path):
+        return False
+    if not Path(output_path).exists():
+        return False
+    signature = file_signature(input_path)
+    if signature["size"] != entry.get("size"):
+        return False
+    if signature["mtime_ns"] == entry.get("mtime_ns"):
+        # 之前未记录哈希的条目补充哈希，供之后的运行比较
+        if checksum and not entry.get("sha256"):
+            entry["sha256"] = file_signature(input_path, checksum=True)["sha256"]
+        return True
+    if checksum and entry.get("sha256"):
+        if file_signature(input_path, checksum=True)["sha256"] == entry["sha256"]:
+            entry["mtime_ns"] = signature["mtime_ns"]
+            return True
+    return False
+
+
+def prune_outputs(entries, sources, output_dir):
+    """
+    删除源文件已不存在的输出文件，只处理清单中记录过且位于输出目录内的输出
+
+    参数:
+    entries: 清单记录（会移除被清理的条目）
+    sources: 本次扫描到的源文件相对路径集合
+    output_dir: 输出目录，删除后清理其中的空目录
+
+    返回:
+    int: 删除的输出文件数
+    """
+    pruned = 0
+    output_dir = Path(output_dir).resolve()
+    for relative in [key for key in entries if key not in sources]:
+        output_path = Path(entries.pop(relative)["output"])
+        if output_dir not in output_path.resolve().parents:
+            logging.warning(f"输出不在输出目录 {output_dir} 中，不清理: {output_path}")
+            continue
+        if output_path.exists():
+            output_path.unlink()
+            pruned += 1
+            logging.info(f"已清理: {output_path}（源文件已删除: {relative}）")
+        # 清理因此变空的子目录
+        parent = output_path.parent.resolve()
+        while parent != output_dir and output_dir in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+    return pruned
+
+
+def batch_resize(input_dir, output_dir, jobs=1, report=None, incremental=False, manifest=None, checksum=False, **kwargs):
+    """
+    批量处理目录中的图片
+
+    参数:
+    input_dir: 输入目录
+    output_dir: 输出目录（保持输入目录结构）
+    jobs: 并发进程数，1 表示在当前进程中逐个处理
+    report: 处理报告路径（JSON，包含每个文件的耗时）
+    incremental: 增量模式，只处理新增或变化的文件，并清理源文件已删除的输出
+    manifest: 增量清单路径，默认为 <输出目录>/.resize_manifest.json
+    checksum: 增量模式下修改时间变化时再比较内容哈希
+    kwargs: 传给 resize_image 的参数
+
+    返回:
+    dict: 处理统计，无可处理文件时为 None
+    """
     supported_formats = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp', '.ico', '.ppm', '.pgm', '.pbm'}
     
     # 验证输入目录
@@ -117,7 +392,7 @@ def batch_resize(input_dir, output_dir, **kwargs):
     
     if not input_dir.exists():
         logging.error(f"输入目录不存在: {input_dir}")
-        return
+        return None
     
     # 创建输出目录
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -125,30 +400,195 @@ def batch_resize(input_dir, output_dir, **kwargs):
     # 收集所有图片文件
     image_files = []
     for root, dirs, files in os.walk(input_dir):
-        for file in files:
+        dirs.sort()
+        for file in sorted(files):
             file_path = Path(root) / file
             if file_path.suffix.lower() in supported_formats:
                 image_files.append(file_path)
     
-    if not image_files:
+    if not image_files and not incremental:
         logging.warning(f"在 {input_dir} 中没有找到支持的图片文件")
-        return
+        return None
+    
+    # 构建输出路径，保持目录结构
+    tasks = [
+        (str(input_path), str(output_dir / input_path.relative_to(input_dir)), kwargs)
+        for input_path in image_files
+    ]
+    
+    skipped = pruned = 0
+    if incremental:
+        manifest_path = Path(manifest) if manifest else output_dir / MANIFEST_NAME
+        entries = load_manifest(manifest_path, input_dir)
+        relative_paths = {task[0]: Path(task[0]).relative_to(input_dir).as_posix() for task in tasks}
+        pruned = prune_outputs(entries, set(relative_paths.values()), output_dir)
+        pending = []
+        for task in tasks:
+            if is_unchanged(entries.get(relative_paths[task[0]]), task[0], task[1], kwargs, checksum):
+                skipped += 1
+            else:
+                pending.append(task)
+        tasks = pending
+        # 处理前记录签名，处理期间被修改的文件下次仍会重新处理
+        signatures = {task[0]: file_signature(task[0], checksum) for task in tasks}
+        logging.info(f"增量模式: 跳过 {skipped} 个未变化文件，清理 {pruned} 个过期输出")
     
-    logging.info(f"找到 {len(image_files)} 个图片文件，开始处理...")
+    total = len(tasks)
+    jobs = max(1, min(jobs or 1, total))
+    logging.info(f"找到 {total} 个待处理的图片文件，开始处理...（并发进程: {jobs}）")
     
     # 处理图片并跟踪进度
-    success_count = 0
-    for i, input_path in enumerate(image_files, 1):
-        # 构建输出路径，保持目录结构
-        relative_path = input_path.relative_to(input_dir)
-        output_path = output_dir / relative_path
-        
-        logging.info(f"[{i}/{len(image_files)}] 处理: {input_path.name}")
-        
-        if resize_image(str(input_path), str(output_path), **kwargs):
-            success_count += 1
+    results = []
+    start = time.perf_counter()
+    try:
+        if jobs == 1:
+            for i, (input_path, output_path, _) in enumerate(tasks, 1):
+                logging.info(f"[{i}/{total}] 处理: {Path(input_path).name}")
+                file_start = time.perf_counter()
+                success = resize_image(input_path, output_path, **kwargs)
+                results.append((input_path, output_path, success, time.perf_counter() - file_start))
+        else:
+            # 分块派发减少进程间通信；按提交顺序读取结果，日志顺序与文件顺序一致
+            chunksize = max(1, min(64, total // (jobs * 8)))
+            executor = ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_worker,
+                initargs=(logging.getLogger().level,)
+            )
+            futures = [
+                (offset, executor.submit(_resize_chunk, tasks[offset:offset + chunksize]))
+                for offset in range(0, total, chunksize)
+            ]
+
+            def collect(offset, chunk_results):
+                for i, (success, elapsed, records) in enumerate(chunk_results, offset + 1):
+                    for level, message in records:
+                        logging.log(level, f"[{i}/{total}] {message}")
+                    results.append((tasks[i - 1][0], tasks[i - 1][1], success, elapsed))
+
+            collected = 0
+            try:
+                for offset, future in futures:
+                    collect(offset, future.result())
+                    collected += 1
+            except KeyboardInterrupt:
+                # 取消尚未开始的分块，等待正在处理的分块完成并记录其结果
+                executor.shutdown(wait=True, cancel_futures=True)
+                for offset, future in futures[collected:]:
+                    if future.done() and not future.cancelled() and future.exception() is None:
+                        collect(offset, future.result())
+                raise
+            executor.shutdown()
+    except KeyboardInterrupt:
+        logging.warning(f"已取消，已完成 {len(results)}/{total} 个文件")
+    
+    if incremental:
+        # 只记录成功的文件，失败和未处理的文件下次重新处理
+        for input_path, output_path, success, _ in results:
+            relative = relative_paths[input_path]
+            if success:
+                entries[relative] = {
+                    "source": relative,
+                    **signatures[input_path],
+                    "params": kwargs,
+                    "output": output_path
+                }
+            else:
+                entries.pop(relative, None)
+        save_manifest(manifest_path, entries, input_dir)
     
-    logging.info(f"批量处理完成！成功: {success_count}/{len(image_files)}")
+    wall_time = time.perf_counter() - start
+    success_count = sum(1 for result in results if result[2])
+    timings = sorted(results, key=lambda result: result[3], reverse=True)
+    cpu_time = sum(result[3] for result in results)
+    
+    logging.info(f"批量处理完成！成功: {success_count}/{total}，耗时 {wall_time:.1f}s")
+    if results:
+        logging.info(
+            f"单文件耗时: 平均 {cpu_time / len(results) * 1000:.0f}ms，"
+            f"最长 {timings[0][3] * 1000:.0f}ms ({Path(timings[0][0]).name})，"
+            f"吞吐 {len(results) / wall_time:.1f} 张/秒"
+        )
+    
+    summary = {
+        "total": total,
+        "processed": len(results),
+        "succeeded": success_count,
+        "failed": len(results) - success_count,
+        "cancelled": total - len(results),
+        "skipped": skipped,
+        "pruned": pruned,
+        "jobs": jobs,
+        "wall_time": round(wall_time, 3),
+        "files": [
+            {"input": input_path, "output": output_path, "success": success, "elapsed": round(elapsed, 4)}
+            for input_path, output_path, success, elapsed in results
+        ]
+    }
+    if report:
+        Path(report).parent.mkdir(parents=True, exist_ok=True)
+        with open(report, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        logging.info(f"处理报告: {report}")
+    return summary
+
+def benchmark(paths, width=None, height=None, scale=None, keep_ratio=True, repeat=3, fit_model=None, **kwargs):
+    """
+    比较各缩放模式的耗时、解码尺寸和画质
+
+    参数:
+    paths: 图片路径列表
+    width/height/scale/keep_ratio/fit_model: 与 resize_image 相同（fit_model 只用于确定目标尺寸）
+    repeat: 每个模式重复次数，取最短耗时
+
+    返回:
+    dict: 模式 -> {"ms": 平均单张耗时, "decoded_mpx": 平均解码像素(百万), "psnr": 相对 quality 模式的PSNR}
+    """
+    import math
+    from PIL import ImageChops, ImageStat
+
+    models = _load_fitting()[1] if fit_model else None
+    references = {}
+    report = {}
+    for mode in RESIZE_MODES:
+        total_ms, decoded, psnrs = 0.0, 0, []
+        for path in paths:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                with Image.open(path) as img:
+                    if models:
+                        size = models.fit_size_for_model(img.width, img.height, fit_model)
+                    else:
+                        size = compute_target_size(img.size, width, height, scale, keep_ratio)
+                    resized = resample_image(img, size, mode)
+                    decoded_pixels = img.size[0] * img.size[1]
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            total_ms += best
+            decoded += decoded_pixels
+
+            pixels = resized.convert('RGB')
+            if mode == 'quality':
+                references[path] = pixels
+            else:
+                stat = ImageStat.Stat(ImageChops.difference(pixels, references[path]))
+                mse = sum(stat.sum2) / (sum(stat.count) or 1)
+                psnrs.append(99.0 if mse == 0 else 10 * math.log10(255 ** 2 / mse))
+
+        report[mode] = {
+            "ms": total_ms / len(paths),
+            "decoded_mpx": decoded / len(paths) / 1e6,
+            "psnr": sum(psnrs) / len(psnrs) if psnrs else None,
+        }
+
+    baseline = report['quality']['ms']
+    print(f"{'模式':<10}{'单张耗时(ms)':>14}{'加速':>8}{'解码像素(MP)':>14}{'PSNR(dB)':>10}")
+    for mode, result in report.items():
+        psnr = f"{result['psnr']:.1f}" if result['psnr'] is not None else '-'
+        print(f"{mode:<10}{result['ms']:>14.1f}{baseline / result['ms']:>7.1f}x{result['decoded_mpx']:>14.2f}{psnr:>10}")
+    return report
+
 
 def main():
     # 解析命令行参数
@@ -157,13 +597,29 @@ def main():
     )
     
     parser.add_argument('input', help='输入图片文件或目录')
-    parser.add_argument('output', help='输出图片文件或目录')
+    parser.add_argument('output', nargs='?', help='输出图片文件或目录(--benchmark 时不需要)')
     parser.add_argument('-W', '--width', type=int, help='目标宽度(像素)')
     parser.add_argument('-H', '--height', type=int, help='目标高度(像素)')
     parser.add_argument('-S', '--scale', type=float, help='缩放比例(例如0.5表示缩小到50%%)')
     parser.add_argument('-Q', '--quality', type=int, default=95, choices=range(1, 101), 
                        help='输出图片质量(JPEG格式，1-100，默认95)')
     parser.add_argument('--no-ratio', action='store_true', help='不保持宽高比')
+    parser.add_argument('--fit-model', metavar='NAME',
+                       help='适配为模型支持的最接近尺寸: qwen, wan, wanx-edit, sketch, video, video-480p/720p/1080p 或具体模型名称')
+    parser.add_argument('--fit-method', choices=['auto', 'crop', 'pad'], default='auto',
+                       help='--fit-model 的适配方式: auto(默认，宽高比相差不大时裁剪，否则填充), crop(裁剪信息最多的区域), pad(按边缘颜色填充)')
+    parser.add_argument('-M', '--mode', choices=list(RESIZE_MODES), default='balanced',
+                       help='缩放模式: quality(完整解码), balanced(默认，JPEG缩小解码+高质量重采样), fast(速度优先)')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='比较各缩放模式的耗时和画质，不写出文件(目录输入时取前10张)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                       help='批量处理的并发进程数(默认1，0表示使用全部CPU核数)')
+    parser.add_argument('--report', help='批量处理报告路径(JSON，包含每个文件的耗时)')
+    parser.add_argument('-I', '--incremental', action='store_true',
+                       help='增量处理：只处理新增或变化的文件，并删除源文件已不存在的输出')
+    parser.add_argument('--manifest', help=f'增量清单路径(默认: <输出目录>/{MANIFEST_NAME})')
+    parser.add_argument('--checksum', action='store_true',
+                       help='增量处理时修改时间变化的文件再比较内容哈希，内容未变则跳过')
     parser.add_argument('-v', '--verbose', action='store_true', help='详细输出')
     
     args = parser.parse_args()
@@ -173,11 +629,18 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     # 验证参数
-    if not args.width and not args.height and not args.scale:
-        logging.error("错误：必须指定宽度、高度或缩放比例中的至少一个")
+    if not args.width and not args.height and not args.scale and not args.fit_model:
+        logging.error("错误：必须指定宽度、高度、缩放比例或 --fit-model 中的至少一个")
         sys.exit(1)
     
-    if args.scale and (args.width or args.height):
+    if args.fit_model:
+        models = _load_fitting()[1]
+        if models.resolve_capability(args.fit_model) is None:
+            logging.error(f"错误：未知的模型尺寸能力 - {args.fit_model}，可用: {', '.join(models.MODEL_CAPABILITIES)}")
+            sys.exit(1)
+        if args.width or args.height or args.scale:
+            logging.warning("警告：指定了 --fit-model，将忽略宽度/高度/缩放比例")
+    elif args.scale and (args.width or args.height):
         logging.warning("警告：同时指定了缩放比例和宽度/高度，将使用缩放比例")
     
     if args.quality < 1 or args.quality > 100:
@@ -190,8 +653,11 @@ def main():
         'height': args.height,
         'scale': args.scale,
         'keep_ratio': not args.no_ratio,
-        'quality': args.quality
+        'quality': args.quality,
+        'mode': args.mode
     }
+    if args.fit_model:
+        resize_kwargs.update(fit_model=args.fit_model, fit_method=args.fit_method)
     
     # 处理单个文件或目录
     input_path = Path(args.input)
@@ -200,6 +666,21 @@ def main():
         logging.error(f"错误：输入路径不存在 - {args.input}")
         sys.exit(1)
     
+    if args.benchmark:
+        if input_path.is_dir():
+            paths = sorted(
+                str(path) for path in input_path.rglob('*')
+                if path.suffix.lower() in {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff'}
+            )[:10]
+        else:
+            paths = [str(input_path)]
+        benchmark(paths, **resize_kwargs)
+        return
+    
+    if not args.output:
+        logging.error("错误：必须指定输出路径")
+        sys.exit(1)
+    
     if input_path.is_file():
         # 处理单个文件
         output_path = Path(args.output)
@@ -219,7 +700,12 @@ def main():
     elif input_path.is_dir():
         # 处理目录（批量处理）
         logging.info(f"开始批量处理目录: {args.input}")
-        batch_resize(str(input_path), str(Path(args.output)), **resize_kwargs)
+        jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+        summary = batch_resize(str(input_path), str(Path(args.output)), jobs=jobs, report=args.report,
+                               incremental=args.incremental, manifest=args.manifest, checksum=args.checksum,
+                               **resize_kwargs)
+        if summary is None or summary["failed"] or summary["cancelled"]:
+            sys.exit(1)
     else:
         logging.error(f"错误：输入路径类型不支持 - {args.input}")
         sys.exit(1)